@@ -19,6 +19,7 @@ from app.models import (  # noqa: F401
     AdminSession,
     Appeal,
     Blacklist,
+    BroadcastJob,  # Persisted broadcast progress
     Deposit,
     DepositReward,
     FailedNotification,
@@ -28,6 +29,7 @@ from app.models import (  # noqa: F401
     PaymentRetry,
     Referral,
     ReferralEarning,
+    ReferralLeaderboardEntry,  # Materialized referral leaderboard
     RewardSession,
     SupportMessage,
     SupportTicket,
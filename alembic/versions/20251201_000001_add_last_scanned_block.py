@@ -0,0 +1,29 @@
+"""Add last_scanned_block cursor to global_settings.
+
+Revision ID: 20251201_scan_cursor
+Revises: 20251130_roi_notif
+Create Date: 2025-12-01
+
+Durable cursor for the incoming transfer monitor so each block range is
+scanned exactly once.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251201_scan_cursor'
+down_revision = '20251130_roi_notif'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'global_settings',
+        sa.Column('last_scanned_block', sa.BigInteger(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('global_settings', 'last_scanned_block')
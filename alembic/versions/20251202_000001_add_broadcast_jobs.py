@@ -0,0 +1,47 @@
+"""Add broadcast_jobs table.
+
+Revision ID: 20251202_broadcast_jobs
+Revises: 20251201_scan_cursor
+Create Date: 2025-12-02
+
+Persisted broadcast progress (keyset cursor and counters) so broadcasts
+resume after a restart.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251202_broadcast_jobs'
+down_revision = '20251201_scan_cursor'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'broadcast_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('broadcast_id', sa.String(length=100), nullable=False),
+        sa.Column('admin_id', sa.Integer(), nullable=False),
+        sa.Column('admin_telegram_id', sa.BigInteger(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('button', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('last_user_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sent_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('broadcast_id'),
+    )
+    op.create_index(
+        'ix_broadcast_jobs_status', 'broadcast_jobs', ['status']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_broadcast_jobs_status', table_name='broadcast_jobs')
+    op.drop_table('broadcast_jobs')
@@ -0,0 +1,31 @@
+"""Add version column to global_settings.
+
+Revision ID: 20251203_settings_version
+Revises: 20251202_broadcast_jobs
+Create Date: 2025-12-03
+
+Monotonic version bumped on every settings change, so processes can
+tell whether their in-memory settings snapshot is current.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251203_settings_version'
+down_revision = '20251202_broadcast_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'global_settings',
+        sa.Column(
+            'version', sa.Integer(), server_default='1', nullable=False
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('global_settings', 'version')
@@ -0,0 +1,61 @@
+"""Add referral_leaderboard table.
+
+Revision ID: 20251204_referral_leaderboard
+Revises: 20251203_settings_version
+Create Date: 2025-12-04
+
+Materialized per-referrer referral count and earnings, so leaderboard
+reads and rank lookups no longer aggregate referrals and earnings.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251204_referral_leaderboard'
+down_revision = '20251203_settings_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'referral_leaderboard',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('referral_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_earnings', sa.DECIMAL(18, 8), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_index(
+        'ix_referral_leaderboard_by_referrals',
+        'referral_leaderboard',
+        ['referral_count', 'total_earnings'],
+    )
+    op.create_index(
+        'ix_referral_leaderboard_by_earnings',
+        'referral_leaderboard',
+        ['total_earnings', 'referral_count'],
+    )
+
+    # Backfill from existing referrals and earnings
+    op.execute("""
+        INSERT INTO referral_leaderboard
+            (user_id, referral_count, total_earnings, updated_at)
+        SELECT
+            r.referrer_id,
+            COUNT(DISTINCT r.referral_id),
+            COALESCE(SUM(re.amount), 0),
+            now()
+        FROM referrals r
+        JOIN users u ON u.id = r.referrer_id
+        LEFT JOIN referral_earnings re ON re.referral_id = r.id
+        GROUP BY r.referrer_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_referral_leaderboard_by_earnings', table_name='referral_leaderboard')
+    op.drop_index('ix_referral_leaderboard_by_referrals', table_name='referral_leaderboard')
+    op.drop_table('referral_leaderboard')
@@ -0,0 +1,57 @@
+"""Notify consumers of notification_queue_fallback inserts.
+
+Revision ID: 20251205_fallback_notify
+Revises: 20251204_referral_leaderboard
+Create Date: 2025-12-05
+
+Inserts into notification_queue_fallback NOTIFY the
+notification_queue_fallback channel (once per statement, delivered on
+commit), so consumers LISTEN instead of polling. A partial index serves
+the consumers' pending-rows claim query.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251205_fallback_notify'
+down_revision = '20251204_referral_leaderboard'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_notification_queue_fallback_pending',
+        'notification_queue_fallback',
+        [sa.text('priority DESC'), 'created_at'],
+        postgresql_where=sa.text('processed_at IS NULL'),
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_notification_queue_fallback()
+        RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('notification_queue_fallback', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER notification_queue_fallback_notify
+        AFTER INSERT ON notification_queue_fallback
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION notify_notification_queue_fallback()
+    """)
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER IF EXISTS notification_queue_fallback_notify "
+        "ON notification_queue_fallback"
+    )
+    op.execute("DROP FUNCTION IF EXISTS notify_notification_queue_fallback()")
+    op.drop_index(
+        'ix_notification_queue_fallback_pending',
+        table_name='notification_queue_fallback',
+    )
@@ -0,0 +1,30 @@
+"""Add lower(wallet_address) index to users.
+
+Revision ID: 20251206_wallet_lower_index
+Revises: 20251205_fallback_notify
+Create Date: 2025-12-06
+
+Incoming deposits are matched to users by sender address ignoring case.
+ILIKE cannot use an index; lower(wallet_address) IN (...) can.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251206_wallet_lower_index'
+down_revision = '20251205_fallback_notify'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_users_wallet_address_lower',
+        'users',
+        [sa.text('lower(wallet_address)')],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_wallet_address_lower', table_name='users')
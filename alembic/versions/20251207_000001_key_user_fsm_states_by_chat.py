@@ -0,0 +1,65 @@
+"""Key user_fsm_states by Telegram chat and user ID.
+
+Revision ID: 20251207_fsm_chat_key
+Revises: 20251206_wallet_lower_index
+Create Date: 2025-12-07
+
+The PostgreSQL FSM storage upserts by (chat_id, telegram_id) instead of
+resolving users.id per call. Existing rows are backfilled from users
+(private chats: chat_id = telegram_id) and deduplicated, keeping the
+latest row per key. user_id becomes optional.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251207_fsm_chat_key'
+down_revision = '20251206_wallet_lower_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('user_fsm_states', sa.Column('chat_id', sa.BigInteger(), nullable=True))
+    op.add_column('user_fsm_states', sa.Column('telegram_id', sa.BigInteger(), nullable=True))
+
+    op.execute("""
+        UPDATE user_fsm_states s
+        SET telegram_id = u.telegram_id, chat_id = u.telegram_id
+        FROM users u
+        WHERE u.id = s.user_id
+    """)
+    op.execute("DELETE FROM user_fsm_states WHERE telegram_id IS NULL")
+    op.execute("""
+        DELETE FROM user_fsm_states a
+        USING user_fsm_states b
+        WHERE a.chat_id = b.chat_id
+          AND a.telegram_id = b.telegram_id
+          AND (a.updated_at, a.id) < (b.updated_at, b.id)
+    """)
+
+    op.alter_column('user_fsm_states', 'chat_id', nullable=False)
+    op.alter_column('user_fsm_states', 'telegram_id', nullable=False)
+    op.alter_column('user_fsm_states', 'user_id', nullable=True)
+    op.create_unique_constraint(
+        'uq_user_fsm_states_chat_user',
+        'user_fsm_states',
+        ['chat_id', 'telegram_id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_user_fsm_states_chat_user', 'user_fsm_states', type_='unique')
+
+    op.execute("""
+        UPDATE user_fsm_states s
+        SET user_id = u.id
+        FROM users u
+        WHERE u.telegram_id = s.telegram_id AND s.user_id IS NULL
+    """)
+    op.execute("DELETE FROM user_fsm_states WHERE user_id IS NULL")
+    op.alter_column('user_fsm_states', 'user_id', nullable=False)
+
+    op.drop_column('user_fsm_states', 'telegram_id')
+    op.drop_column('user_fsm_states', 'chat_id')
@@ -0,0 +1,37 @@
+"""Add lease columns to broadcast_jobs.
+
+Revision ID: 20251208_broadcast_lease
+Revises: 20251207_fsm_chat_key
+Create Date: 2025-12-08
+
+A process sending a broadcast holds a lease (token and expiry) that it
+renews at every checkpoint, so a broadcast is resumed by only one
+process and only after its sender stopped renewing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20251208_broadcast_lease'
+down_revision = '20251207_fsm_chat_key'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'broadcast_jobs',
+        sa.Column('lease_token', sa.String(length=32), nullable=True),
+    )
+    op.add_column(
+        'broadcast_jobs',
+        sa.Column(
+            'lease_expires_at', sa.DateTime(timezone=True), nullable=True
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('broadcast_jobs', 'lease_expires_at')
+    op.drop_column('broadcast_jobs', 'lease_token')
@@ -5,6 +5,7 @@ Loads configuration from environment variables using pydantic-settings.
 """
 
 import re
+from typing import Literal
 
 from loguru import logger
 from pydantic import Field, field_validator, model_validator
@@ -46,6 +47,33 @@ class Settings(BaseSettings):
     blockchain_poll_interval: int = Field(
         default=3, ge=1, description="Blockchain event polling interval in seconds"
     )
+    # Incoming transfer scanner
+    incoming_scan_confirmations: int = Field(
+        default=12,
+        ge=0,
+        description="Blocks behind head before a range is scanned as final",
+    )
+    incoming_scan_max_block_range: int = Field(
+        default=2000,
+        ge=1,
+        description="Max blocks per eth_getLogs request (RPC provider limit)",
+    )
+    rpc_batch_size: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Max calls per JSON-RPC batch request",
+    )
+    payout_batch_size: int = Field(
+        default=200,
+        ge=1,
+        description="Max payment retries signed and broadcast per run",
+    )
+    payout_receipt_timeout: int = Field(
+        default=60,
+        ge=0,
+        description="Seconds to wait for receipts of a payout batch",
+    )
     # Payout wallet (optional, defaults to wallet_address)
     payout_wallet_address: str | None = None
 
@@ -73,6 +101,52 @@ class Settings(BaseSettings):
     redis_password: str | None = None
     redis_db: int = 0
 
+    # User context cache (middleware user/ban/language snapshot)
+    user_context_cache_size: int = Field(
+        default=10000, ge=1, description="Max users in the in-process LRU"
+    )
+    user_context_local_ttl: int = Field(
+        default=30, ge=1, description="In-process entry lifetime in seconds"
+    )
+    user_context_redis_ttl: int = Field(
+        default=300, ge=1, description="Redis entry lifetime in seconds"
+    )
+    global_settings_cache_ttl: int = Field(
+        default=30,
+        ge=1,
+        description="Seconds before the settings snapshot is revalidated",
+    )
+
+    # Admin sessions (Redis) and admin identity cache
+    admin_session_persist_interval: int = Field(
+        default=60,
+        ge=1,
+        le=300,
+        description="Min seconds between last_activity writes per session",
+    )
+    admin_cache_ttl: int = Field(
+        default=60, ge=1, description="In-process admin row lifetime"
+    )
+
+    # PostgreSQL FSM storage (Redis outage fallback)
+    fsm_cache_size: int = Field(
+        default=10000, ge=1, description="Max FSM records in the process LRU"
+    )
+    fsm_write_delay_ms: int = Field(
+        default=50, ge=0, description="Delay coalescing FSM writes per key"
+    )
+
+    # Password hashing (bcrypt off the event loop)
+    password_hash_workers: int = Field(
+        default=2, ge=1, description="Processes in the bcrypt pool"
+    )
+    password_hash_max_pending: int = Field(
+        default=32, ge=1, description="Max queued + running hash jobs"
+    )
+    password_hash_rounds: int = Field(
+        default=12, ge=4, le=31, description="bcrypt cost factor"
+    )
+
     # Security
     secret_key: str
     encryption_key: str
@@ -85,9 +159,119 @@ class Settings(BaseSettings):
         default=8080, ge=1, le=65535, description="Health check HTTP server port"
     )
 
+    # Update ingestion: "polling" (single process), "webhook" (ingress
+    # that queues updates per shard) or "worker" (handles one shard)
+    bot_mode: Literal["polling", "webhook", "worker"] = "polling"
+    webhook_url: str | None = Field(
+        default=None, description="Public base URL Telegram posts to"
+    )
+    webhook_path: str = "/telegram/webhook"
+    webhook_secret: str | None = Field(
+        default=None, description="X-Telegram-Bot-Api-Secret-Token value"
+    )
+    webhook_shards: int = Field(
+        default=4, ge=1, le=256, description="Update streams (one worker each)"
+    )
+    webhook_worker_shard: int = Field(
+        default=0, ge=0, description="Shard handled by this worker process"
+    )
+    webhook_worker_concurrency: int = Field(
+        default=32, ge=1, description="Updates handled at once per worker"
+    )
+    webhook_dedup_ttl: int = Field(
+        default=86400, ge=60, description="Seconds update_ids are remembered"
+    )
+    webhook_stream_maxlen: int = Field(
+        default=100000, ge=1000, description="Approx max entries per stream"
+    )
+    webhook_max_deliveries: int = Field(
+        default=5, ge=1, description="Deliveries before dead-lettering"
+    )
+
     # Broadcast settings
-    broadcast_rate_limit: int = 15  # messages per second
+    broadcast_rate_limit: int = 25  # messages per second (Telegram ~30/s)
     broadcast_cooldown: int = 900  # 15 minutes in seconds
+    broadcast_concurrency: int = Field(
+        default=10, ge=1, le=100, description="Concurrent broadcast senders"
+    )
+    broadcast_page_size: int = Field(
+        default=500,
+        ge=1,
+        le=10000,
+        description="Recipients per broadcast progress checkpoint",
+    )
+    broadcast_lease_seconds: int = Field(
+        default=600,
+        ge=60,
+        description="Broadcast claim lifetime, renewed at each checkpoint",
+    )
+
+    # Notification fallback queue consumer settings
+    notification_fallback_batch_size: int = Field(
+        default=50,
+        ge=1,
+        le=1000,
+        description="Notifications claimed per batch",
+    )
+    notification_fallback_rate_limit: int = Field(
+        default=25, ge=1, description="Fallback messages per second"
+    )
+    notification_fallback_sweep_seconds: int = Field(
+        default=60, ge=1, description="Max wait for NOTIFY before a sweep"
+    )
+
+    # User message log settings
+    message_log_batch_size: int = Field(
+        default=200, ge=1, le=10000, description="Rows per log insert batch"
+    )
+    message_log_flush_interval_ms: int = Field(
+        default=500, ge=10, description="Max delay before buffered logs flush"
+    )
+    message_log_buffer_limit: int = Field(
+        default=10000, ge=1, description="Max buffered logs (oldest dropped)"
+    )
+    message_log_keep_per_user: int = Field(
+        default=500, ge=1, description="Messages kept per user by trim job"
+    )
+
+    # Data retention settings
+    retention_batch_size: int = Field(
+        default=1000, ge=1, le=50000, description="Rows deleted per batch"
+    )
+    retention_batch_pause_ms: int = Field(
+        default=100, ge=0, description="Pause between retention batches"
+    )
+    retention_archive_dir: str = Field(
+        default="./archive", description="Directory for archived rows"
+    )
+    retention_admin_actions_days: int = Field(
+        default=30, ge=1, description="Age of deleted admin actions"
+    )
+    retention_message_logs_days: int = Field(
+        default=90, ge=1, description="Age of deleted user message logs"
+    )
+    retention_fsm_states_days: int = Field(
+        default=30, ge=1, description="Inactivity of deleted FSM states"
+    )
+    retention_notification_fallback_days: int = Field(
+        default=7, ge=1, description="Age of deleted processed notifications"
+    )
+    retention_admin_sessions_days: int = Field(
+        default=30, ge=1, description="Inactivity of deleted admin sessions"
+    )
+
+    # Report exports (streamed CSV/XLSX)
+    export_batch_size: int = Field(
+        default=1000,
+        ge=1,
+        le=50000,
+        description="Rows fetched per export batch",
+    )
+    export_spool_max_bytes: int = Field(
+        default=8 * 1024 * 1024,
+        ge=0,
+        description="Export size kept in memory before spilling to disk",
+    )
 
     # ROI settings
     roi_daily_percent: float = Field(
@@ -97,6 +281,12 @@ class Settings(BaseSettings):
     roi_cap_multiplier: float = Field(
         default=5.0, gt=0, le=10.0, description="ROI cap multiplier"
     )
+    reward_accrual_chunk_size: int = Field(
+        default=500,
+        ge=1,
+        le=10000,
+        description="Deposits processed (and committed) per accrual chunk",
+    )
 
     # Blockchain maintenance mode (R7-5)
     blockchain_maintenance_mode: bool = Field(
@@ -205,6 +395,21 @@ class Settings(BaseSettings):
             self.rpc_quicknode_http = self.rpc_url
         return self
 
+    @model_validator(mode='after')
+    def validate_webhook(self) -> 'Settings':
+        """Validate webhook ingestion settings."""
+        if self.bot_mode == 'webhook' and not self.webhook_url:
+            raise ValueError('WEBHOOK_URL is required when BOT_MODE=webhook')
+        if self.bot_mode == 'webhook' and not self.webhook_secret:
+            raise ValueError(
+                'WEBHOOK_SECRET is required when BOT_MODE=webhook'
+            )
+        if self.webhook_worker_shard >= self.webhook_shards:
+            raise ValueError(
+                'WEBHOOK_WORKER_SHARD must be lower than WEBHOOK_SHARDS'
+            )
+        return self
+
     @model_validator(mode='after')
     def validate_production(self) -> 'Settings':
         """Validate production-specific requirements."""
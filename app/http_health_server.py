@@ -59,15 +59,21 @@ def create_health_app() -> web.Application:
     return app
 
 
-async def run_health_server(host: str = "0.0.0.0", port: int = 8080) -> None:
+async def run_health_server(
+    host: str = "0.0.0.0",
+    port: int = 8080,
+    app: web.Application | None = None,
+) -> None:
     """
     Run health check HTTP server.
 
     Args:
         host: Host to bind to (default: 0.0.0.0)
         port: Port to bind to (default: 8080)
+        app: Application with extra routes (default: health app only)
     """
-    app = create_health_app()
+    if app is None:
+        app = create_health_app()
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, host, port)
@@ -14,6 +14,7 @@ from app.models.base import Base
 
 # Security Models
 from app.models.blacklist import Blacklist
+from app.models.broadcast_job import BroadcastJob
 from app.models.deposit import Deposit
 from app.models.deposit_corridor_history import DepositCorridorHistory
 from app.models.deposit_level_version import DepositLevelVersion
@@ -38,6 +39,7 @@ from app.models.financial_password_recovery import (
 from app.models.payment_retry import PaymentRetry, PaymentType
 from app.models.referral import Referral
 from app.models.referral_earning import ReferralEarning
+from app.models.referral_leaderboard import ReferralLeaderboardEntry
 
 # Reward Models
 from app.models.reward_session import RewardSession
@@ -94,6 +96,7 @@ __all__ = [
     "RewardSession",
     "DepositReward",
     "ReferralEarning",
+    "ReferralLeaderboardEntry",
     # PART5 Critical Models
     "PaymentRetry",
     "FailedNotification",
@@ -102,6 +105,7 @@ __all__ = [
     "SupportTicket",
     "SupportMessage",
     # System Models
+    "BroadcastJob",
     "GlobalSettings",
     "UserAction",
     "UserFsmState",
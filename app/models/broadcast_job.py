@@ -0,0 +1,94 @@
+"""
+BroadcastJob model.
+
+Persists broadcast content and delivery progress so a broadcast
+survives bot restarts and resumes from its keyset cursor. A lease keeps
+one process sending a broadcast at a time.
+"""
+
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import JSON, BigInteger, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class BroadcastJob(Base):
+    """
+    BroadcastJob entity.
+
+    Attributes:
+        id: Primary key
+        broadcast_id: Public broadcast identifier shown to admin
+        admin_id: Admin who started the broadcast
+        admin_telegram_id: Chat notified on completion
+        payload: Broadcast content (type, text, file_id, caption)
+        button: Optional inline URL button (text, url)
+        status: running / completed / failed
+        last_user_id: Keyset cursor - last users.id processed
+        sent_count: Messages delivered
+        failed_count: Messages that could not be delivered
+        lease_token: Claim of the process currently sending
+        lease_expires_at: When the claim lapses unless renewed
+        created_at: When broadcast was started
+        updated_at: Last progress checkpoint
+        finished_at: When broadcast completed or failed
+    """
+
+    __tablename__ = "broadcast_jobs"
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    broadcast_id: Mapped[str] = mapped_column(
+        String(100), nullable=False, unique=True
+    )
+    admin_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    admin_telegram_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    button: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="running", index=True
+    )
+    last_user_id: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+    sent_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+
+    lease_token: Mapped[str | None] = mapped_column(
+        String(32), nullable=True
+    )
+    lease_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+        nullable=False,
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"BroadcastJob(id={self.id}, "
+            f"broadcast_id={self.broadcast_id!r}, "
+            f"status={self.status!r}, "
+            f"last_user_id={self.last_user_id})"
+        )
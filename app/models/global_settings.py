@@ -8,7 +8,7 @@ Singleton pattern (only one row expected).
 from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import Boolean, Integer, Numeric, String
+from sqlalchemy import BigInteger, Boolean, Integer, Numeric, String
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -21,6 +21,11 @@ class GlobalSettings(Base):
     __tablename__ = "global_settings"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    # Bumped on every settings change (see global_settings_cache)
+    version: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", nullable=False
+    )
     
     # Withdrawal settings
     min_withdrawal_amount: Mapped[Decimal] = mapped_column(
@@ -46,6 +51,10 @@ class GlobalSettings(Base):
     is_auto_switch_enabled: Mapped[bool] = mapped_column(
         Boolean, default=True, nullable=False
     )
+    # Incoming transfer scanner cursor (last fully processed block)
+    last_scanned_block: Mapped[int | None] = mapped_column(
+        BigInteger, nullable=True
+    )
 
     # Deposit settings
     max_open_deposit_level: Mapped[int] = mapped_column(
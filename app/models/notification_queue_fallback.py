@@ -16,6 +16,7 @@ from sqlalchemy import (
     String,
     Text,
     Index,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -33,8 +34,9 @@ class NotificationQueueFallback(Base):
 
     Workflow:
     1. NotificationService writes to this table when Redis is down
-    2. Worker task polls this table every 5 seconds
-    3. Notifications are sent and marked as processed
+    2. An insert trigger NOTIFYs the notification_queue_fallback channel
+    3. Consumers claim rows (FOR UPDATE SKIP LOCKED), send them and mark
+       them as processed
     4. When Redis recovers, remaining notifications are migrated back
 
     Attributes:
@@ -58,6 +60,12 @@ class NotificationQueueFallback(Base):
             "idx_notification_queue_created",
             "created_at",
         ),
+        Index(
+            "ix_notification_queue_fallback_pending",
+            text("priority DESC"),
+            "created_at",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
     )
 
     # Primary key
@@ -0,0 +1,68 @@
+"""
+ReferralLeaderboardEntry model.
+
+Per-referrer leaderboard totals, maintained incrementally when referral
+relationships and earnings are written.
+"""
+
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from sqlalchemy import DECIMAL, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ReferralLeaderboardEntry(Base):
+    """
+    ReferralLeaderboardEntry entity.
+
+    Attributes:
+        user_id: Referrer user ID
+        referral_count: Distinct users referred (all levels)
+        total_earnings: Sum of referral earnings
+        updated_at: Last change
+    """
+
+    __tablename__ = "referral_leaderboard"
+    __table_args__ = (
+        # One index per ranking; top-N reads and rank counts are
+        # index range scans
+        Index(
+            "ix_referral_leaderboard_by_referrals",
+            "referral_count",
+            "total_earnings",
+        ),
+        Index(
+            "ix_referral_leaderboard_by_earnings",
+            "total_earnings",
+            "referral_count",
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    referral_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+    total_earnings: Mapped[Decimal] = mapped_column(
+        DECIMAL(18, 8), nullable=False, default=Decimal("0")
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"ReferralLeaderboardEntry(user_id={self.user_id}, "
+            f"referral_count={self.referral_count}, "
+            f"total_earnings={self.total_earnings})"
+        )
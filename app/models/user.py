@@ -15,8 +15,10 @@ from sqlalchemy import (
     CheckConstraint,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
+    text,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -45,6 +47,8 @@ class User(Base):
             'pending_earnings >= 0',
             name='check_user_pending_earnings_non_negative'
         ),
+        # Case-insensitive sender lookup of incoming deposits
+        Index('ix_users_wallet_address_lower', text('lower(wallet_address)')),
     )
 
     # Primary key
@@ -7,7 +7,15 @@ R11-2: Fallback storage for FSM states in PostgreSQL when Redis is unavailable.
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Integer, JSON, String
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Integer,
+    JSON,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -21,13 +29,22 @@ class UserFsmState(Base):
     User FSM state storage.
 
     R11-2: Stores FSM states in PostgreSQL as fallback when Redis is unavailable.
+    Rows are keyed by Telegram chat and user ID (one row per FSM key), so
+    storage needs no users lookup; user_id is only set on legacy rows.
     """
 
     __tablename__ = "user_fsm_states"
+    __table_args__ = (
+        UniqueConstraint(
+            "chat_id", "telegram_id", name="uq_user_fsm_states_chat_user"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    user_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("users.id"), nullable=False, index=True
+    chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    telegram_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    user_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("users.id"), nullable=True, index=True
     )
     state: Mapped[str | None] = mapped_column(String(255), nullable=True, index=True)
     data: Mapped[dict | None] = mapped_column(JSON, nullable=True)
@@ -42,5 +59,6 @@ class UserFsmState(Base):
     )
 
     # Relationship
-    user: Mapped["User"] = relationship("User", back_populates="fsm_states")
-
+    user: Mapped["User | None"] = relationship(
+        "User", back_populates="fsm_states"
+    )
@@ -37,6 +37,9 @@ from app.repositories.payment_retry_repository import (
 from app.repositories.referral_earning_repository import (
     ReferralEarningRepository,
 )
+from app.repositories.referral_leaderboard_repository import (
+    ReferralLeaderboardRepository,
+)
 from app.repositories.referral_repository import ReferralRepository
 
 # Reward Repositories
@@ -53,6 +56,9 @@ from app.repositories.support_ticket_repository import (
 )
 
 # System Repositories
+from app.repositories.broadcast_job_repository import (
+    BroadcastJobRepository,
+)
 from app.repositories.global_settings_repository import (
     GlobalSettingsRepository,
 )
@@ -81,6 +87,7 @@ __all__ = [
     "DepositLevelVersionRepository",
     "TransactionRepository",
     "ReferralRepository",
+    "ReferralLeaderboardRepository",
     "UserNotificationSettingsRepository",
     # Admin
     "AdminRepository",
@@ -100,6 +107,7 @@ __all__ = [
     "SupportTicketRepository",
     "SupportMessageRepository",
     # System
+    "BroadcastJobRepository",
     "GlobalSettingsRepository",
     "UserActionRepository",
     "WalletChangeRequestRepository",
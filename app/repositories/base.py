@@ -4,9 +4,10 @@ Base repository.
 Generic CRUD operations for all repositories.
 """
 
+from collections.abc import AsyncIterator
 from typing import Any, Generic, TypeVar
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.base import Base
@@ -98,6 +99,95 @@ class BaseRepository(Generic[ModelType]):
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_page(
+        self,
+        after_id: int | None = None,
+        limit: int = 100,
+        descending: bool = False,
+        **filters: Any,
+    ) -> list[ModelType]:
+        """
+        Get a keyset page of entities ordered by ID.
+
+        Unlike OFFSET pagination, the cost does not grow with the page
+        number.
+
+        Args:
+            after_id: Last ID of the previous page (None for first page)
+            limit: Page size
+            descending: Order by ID descending (newest first)
+            **filters: Column filters
+
+        Returns:
+            List of entities
+        """
+        stmt = select(self.model).filter_by(**filters)
+
+        if descending:
+            if after_id is not None:
+                stmt = stmt.where(self.model.id < after_id)
+            stmt = stmt.order_by(self.model.id.desc())
+        else:
+            if after_id is not None:
+                stmt = stmt.where(self.model.id > after_id)
+            stmt = stmt.order_by(self.model.id)
+
+        result = await self.session.execute(stmt.limit(limit))
+        return list(result.scalars().all())
+
+    async def iter_pages(
+        self, page_size: int = 500, **filters: Any
+    ) -> AsyncIterator[list[ModelType]]:
+        """
+        Iterate over all matching entities in keyset pages.
+
+        Each page is a separate query, so the session may be committed
+        between pages.
+
+        Args:
+            page_size: Entities per page
+            **filters: Column filters
+
+        Yields:
+            Lists of entities ordered by ID
+        """
+        after_id = None
+        while True:
+            page = await self.get_page(after_id, page_size, **filters)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after_id = page[-1].id
+
+    async def stream(
+        self, batch_size: int = 1000, **filters: Any
+    ) -> AsyncIterator[ModelType]:
+        """
+        Stream matching entities through a server-side cursor.
+
+        Rows are fetched `batch_size` at a time, so memory stays flat
+        regardless of table size. The session must not be committed
+        while iterating.
+
+        Args:
+            batch_size: Rows fetched per round trip
+            **filters: Column filters
+
+        Yields:
+            Entities ordered by ID
+        """
+        stmt = (
+            select(self.model)
+            .filter_by(**filters)
+            .order_by(self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream_scalars(stmt)
+        async for entity in result:
+            yield entity
+
     async def find_by(
         self, **filters: Any
     ) -> list[ModelType]:
@@ -152,6 +242,59 @@ class BaseRepository(Generic[ModelType]):
         await self.session.refresh(entity)
         return entity
 
+    async def update_by_id(self, id: int, **data: Any) -> bool:
+        """
+        Update entity by ID with a single UPDATE statement.
+
+        Unlike update(), does not load the entity first nor refresh it
+        afterwards. Loaded instances in the session are kept in sync.
+
+        Args:
+            id: Entity ID
+            **data: Updated data
+
+        Returns:
+            True if updated, False if not found
+        """
+        return await self.update_by_ids([id], **data) > 0
+
+    async def update_by_ids(self, ids: list[int], **data: Any) -> int:
+        """
+        Set the same values on many entities with one UPDATE statement.
+
+        Args:
+            ids: Entity IDs
+            **data: Updated data
+
+        Returns:
+            Number of updated rows
+        """
+        if not ids:
+            return 0
+
+        stmt = (
+            update(self.model)
+            .where(self.model.id.in_(ids))
+            .values(**data)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount or 0
+
+    async def bulk_update(self, items: list[dict[str, Any]]) -> None:
+        """
+        Set different values on many entities by primary key.
+
+        Sent as one executemany UPDATE ... WHERE id = :id. Every dict
+        must contain "id" and the same set of keys.
+
+        Args:
+            items: List of entity data dicts including "id"
+        """
+        if not items:
+            return
+
+        await self.session.execute(update(self.model), items)
+
     async def delete(self, id: int) -> bool:
         """
         Delete entity by ID.
@@ -198,26 +341,41 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             True if exists, False otherwise
         """
-        count = await self.count(**filters)
-        return count > 0
+        stmt = select(
+            select(self.model).filter_by(**filters).exists()
+        )
+        result = await self.session.execute(stmt)
+        return bool(result.scalar())
 
     async def bulk_create(
-        self, items: list[dict[str, Any]]
+        self, items: list[dict[str, Any]], returning: bool = True
     ) -> list[ModelType]:
         """
-        Create multiple entities.
+        Create multiple entities with a bulk INSERT.
+
+        Rows are sent as batched multi-row INSERTs. With returning=True
+        the created entities come back from INSERT ... RETURNING in the
+        same round trip, in the order of `items`; with returning=False
+        nothing is fetched back.
 
         Args:
             items: List of entity data dicts
+            returning: Return created entities
 
         Returns:
-            List of created entities
+            List of created entities (empty if returning=False)
         """
-        entities = [self.model(**item) for item in items]
-        self.session.add_all(entities)
-        await self.session.flush()
-
-        for entity in entities:
-            await self.session.refresh(entity)
-
-        return entities
+        if not items:
+            return []
+
+        if not returning:
+            await self.session.execute(insert(self.model), items)
+            return []
+
+        result = await self.session.scalars(
+            insert(self.model).returning(
+                self.model, sort_by_parameter_order=True
+            ),
+            items,
+        )
+        return list(result.all())
@@ -0,0 +1,83 @@
+"""
+BroadcastJob repository.
+
+Data access layer for BroadcastJob model.
+"""
+
+from datetime import timedelta
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.broadcast_job import BroadcastJob
+from app.repositories.base import BaseRepository
+
+
+class BroadcastJobRepository(BaseRepository[BroadcastJob]):
+    """BroadcastJob repository with progress tracking and leases."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        """Initialize broadcast job repository."""
+        super().__init__(BroadcastJob, session)
+
+    async def claim_unleased(
+        self, lease_token: str, lease_seconds: int
+    ) -> list[int]:
+        """
+        Atomically claim running broadcasts whose lease has lapsed.
+
+        Concurrent callers never claim the same job: the row lock taken
+        by the UPDATE makes the second caller re-check the lease.
+
+        Args:
+            lease_token: Token identifying the claiming process
+            lease_seconds: Lease lifetime
+
+        Returns:
+            IDs of the claimed jobs
+        """
+        result = await self.session.execute(
+            update(BroadcastJob)
+            .where(
+                BroadcastJob.status == "running",
+                or_(
+                    BroadcastJob.lease_expires_at.is_(None),
+                    BroadcastJob.lease_expires_at < func.now(),
+                ),
+            )
+            .values(
+                lease_token=lease_token,
+                lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(BroadcastJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        return list(result.scalars().all())
+
+    async def renew_lease(
+        self, job_id: int, lease_token: str, lease_seconds: int
+    ) -> bool:
+        """
+        Extend a lease if it is still held by `lease_token`.
+
+        Args:
+            job_id: Broadcast job ID
+            lease_token: Token the lease was claimed with
+            lease_seconds: New lease lifetime from now
+
+        Returns:
+            False if the lease was taken over by another process
+        """
+        result = await self.session.execute(
+            update(BroadcastJob)
+            .where(
+                BroadcastJob.id == job_id,
+                BroadcastJob.lease_token == lease_token,
+            )
+            .values(
+                lease_expires_at=func.now() + timedelta(seconds=lease_seconds)
+            )
+            .returning(BroadcastJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none() is not None
@@ -5,8 +5,10 @@ Data access layer for Deposit model.
 """
 
 from decimal import Decimal
+from typing import Any
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.deposit import Deposit
@@ -54,6 +56,32 @@ class DepositRepository(BaseRepository[Deposit]):
         """
         return await self.get_by(tx_hash=tx_hash)
 
+    async def bulk_create_new(
+        self, items: list[dict[str, Any]]
+    ) -> list[Deposit]:
+        """
+        Bulk insert deposits, skipping tx hashes that already exist.
+
+        A row whose tx_hash is already recorded (e.g. submitted by the
+        user in the bot) is left out instead of failing the statement.
+
+        Args:
+            items: List of deposit data dicts
+
+        Returns:
+            Deposits actually inserted
+        """
+        if not items:
+            return []
+
+        result = await self.session.scalars(
+            pg_insert(Deposit)
+            .values(items)
+            .on_conflict_do_nothing(index_elements=[Deposit.tx_hash])
+            .returning(Deposit)
+        )
+        return list(result.all())
+
     async def get_active_deposits(
         self, user_id: int
     ) -> list[Deposit]:
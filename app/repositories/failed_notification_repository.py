@@ -5,7 +5,7 @@ Data access layer for FailedNotification model.
 """
 
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.failed_notification import FailedNotification
@@ -43,6 +43,24 @@ class FailedNotificationRepository(
 
         return await self.find_by(**filters)
 
+    async def count_unresolved_by_type(self) -> dict[str, int]:
+        """
+        Count unresolved notifications per notification type.
+
+        Returns:
+            Dict of notification_type -> count
+        """
+        stmt = (
+            select(
+                FailedNotification.notification_type,
+                func.count(FailedNotification.id),
+            )
+            .where(FailedNotification.resolved == False)  # noqa: E712
+            .group_by(FailedNotification.notification_type)
+        )
+        result = await self.session.execute(stmt)
+        return {ntype: count for ntype, count in result.all()}
+
     async def get_critical_unresolved(
         self,
     ) -> list[FailedNotification]:
@@ -6,7 +6,7 @@ from decimal import Decimal
 from typing import Any
 
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.global_settings import GlobalSettings
@@ -54,6 +54,7 @@ class GlobalSettingsRepository:
         daily_withdrawal_limit: Decimal | None = None,
         is_daily_limit_enabled: bool | None = None,
         auto_withdrawal_enabled: bool | None = None,
+        withdrawal_service_fee: Decimal | None = None,
         active_rpc_provider: str | None = None,
         is_auto_switch_enabled: bool | None = None,
         max_open_deposit_level: int | None = None,
@@ -64,6 +65,9 @@ class GlobalSettingsRepository:
     ) -> GlobalSettings:
         """
         Update global settings.
+
+        Configuration changes bump the row version on flush, which
+        invalidates every process' GlobalSettingsCache snapshot.
         """
         settings = await self.get_settings()
 
@@ -75,6 +79,8 @@ class GlobalSettingsRepository:
             settings.is_daily_limit_enabled = is_daily_limit_enabled
         if auto_withdrawal_enabled is not None:
             settings.auto_withdrawal_enabled = auto_withdrawal_enabled
+        if withdrawal_service_fee is not None:
+            settings.withdrawal_service_fee = withdrawal_service_fee
         if active_rpc_provider is not None:
             settings.active_rpc_provider = active_rpc_provider
         if is_auto_switch_enabled is not None:
@@ -101,3 +107,35 @@ class GlobalSettingsRepository:
         await self.session.commit()
         await self.session.refresh(settings)
         return settings
+
+    async def advance_last_scanned_block(
+        self, expected: int | None, new_block: int
+    ) -> bool:
+        """
+        Move the incoming transfer scan cursor forward (compare-and-set).
+
+        The update only applies if the cursor still holds `expected`, so
+        a concurrent scanner can never move it backwards or skip a range.
+        Does not commit.
+
+        Args:
+            expected: Cursor value read before scanning (None if unset)
+            new_block: Last block that has been fully processed
+
+        Returns:
+            True if the cursor was advanced
+        """
+        settings = await self.get_settings()
+
+        if expected is None:
+            condition = GlobalSettings.last_scanned_block.is_(None)
+        else:
+            condition = GlobalSettings.last_scanned_block == expected
+
+        stmt = (
+            update(GlobalSettings)
+            .where(GlobalSettings.id == settings.id, condition)
+            .values(last_scanned_block=new_block)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount == 1
@@ -26,10 +26,17 @@ class PaymentRetryRepository(BaseRepository[PaymentRetry]):
 
     async def get_pending_retries(
         self,
+        limit: int | None = None,
+        skip_locked: bool = False,
     ) -> list[PaymentRetry]:
         """
         Get pending retries ready for processing.
 
+        Args:
+            limit: Max retries, oldest due first (None for all)
+            skip_locked: Lock the rows, skipping rows locked by a
+                concurrent run (FOR UPDATE SKIP LOCKED)
+
         Returns:
             List of pending retries
         """
@@ -43,7 +50,15 @@ class PaymentRetryRepository(BaseRepository[PaymentRetry]):
                 (PaymentRetry.next_retry_at.is_(None))
                 | (PaymentRetry.next_retry_at <= now)
             )
+            .order_by(
+                PaymentRetry.next_retry_at.asc().nulls_first(),
+                PaymentRetry.id,
+            )
         )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if skip_locked:
+            stmt = stmt.with_for_update(skip_locked=True)
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
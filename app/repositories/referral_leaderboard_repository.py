@@ -0,0 +1,241 @@
+"""
+ReferralLeaderboard repository.
+
+Data access layer for ReferralLeaderboardEntry model.
+
+Totals are incremented with INSERT ... ON CONFLICT DO UPDATE in the
+transaction that writes the referral or earning, so the leaderboard is
+never read by aggregating referrals and referral_earnings.
+
+Increments hold a shared transaction-level advisory lock and the full
+rebuild holds it exclusively, so a rebuild never interleaves with an
+increment (which could otherwise be lost or hit the unique key).
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.referral_leaderboard import ReferralLeaderboardEntry
+from app.models.user import User
+from app.repositories.base import BaseRepository
+
+# Advisory lock ID serializing rebuilds against increments
+LEADERBOARD_LOCK_ID = 7_412_003_001
+
+# Full recompute, used to correct drift (e.g. deleted referrals)
+REBUILD_SQL = text("""
+    INSERT INTO referral_leaderboard
+        (user_id, referral_count, total_earnings, updated_at)
+    SELECT
+        r.referrer_id,
+        COUNT(DISTINCT r.referral_id),
+        COALESCE(SUM(re.amount), 0),
+        now()
+    FROM referrals r
+    JOIN users u ON u.id = r.referrer_id
+    LEFT JOIN referral_earnings re ON re.referral_id = r.id
+    GROUP BY r.referrer_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        referral_count = EXCLUDED.referral_count,
+        total_earnings = EXCLUDED.total_earnings,
+        updated_at = EXCLUDED.updated_at
+""")
+
+# Rows of users who no longer refer anyone (run after REBUILD_SQL)
+PRUNE_SQL = text("""
+    DELETE FROM referral_leaderboard lb
+    WHERE NOT EXISTS (
+        SELECT 1
+        FROM referrals r
+        JOIN users u ON u.id = r.referrer_id
+        WHERE r.referrer_id = lb.user_id
+    )
+""")
+
+
+@dataclass
+class LeaderboardPosition:
+    """User's ranks in both leaderboards."""
+
+    referral_rank: int | None
+    earnings_rank: int | None
+    total_users: int
+
+
+class ReferralLeaderboardRepository(
+    BaseRepository[ReferralLeaderboardEntry]
+):
+    """ReferralLeaderboardEntry repository with incremental upserts."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        """Initialize referral leaderboard repository."""
+        super().__init__(ReferralLeaderboardEntry, session)
+
+    async def add_referrals(self, referrer_ids: Iterable[int]) -> None:
+        """
+        Count one new referred user per referrer ID occurrence.
+
+        Does not commit.
+
+        Args:
+            referrer_ids: Referrer IDs (repeat an ID to add several)
+        """
+        await self._upsert("referral_count", dict(Counter(referrer_ids)))
+
+    async def add_earnings(self, amounts: dict[int, Decimal]) -> None:
+        """
+        Add referral earnings to referrers' totals.
+
+        Does not commit.
+
+        Args:
+            amounts: Earned amount by referrer ID
+        """
+        await self._upsert("total_earnings", amounts)
+
+    async def _upsert(self, field: str, deltas: dict[int, Any]) -> None:
+        """Increment one total for many referrers in one statement."""
+        if not deltas:
+            return
+
+        # Shared: increments run concurrently, but never during a rebuild
+        await self.session.execute(
+            select(func.pg_advisory_xact_lock_shared(LEADERBOARD_LOCK_ID))
+        )
+
+        now = datetime.now(UTC)
+        # Sorted keys keep row lock order stable across writers
+        rows = [
+            {"user_id": user_id, field: deltas[user_id], "updated_at": now}
+            for user_id in sorted(deltas)
+        ]
+        stmt = pg_insert(ReferralLeaderboardEntry).values(rows)
+        column = getattr(ReferralLeaderboardEntry, field)
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ReferralLeaderboardEntry.user_id],
+                set_={
+                    field: column + getattr(stmt.excluded, field),
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
+        )
+
+    async def get_top(
+        self, limit: int = 10, by_earnings: bool = False
+    ) -> list[Any]:
+        """
+        Get top referrers.
+
+        Args:
+            limit: Number of rows
+            by_earnings: Rank by earnings instead of referral count
+
+        Returns:
+            Rows with user_id, telegram_id, username, referral_count,
+            total_earnings
+        """
+        entry = ReferralLeaderboardEntry
+        order = (
+            (entry.total_earnings.desc(), entry.referral_count.desc())
+            if by_earnings
+            else (entry.referral_count.desc(), entry.total_earnings.desc())
+        )
+        stmt = (
+            select(
+                entry.user_id,
+                User.telegram_id,
+                User.username,
+                entry.referral_count,
+                entry.total_earnings,
+            )
+            .join(User, User.id == entry.user_id)
+            .order_by(*order, entry.user_id)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def get_position(self, user_id: int) -> LeaderboardPosition:
+        """
+        Get user's ranks (RANK semantics: 1 + users strictly ahead).
+
+        Each rank is a COUNT over the ranking index range ahead of the
+        user: an index range scan of O(k) entries for a user at rank k,
+        not an O(log n) lookup. Cheap for the top of the board, it grows
+        with the rank; no rank column is maintained.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Ranks (None if the user has no referrals) and total users
+        """
+        entry = ReferralLeaderboardEntry
+        result = await self.session.execute(
+            select(entry.referral_count, entry.total_earnings).where(
+                entry.user_id == user_id
+            )
+        )
+        own = result.one_or_none()
+
+        if own is None:
+            return LeaderboardPosition(None, None, await self.count())
+        referral_count, total_earnings = own
+
+        ahead_by_referrals = (
+            select(func.count())
+            .select_from(entry)
+            .where(
+                tuple_(entry.referral_count, entry.total_earnings)
+                > tuple_(referral_count, total_earnings)
+            )
+            .scalar_subquery()
+        )
+        ahead_by_earnings = (
+            select(func.count())
+            .select_from(entry)
+            .where(
+                tuple_(entry.total_earnings, entry.referral_count)
+                > tuple_(total_earnings, referral_count)
+            )
+            .scalar_subquery()
+        )
+        total = select(func.count()).select_from(entry).scalar_subquery()
+
+        result = await self.session.execute(
+            select(ahead_by_referrals, ahead_by_earnings, total)
+        )
+        referrals_ahead, earnings_ahead, total_users = result.one()
+
+        return LeaderboardPosition(
+            referral_rank=referrals_ahead + 1,
+            earnings_rank=earnings_ahead + 1,
+            total_users=total_users,
+        )
+
+    async def rebuild(self) -> int:
+        """
+        Recompute all totals from referrals and referral_earnings.
+
+        Upserts the recomputed totals and prunes stale rows while holding
+        the leaderboard lock exclusively, so in-flight increments commit
+        first and new ones wait for this transaction. Does not commit.
+
+        Returns:
+            Number of leaderboard rows
+        """
+        await self.session.execute(
+            select(func.pg_advisory_xact_lock(LEADERBOARD_LOCK_ID))
+        )
+        result = await self.session.execute(REBUILD_SQL)
+        await self.session.execute(PRUNE_SQL)
+        return result.rowcount
@@ -2,13 +2,92 @@
 Referral repository.
 
 Data access layer for Referral model.
+
+The referrals table is a closure of the referral tree: a user has one
+row per ancestor (level 1-3), so a whole chain is read with one
+indexed lookup and credited with set-based UPDATEs.
 """
 
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Any
 
+from sqlalchemy import (
+    DECIMAL,
+    Integer,
+    column,
+    insert,
+    select,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.referral import Referral
+from app.models.referral_earning import ReferralEarning
+from app.models.user import User
 from app.repositories.base import BaseRepository
+from app.repositories.referral_leaderboard_repository import (
+    ReferralLeaderboardRepository,
+)
+
+AMOUNT_TYPE = DECIMAL(18, 8)
+
+
+@dataclass
+class ReferralRelation:
+    """Referral relationship with referrer eligibility flags."""
+
+    id: int
+    referral_id: int
+    referrer_id: int
+    level: int
+    is_active: bool
+    earnings_blocked: bool
+    is_banned: bool
+
+    @property
+    def is_eligible(self) -> bool:
+        """Check if referrer may receive rewards."""
+        return (
+            self.is_active
+            and not self.earnings_blocked
+            and not self.is_banned
+        )
+
+
+@dataclass
+class ReferralCredit:
+    """Computed referral reward for one relationship."""
+
+    referral_id: int
+    referrer_id: int
+    level: int
+    amount: Decimal
+
+
+def sum_deltas(
+    pairs: Iterable[tuple[int, Decimal]],
+) -> list[dict[str, Any]]:
+    """Aggregate (id, amount) pairs into VALUES rows sorted by id."""
+    totals: dict[int, Decimal] = defaultdict(Decimal)
+    for key, amount in pairs:
+        totals[key] += amount
+    return [
+        {"id": key, "delta": totals[key]} for key in sorted(totals)
+    ]
+
+
+def delta_values(rows: list[dict[str, Any]], name: str) -> Any:
+    """Build a (id, delta) VALUES clause for UPDATE ... FROM."""
+    return values(
+        column("id", Integer),
+        column("delta", AMOUNT_TYPE),
+        name=name,
+    ).data([(row["id"], row["delta"]) for row in rows])
 
 
 class ReferralRepository(BaseRepository[Referral]):
@@ -67,6 +146,107 @@ class ReferralRepository(BaseRepository[Referral]):
         """
         return await self.find_by(referral_id=user_id)
 
+    async def get_ancestors(
+        self, user_ids: Iterable[int]
+    ) -> list[ReferralRelation]:
+        """
+        Get referral chains of users with referrer eligibility flags.
+
+        One query for any number of users; relationships whose
+        referrer was deleted are skipped.
+
+        Args:
+            user_ids: IDs of referred users
+
+        Returns:
+            Relationships ordered by referred user and level
+        """
+        stmt = (
+            select(
+                Referral.id,
+                Referral.referral_id,
+                Referral.referrer_id,
+                Referral.level,
+                User.is_active,
+                User.earnings_blocked,
+                User.is_banned,
+            )
+            .join(User, User.id == Referral.referrer_id)
+            .where(Referral.referral_id.in_(sorted(set(user_ids))))
+            .order_by(Referral.referral_id, Referral.level)
+        )
+        result = await self.session.execute(stmt)
+        return [ReferralRelation(*row) for row in result.all()]
+
+    async def apply_credits(
+        self,
+        credits: list[ReferralCredit],
+        tx_hash: str,
+        created_at: datetime | None = None,
+    ) -> None:
+        """
+        Record referral earnings and credit referrers in bulk.
+
+        Writes one earnings INSERT, one UPDATE of relationship totals,
+        one UPDATE of referrer balances and one leaderboard upsert,
+        however many referrers are credited. Balances are incremented
+        in SQL, so concurrent credits to the same referrer cannot
+        overwrite each other.
+
+        Args:
+            credits: Credits to apply (paid to internal balance)
+            tx_hash: Marker stored on earning records
+            created_at: Earning timestamp (defaults to now)
+        """
+        if not credits:
+            return
+
+        created_at = created_at or datetime.now(UTC)
+        await self.session.execute(
+            insert(ReferralEarning),
+            [
+                {
+                    "referral_id": credit.referral_id,
+                    "amount": credit.amount,
+                    "paid": True,  # Paid to internal balance
+                    "tx_hash": tx_hash,
+                    "created_at": created_at,
+                }
+                for credit in credits
+            ],
+        )
+
+        relation_totals = delta_values(
+            sum_deltas((c.referral_id, c.amount) for c in credits),
+            "referral_totals",
+        )
+        await self.session.execute(
+            update(Referral)
+            .where(Referral.id == relation_totals.c.id)
+            .values(
+                total_earned=Referral.total_earned + relation_totals.c.delta
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        referrer_totals = sum_deltas(
+            (c.referrer_id, c.amount) for c in credits
+        )
+        referrer_credit = delta_values(referrer_totals, "referrer_credit")
+        await self.session.execute(
+            update(User)
+            .where(User.id == referrer_credit.c.id)
+            .values(
+                balance=User.balance + referrer_credit.c.delta,
+                total_earned=User.total_earned + referrer_credit.c.delta,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        await ReferralLeaderboardRepository(self.session).add_earnings(
+            {row["id"]: row["delta"] for row in referrer_totals}
+        )
+
     async def get_level_1_referrals(
         self, referrer_id: int
     ) -> list[Referral]:
@@ -5,8 +5,9 @@ Handles database operations for user message logs.
 """
 
 from datetime import UTC, datetime
+from typing import Any
 
-from sqlalchemy import delete, desc, select
+from sqlalchemy import delete, desc, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user_message_log import UserMessageLog
@@ -51,6 +52,21 @@ class UserMessageLogRepository:
         await self.session.flush()
         return log
 
+    async def create_many(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Insert message log entries with one multi-row INSERT.
+
+        Args:
+            rows: Dicts with telegram_id, message_text, user_id, created_at
+
+        Returns:
+            Number of inserted rows
+        """
+        if not rows:
+            return 0
+        await self.session.execute(insert(UserMessageLog).values(rows))
+        return len(rows)
+
     async def get_user_messages(
         self,
         telegram_id: int,
@@ -133,6 +149,53 @@ class UserMessageLogRepository:
         await self.session.flush()
         return result.rowcount or 0
 
+    async def trim_all_users(
+        self, keep_last: int = 500, batch_size: int = 5000
+    ) -> int:
+        """
+        Delete messages beyond the newest `keep_last` for every user.
+
+        Set-based: ranks rows per user with a window function and only
+        for users above the limit. Deletes at most `batch_size` rows.
+
+        Args:
+            keep_last: Number of messages to keep per user
+            batch_size: Max rows deleted by this call
+
+        Returns:
+            Number of deleted messages
+        """
+        over_limit = (
+            select(UserMessageLog.telegram_id)
+            .group_by(UserMessageLog.telegram_id)
+            .having(func.count(UserMessageLog.id) > keep_last)
+        )
+        ranked = (
+            select(
+                UserMessageLog.id,
+                func.row_number()
+                .over(
+                    partition_by=UserMessageLog.telegram_id,
+                    order_by=(
+                        desc(UserMessageLog.created_at),
+                        desc(UserMessageLog.id),
+                    ),
+                )
+                .label("rn"),
+            )
+            .where(UserMessageLog.telegram_id.in_(over_limit))
+            .subquery()
+        )
+        doomed = (
+            select(ranked.c.id)
+            .where(ranked.c.rn > keep_last)
+            .limit(batch_size)
+        )
+
+        stmt = delete(UserMessageLog).where(UserMessageLog.id.in_(doomed))
+        result = await self.session.execute(stmt)
+        return result.rowcount or 0
+
     async def search_messages(
         self,
         telegram_id: int,
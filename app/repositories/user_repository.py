@@ -5,7 +5,7 @@ Data access layer for User model.
 """
 
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -48,6 +48,34 @@ class UserRepository(BaseRepository[User]):
         """
         return await self.get_by(wallet_address=wallet_address)
 
+    async def get_by_wallet_addresses(
+        self, wallet_addresses: set[str]
+    ) -> dict[str, User]:
+        """
+        Get users by wallet addresses, ignoring case.
+
+        Uses the lower(wallet_address) index.
+
+        Args:
+            wallet_addresses: Wallet addresses in any case
+
+        Returns:
+            Users keyed by lowercase wallet address
+        """
+        if not wallet_addresses:
+            return {}
+
+        stmt = select(User).where(
+            func.lower(User.wallet_address).in_(
+                {address.lower() for address in wallet_addresses}
+            )
+        )
+        result = await self.session.execute(stmt)
+        return {
+            user.wallet_address.lower(): user
+            for user in result.scalars().all()
+        }
+
     async def get_by_referral_code(
         self, referral_code: str
     ) -> User | None:
@@ -96,6 +124,28 @@ class UserRepository(BaseRepository[User]):
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_telegram_id_page(
+        self, after_id: int, limit: int
+    ) -> list[tuple[int, int]]:
+        """
+        Get a keyset page of non-banned users' Telegram IDs.
+
+        Args:
+            after_id: Return users with id greater than this
+            limit: Page size
+
+        Returns:
+            List of (user_id, telegram_id) ordered by user_id
+        """
+        stmt = (
+            select(User.id, User.telegram_id)
+            .where(User.is_banned == False, User.id > after_id)  # noqa: E712
+            .order_by(User.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return [(row.id, row.telegram_id) for row in result]
+
     async def get_all_active_users(self) -> list[User]:
         """
         Get all active (non-banned) users.
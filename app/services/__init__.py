@@ -6,7 +6,16 @@ Business logic layer.
 
 # Core Services
 # Support & Admin Services
+from app.services.admin_identity_cache import (
+    AdminIdentityCache,
+    get_admin_identity_cache,
+)
 from app.services.admin_service import AdminService
+from app.services.admin_session_store import (
+    AdminSessionStore,
+    get_admin_session_store,
+    init_admin_session_store,
+)
 from app.services.blacklist_service import BlacklistService
 
 # Blockchain Service
@@ -22,6 +31,11 @@ from app.services.deposit_validation_service import DepositValidationService
 from app.services.finpass_recovery_service import (
     FinpassRecoveryService,
 )
+from app.services.global_settings_cache import (
+    SettingsSnapshot,
+    get_global_settings_cache,
+    init_global_settings_cache,
+)
 
 # PART5 Critical Services
 from app.services.notification_retry_service import (
@@ -34,6 +48,11 @@ from app.services.reward_service import RewardService
 from app.services.support_service import SupportService
 from app.services.transaction_service import TransactionService
 from app.services.user_service import UserService
+from app.services.user_context_cache import (
+    UserContext,
+    get_user_context_cache,
+    init_user_context_cache,
+)
 from app.services.user_notification_service import UserNotificationService
 
 from app.services.wallet_admin_service import WalletAdminService
@@ -48,6 +67,12 @@ __all__ = [
     "RewardService",
     "TransactionService",
     "UserService",
+    "UserContext",
+    "get_user_context_cache",
+    "init_user_context_cache",
+    "SettingsSnapshot",
+    "get_global_settings_cache",
+    "init_global_settings_cache",
     "UserNotificationService",
     "WithdrawalService",
     # PART5 Critical
@@ -55,6 +80,11 @@ __all__ = [
     "PaymentRetryService",
     # Support & Admin
     "AdminService",
+    "AdminIdentityCache",
+    "get_admin_identity_cache",
+    "AdminSessionStore",
+    "get_admin_session_store",
+    "init_admin_session_store",
     "BlacklistService",
     "SupportService",
     # Blockchain
@@ -167,15 +167,16 @@ class AccountRecoveryService:
         # Generate new financial password (security requirement)
         import secrets
         import string
-        import bcrypt
+
+        from app.services.password_hasher import get_password_hasher
 
         new_finpass = "".join(
             secrets.choice(string.ascii_letters + string.digits)
             for _ in range(12)
         )
-        hashed_finpass = bcrypt.hashpw(
-            new_finpass.encode(), bcrypt.gensalt()
-        ).decode()
+        hashed_finpass = await get_password_hasher().hash(
+            new_finpass, key=user.id
+        )
 
         await self.user_repo.update(
             user.id,
@@ -0,0 +1,138 @@
+"""
+Admin identity cache.
+
+Keeps a detached copy of each Admin row in process memory, so the auth
+middlewares resolve the admin of every admin click without a query.
+Cached rows are attached to the request session with merge(load=False),
+which emits no SQL.
+
+Entries are dropped after any committed ORM write to the Admin row
+(block, role change, delete) in this process; other processes pick the
+change up once `admin_cache_ttl` expires.
+"""
+
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config.settings import settings
+from app.models.admin import Admin
+
+# Session.info key for admin IDs written by the current transaction
+DIRTY_KEY = "admin_identity_dirty"
+
+
+class AdminIdentityCache:
+    """In-process cache of Admin rows by admin ID."""
+
+    def __init__(self, ttl: float | None = None) -> None:
+        """
+        Initialize admin identity cache.
+
+        Args:
+            ttl: Entry lifetime in seconds
+        """
+        self.ttl = ttl or settings.admin_cache_ttl
+        # admin_id -> (expires_at, detached Admin)
+        self._entries: dict[int, tuple[float, Admin]] = {}
+
+    async def get(
+        self, session: AsyncSession, admin_id: int
+    ) -> Admin | None:
+        """
+        Get an admin attached to the session (loaded once per TTL).
+
+        Args:
+            session: Database session
+            admin_id: Admin ID
+
+        Returns:
+            Admin or None if not found
+        """
+        cached = self._entries.get(admin_id)
+        if cached and cached[0] > time.monotonic():
+            return await session.merge(cached[1], load=False)
+
+        admin = await session.get(Admin, admin_id)
+        if admin is None:
+            self._entries.pop(admin_id, None)
+            return None
+
+        self._entries[admin_id] = (
+            time.monotonic() + self.ttl,
+            self._detached_copy(admin),
+        )
+        return admin
+
+    def invalidate(self, admin_ids: Iterable[int]) -> None:
+        """
+        Drop cached admins.
+
+        Args:
+            admin_ids: Admin IDs
+        """
+        for admin_id in admin_ids:
+            self._entries.pop(admin_id, None)
+
+    @staticmethod
+    def _detached_copy(admin: Admin) -> Admin:
+        """Copy column values into a detached instance."""
+        copy = Admin(
+            **{
+                attr.key: getattr(admin, attr.key)
+                for attr in inspect(Admin).column_attrs
+            }
+        )
+        make_transient_to_detached(copy)
+        return copy
+
+
+def _changed_admin_ids(
+    new: Iterable[Any], dirty: Iterable[Any], deleted: Iterable[Any]
+) -> set[int]:
+    """IDs of admins written by a flush."""
+    return {
+        obj.id
+        for obj in [*new, *dirty, *deleted]
+        if isinstance(obj, Admin) and obj.id is not None
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_admins(session: Session, flush_context: Any) -> None:
+    """Remember admin IDs written in this transaction."""
+    admin_ids = _changed_admin_ids(
+        session.new, session.dirty, session.deleted
+    )
+    if admin_ids:
+        session.info.setdefault(DIRTY_KEY, set()).update(admin_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_admins(session: Session) -> None:
+    """Drop cached admins once the write is committed."""
+    admin_ids = session.info.pop(DIRTY_KEY, None)
+    if admin_ids:
+        get_admin_identity_cache().invalidate(admin_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_admins(session: Session) -> None:
+    """Forget admin IDs of a rolled back transaction."""
+    session.info.pop(DIRTY_KEY, None)
+
+
+# Singleton instance
+_admin_identity_cache: AdminIdentityCache | None = None
+
+
+def get_admin_identity_cache() -> AdminIdentityCache:
+    """Get admin identity cache singleton."""
+    global _admin_identity_cache
+    if _admin_identity_cache is None:
+        _admin_identity_cache = AdminIdentityCache()
+    return _admin_identity_cache
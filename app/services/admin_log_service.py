@@ -67,13 +67,17 @@ class AdminLogService:
             # Установить is_immutable=True для критичных действий
             is_immutable = action_type in critical_actions
 
-            await self.action_repo.create(
-                admin_id=admin_id,
-                action_type=action_type,
-                target_user_id=target_user_id,
-                details=details,
-                ip_address=ip_address,
-                is_immutable=is_immutable,
+            # Plain INSERT - the created row is not needed here
+            await self.action_repo.bulk_create(
+                [{
+                    "admin_id": admin_id,
+                    "action_type": action_type,
+                    "target_user_id": target_user_id,
+                    "details": details,
+                    "ip_address": ip_address,
+                    "is_immutable": is_immutable,
+                }],
+                returning=False,
             )
             await self.session.commit()
 
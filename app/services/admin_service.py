@@ -9,7 +9,6 @@ from collections import defaultdict
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
-import bcrypt
 from loguru import logger
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -21,6 +20,16 @@ from app.repositories.admin_repository import AdminRepository
 from app.repositories.admin_session_repository import (
     AdminSessionRepository,
 )
+from app.services.admin_identity_cache import get_admin_identity_cache
+from app.services.admin_session_store import (
+    AdminSessionStore,
+    StoredAdminSession,
+    get_admin_session_store,
+)
+from app.services.password_hasher import (
+    PasswordHasherBusyError,
+    get_password_hasher,
+)
 
 # Admin session configuration
 SESSION_DURATION_HOURS = 24
@@ -49,6 +58,7 @@ class AdminService:
         self,
         session: AsyncSession,
         redis_client: Any | None = None,
+        session_store: AdminSessionStore | None = None,
     ) -> None:
         """
         Initialize admin service.
@@ -56,11 +66,13 @@ class AdminService:
         Args:
             session: Database session
             redis_client: Optional Redis client for rate limiting
+            session_store: Redis session store (defaults to singleton)
         """
         self.session = session
         self.admin_repo = AdminRepository(session)
         self.session_repo = AdminSessionRepository(session)
         self.redis_client = redis_client
+        self.session_store = session_store or get_admin_session_store()
 
         # In-memory fallback for failed login tracking
         # Structure: {telegram_id: [(timestamp, ...), ...]}
@@ -77,9 +89,9 @@ class AdminService:
         return secrets.token_hex(MASTER_KEY_LENGTH)
 
     @staticmethod
-    def hash_master_key(master_key: str) -> str:
+    async def hash_master_key(master_key: str) -> str:
         """
-        Hash master key using bcrypt.
+        Hash master key using bcrypt (in the password hasher pool).
 
         Args:
             master_key: Plain master key
@@ -87,26 +99,25 @@ class AdminService:
         Returns:
             Hashed master key
         """
-        return bcrypt.hashpw(
-            master_key.encode(), bcrypt.gensalt()
-        ).decode()
+        return await get_password_hasher().hash(master_key)
 
     @staticmethod
-    def verify_master_key(
-        plain_key: str, hashed_key: str
+    async def verify_master_key(
+        plain_key: str, hashed_key: str, key: int | None = None
     ) -> bool:
         """
-        Verify master key against hash.
+        Verify master key against hash (in the password hasher pool).
 
         Args:
             plain_key: Plain master key
             hashed_key: Hashed master key
+            key: Optional per-admin concurrency key
 
         Returns:
             True if match
         """
-        return bcrypt.checkpw(
-            plain_key.encode(), hashed_key.encode()
+        return await get_password_hasher().verify(
+            plain_key, hashed_key, key=key
         )
 
     @staticmethod
@@ -185,7 +196,7 @@ class AdminService:
 
         # Generate and hash master key
         plain_master_key = self.generate_master_key()
-        hashed_master_key = self.hash_master_key(plain_master_key)
+        hashed_master_key = await self.hash_master_key(plain_master_key)
 
         # Create admin
         admin = await self.admin_repo.create(
@@ -246,9 +257,14 @@ class AdminService:
             return None, None, "Мастер-ключ не установлен"
 
         # Verify master key
-        if not self.verify_master_key(
-            master_key, admin.master_key
-        ):
+        try:
+            is_valid = await self.verify_master_key(
+                master_key, admin.master_key, key=telegram_id
+            )
+        except PasswordHasherBusyError:
+            return None, None, "Сервис перегружен, попробуйте позже"
+
+        if not is_valid:
             # Track failed login attempt
             await self._track_failed_login(telegram_id)
             
@@ -283,6 +299,7 @@ class AdminService:
         )
 
         await self.session.commit()
+        await self.session_store.save(session)
 
         logger.info(
             "Admin logged in",
@@ -318,6 +335,7 @@ class AdminService:
         )
 
         await self.session.commit()
+        await self.session_store.revoke([session_token])
 
         logger.info(
             "Admin logged out",
@@ -332,12 +350,20 @@ class AdminService:
         """
         Validate session and update activity.
 
+        Sessions found in the Redis store are validated without queries
+        (the admin comes from the identity cache). Others are validated
+        against the DB and added to the store.
+
         Args:
             session_token: Session token
 
         Returns:
             Tuple of (admin, session, error_message)
         """
+        stored = await self.session_store.get(session_token)
+        if stored is not None:
+            return await self._validate_stored_session(session_token, stored)
+
         sessions = await self.session_repo.find_by(
             session_token=session_token, is_active=True
         )
@@ -401,9 +427,59 @@ class AdminService:
             return None, None, "Admin account is blocked"
 
         await self.session.commit()
+        await self.session_store.save(session)
 
         return admin, session, None
 
+    async def _validate_stored_session(
+        self, session_token: str, stored: StoredAdminSession
+    ) -> tuple[Admin | None, AdminSession | None, str | None]:
+        """
+        Validate a session held in the Redis store.
+
+        Args:
+            session_token: Session token
+            stored: Session read from the store
+
+        Returns:
+            Tuple of (admin, session, error_message)
+        """
+        if stored.is_expired:
+            await self.session_store.revoke([session_token])
+            await self.session_repo.update_by_id(
+                stored.session_id, is_active=False
+            )
+            await self.session.commit()
+
+            logger.info(
+                "Session expired",
+                extra={"session_id": stored.session_id},
+            )
+            return None, None, "Сессия истекла. Войдите заново"
+
+        admin = await get_admin_identity_cache().get(
+            self.session, stored.admin_id
+        )
+
+        if not admin:
+            await self.session_store.revoke([session_token])
+            return None, None, "Admin not found"
+
+        # R10-3: Check if admin is blocked
+        if admin.is_blocked:
+            logger.warning(
+                f"R10-3: Blocked admin {admin.id} attempted to use session "
+                f"{session_token[:8]}..."
+            )
+            await self.session_store.revoke([session_token])
+            await self.session_repo.delete(stored.session_id)
+            await self.session.commit()
+            return None, None, "Admin account is blocked"
+
+        await self.session_store.touch(session_token, stored)
+
+        return admin, stored.to_model(session_token), None
+
     async def get_admin_by_telegram_id(
         self, telegram_id: int
     ) -> Admin | None:
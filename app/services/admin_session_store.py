@@ -0,0 +1,318 @@
+"""
+Admin session store.
+
+Active admin sessions are mirrored in Redis as a hash per token whose
+TTL is the inactivity window, so validating a session on each admin
+click is one Redis round trip instead of several queries. Activity is
+written back to admin_sessions.last_activity in the background at most
+once per `admin_session_persist_interval` seconds per session.
+
+The DB stays the source of truth:
+- a token missing from Redis is validated against the DB and re-added
+- committed ORM deactivation/deletion of a session revokes its token
+- a background activity write that finds the row inactive (e.g.
+  deactivated by another process) revokes the token as well
+"""
+
+import asyncio
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+
+from app.config.database import async_session_maker
+from app.config.settings import settings
+from app.models.admin_session import AdminSession
+
+REDIS_KEY_PREFIX = "admin_session:"
+
+# Matches AdminSession.is_inactive
+INACTIVITY_SECONDS = 15 * 60
+
+# Session.info key for tokens revoked by the current transaction
+REVOKED_KEY = "admin_session_revoked"
+
+
+@dataclass(frozen=True)
+class StoredAdminSession:
+    """Admin session as held in Redis."""
+
+    session_id: int
+    admin_id: int
+    expires_at: float | None
+    persisted_at: float
+
+    @property
+    def is_expired(self) -> bool:
+        """Check if the absolute session lifetime is over."""
+        return self.expires_at is not None and time.time() > self.expires_at
+
+    def to_model(self, session_token: str) -> AdminSession:
+        """Build a transient AdminSession (not attached to any session)."""
+        return AdminSession(
+            id=self.session_id,
+            admin_id=self.admin_id,
+            session_token=session_token,
+            is_active=True,
+            last_activity=datetime.now(UTC),
+            expires_at=(
+                datetime.fromtimestamp(self.expires_at, UTC)
+                if self.expires_at is not None
+                else None
+            ),
+        )
+
+
+class AdminSessionStore:
+    """Redis mirror of active admin sessions (disabled without Redis)."""
+
+    def __init__(
+        self,
+        redis_client: Any | None = None,
+        session_factory: Any | None = None,
+        persist_interval: float | None = None,
+    ) -> None:
+        """
+        Initialize admin session store.
+
+        Args:
+            redis_client: Async Redis client (store disabled if None)
+            session_factory: Async session factory for activity writes
+            persist_interval: Min seconds between activity writes
+        """
+        self.redis_client = redis_client
+        self.session_factory = session_factory or async_session_maker
+        self.persist_interval = (
+            persist_interval or settings.admin_session_persist_interval
+        )
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether sessions are held in Redis."""
+        return self.redis_client is not None
+
+    async def save(self, session: AdminSession) -> None:
+        """
+        Add a valid DB session to Redis.
+
+        Args:
+            session: Active admin session
+        """
+        if not self.enabled:
+            return
+
+        mapping = {
+            "session_id": session.id,
+            "admin_id": session.admin_id,
+            "persisted_at": time.time(),
+        }
+        if session.expires_at is not None:
+            mapping["expires_at"] = session.expires_at.timestamp()
+
+        key = f"{REDIS_KEY_PREFIX}{session.session_token}"
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, INACTIVITY_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Admin session Redis write failed: {e}")
+
+    async def get(self, session_token: str) -> StoredAdminSession | None:
+        """
+        Get a session from Redis.
+
+        Args:
+            session_token: Session token
+
+        Returns:
+            Stored session, or None if missing (or Redis unavailable)
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            raw = await self.redis_client.hgetall(
+                f"{REDIS_KEY_PREFIX}{session_token}"
+            )
+        except Exception as e:
+            logger.warning(f"Admin session Redis read failed: {e}")
+            return None
+
+        if not raw:
+            return None
+
+        fields = {
+            (k.decode() if isinstance(k, bytes) else k): v
+            for k, v in raw.items()
+        }
+        try:
+            return StoredAdminSession(
+                session_id=int(fields["session_id"]),
+                admin_id=int(fields["admin_id"]),
+                expires_at=(
+                    float(fields["expires_at"])
+                    if "expires_at" in fields
+                    else None
+                ),
+                persisted_at=float(fields["persisted_at"]),
+            )
+        except (KeyError, ValueError):
+            # Partial hash (e.g. racing a revoke) - treat as missing
+            return None
+
+    async def touch(
+        self, session_token: str, stored: StoredAdminSession
+    ) -> None:
+        """
+        Record activity: extend the TTL, write to the DB when due.
+
+        Args:
+            session_token: Session token
+            stored: Session read by get()
+        """
+        key = f"{REDIS_KEY_PREFIX}{session_token}"
+        now = time.time()
+        persist = now - stored.persisted_at >= self.persist_interval
+
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                if persist:
+                    pipe.hset(key, "persisted_at", now)
+                pipe.expire(key, INACTIVITY_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Admin session Redis touch failed: {e}")
+            return
+
+        if persist:
+            task = asyncio.get_running_loop().create_task(
+                self._persist_activity(session_token, stored.session_id)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def revoke(self, session_tokens: Iterable[str]) -> None:
+        """
+        Remove sessions from Redis.
+
+        Args:
+            session_tokens: Session tokens
+        """
+        keys = [f"{REDIS_KEY_PREFIX}{token}" for token in session_tokens]
+        if not self.enabled or not keys:
+            return
+
+        try:
+            await self.redis_client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Admin session Redis revoke failed: {e}")
+
+    async def stop(self) -> None:
+        """Wait for background activity writes."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _persist_activity(
+        self, session_token: str, session_id: int
+    ) -> None:
+        """Write last_activity; revoke the token if the row is gone."""
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    update(AdminSession)
+                    .where(
+                        AdminSession.id == session_id,
+                        AdminSession.is_active.is_(True),
+                    )
+                    .values(last_activity=datetime.now(UTC))
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(
+                f"Failed to persist admin session {session_id} activity: {e}"
+            )
+            return
+
+        if not result.rowcount:
+            logger.info(
+                "Admin session deactivated in DB, revoking",
+                extra={"session_id": session_id},
+            )
+            await self.revoke([session_token])
+
+
+def _revoked_tokens(
+    dirty: Iterable[Any], deleted: Iterable[Any]
+) -> set[str]:
+    """Tokens of sessions deactivated or deleted by a flush."""
+    tokens: set[str] = set()
+
+    for obj in deleted:
+        if isinstance(obj, AdminSession):
+            tokens.add(obj.session_token)
+
+    for obj in dirty:
+        if (
+            isinstance(obj, AdminSession)
+            and not obj.is_active
+            and inspect(obj).attrs.is_active.history.has_changes()
+        ):
+            tokens.add(obj.session_token)
+
+    return tokens
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_revoked_sessions(session: Session, flush_context: Any) -> None:
+    """Remember session tokens revoked in this transaction."""
+    tokens = _revoked_tokens(session.dirty, session.deleted)
+    if tokens:
+        session.info.setdefault(REVOKED_KEY, set()).update(tokens)
+
+
+@event.listens_for(Session, "after_commit")
+def _revoke_committed_sessions(session: Session) -> None:
+    """Revoke tokens once the deactivation is committed."""
+    tokens = session.info.pop(REVOKED_KEY, None)
+    store = get_admin_session_store()
+    if not tokens or not store.enabled:
+        return
+
+    try:
+        asyncio.get_running_loop().create_task(store.revoke(tokens))
+    except RuntimeError:
+        # No running loop (sync scripts) - nothing is cached there
+        pass
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_revoked_sessions(session: Session) -> None:
+    """Forget tokens of a rolled back transaction."""
+    session.info.pop(REVOKED_KEY, None)
+
+
+# Singleton instance
+_admin_session_store: AdminSessionStore | None = None
+
+
+def get_admin_session_store() -> AdminSessionStore:
+    """Get admin session store (disabled until init with Redis)."""
+    global _admin_session_store
+    if _admin_session_store is None:
+        _admin_session_store = AdminSessionStore()
+    return _admin_session_store
+
+
+def init_admin_session_store(redis_client: Any | None) -> AdminSessionStore:
+    """Initialize admin session store with a Redis client."""
+    global _admin_session_store
+    _admin_session_store = AdminSessionStore(redis_client=redis_client)
+    return _admin_session_store
@@ -1,156 +1,380 @@
 """
 Nonce Manager for blockchain transactions.
 
-Prevents race conditions when sending multiple transactions by using distributed locks.
+Reserves nonces monotonically so concurrent sends from one wallet never
+share a nonce and do not wait for each other's confirmation.
+
+The next free nonce lives in Redis and is handed out with an atomic
+INCR, so every process sending from the wallet shares one sequence that
+survives restarts. Nonces reserved for a transaction that was never
+broadcast are released and reused first. The sequence is periodically
+resynced with the chain: it is moved up if transactions were sent from
+the wallet elsewhere, and reset down when reserved nonces were lost
+(gap) and nothing from the wallet is pending.
+
+Replacement (speed-up/cancel) transactions reuse the nonce of the
+transaction they replace and must not reserve a new one.
 """
 
 import asyncio
+import heapq
+import time
+from collections.abc import Callable
 from typing import Any
 
 from loguru import logger
-from web3 import Web3, AsyncWeb3
+from web3 import AsyncWeb3, Web3
 
 try:
-    import redis.asyncio as redis
+    from redis.asyncio import Redis as AsyncRedis
+    from redis.exceptions import RedisError
 except ImportError:
-    redis = None  # type: ignore
+    AsyncRedis = None  # type: ignore
+    RedisError = ConnectionError  # type: ignore
+
+# Redis failures that fall back to the local allocator
+REDIS_ERRORS = (RedisError, OSError)
+
+# send_raw_transaction errors meaning the nonce is already taken
+NONCE_USED_ERRORS = ("nonce too low", "already known")
+
+# Reserve: reuse the lowest released nonce, else INCR the sequence.
+# Returns -1 if the sequence is not initialized yet (sync first).
+RESERVE_SCRIPT = """
+redis.call('SET', KEYS[3], ARGV[1])
+local released = redis.call('ZPOPMIN', KEYS[2])
+if released[1] then
+    return tonumber(released[1])
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+return redis.call('INCR', KEYS[1]) - 1
+"""
+
+# Sync with chain counts (ARGV: pending, latest, now, stale_after).
+# A gap is a reserved nonce that never reached the node: the wallet's
+# pending count stops at it while higher nonces were issued. If no
+# nonce was reserved for stale_after seconds everything above is lost
+# and the sequence is reset; if sends continue but the gap persists,
+# the missing nonce is released so the next send fills it.
+# Returns {next_nonce, gap_size}.
+SYNC_SCRIPT = """
+local pending = tonumber(ARGV[1])
+local latest = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local stale_after = tonumber(ARGV[4])
+local current = tonumber(redis.call('GET', KEYS[1]) or '-1')
+local reserved_at = tonumber(redis.call('GET', KEYS[3]) or '0')
+
+-- Released nonces the chain already knows about cannot be reused
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', '(' .. pending)
+
+if current < pending then
+    redis.call('SET', KEYS[1], pending)
+    redis.call('DEL', KEYS[4])
+    return {pending, 0}
+end
+
+if current == pending or pending ~= latest then
+    redis.call('DEL', KEYS[4])
+    return {current, 0}
+end
+
+if now - reserved_at > stale_after then
+    redis.call('SET', KEYS[1], pending)
+    redis.call('DEL', KEYS[2], KEYS[4])
+    return {pending, current - pending}
+end
+
+local stalled = redis.call('HMGET', KEYS[4], 'nonce', 'since')
+if tonumber(stalled[1]) ~= pending then
+    redis.call('HSET', KEYS[4], 'nonce', pending, 'since', now)
+elseif now - tonumber(stalled[2]) > stale_after then
+    redis.call('ZADD', KEYS[2], pending, pending)
+    redis.call('DEL', KEYS[4])
+    return {current, 1}
+end
+return {current, 0}
+"""
+
+
+def create_redis_client() -> Any | None:
+    """
+    Create a Redis client for the running event loop from app settings.
+
+    Used as the default `redis_factory`, so every process sending from
+    the wallet shares one nonce sequence. Returns None (in-process
+    allocator) if redis is not installed.
+    """
+    if AsyncRedis is None:
+        return None
+
+    from app.config.settings import settings
+
+    return AsyncRedis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        password=settings.redis_password,
+        db=settings.redis_db,
+        decode_responses=True,
+    )
 
 
 class NonceManager:
     """
-    Manages nonce allocation for blockchain transactions with distributed locking.
+    Monotonic nonce allocator for one wallet.
 
     Features:
-    - Uses 'latest' block for nonce (not 'pending' to avoid race conditions)
-    - Distributed lock via Redis to prevent concurrent nonce conflicts
-    - Fallback to local lock if Redis unavailable
+    - Atomic reservation via Redis (shared by all processes)
+    - Released nonces are reused before new ones are issued
+    - Periodic chain resync with gap detection
+    - Fallback to an in-process allocator if Redis is unavailable
     """
 
     def __init__(
         self,
         redis_client: Any | None = None,
         address: str | None = None,
+        redis_factory: Callable[[], Any] | None = None,
+        resync_interval: float = 60.0,
+        stale_after: float = 120.0,
     ) -> None:
         """
         Initialize nonce manager.
 
         Args:
-            redis_client: Redis client for distributed locking
+            redis_client: Redis client (bound to the current event loop)
             address: Wallet address for nonce tracking
+            redis_factory: Creates a Redis client per event loop (for
+                dramatiq actors, which run each message in a new loop)
+            resync_interval: Seconds between chain resyncs
+            stale_after: Seconds without reservations after which
+                unbroadcast nonces count as lost
         """
         self.redis = redis_client
+        self.redis_factory = redis_factory
         self.address = address.lower() if address else None
-        self.lock_key = f"nonce_lock:{self.address}" if self.address else None
+        self.checksum_address = (
+            Web3.to_checksum_address(address) if address else None
+        )
+        self.resync_interval = resync_interval
+        self.stale_after = stale_after
 
-        # Local asyncio lock as fallback
-        self._local_lock = asyncio.Lock()
+        self.next_key = f"nonce:{self.address}:next"
+        self.released_key = f"nonce:{self.address}:released"
+        self.reserved_at_key = f"nonce:{self.address}:reserved_at"
+        self.stalled_key = f"nonce:{self.address}:stalled"
 
-    async def get_next_nonce(self, web3: Web3 | AsyncWeb3) -> int:
-        """
-        Get next available nonce for address with distributed locking.
+        self._loop_redis: tuple[asyncio.AbstractEventLoop, Any] | None = None
+        self._synced_at = 0.0
+
+        # In-process allocator (fallback)
+        self._local_lock: (
+            tuple[asyncio.AbstractEventLoop, asyncio.Lock] | None
+        ) = None
+        self._local_next: int | None = None
+        self._local_released: list[int] = []
+        self._local_reserved_at = 0.0
 
-        Uses 'latest' block for nonce to avoid race conditions with 'pending'.
+    async def reserve(self, web3: Web3 | AsyncWeb3) -> int:
+        """
+        Reserve the next nonce for a new transaction.
 
         Args:
-            web3: Web3 or AsyncWeb3 instance
+            web3: Web3 or AsyncWeb3 instance (for chain resyncs)
 
         Returns:
-            Next nonce value
+            Reserved nonce
         """
         if not self.address:
             raise ValueError("Address not configured in NonceManager")
 
-        # Use distributed lock if Redis available
-        if self.redis and self.lock_key:
-            return await self._get_nonce_with_redis_lock(web3)
-        else:
-            # Fallback to local lock
+        redis_client = self._get_redis()
+        if redis_client is None:
+            return await self._reserve_local(web3)
+
+        try:
+            if time.monotonic() - self._synced_at > self.resync_interval:
+                await self.sync(web3)
+
+            nonce = await self._reserve_redis(redis_client)
+            if nonce < 0:
+                await self.sync(web3)
+                nonce = await self._reserve_redis(redis_client)
+
+            logger.debug(f"Reserved nonce {nonce} for {self.address}")
+            return int(nonce)
+        except REDIS_ERRORS as e:
             logger.warning(
-                "Redis not available for nonce locking, using local lock. "
-                "This may cause race conditions in multi-process environments."
+                f"Redis unavailable for nonce allocation ({e}), "
+                "using local allocator. This may cause nonce conflicts "
+                "in multi-process environments."
             )
-            return await self._get_nonce_with_local_lock(web3)
+            return await self._reserve_local(web3)
+
+    async def get_next_nonce(self, web3: Web3 | AsyncWeb3) -> int:
+        """Reserve the next nonce (backward compatible name)."""
+        return await self.reserve(web3)
 
-    async def _get_nonce_with_redis_lock(self, web3: Web3 | AsyncWeb3) -> int:
+    async def release(self, nonce: int) -> None:
         """
-        Get nonce with Redis distributed lock.
+        Return a reserved nonce whose transaction was never broadcast.
 
-        Args:
-            web3: Web3 or AsyncWeb3 instance
+        Only call this when the node did not accept the transaction;
+        otherwise let the next resync decide.
 
-        Returns:
-            Next nonce value
+        Args:
+            nonce: Reserved nonce
         """
-        lock_timeout = 30  # 30 seconds timeout for lock
-        lock_acquired = False
-        lock_value = f"nonce_lock_{asyncio.current_task().get_name() if asyncio.current_task() else 'unknown'}"
+        redis_client = self._get_redis()
+        if redis_client is not None:
+            try:
+                await redis_client.zadd(self.released_key, {nonce: nonce})
+                return
+            except REDIS_ERRORS as e:
+                logger.warning(f"Failed to release nonce {nonce}: {e}")
 
-        try:
-            # Try to acquire lock with timeout
-            start_time = asyncio.get_event_loop().time()
-            while not lock_acquired:
-                # Use SET NX EX to atomically acquire lock
-                lock_acquired = await self.redis.set(
-                    self.lock_key,
-                    lock_value,
-                    nx=True,  # Only set if not exists
-                    ex=lock_timeout,  # Expire after timeout
-                )
-
-                if lock_acquired:
-                    break
-
-                # Check if timeout exceeded
-                if asyncio.get_event_loop().time() - start_time > lock_timeout:
-                    raise TimeoutError(
-                        f"Failed to acquire nonce lock for {self.address} "
-                        f"after {lock_timeout}s"
-                    )
-
-                # Wait a bit before retrying
-                await asyncio.sleep(0.1)
-
-            # Get nonce from 'latest' block
-            if isinstance(web3, AsyncWeb3):
-                nonce = await web3.eth.get_transaction_count(self.address, 'latest')
-            else:
-                nonce = web3.eth.get_transaction_count(self.address, 'latest')
-
-            logger.debug(f"Acquired nonce {nonce} for {self.address} with Redis lock")
-            return nonce
+        async with self._get_local_lock():
+            heapq.heappush(self._local_released, nonce)
 
-        finally:
-            # Release lock if we acquired it
-            if lock_acquired:
-                try:
-                    # Only delete if we still own the lock (check value)
-                    script = """
-                    if redis.call("get", KEYS[1]) == ARGV[1] then
-                        return redis.call("del", KEYS[1])
-                    else
-                        return 0
-                    end
-                    """
-                    await self.redis.eval(script, 1, self.lock_key, lock_value)
-                except Exception as e:
-                    logger.warning(f"Failed to release Redis lock: {e}")
-
-    async def _get_nonce_with_local_lock(self, web3: Web3 | AsyncWeb3) -> int:
+    async def sync(self, web3: Web3 | AsyncWeb3) -> int:
         """
-        Get nonce with local asyncio lock (fallback).
+        Resync the sequence with the chain.
 
         Args:
             web3: Web3 or AsyncWeb3 instance
 
         Returns:
-            Next nonce value
+            Next nonce after the resync
         """
-        async with self._local_lock:
-            # Get nonce from 'latest' block
-            if isinstance(web3, AsyncWeb3):
-                nonce = await web3.eth.get_transaction_count(self.address, 'latest')
-            else:
-                nonce = web3.eth.get_transaction_count(self.address, 'latest')
-
-            logger.debug(f"Acquired nonce {nonce} for {self.address} with local lock")
+        pending, latest = await self._chain_counts(web3)
+        redis_client = self._get_redis()
+
+        if redis_client is None:
+            async with self._get_local_lock():
+                return self._sync_local(pending, latest)
+
+        result = await redis_client.eval(
+            SYNC_SCRIPT,
+            4,
+            self.next_key,
+            self.released_key,
+            self.reserved_at_key,
+            self.stalled_key,
+            pending,
+            latest,
+            int(time.time()),
+            int(self.stale_after),
+        )
+        next_nonce, gap = (int(value) for value in result)
+        self._synced_at = time.monotonic()
+
+        if gap:
+            logger.warning(
+                f"Nonce gap detected for {self.address}: {gap} reserved "
+                f"nonce(s) never reached the chain (next {next_nonce}, "
+                f"chain {pending})"
+            )
+        return next_nonce
+
+    def _get_redis(self) -> Any | None:
+        """Get the Redis client usable on the running event loop."""
+        if self.redis is not None or self.redis_factory is None:
+            return self.redis
+
+        loop = asyncio.get_running_loop()
+        if self._loop_redis is None or self._loop_redis[0] is not loop:
+            self._loop_redis = (loop, self.redis_factory())
+            # A new loop means a new process run - resync before use
+            self._synced_at = 0.0
+        return self._loop_redis[1]
+
+    def _get_local_lock(self) -> asyncio.Lock:
+        """Get the local allocator lock for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._local_lock is None or self._local_lock[0] is not loop:
+            self._local_lock = (loop, asyncio.Lock())
+        return self._local_lock[1]
+
+    async def _reserve_redis(self, redis_client: Any) -> int:
+        """Run the reservation script for this wallet."""
+        return int(
+            await redis_client.eval(
+                RESERVE_SCRIPT,
+                3,
+                self.next_key,
+                self.released_key,
+                self.reserved_at_key,
+                int(time.time()),
+            )
+        )
+
+    async def _chain_counts(
+        self, web3: Web3 | AsyncWeb3
+    ) -> tuple[int, int]:
+        """Get (pending, latest) transaction counts of the wallet."""
+        if isinstance(web3, AsyncWeb3):
+            pending = await web3.eth.get_transaction_count(
+                self.checksum_address, "pending"
+            )
+            latest = await web3.eth.get_transaction_count(
+                self.checksum_address, "latest"
+            )
+        else:
+            pending = web3.eth.get_transaction_count(
+                self.checksum_address, "pending"
+            )
+            latest = web3.eth.get_transaction_count(
+                self.checksum_address, "latest"
+            )
+        return int(pending), int(latest)
+
+    async def _reserve_local(self, web3: Web3 | AsyncWeb3) -> int:
+        """Reserve a nonce with the in-process allocator."""
+        async with self._get_local_lock():
+            if (
+                self._local_next is None
+                or time.monotonic() - self._synced_at > self.resync_interval
+            ):
+                pending, latest = await self._chain_counts(web3)
+                self._sync_local(pending, latest)
+
+            self._local_reserved_at = time.time()
+            if self._local_released:
+                return heapq.heappop(self._local_released)
+
+            nonce = self._local_next
+            self._local_next += 1
             return nonce
+
+    def _sync_local(self, pending: int, latest: int) -> int:
+        """
+        Resync the in-process allocator with chain counts.
+
+        Only the idle-wallet gap reset is applied; hole filling needs
+        the shared state kept in Redis.
+        """
+        self._local_released = [
+            nonce for nonce in self._local_released if nonce >= pending
+        ]
+        heapq.heapify(self._local_released)
+
+        current = self._local_next if self._local_next is not None else -1
+        if current < pending:
+            self._local_next = pending
+        elif (
+            current > pending
+            and pending == latest
+            and time.time() - self._local_reserved_at > self.stale_after
+        ):
+            logger.warning(
+                f"Nonce gap detected for {self.address}: "
+                f"{current - pending} reserved nonce(s) never reached "
+                f"the chain, reset to {pending}"
+            )
+            self._local_next = pending
+            self._local_released = []
+
+        self._synced_at = time.monotonic()
+        return self._local_next
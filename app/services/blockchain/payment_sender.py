@@ -21,6 +21,11 @@ from .constants import (
     USDT_ABI,
     USDT_DECIMALS,
 )
+from .nonce_manager import (
+    NONCE_USED_ERRORS,
+    NonceManager,
+    create_redis_client,
+)
 
 
 class PaymentSender:
@@ -39,6 +44,7 @@ class PaymentSender:
         web3: AsyncWeb3,
         usdt_contract_address: str,
         payout_wallet_private_key: str | None = None,
+        nonce_manager: NonceManager | None = None,
     ) -> None:
         """
         Initialize payment sender.
@@ -47,6 +53,8 @@ class PaymentSender:
             web3: AsyncWeb3 instance
             usdt_contract_address: USDT contract address
             payout_wallet_private_key: Private key for signing transactions
+            nonce_manager: Nonce allocator (Redis-backed from app
+                settings if None)
         """
         self.web3 = web3
         self.usdt_contract_address = web3.to_checksum_address(
@@ -78,6 +86,11 @@ class PaymentSender:
                 "sending will not work"
             )
 
+        self.nonce_manager = nonce_manager or NonceManager(
+            address=self._payout_address,
+            redis_factory=create_redis_client,
+        )
+
     async def send_payment(
         self,
         to_address: str,
@@ -175,12 +188,6 @@ class PaymentSender:
             Dict with success, tx_hash, error
         """
         try:
-            # Get nonce (using 'latest' to avoid race conditions)
-            # TODO: Add NonceManager with distributed lock for multi-process environments
-            nonce = await self.web3.eth.get_transaction_count(
-                self._payout_address, 'latest'
-            )
-
             # Build transaction
             transfer_function = self.usdt_contract.functions.transfer(
                 to_address,
@@ -210,23 +217,38 @@ class PaymentSender:
                 )
                 gas_price_wei = max_gas_price
 
-            # Build transaction dict
-            transaction = await transfer_function.build_transaction(
-                {
-                    "from": self._payout_address,
-                    "gas": gas_limit,
-                    "gasPrice": gas_price_wei,
-                    "nonce": nonce,
-                }
-            )
+            # Reserve nonce as late as possible; give it back if the
+            # transaction never reaches the node
+            nonce = await self.nonce_manager.reserve(self.web3)
+            try:
+                transaction = await transfer_function.build_transaction(
+                    {
+                        "from": self._payout_address,
+                        "gas": gas_limit,
+                        "gasPrice": gas_price_wei,
+                        "nonce": nonce,
+                    }
+                )
 
-            # Sign transaction (reuse cached account)
-            signed_tx = self._account.sign_transaction(transaction)
+                # Sign transaction (reuse cached account)
+                signed_tx = self._account.sign_transaction(transaction)
+            except Exception:
+                await self.nonce_manager.release(nonce)
+                raise
 
             # Send transaction
-            tx_hash = await self.web3.eth.send_raw_transaction(
-                signed_tx.rawTransaction
-            )
+            try:
+                tx_hash = await self.web3.eth.send_raw_transaction(
+                    signed_tx.rawTransaction
+                )
+            except ValueError as e:
+                # JSON-RPC error: the node rejected the transaction
+                error = str(e).lower()
+                if any(marker in error for marker in NONCE_USED_ERRORS):
+                    await self.nonce_manager.sync(self.web3)
+                else:
+                    await self.nonce_manager.release(nonce)
+                raise
 
             tx_hash_hex = tx_hash.hex()
 
@@ -3,15 +3,15 @@ Blockchain service.
 
 Full Web3.py implementation for BSC blockchain operations
 (USDT transfers, monitoring) with Dual-Core engine (QuickNode + NodeReal).
+RPC calls are awaited natively over AsyncWeb3 with a pooled aiohttp
+session per provider.
 """
 
 import asyncio
-import time
 import warnings
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
+from collections.abc import Awaitable, Callable
 from decimal import Decimal
-from typing import Any, Callable, TypeVar
+from typing import Any, TypeVar
 
 # Suppress eth_utils network warnings about invalid ChainId
 warnings.filterwarnings(
@@ -26,15 +26,29 @@ warnings.filterwarnings(
     category=UserWarning,
 )
 
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
 from eth_account import Account
 from eth_utils import is_address, to_checksum_address
 from loguru import logger
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+from web3._utils.method_formatters import PYTHONIC_RESULT_FORMATTERS
+from web3._utils.rpc_abi import RPC
+from web3.datastructures import AttributeDict
+from web3.middleware import async_geth_poa_middleware
+
+try:
+    from redis.asyncio import Redis as AsyncRedis
+except ImportError:
+    AsyncRedis = None  # type: ignore
 
 from app.config.settings import Settings
 from app.repositories.global_settings_repository import GlobalSettingsRepository
 from app.config.database import async_session_maker
+from app.services.blockchain.nonce_manager import (
+    NONCE_USED_ERRORS,
+    NonceManager,
+)
+from app.services.global_settings_cache import get_global_settings_cache
 
 # USDT contract ABI (ERC-20 standard functions)
 USDT_ABI = [
@@ -70,6 +84,11 @@ USDT_ABI = [
 # USDT decimals (BEP-20 USDT uses 18 decimals)
 USDT_DECIMALS = 18
 
+# keccak("Transfer(address,address,uint256)")
+TRANSFER_EVENT_TOPIC = Web3.keccak(
+    text="Transfer(address,address,uint256)"
+).hex()
+
 # Gas settings for BSC
 # 0.1 Gwei = 100_000_000 Wei (1 Gwei = 10^9 Wei)
 # User requirement: Max 0.1 Gwei, try lower if possible
@@ -78,8 +97,45 @@ MAX_GAS_PRICE_GWEI = Decimal("0.1")
 MIN_GAS_PRICE_WEI = int(MIN_GAS_PRICE_GWEI * 10**9)
 MAX_GAS_PRICE_WEI = int(MAX_GAS_PRICE_GWEI * 10**9)
 
+# RPC transport settings (one keep-alive connection pool per provider)
+RPC_TIMEOUT_SECONDS = 30
+RPC_POOL_SIZE = 10  # Matches RPCRateLimiter max_concurrent
+RPC_KEEPALIVE_SECONDS = 30
+
 T = TypeVar("T")
 
+
+class AmbiguousBroadcastError(Exception):
+    """A broadcast failed in a way that may have reached the node."""
+
+    def __init__(self, tx_hash: str, cause: Exception) -> None:
+        super().__init__(f"Broadcast outcome unknown for {tx_hash}: {cause}")
+        self.tx_hash = tx_hash
+
+
+class PooledHTTPProvider(AsyncHTTPProvider):
+    """
+    AsyncHTTPProvider posting through a session attached by the service.
+
+    web3's own per-endpoint session cache replaces a session whose loop
+    was closed with a default ClientSession, so the tuned connector
+    would be lost after the first event loop.
+    """
+
+    session: ClientSession | None = None
+
+    async def make_request(self, method: str, params: Any) -> Any:
+        if self.session is None or self.session.closed:
+            raise ConnectionError(f"No session attached to {self}")
+
+        request_data = self.encode_rpc_request(method, params)
+        async with self.session.post(
+            self.endpoint_uri, data=request_data, **self.get_request_kwargs()
+        ) as response:
+            raw_response = await response.read()
+        return self.decode_rpc_response(raw_response)
+
+
 class BlockchainService:
     """
     Blockchain service for BSC/USDT operations.
@@ -117,17 +173,15 @@ class BlockchainService:
         from app.services.blockchain.rpc_rate_limiter import RPCRateLimiter
         self.rpc_limiter = RPCRateLimiter(max_concurrent=10, max_rps=25)
 
-        # Thread pool executor
-        self._executor = ThreadPoolExecutor(
-            max_workers=4, thread_name_prefix="web3"
-        )
-
         # Providers storage
-        self.providers: dict[str, Web3] = {}
+        self.providers: dict[str, AsyncWeb3] = {}
+        # Pooled aiohttp session per provider, bound to the loop it was
+        # created on (dramatiq actors run each message in a fresh loop)
+        self._sessions: dict[
+            str, tuple[asyncio.AbstractEventLoop, ClientSession]
+        ] = {}
         self.active_provider_name = "quicknode"
         self.is_auto_switch_enabled = True
-        self._last_settings_update = 0.0
-        self._settings_cache_ttl = 30.0  # Check DB every 30 seconds
 
         # Initialize Providers
         self._init_providers()
@@ -135,6 +189,12 @@ class BlockchainService:
         # Initialize Wallet
         self._init_wallet()
 
+        # Nonce allocator shared by every process sending from the wallet
+        self.nonce_manager = NonceManager(
+            address=self.wallet_address,
+            redis_factory=self._create_redis_client if AsyncRedis else None,
+        )
+
         logger.success(
             f"BlockchainService initialized successfully\n"
             f"  Active Provider: {self.active_provider_name}\n"
@@ -143,7 +203,7 @@ class BlockchainService:
             f"  Wallet: {self.wallet_address if self.wallet_address else 'Not configured'}"
         )
 
-    def get_optimal_gas_price(self, w3: Web3) -> int:
+    async def get_optimal_gas_price(self, w3: AsyncWeb3) -> int:
         """
         Calculate optimal gas price with Smart Gas strategy.
         
@@ -152,13 +212,13 @@ class BlockchainService:
         2. Clamp between MIN (0.1 Gwei) and MAX (5.0 Gwei).
         
         Args:
-            w3: Web3 instance
+            w3: AsyncWeb3 instance
             
         Returns:
             Gas price in Wei
         """
         try:
-            rpc_gas = w3.eth.gas_price
+            rpc_gas = await w3.eth.gas_price
             
             # Clamp logic
             final_gas = max(MIN_GAS_PRICE_WEI, min(MAX_GAS_PRICE_WEI, rpc_gas))
@@ -176,47 +236,73 @@ class BlockchainService:
             return int(MIN_GAS_PRICE_WEI)
 
     def _init_providers(self) -> None:
-        """Initialize Web3 providers based on settings."""
-        # RPC timeout in seconds
-        rpc_timeout = 30
-        
-        # 1. QuickNode
-        qn_url = self.settings.rpc_quicknode_http or self.settings.rpc_url
-        if qn_url:
-            try:
-                w3_qn = Web3(Web3.HTTPProvider(
-                    qn_url,
-                    request_kwargs={'timeout': rpc_timeout}
-                ))
-                w3_qn.middleware_onion.inject(geth_poa_middleware, layer=0)
-                if w3_qn.is_connected():
-                    self.providers["quicknode"] = w3_qn
-                    logger.info("✅ QuickNode provider connected (timeout=30s)")
-                else:
-                    logger.warning("❌ QuickNode provider failed to connect")
-            except Exception as e:
-                logger.error(f"Failed to init QuickNode: {e}")
+        """
+        Initialize AsyncWeb3 providers based on settings.
 
-        # 2. NodeReal
-        nr_url = self.settings.rpc_nodereal_http
-        if nr_url:
+        No RPC is made here (the service is constructed synchronously);
+        connectivity is checked by get_providers_status and failover.
+        """
+        endpoints = {
+            "quicknode": (
+                self.settings.rpc_quicknode_http or self.settings.rpc_url
+            ),
+            "nodereal": self.settings.rpc_nodereal_http,
+        }
+
+        for name, url in endpoints.items():
+            if not url:
+                continue
             try:
-                w3_nr = Web3(Web3.HTTPProvider(
-                    nr_url,
-                    request_kwargs={'timeout': rpc_timeout}
+                w3 = AsyncWeb3(PooledHTTPProvider(
+                    url,
+                    request_kwargs={
+                        "timeout": ClientTimeout(total=RPC_TIMEOUT_SECONDS)
+                    },
                 ))
-                w3_nr.middleware_onion.inject(geth_poa_middleware, layer=0)
-                if w3_nr.is_connected():
-                    self.providers["nodereal"] = w3_nr
-                    logger.info("✅ NodeReal provider connected (timeout=30s)")
-                else:
-                    logger.warning("❌ NodeReal provider failed to connect")
+                w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+                self.providers[name] = w3
+                logger.info(
+                    f"✅ {name} provider configured "
+                    f"(timeout={RPC_TIMEOUT_SECONDS}s, pool={RPC_POOL_SIZE})"
+                )
             except Exception as e:
-                logger.error(f"Failed to init NodeReal: {e}")
+                logger.error(f"Failed to init {name}: {e}")
 
         if not self.providers:
             logger.error("🔥 NO BLOCKCHAIN PROVIDERS AVAILABLE! Service will fail.")
 
+    async def _get_web3(self, name: str) -> AsyncWeb3:
+        """
+        Get provider with its pooled keep-alive session attached.
+
+        One aiohttp session (TCPConnector with keep-alive) is shared by all
+        calls to a provider within an event loop. A new one is attached
+        when called from a different loop, since aiohttp sessions cannot
+        outlive the loop they were created on; the previous loop's session
+        is closed so its connector does not leak.
+        """
+        w3 = self.providers[name]
+        loop = asyncio.get_running_loop()
+
+        cached = self._sessions.get(name)
+        if cached:
+            if cached[0] is loop and not cached[1].closed:
+                return w3
+            await self._close_session(*cached)
+
+        session = ClientSession(
+            connector=TCPConnector(
+                limit=RPC_POOL_SIZE,
+                keepalive_timeout=RPC_KEEPALIVE_SECONDS,
+            ),
+            timeout=ClientTimeout(total=RPC_TIMEOUT_SECONDS),
+            raise_for_status=True,
+        )
+        w3.provider.session = session
+
+        self._sessions[name] = (loop, session)
+        return w3
+
     def _init_wallet(self) -> None:
         """Initialize wallet account."""
         if self.wallet_private_key:
@@ -231,27 +317,137 @@ class BlockchainService:
             self.wallet_account = None
             self.wallet_address = None
 
+    def _create_redis_client(self) -> Any:
+        """Create a Redis client for the running event loop."""
+        return AsyncRedis(
+            host=self.settings.redis_host,
+            port=self.settings.redis_port,
+            password=self.settings.redis_password,
+            db=self.settings.redis_db,
+            decode_responses=True,
+        )
+
+    async def _reserve_txn(
+        self,
+        w3: AsyncWeb3,
+        build_txn: Callable[[int], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """
+        Reserve a nonce and build the transaction for it.
+
+        Nothing is broadcast, so this may run under provider failover;
+        the nonce goes back to the allocator if building fails.
+
+        Args:
+            w3: AsyncWeb3 instance
+            build_txn: Builds the transaction dict for a nonce
+
+        Returns:
+            Transaction dict (with nonce)
+        """
+        nonce = await self.nonce_manager.reserve(w3)
+        try:
+            return await build_txn(nonce)
+        except BaseException:
+            await self.nonce_manager.release(nonce)
+            raise
+
+    async def _sign_and_send(
+        self, w3: AsyncWeb3, txn: dict[str, Any]
+    ) -> str:
+        """
+        Sign and broadcast a built transaction exactly once.
+
+        Must not run under provider failover: a retry would broadcast the
+        payment again with a new nonce. The nonce goes back to the
+        allocator only if the node definitely did not accept the
+        transaction.
+
+        Args:
+            w3: AsyncWeb3 instance
+            txn: Transaction dict from _reserve_txn
+
+        Returns:
+            Transaction hash (hex)
+
+        Raises:
+            ValueError: The node rejected the transaction
+            AmbiguousBroadcastError: The send failed in a way that may
+                have left the transaction with the node
+        """
+        nonce = txn["nonce"]
+        try:
+            signed = self.wallet_account.sign_transaction(txn)
+        except Exception:
+            await self.nonce_manager.release(nonce)
+            raise
+
+        try:
+            tx_hash = await w3.eth.send_raw_transaction(signed.rawTransaction)
+        except ValueError as e:
+            # JSON-RPC error: the node rejected the transaction
+            if any(marker in str(e).lower() for marker in NONCE_USED_ERRORS):
+                await self.nonce_manager.sync(w3)
+            else:
+                await self.nonce_manager.release(nonce)
+            raise
+        except Exception as e:
+            # Timeout or transport error: the node may have it, so the
+            # nonce stays taken and the chain decides on the next resync
+            try:
+                await self.nonce_manager.sync(w3)
+            except Exception as sync_error:
+                logger.warning(
+                    f"Nonce resync after broadcast failed: {sync_error}"
+                )
+            raise AmbiguousBroadcastError(signed.hash.hex(), e) from e
+
+        return tx_hash.hex()
+
+    async def _send_reserved(
+        self, w3: AsyncWeb3, txn: dict[str, Any]
+    ) -> dict[str, Any]:
+        """
+        Broadcast a reserved transaction and build the send result.
+
+        Result status is "pending" once the node accepted the transaction
+        and "unknown" when the broadcast outcome is ambiguous; both carry
+        the transaction hash and must not be resent.
+        """
+        try:
+            async with self.rpc_limiter:
+                tx_hash = await self._sign_and_send(w3, txn)
+        except AmbiguousBroadcastError as e:
+            logger.error(f"{e}. Not resending; check the hash on chain")
+            return {
+                "success": True,
+                "tx_hash": e.tx_hash,
+                "error": None,
+                "status": "unknown",
+            }
+        return {
+            "success": True,
+            "tx_hash": tx_hash,
+            "error": None,
+            "status": "pending",
+        }
+
     async def _update_settings_from_db(self) -> None:
         """Update active provider and auto-switch settings from DB."""
         if not self.session_factory:
             return
 
-        now = time.time()
-        if now - self._last_settings_update < self._settings_cache_ttl:
-            return
-
         try:
-            async with self.session_factory() as session:
-                repo = GlobalSettingsRepository(session)
-                settings = await repo.get_settings()
-                self.active_provider_name = settings.active_rpc_provider
-                self.is_auto_switch_enabled = settings.is_auto_switch_enabled
-                self._last_settings_update = now
+            # Served from memory; the DB is only touched after a change
+            # was published or the snapshot TTL expired
+            snapshot = await get_global_settings_cache().get()
+            self.active_provider_name = snapshot.active_rpc_provider
+            self.is_auto_switch_enabled = snapshot.is_auto_switch_enabled
         except Exception as e:
             logger.warning(f"Failed to update blockchain settings from DB: {e}")
 
-    def get_active_web3(self) -> Web3:
-        """Get the currently active Web3 instance."""
+    def get_active_web3(self) -> AsyncWeb3:
+        """Get the currently active AsyncWeb3 instance."""
         provider = self.providers.get(self.active_provider_name)
         if not provider:
             # Fallback to any available
@@ -263,7 +459,7 @@ class BlockchainService:
         return provider
 
     @property
-    def web3(self) -> Web3:
+    def web3(self) -> AsyncWeb3:
         """Backward compatibility property."""
         return self.get_active_web3()
     
@@ -273,51 +469,6 @@ class BlockchainService:
         w3 = self.get_active_web3()
         return w3.eth.contract(address=self.usdt_contract_address, abi=USDT_ABI)
 
-    async def _execute_with_failover(self, func: Callable[[Web3], Any]) -> Any:
-        """
-        Execute a function with automatic failover to the backup provider.
-        """
-        await self._update_settings_from_db()
-        
-        current_name = self.active_provider_name
-        providers_list = list(self.providers.keys())
-        
-        # Try current provider first
-        try:
-            w3 = self.get_active_web3()
-            return func(w3)
-        except Exception as e:
-            if not self.is_auto_switch_enabled:
-                raise e
-                
-            logger.warning(f"Provider '{current_name}' failed: {e}. Attempting failover...")
-            
-            # Find backup provider
-            backup_name = None
-            for name in providers_list:
-                if name != current_name:
-                    backup_name = name
-                    break
-            
-            if not backup_name:
-                logger.error("No backup provider available.")
-                raise e
-                
-            logger.info(f"Switching to backup provider: {backup_name}")
-            try:
-                self.active_provider_name = backup_name 
-                w3_backup = self.providers[backup_name]
-                result = func(w3_backup)
-                
-                # If successful, persist the switch asynchronously
-                if self.session_factory:
-                    asyncio.create_task(self._persist_provider_switch(backup_name))
-                
-                return result
-            except Exception as e2:
-                logger.error(f"Backup provider '{backup_name}' also failed: {e2}")
-                raise e2
-
     async def _persist_provider_switch(self, new_provider: str):
         """Persist the provider switch to DB."""
         if not self.session_factory:
@@ -333,53 +484,70 @@ class BlockchainService:
 
     async def force_refresh_settings(self):
         """Force update settings from DB."""
-        self._last_settings_update = 0
+        get_global_settings_cache().invalidate()
         await self._update_settings_from_db()
 
     def get_rpc_stats(self) -> dict[str, Any]:
         return self.rpc_limiter.get_stats()
 
-    def close(self) -> None:
-        if hasattr(self, '_executor') and self._executor:
-            self._executor.shutdown(wait=True)
+    async def close(self) -> None:
+        """Close all pooled provider sessions."""
+        for name, (session_loop, session) in list(self._sessions.items()):
+            await self._close_session(session_loop, session)
+            del self._sessions[name]
+
+    @staticmethod
+    async def _close_session(
+        session_loop: asyncio.AbstractEventLoop, session: ClientSession
+    ) -> None:
+        """
+        Close a pooled session, possibly created on another event loop.
+
+        A session whose loop still runs (in another thread) is closed on
+        that loop; otherwise it is closed here, which only drops the
+        connections when the loop is already gone.
+        """
+        if session.closed:
+            return
+        if session_loop.is_running() and (
+            session_loop is not asyncio.get_running_loop()
+        ):
+            asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+            return
+        await session.close()
 
     async def get_block_number(self) -> int:
-        loop = asyncio.get_event_loop()
-        async with self.rpc_limiter:
-            return await loop.run_in_executor(
-                self._executor,
-                lambda: asyncio.run(self._execute_with_failover(
-                    lambda w3: w3.eth.block_number
-                ))
-            )
+        return await self._run_async_failover(lambda w3: w3.eth.block_number)
+
+    async def get_chain_id(self) -> int:
+        """Get chain ID from the active provider."""
+        return await self._run_async_failover(lambda w3: w3.eth.chain_id)
 
-    async def _run_async_failover(self, sync_func: Callable[[Web3], Any]) -> Any:
+    async def _run_async_failover(
+        self, func: Callable[[AsyncWeb3], Awaitable[T]]
+    ) -> T:
         """
-        Runs a synchronous Web3 function in the thread pool, 
-        with failover logic handled in the main async loop.
+        Await an RPC callable on the active provider, failing over to the
+        backup provider on error.
+
+        Concurrency is bounded by the RPC rate limiter only.
         """
         await self._update_settings_from_db()
-        loop = asyncio.get_event_loop()
         
         current_name = self.active_provider_name
         
         # Try primary
         try:
-            # Check primary provider exists logic handled by get_active_web3 inside executor or here
-            # Actually better to get w3 instance here
             if current_name not in self.providers and self.providers:
                  current_name = next(iter(self.providers))
             
             if current_name not in self.providers:
                  raise ConnectionError("No providers available")
 
-            w3 = self.providers[current_name]
+            w3 = await self._get_web3(current_name)
             
             async with self.rpc_limiter:
-                return await loop.run_in_executor(
-                    self._executor,
-                    lambda: sync_func(w3)
-                )
+                return await func(w3)
         except Exception as e:
             if not self.is_auto_switch_enabled:
                 raise e
@@ -394,13 +562,10 @@ class BlockchainService:
             # Try backup
             try:
                 logger.info(f"Switching to backup: {backup_name}")
-                w3_backup = self.providers[backup_name]
+                w3_backup = await self._get_web3(backup_name)
                 
                 async with self.rpc_limiter:
-                    result = await loop.run_in_executor(
-                        self._executor,
-                        lambda: sync_func(w3_backup)
-                    )
+                    result = await func(w3_backup)
                 
                 # If success, switch permanent
                 self.active_provider_name = backup_name
@@ -413,6 +578,13 @@ class BlockchainService:
                 raise e2 
 
     async def send_payment(self, to_address: str, amount: float) -> dict[str, Any]:
+        """
+        Send USDT to address.
+
+        Gas, chain ID and the nonce are obtained with provider failover;
+        the signed transaction is then broadcast once (see _send_reserved
+        for the result status).
+        """
         try:
             if not self.wallet_account:
                 return {"success": False, "error": "Wallet not configured"}
@@ -423,51 +595,220 @@ class BlockchainService:
             to_address = to_checksum_address(to_address)
             amount_wei = int(amount * (10 ** USDT_DECIMALS))
 
-            def _send_tx(w3: Web3):
+            async def _prepare_tx(
+                w3: AsyncWeb3,
+            ) -> tuple[AsyncWeb3, dict[str, Any]]:
                 contract = w3.eth.contract(address=self.usdt_contract_address, abi=USDT_ABI)
                 func = contract.functions.transfer(to_address, amount_wei)
                 
                 # Use Smart Gas
-                gas_price = self.get_optimal_gas_price(w3)
+                gas_price = await self.get_optimal_gas_price(w3)
                 
                 try:
-                    gas_est = func.estimate_gas({"from": self.wallet_address})
+                    gas_est = await func.estimate_gas(
+                        {"from": self.wallet_address}
+                    )
                 except Exception:
                     gas_est = 100000  # Fallback for USDT transfer
 
-                # Use latest block to avoid race conditions
-                nonce = w3.eth.get_transaction_count(self.wallet_address, 'latest')
+                chain_id = await w3.eth.chain_id
+
+                async def _build(nonce: int) -> dict[str, Any]:
+                    return await func.build_transaction({
+                        "from": self.wallet_address,
+                        "gas": int(gas_est * 1.2),
+                        "gasPrice": gas_price,
+                        "nonce": nonce,
+                        "chainId": chain_id,
+                    })
 
-                txn = func.build_transaction({
-                    "from": self.wallet_address,
-                    "gas": int(gas_est * 1.2),
-                    "gasPrice": gas_price,
-                    "nonce": nonce,
-                    "chainId": w3.eth.chain_id,
-                })
-                
                 logger.info(
                     f"Sending USDT tx: to={to_address}, amount={amount}, "
                     f"gas_price={gas_price} wei ({gas_price / 10**9} Gwei), "
                     f"gas_limit={int(gas_est * 1.2)}"
                 )
-                
-                signed = self.wallet_account.sign_transaction(txn)
-                tx_hash = w3.eth.send_raw_transaction(signed.rawTransaction)
-                return tx_hash.hex()
 
-            tx_hash_str = await self._run_async_failover(_send_tx)
+                return w3, await self._reserve_txn(w3, _build)
+
+            w3, txn = await self._run_async_failover(_prepare_tx)
+            result = await self._send_reserved(w3, txn)
             
-            logger.info(f"USDT payment sent: {amount} to {to_address}, hash: {tx_hash_str}")
-            return {"success": True, "tx_hash": tx_hash_str, "error": None}
+            logger.info(
+                f"USDT payment sent: {amount} to {to_address}, "
+                f"hash: {result['tx_hash']} ({result['status']})"
+            )
+            return result
 
         except Exception as e:
             logger.error(f"Failed to send payment: {e}")
             return {"success": False, "error": str(e)}
 
+    async def send_payments(
+        self, payments: list[tuple[str, Decimal]]
+    ) -> list[dict[str, Any]]:
+        """
+        Send many USDT payments back-to-back.
+
+        Gas limits come from one batched eth_estimateGas lookup and the
+        gas price and chain ID are read once. Transactions are then
+        signed and broadcast in nonce order without waiting for each
+        other's receipts (see wait_for_receipts).
+
+        Args:
+            payments: (to_address, amount) pairs
+
+        Returns:
+            send_payment-style result per payment, in the same order
+        """
+        if not self.wallet_account:
+            return [
+                {"success": False, "error": "Wallet not configured"}
+                for _ in payments
+            ]
+
+        results: list[dict[str, Any] | None] = [None] * len(payments)
+        calls: list[tuple[int, str, Decimal, str]] = []
+        contract = self.usdt_contract
+        for i, (to_address, amount) in enumerate(payments):
+            if not await self.validate_wallet_address(to_address):
+                results[i] = {
+                    "success": False,
+                    "error": f"Invalid address: {to_address}",
+                }
+                continue
+            to_address = to_checksum_address(to_address)
+            amount_wei = int(amount * (10 ** USDT_DECIMALS))
+            data = contract.encodeABI(
+                fn_name="transfer", args=[to_address, amount_wei]
+            )
+            calls.append((i, to_address, amount, data))
+
+        if not calls:
+            return results
+
+        estimates = await self._estimate_transfers_gas(
+            [data for _, _, _, data in calls]
+        )
+
+        async def _prepare_batch(
+            w3: AsyncWeb3,
+        ) -> tuple[AsyncWeb3, list[dict[str, Any]]]:
+            # Only reads run under failover; broadcasting happens once,
+            # outside it, so the backup provider cannot send twice
+            gas_price = await self.get_optimal_gas_price(w3)
+            chain_id = await w3.eth.chain_id
+
+            return w3, [
+                {
+                    "to": self.usdt_contract_address,
+                    "value": 0,
+                    "data": data,
+                    # Fallback for USDT transfer
+                    "gas": int((gas_est or 100000) * 1.2),
+                    "gasPrice": gas_price,
+                    "chainId": chain_id,
+                }
+                for (_, _, _, data), gas_est in zip(calls, estimates)
+            ]
+
+        try:
+            w3, txns = await self._run_async_failover(_prepare_batch)
+            sent_results = await self._broadcast_in_order(w3, txns)
+        except Exception as e:
+            logger.error(f"Failed to send payment batch: {e}")
+            sent_results = [{"success": False, "error": str(e)}] * len(calls)
+
+        for (i, to_address, amount, _), result in zip(calls, sent_results):
+            results[i] = result
+            if not result["success"]:
+                logger.error(
+                    f"Failed to send payment {amount} to {to_address}: "
+                    f"{result['error']}"
+                )
+
+        sent = sum(1 for result in results if result and result["success"])
+        logger.info(f"USDT payment batch sent: {sent}/{len(payments)}")
+        return results
+
+    async def _broadcast_in_order(
+        self, w3: AsyncWeb3, txns: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Reserve nonces for, sign and broadcast transactions one by one.
+
+        Each transaction gets the next reserved nonce; a rejected one
+        does not stop the rest (its nonce is released for the next
+        send). After an ambiguous broadcast (status "unknown") the node
+        is suspect, so the remaining transactions are not sent.
+
+        Args:
+            w3: AsyncWeb3 instance
+            txns: Transaction dicts without nonce
+
+        Returns:
+            send_payment-style result per transaction
+        """
+        results: list[dict[str, Any]] = []
+        for txn in txns:
+
+            async def _build(nonce: int, txn=txn) -> dict[str, Any]:
+                return {**txn, "nonce": nonce}
+
+            try:
+                reserved = await self._reserve_txn(w3, _build)
+                results.append(await self._send_reserved(w3, reserved))
+            except Exception as e:
+                results.append({"success": False, "error": str(e)})
+                continue
+
+            if results[-1]["status"] == "unknown":
+                break
+
+        skipped = len(txns) - len(results)
+        if skipped:
+            logger.warning(
+                f"Broadcast outcome unknown, {skipped} payment(s) of the "
+                f"batch not sent"
+            )
+            results.extend(
+                {
+                    "success": False,
+                    "error": "Not sent: previous broadcast outcome unknown",
+                }
+                for _ in range(skipped)
+            )
+        return results
+
+    async def _estimate_transfers_gas(
+        self, calldata: list[str]
+    ) -> list[int | None]:
+        """
+        Estimate gas of USDT contract calls with batched eth_estimateGas.
+
+        Returns:
+            Gas per call, None where the estimate failed
+        """
+        try:
+            return await self._batch_call(
+                RPC.eth_estimateGas,
+                [
+                    [{
+                        "from": self.wallet_address,
+                        "to": self.usdt_contract_address,
+                        "data": data,
+                    }]
+                    for data in calldata
+                ],
+            )
+        except Exception as e:
+            logger.warning(f"Batch gas estimation failed: {e}")
+            return [None] * len(calldata)
+
     async def send_native_token(self, to_address: str, amount: float) -> dict[str, Any]:
         """
         Send native token (BNB) to address.
+
+        Same failover and broadcast rules as send_payment.
         """
         try:
             if not self.wallet_account:
@@ -479,36 +820,40 @@ class BlockchainService:
             to_address = to_checksum_address(to_address)
             amount_wei = Web3.to_wei(amount, 'ether')
 
-            def _send_native(w3: Web3):
+            async def _prepare_native(
+                w3: AsyncWeb3,
+            ) -> tuple[AsyncWeb3, dict[str, Any]]:
                 # Use Smart Gas
-                gas_price = self.get_optimal_gas_price(w3)
+                gas_price = await self.get_optimal_gas_price(w3)
                 gas_limit = 21000  # Standard native transfer gas
                 
-                # Use latest block to avoid race conditions
-                nonce = w3.eth.get_transaction_count(self.wallet_address, 'latest')
+                chain_id = await w3.eth.chain_id
+
+                async def _build(nonce: int) -> dict[str, Any]:
+                    return {
+                        "to": to_address,
+                        "value": amount_wei,
+                        "gas": gas_limit,
+                        "gasPrice": gas_price,
+                        "nonce": nonce,
+                        "chainId": chain_id,
+                    }
 
-                txn = {
-                    "to": to_address,
-                    "value": amount_wei,
-                    "gas": gas_limit,
-                    "gasPrice": gas_price,
-                    "nonce": nonce,
-                    "chainId": w3.eth.chain_id,
-                }
-                
                 logger.info(
                     f"Sending BNB tx: to={to_address}, amount={amount}, "
                     f"gas_price={gas_price} wei ({gas_price / 10**9} Gwei)"
                 )
 
-                signed = self.wallet_account.sign_transaction(txn)
-                tx_hash = w3.eth.send_raw_transaction(signed.rawTransaction)
-                return tx_hash.hex()
+                return w3, await self._reserve_txn(w3, _build)
 
-            tx_hash_str = await self._run_async_failover(_send_native)
+            w3, txn = await self._run_async_failover(_prepare_native)
+            result = await self._send_reserved(w3, txn)
             
-            logger.info(f"BNB payment sent: {amount} to {to_address}, hash: {tx_hash_str}")
-            return {"success": True, "tx_hash": tx_hash_str, "error": None}
+            logger.info(
+                f"BNB payment sent: {amount} to {to_address}, "
+                f"hash: {result['tx_hash']} ({result['status']})"
+            )
+            return result
 
         except Exception as e:
             logger.error(f"Failed to send BNB: {e}")
@@ -518,10 +863,9 @@ class BlockchainService:
         """Get Native Token (BNB) balance."""
         try:
             address = to_checksum_address(address)
-            def _get_bal(w3: Web3):
-                return w3.eth.get_balance(address)
-            
-            wei = await self._run_async_failover(_get_bal)
+            wei = await self._run_async_failover(
+                lambda w3: w3.eth.get_balance(address)
+            )
             return Decimal(wei) / Decimal(10 ** 18)
         except Exception as e:
             logger.error(f"Get BNB balance failed: {e}")
@@ -529,42 +873,222 @@ class BlockchainService:
 
     async def check_transaction_status(self, tx_hash: str) -> dict[str, Any]:
         try:
-            def _check(w3: Web3):
+            async def _check(w3: AsyncWeb3):
                 try:
-                    receipt = w3.eth.get_transaction_receipt(tx_hash)
-                    current = w3.eth.block_number
+                    receipt = await w3.eth.get_transaction_receipt(tx_hash)
+                    current = await w3.eth.block_number
                     return receipt, current
                 except Exception:
                     return None, None
 
             receipt, current_block = await self._run_async_failover(_check)
-            
-            if not receipt:
-                return {"status": "pending", "confirmations": 0}
+            return self._receipt_status(receipt, current_block)
+        except Exception:
+            return {"status": "unknown", "confirmations": 0}
 
-            confirmations = max(0, current_block - receipt.blockNumber + 1)
-            status = "confirmed" if receipt.status == 1 else "failed"
-            
+    async def check_transactions_status(
+        self, tx_hashes: list[str]
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Check status of many transactions with batched receipt lookups.
+
+        Same per-hash result as check_transaction_status, but one block
+        number call plus one JSON-RPC batch per rpc_batch_size hashes.
+
+        Args:
+            tx_hashes: Transaction hashes
+
+        Returns:
+            Dict of {tx_hash: status dict}
+        """
+        if not tx_hashes:
+            return {}
+
+        try:
+            current_block = await self.get_block_number()
+            receipts = await self.get_transaction_receipts(tx_hashes)
+        except Exception as e:
+            logger.error(f"Batch status check failed: {e}")
             return {
-                "status": status,
-                "confirmations": confirmations,
-                "block_number": receipt.blockNumber
+                tx_hash: {"status": "unknown", "confirmations": 0}
+                for tx_hash in tx_hashes
             }
-        except Exception:
-            return {"status": "unknown", "confirmations": 0}
+
+        return {
+            tx_hash: self._receipt_status(receipts.get(tx_hash), current_block)
+            for tx_hash in tx_hashes
+        }
+
+    async def wait_for_receipts(
+        self,
+        tx_hashes: list[str],
+        timeout: float,
+        poll_interval: float | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Wait until transactions are mined, polling all of them at once.
+
+        Args:
+            tx_hashes: Transaction hashes
+            timeout: Max seconds to wait
+            poll_interval: Seconds between polls (default
+                settings.blockchain_poll_interval)
+
+        Returns:
+            Dict of {tx_hash: status dict}; transactions not mined
+            within the timeout have status "pending" or "unknown"
+        """
+        interval = poll_interval or self.settings.blockchain_poll_interval
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        statuses: dict[str, dict[str, Any]] = {}
+        waiting = list(dict.fromkeys(tx_hashes))
+        while waiting:
+            statuses.update(await self.check_transactions_status(waiting))
+            waiting = [
+                tx_hash for tx_hash in waiting
+                if statuses[tx_hash]["status"] in ("pending", "unknown")
+            ]
+            if not waiting or loop.time() + interval > deadline:
+                break
+            await asyncio.sleep(interval)
+
+        return statuses
+
+    @staticmethod
+    def _receipt_status(receipt: Any, current_block: int | None) -> dict[str, Any]:
+        """Build status dict from a receipt (None means not mined yet)."""
+        if not receipt:
+            return {"status": "pending", "confirmations": 0}
+
+        confirmations = max(0, current_block - receipt.blockNumber + 1)
+        status = "confirmed" if receipt.status == 1 else "failed"
+
+        return {
+            "status": status,
+            "confirmations": confirmations,
+            "block_number": receipt.blockNumber
+        }
+
+    async def get_transaction_receipts(
+        self, tx_hashes: list[str]
+    ) -> dict[str, Any]:
+        """
+        Get receipts for many transactions via JSON-RPC batches.
+
+        Returns:
+            Dict of {tx_hash: receipt or None if not mined/unavailable}
+        """
+        unique = list(dict.fromkeys(tx_hashes))
+        results = await self._batch_call(
+            RPC.eth_getTransactionReceipt, [[h] for h in unique]
+        )
+        return dict(zip(unique, results))
+
+    async def get_transactions(self, tx_hashes: list[str]) -> dict[str, Any]:
+        """
+        Get many transactions via JSON-RPC batches.
+
+        Returns:
+            Dict of {tx_hash: transaction or None if not found/unavailable}
+        """
+        unique = list(dict.fromkeys(tx_hashes))
+        results = await self._batch_call(
+            RPC.eth_getTransactionByHash, [[h] for h in unique]
+        )
+        return dict(zip(unique, results))
+
+    async def _batch_call(
+        self, method: str, params_list: list[list[Any]]
+    ) -> list[Any]:
+        """
+        Execute the same RPC method for many params as JSON-RPC batches.
+
+        Params are split into batches of settings.rpc_batch_size; each
+        batch is one HTTP request and one rate limiter slot, with the same
+        failover as single calls. Results are formatted like the matching
+        w3.eth method; per-call errors and null results map to None.
+
+        Args:
+            method: JSON-RPC method name
+            params_list: Params for each call
+
+        Returns:
+            Results in the same order as params_list
+        """
+        formatter = PYTHONIC_RESULT_FORMATTERS.get(method)
+        batch_size = self.settings.rpc_batch_size
+
+        async def _send_batch(chunk: list[list[Any]]) -> list[Any]:
+            payload = [
+                {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+                for i, params in enumerate(chunk)
+            ]
+
+            async def _post(w3: AsyncWeb3) -> list[Any]:
+                session = self._session_for(w3)
+                async with session.post(
+                    w3.provider.endpoint_uri,
+                    json=payload,
+                    headers=w3.provider.get_request_headers(),
+                ) as response:
+                    body = await response.json(content_type=None)
+
+                if not isinstance(body, list):
+                    # Provider rejected the batch as a whole
+                    raise ValueError(f"JSON-RPC batch rejected: {body}")
+                return body
+
+            responses = await self._run_async_failover(_post)
+            by_id = {item.get("id"): item for item in responses}
+
+            results = []
+            errors = 0
+            for i in range(len(chunk)):
+                item = by_id.get(i) or {}
+                result = item.get("result")
+                if "error" in item or "result" not in item:
+                    errors += 1
+                    result = None
+                if result is not None and formatter:
+                    result = AttributeDict.recursive(formatter(result))
+                results.append(result)
+
+            if errors:
+                logger.warning(
+                    f"JSON-RPC batch {method}: {errors}/{len(chunk)} calls failed"
+                )
+            return results
+
+        chunks = [
+            params_list[start:start + batch_size]
+            for start in range(0, len(params_list), batch_size)
+        ]
+        batches = await asyncio.gather(*(_send_batch(c) for c in chunks))
+        return [result for batch in batches for result in batch]
+
+    def _session_for(self, w3: AsyncWeb3) -> ClientSession:
+        """Get the pooled session registered for a provider by _get_web3."""
+        for name, provider in self.providers.items():
+            if provider is w3 and name in self._sessions:
+                return self._sessions[name][1]
+        raise ConnectionError("No session registered for provider")
 
     async def get_transaction_details(self, tx_hash: str) -> dict[str, Any] | None:
         try:
             # Just execute directly via failover helper, encapsulating logic
-            return await self._run_async_failover(lambda w3: self._fetch_tx_details_sync(w3, tx_hash))
+            return await self._run_async_failover(
+                lambda w3: self._fetch_tx_details(w3, tx_hash)
+            )
         except Exception:
             return None
 
-    def _fetch_tx_details_sync(self, w3: Web3, tx_hash: str):
+    async def _fetch_tx_details(self, w3: AsyncWeb3, tx_hash: str):
         try:
-            tx = w3.eth.get_transaction(tx_hash)
+            tx = await w3.eth.get_transaction(tx_hash)
             try:
-                receipt = w3.eth.get_transaction_receipt(tx_hash)
+                receipt = await w3.eth.get_transaction_receipt(tx_hash)
             except Exception:
                 receipt = None
             
@@ -603,8 +1127,11 @@ class BlockchainService:
     async def get_usdt_balance(self, address: str) -> Decimal | None:
         try:
             address = to_checksum_address(address)
-            def _get_bal(w3: Web3):
-                contract = w3.eth.contract(address=self.usdt_contract_address, abi=USDT_ABI)
+
+            def _get_bal(w3: AsyncWeb3):
+                contract = w3.eth.contract(
+                    address=self.usdt_contract_address, abi=USDT_ABI
+                )
                 return contract.functions.balanceOf(address).call()
             
             wei = await self._run_async_failover(_get_bal)
@@ -613,16 +1140,39 @@ class BlockchainService:
             logger.error(f"Get balance failed: {e}")
             return None
 
+    async def get_usdt_transfer_logs(
+        self, from_block: int, to_block: int, to_address: str
+    ) -> list[Any]:
+        """
+        Get USDT Transfer logs to an address for an inclusive block range.
+
+        Errors are propagated so callers can shrink the range when the
+        provider rejects it (eth_getLogs block/result limits).
+        """
+        padded_to = "0x" + to_address[2:].lower().zfill(64)
+
+        def _get_logs(w3: AsyncWeb3):
+            return w3.eth.get_logs({
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": self.usdt_contract_address,
+                "topics": [TRANSFER_EVENT_TOPIC, None, padded_to],
+            })
+
+        return await self._run_async_failover(_get_logs)
+
     async def estimate_gas_fee(self, to_address: str, amount: Decimal) -> Decimal | None:
          try:
             to_address = to_checksum_address(to_address)
             amount_wei = int(amount * (10 ** USDT_DECIMALS))
             
-            def _est_gas(w3: Web3):
+            async def _est_gas(w3: AsyncWeb3):
                 contract = w3.eth.contract(address=self.usdt_contract_address, abi=USDT_ABI)
                 func = contract.functions.transfer(to_address, amount_wei)
-                func_gas = func.estimate_gas({"from": self.wallet_address})
-                price = self.get_optimal_gas_price(w3)
+                func_gas = await func.estimate_gas(
+                    {"from": self.wallet_address}
+                )
+                price = await self.get_optimal_gas_price(w3)
                 return func_gas * price
 
             total_wei = await self._run_async_failover(_est_gas)
@@ -633,13 +1183,11 @@ class BlockchainService:
     async def get_providers_status(self) -> dict[str, Any]:
         """Get status of all providers."""
         status = {}
-        for name, w3 in self.providers.items():
+        for name in self.providers:
             try:
-                loop = asyncio.get_event_loop()
-                # Run ping in executor
-                bn = await loop.run_in_executor(
-                    self._executor, lambda: w3.eth.block_number
-                )
+                w3 = await self._get_web3(name)
+                async with self.rpc_limiter:
+                    bn = await w3.eth.block_number
                 status[name] = {"connected": True, "block": bn, "active": name == self.active_provider_name}
             except Exception as e:
                 status[name] = {"connected": False, "error": str(e), "active": name == self.active_provider_name}
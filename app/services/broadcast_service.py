@@ -2,10 +2,18 @@
 Broadcast Service.
 
 Handles mass message sending with rate limiting and background execution.
+
+Recipients are streamed from the DB in keyset pages and sent by a bounded
+pool of concurrent senders sharing one token bucket. Progress is
+checkpointed after every page, so a broadcast resumes after a restart.
+The sending process holds a lease on the job, renewed at every
+checkpoint, so only one process sends a broadcast at a time.
 """
 
 import asyncio
-from datetime import datetime
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from aiogram import Bot
@@ -15,17 +23,89 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.admin import Admin
-from app.services.admin_log_service import AdminLogService
-from app.services.user_service import UserService
+from app.config.database import async_session_maker
+from app.config.settings import settings
+from app.repositories.broadcast_job_repository import BroadcastJobRepository
+from app.repositories.user_repository import UserRepository
+
+# Attempts per recipient when Telegram answers with RetryAfter
+BROADCAST_MAX_ATTEMPTS = 3
+
+# Bot methods for media broadcasts (text uses send_message)
+MEDIA_SEND_METHODS = {
+    "photo": "send_photo",
+    "voice": "send_voice",
+    "audio": "send_audio",
+}
+
+
+class TokenBucket:
+    """
+    Async token bucket shared by concurrent senders.
+
+    Issues `rate` tokens per second with bursts up to `capacity`.
+    `pause()` stops issuing tokens for everyone, which is how a
+    Telegram flood-control RetryAfter is honoured globally.
+    """
+
+    def __init__(self, rate: float, capacity: int | None = None) -> None:
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens per second
+            capacity: Max burst size (defaults to one second of tokens)
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Stop issuing tokens for `seconds` and drop the accumulated burst."""
+        self._paused_until = max(
+            self._paused_until, time.monotonic() + seconds
+        )
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
 
 
 class BroadcastService:
     """Service for handling broadcasts."""
 
-    def __init__(self, session: AsyncSession, bot: Bot):
+    def __init__(
+        self,
+        session: AsyncSession | None,
+        bot: Bot,
+        session_factory: Any | None = None,
+    ):
         self.session = session
         self.bot = bot
+        # Background tasks outlive the handler's session - use own sessions
+        self.session_factory = session_factory or async_session_maker
 
     async def start_broadcast(
         self,
@@ -36,136 +116,220 @@ class BroadcastService:
     ) -> str:
         """
         Start broadcast in background.
-        
+
         Returns:
             Broadcast ID
         """
         broadcast_id = f"broadcast_{admin_id}_{int(datetime.now().timestamp())}"
-        
-        # Start background task
-        asyncio.create_task(
-            self._broadcast_task(
-                admin_id, broadcast_data, button_data, admin_telegram_id, broadcast_id
+
+        lease_token = uuid.uuid4().hex
+        async with self.session_factory() as session:
+            job = await BroadcastJobRepository(session).create(
+                broadcast_id=broadcast_id,
+                admin_id=admin_id,
+                admin_telegram_id=admin_telegram_id,
+                payload=broadcast_data,
+                button=button_data,
+                lease_token=lease_token,
+                lease_expires_at=datetime.now(UTC)
+                + timedelta(seconds=settings.broadcast_lease_seconds),
             )
-        )
-        
+            await session.commit()
+            job_id = job.id
+
+        # Start background task
+        asyncio.create_task(self._broadcast_task(job_id, lease_token))
+
         return broadcast_id
 
-    async def _broadcast_task(
-        self,
-        admin_id: int,
-        broadcast_data: dict,
-        button_data: dict | None,
-        admin_telegram_id: int,
-        broadcast_id: str,
-    ) -> None:
-        """Background broadcast task."""
-        logger.info(f"Starting broadcast {broadcast_id}")
-        
-        try:
-            user_service = UserService(self.session)
-            user_telegram_ids = await user_service.get_all_telegram_ids()
-            
-            if not user_telegram_ids:
+    async def resume_unfinished(self) -> int:
+        """
+        Resume broadcasts interrupted by a restart.
+
+        Only jobs whose lease has lapsed are claimed, so a broadcast
+        still being sent by another process is left alone.
+
+        Returns:
+            Number of broadcasts resumed
+        """
+        lease_token = uuid.uuid4().hex
+        async with self.session_factory() as session:
+            job_ids = await BroadcastJobRepository(session).claim_unleased(
+                lease_token, settings.broadcast_lease_seconds
+            )
+            await session.commit()
+
+        for job_id in job_ids:
+            logger.info(f"Resuming broadcast job {job_id}")
+            asyncio.create_task(self._broadcast_task(job_id, lease_token))
+
+        return len(job_ids)
+
+    async def _broadcast_task(self, job_id: int, lease_token: str) -> None:
+        """Background broadcast task (runs while holding the lease)."""
+        async with self.session_factory() as session:
+            job_repo = BroadcastJobRepository(session)
+            user_repo = UserRepository(session)
+
+            job = await job_repo.get_by_id(job_id)
+            if (
+                not job
+                or job.status != "running"
+                or job.lease_token != lease_token
+            ):
                 return
 
-            # Prepare markup
-            reply_markup = None
-            if button_data:
-                builder = InlineKeyboardBuilder()
-                builder.button(text=button_data["text"], url=button_data["url"])
-                reply_markup = builder.as_markup()
-
-            success_count = 0
-            failed_count = 0
-            
-            broadcast_type = broadcast_data["type"]
-            text = broadcast_data.get("text")
-            file_id = broadcast_data.get("file_id")
-            caption = broadcast_data.get("caption")
-
-            for i, telegram_id in enumerate(user_telegram_ids):
-                try:
-                    if broadcast_type == "text":
-                        await self.bot.send_message(
-                            telegram_id,
-                            text,
-                            parse_mode="Markdown",
-                            reply_markup=reply_markup,
-                        )
-                    elif broadcast_type == "photo":
-                        await self.bot.send_photo(
-                            telegram_id,
-                            file_id,
-                            caption=caption,
-                            parse_mode="Markdown" if caption else None,
-                            reply_markup=reply_markup,
-                        )
-                    elif broadcast_type == "voice":
-                        await self.bot.send_voice(
+            broadcast_id = job.broadcast_id
+            admin_telegram_id = job.admin_telegram_id
+            logger.info(f"Starting broadcast {broadcast_id}")
+
+            try:
+                reply_markup = self._build_markup(job.button)
+                bucket = TokenBucket(settings.broadcast_rate_limit)
+                senders = asyncio.Semaphore(settings.broadcast_concurrency)
+
+                while True:
+                    page = await user_repo.get_telegram_id_page(
+                        after_id=job.last_user_id,
+                        limit=settings.broadcast_page_size,
+                    )
+                    if not page:
+                        break
+
+                    results = await asyncio.gather(*(
+                        self._deliver(
+                            bucket,
+                            senders,
                             telegram_id,
-                            file_id,
-                            caption=caption,
-                            parse_mode="Markdown" if caption else None,
-                            reply_markup=reply_markup,
+                            job.payload,
+                            reply_markup,
                         )
-                    elif broadcast_type == "audio":
-                        await self.bot.send_audio(
-                            telegram_id,
-                            file_id,
-                            caption=caption,
-                            parse_mode="Markdown" if caption else None,
-                            reply_markup=reply_markup,
+                        for _, telegram_id in page
+                    ))
+
+                    # Checkpoint: a restart re-sends at most this page
+                    sent = sum(results)
+                    job.last_user_id = page[-1][0]
+                    job.sent_count += sent
+                    job.failed_count += len(page) - sent
+                    if not await job_repo.renew_lease(
+                        job_id, lease_token, settings.broadcast_lease_seconds
+                    ):
+                        await session.rollback()
+                        logger.warning(
+                            f"Broadcast {broadcast_id} lease taken over, "
+                            f"stopping"
                         )
+                        return
+                    await session.commit()
+
+                job.status = "completed"
+                job.finished_at = datetime.now(UTC)
+                await session.commit()
+
+                logger.info(
+                    f"Broadcast {broadcast_id} completed",
+                    extra={
+                        "broadcast_id": broadcast_id,
+                        "sent": job.sent_count,
+                        "failed": job.failed_count,
+                    },
+                )
 
-                    success_count += 1
+                # Notify admin about completion
+                await self.bot.send_message(
+                    admin_telegram_id,
+                    f"✅ **Рассылка {broadcast_id} завершена!**\n\n"
+                    f"✅ Успешно: {job.sent_count}\n"
+                    f"❌ Ошибки: {job.failed_count}\n"
+                    f"👥 Всего: {job.sent_count + job.failed_count}",
+                    parse_mode="Markdown",
+                )
 
+            except Exception as e:
+                logger.error(f"Broadcast failed: {e}")
+                await session.rollback()
+                await job_repo.update(
+                    job_id, status="failed", finished_at=datetime.now(UTC)
+                )
+                await session.commit()
+                await self.bot.send_message(
+                    admin_telegram_id,
+                    f"❌ **Ошибка рассылки {broadcast_id}**: {e}",
+                    parse_mode="Markdown",
+                )
+
+    async def _deliver(
+        self,
+        bucket: TokenBucket,
+        senders: asyncio.Semaphore,
+        telegram_id: int,
+        payload: dict[str, Any],
+        reply_markup: InlineKeyboardMarkup | None,
+    ) -> bool:
+        """
+        Send one broadcast message, retrying after flood control.
+
+        Returns:
+            True if delivered
+        """
+        async with senders:
+            for _ in range(BROADCAST_MAX_ATTEMPTS):
+                await bucket.acquire()
+                try:
+                    await self._send(telegram_id, payload, reply_markup)
+                    return True
                 except TelegramRetryAfter as e:
-                    await asyncio.sleep(e.retry_after)
-                    # Retry once after waiting
-                    try:
-                        if broadcast_type == "text":
-                            await self.bot.send_message(
-                                telegram_id,
-                                text,
-                                parse_mode="Markdown",
-                                reply_markup=reply_markup,
-                            )
-                            success_count += 1
-                        else:
-                            # Skip retry for media to avoid complexity
-                            failed_count += 1
-                    except Exception as retry_error:
-                        logger.warning(f"Retry failed for {telegram_id}: {retry_error}")
-                        failed_count += 1
+                    # Flood limit is global for the bot - pause all senders
+                    logger.warning(
+                        f"Broadcast flood control, pausing {e.retry_after}s"
+                    )
+                    bucket.pause(e.retry_after)
                 except Exception as send_error:
-                    logger.debug(f"Failed to send to {telegram_id}: {send_error}")
-                    failed_count += 1
+                    logger.debug(
+                        f"Failed to send to {telegram_id}: {send_error}"
+                    )
+                    return False
 
-                # Rate limiting: 20 messages per second (0.05s delay)
-                await asyncio.sleep(0.05) 
+        logger.warning(f"Retry failed for {telegram_id}: flood control")
+        return False
 
-            # Notify admin about completion
-            await self.bot.send_message(
-                admin_telegram_id,
-                f"✅ **Рассылка {broadcast_id} завершена!**\n\n"
-                f"✅ Успешно: {success_count}\n"
-                f"❌ Ошибки: {failed_count}\n"
-                f"👥 Всего: {len(user_telegram_ids)}",
-                parse_mode="Markdown",
-            )
-            
-            # Log action
-            # Note: session might be closed if not handled carefully. 
-            # Ideally create new session for background task.
-            # Here we assume session is valid or we should use session factory.
-            # Skipping DB log in background to avoid DetachedInstanceError or ClosedSession
-            
-        except Exception as e:
-            logger.error(f"Broadcast failed: {e}")
+    async def _send(
+        self,
+        telegram_id: int,
+        payload: dict[str, Any],
+        reply_markup: InlineKeyboardMarkup | None,
+    ) -> None:
+        """Send broadcast payload of any supported type to one chat."""
+        broadcast_type = payload["type"]
+
+        if broadcast_type == "text":
             await self.bot.send_message(
-                admin_telegram_id,
-                f"❌ **Ошибка рассылки {broadcast_id}**: {e}",
+                telegram_id,
+                payload.get("text"),
                 parse_mode="Markdown",
+                reply_markup=reply_markup,
             )
+            return
+
+        send_method = getattr(self.bot, MEDIA_SEND_METHODS[broadcast_type])
+        caption = payload.get("caption")
+        await send_method(
+            telegram_id,
+            payload.get("file_id"),
+            caption=caption,
+            parse_mode="Markdown" if caption else None,
+            reply_markup=reply_markup,
+        )
+
+    @staticmethod
+    def _build_markup(
+        button_data: dict | None,
+    ) -> InlineKeyboardMarkup | None:
+        """Build inline URL button markup."""
+        if not button_data:
+            return None
 
+        builder = InlineKeyboardBuilder()
+        builder.button(text=button_data["text"], url=button_data["url"])
+        return builder.as_markup()
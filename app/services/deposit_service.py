@@ -76,12 +76,13 @@ class DepositService:
                 )
 
             # R17-3: Check emergency stop (DB flag or static config flag)
-            from app.repositories.global_settings_repository import (
-                GlobalSettingsRepository,
+            from app.services.global_settings_cache import (
+                get_global_settings_cache,
             )
 
-            settings_repo = GlobalSettingsRepository(self.session)
-            global_settings = await settings_repo.get_settings()
+            global_settings = await get_global_settings_cache().get(
+                self.session
+            )
 
             if (
                 settings.emergency_stop_deposits
@@ -200,9 +201,10 @@ class DepositService:
             Updated deposit
         """
         from datetime import UTC, datetime, timedelta
-        from app.repositories.global_settings_repository import GlobalSettingsRepository
         from sqlalchemy import select
 
+        from app.services.global_settings_cache import get_global_settings_cache
+
         try:
             # Acquire pessimistic lock on deposit to prevent concurrent modifications
             stmt = select(Deposit).where(Deposit.id == deposit_id).with_for_update()
@@ -219,8 +221,9 @@ class DepositService:
                 return deposit
 
             # R12-1: Calculate next_accrual_at based on settings
-            settings_repo = GlobalSettingsRepository(self.session)
-            global_settings = await settings_repo.get_settings()
+            global_settings = await get_global_settings_cache().get(
+                self.session
+            )
 
             roi_settings = global_settings.roi_settings or {}
             accrual_period_hours = int(roi_settings.get("REWARD_ACCRUAL_PERIOD_HOURS", 6))
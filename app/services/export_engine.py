@@ -0,0 +1,372 @@
+"""
+Export engine.
+
+Streams report data into CSV (optionally gzip-compressed) or write-only
+XLSX files. Query rows come from a server-side cursor in batches; each
+batch is encoded in a worker thread into a spooled temporary file that
+stays in memory up to export_spool_max_bytes and spills to disk beyond
+that. Exports of any size run in constant memory and never block the
+event loop.
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Sequence
+from typing import IO, Any
+
+from loguru import logger
+from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from sqlalchemy import Row, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+
+CSV = "csv"
+XLSX = "xlsx"
+
+# Widest auto-sized XLSX column, in characters
+MAX_COLUMN_WIDTH = 50
+
+_HEADER_FONT = Font(bold=True, color="FFFFFF", name="Calibri", size=11)
+_HEADER_FILL = PatternFill(
+    start_color="366092", end_color="366092", fill_type="solid"
+)
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+_STRIPE_FILL = PatternFill(
+    start_color="E9EFF7", end_color="E9EFF7", fill_type="solid"
+)
+_THIN_SIDE = Side(border_style="thin", color="D4D4D4")
+_CELL_BORDER = Border(
+    left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE
+)
+
+
+class ExportFile:
+    """
+    A finished export in a spooled temporary file.
+
+    The file is positioned at the start. Close it (or use it as a
+    context manager) to release its memory or disk space.
+    """
+
+    def __init__(self, file: IO[bytes], filename: str, rows: int) -> None:
+        """
+        Initialize export file.
+
+        Args:
+            file: Spooled file holding the encoded export
+            filename: Suggested download name
+            rows: Data rows written (headers excluded)
+        """
+        self.file = file
+        self.filename = filename
+        self.rows = rows
+
+    @property
+    def size(self) -> int:
+        """Encoded size in bytes."""
+        position = self.file.tell()
+        size = self.file.seek(0, io.SEEK_END)
+        self.file.seek(position)
+        return size
+
+    def seek(self, offset: int) -> None:
+        """Move the read position."""
+        self.file.seek(offset)
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to `size` bytes from the current position."""
+        return self.file.read(size)
+
+    def getvalue(self) -> bytes:
+        """Whole export as bytes (for small exports)."""
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self) -> None:
+        """Release the spooled file."""
+        self.file.close()
+
+    def __enter__(self) -> "ExportFile":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class CsvExportWriter:
+    """CSV rows into a binary file, UTF-8 with BOM for Excel."""
+
+    def __init__(
+        self,
+        file: IO[bytes],
+        headers: Sequence[str],
+        compress: bool = False,
+    ) -> None:
+        """
+        Initialize CSV writer and write the header row.
+
+        Args:
+            file: Binary file to write into
+            headers: Column headers
+            compress: Gzip the output
+        """
+        self._gzip = (
+            gzip.GzipFile(fileobj=file, mode="wb") if compress else None
+        )
+        self._text = io.TextIOWrapper(
+            self._gzip or file, encoding="utf-8-sig", newline=""
+        )
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(headers)
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Append data rows."""
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        """Flush everything, leaving the target file open."""
+        self._text.flush()
+        self._text.detach()
+        if self._gzip is not None:
+            self._gzip.close()
+
+
+class XlsxExportWriter:
+    """
+    Write-only openpyxl workbook.
+
+    Rows go to per-sheet temporary files instead of an in-memory cell
+    grid; the workbook is assembled into the target file on close().
+    Sheets are written one after another: add_sheet() starts a sheet and
+    write_rows() appends to the latest one.
+    """
+
+    def __init__(self, file: IO[bytes]) -> None:
+        """
+        Initialize XLSX writer.
+
+        Args:
+            file: Binary file the workbook is saved into
+        """
+        self._file = file
+        self._workbook = Workbook(write_only=True)
+        self._sheet: Any = None
+        self._row = 0
+        self._striped = False
+        self.rows = 0
+
+    def add_sheet(
+        self,
+        title: str,
+        headers: Sequence[str] | None = None,
+        widths: Sequence[float] | None = None,
+        striped: bool = False,
+    ) -> None:
+        """
+        Start a new sheet.
+
+        Args:
+            title: Sheet title
+            headers: Styled header row, if any
+            widths: Column widths in characters
+            striped: Border data cells and shade every other row
+        """
+        self._sheet = self._workbook.create_sheet(title)
+        # Write-only sheets take dimensions before the first row
+        for index, width in enumerate(widths or (), start=1):
+            letter = get_column_letter(index)
+            self._sheet.column_dimensions[letter].width = width
+        self._row = 0
+        self._striped = striped
+        if headers:
+            self._sheet.append([
+                self.cell(
+                    value,
+                    font=_HEADER_FONT,
+                    fill=_HEADER_FILL,
+                    alignment=_HEADER_ALIGNMENT,
+                )
+                for value in headers
+            ])
+            self._row = 1
+
+    def cell(self, value: Any, **style: Any) -> Cell:
+        """Styled cell for the current sheet (font=, fill=, ...)."""
+        cell = WriteOnlyCell(self._sheet, value=value)
+        for name, attr in style.items():
+            setattr(cell, name, attr)
+        return cell
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Append data rows to the current sheet."""
+        for values in rows:
+            self._row += 1
+            self.rows += 1
+            if self._striped:
+                fill = _STRIPE_FILL if self._row % 2 == 0 else None
+                values = [self._striped_cell(value, fill) for value in values]
+            self._sheet.append(values)
+
+    def _striped_cell(self, value: Any, fill: PatternFill | None) -> Any:
+        if isinstance(value, Cell):
+            return value
+        if fill is None:
+            return self.cell(value, border=_CELL_BORDER)
+        return self.cell(value, border=_CELL_BORDER, fill=fill)
+
+    def close(self) -> None:
+        """Assemble the workbook into the target file."""
+        self._workbook.save(self._file)
+
+
+def column_widths(
+    headers: Sequence[str], rows: Iterable[Sequence[Any]]
+) -> list[float]:
+    """Column widths fitting the longest value, capped at MAX_COLUMN_WIDTH."""
+    longest = [len(str(header)) for header in headers]
+    for row in rows:
+        for index, value in enumerate(row):
+            longest[index] = max(longest[index], len(str(value)))
+    return [min((length + 2) * 1.2, MAX_COLUMN_WIDTH) for length in longest]
+
+
+def _spooled_file() -> IO[bytes]:
+    return tempfile.SpooledTemporaryFile(
+        max_size=settings.export_spool_max_bytes, mode="w+b"
+    )
+
+
+def _write_batch(
+    writer: CsvExportWriter | XlsxExportWriter,
+    row_mapper: Callable[[Row[Any]], Sequence[Any]],
+    batch: Sequence[Row[Any]],
+) -> None:
+    """Map and encode one batch of rows (runs in a worker thread)."""
+    writer.write_rows(row_mapper(row) for row in batch)
+
+
+class ExportEngine:
+    """Runs streaming exports for one session."""
+
+    def __init__(
+        self, session: AsyncSession, batch_size: int | None = None
+    ) -> None:
+        """
+        Initialize export engine.
+
+        Args:
+            session: Database session
+            batch_size: Rows fetched from the cursor per batch
+        """
+        self.session = session
+        self.batch_size = batch_size or settings.export_batch_size
+
+    async def export_query(
+        self,
+        stmt: Select[Any],
+        *,
+        filename: str,
+        headers: Sequence[str],
+        row_mapper: Callable[[Row[Any]], Sequence[Any]],
+        fmt: str = CSV,
+        compress: bool = False,
+        sheet_title: str = "Export",
+        widths: Sequence[float] | None = None,
+    ) -> ExportFile:
+        """
+        Stream a query into a CSV or XLSX file.
+
+        Args:
+            stmt: Core select; rows are read from a server-side cursor
+            filename: Download name (".gz" is appended when compressed)
+            headers: Column headers
+            row_mapper: Turns a result row into cell values (runs in a
+                worker thread, so it must not touch the session)
+            fmt: CSV or XLSX
+            compress: Gzip CSV output
+            sheet_title: XLSX sheet title
+            widths: XLSX column widths
+
+        Returns:
+            Finished export, positioned at the start
+        """
+        if fmt not in (CSV, XLSX):
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if compress and fmt == CSV:
+            filename = f"{filename}.gz"
+
+        started = time.monotonic()
+        file = _spooled_file()
+        rows = 0
+        try:
+            if fmt == CSV:
+                writer: CsvExportWriter | XlsxExportWriter = CsvExportWriter(
+                    file, headers, compress=compress
+                )
+            else:
+                writer = XlsxExportWriter(file)
+                writer.add_sheet(
+                    sheet_title, headers=headers, widths=widths, striped=True
+                )
+
+            result = await self.session.stream(
+                stmt.execution_options(yield_per=self.batch_size)
+            )
+            async for batch in result.partitions():
+                await asyncio.to_thread(
+                    _write_batch, writer, row_mapper, batch
+                )
+                rows += len(batch)
+
+            await asyncio.to_thread(writer.close)
+        except BaseException:
+            file.close()
+            raise
+
+        file.seek(0)
+        export = ExportFile(file, filename, rows)
+        logger.info(
+            f"Exported {rows} rows to {filename} "
+            f"({export.size} bytes, {time.monotonic() - started:.1f}s)"
+        )
+        return export
+
+    @staticmethod
+    async def write_xlsx(
+        filename: str, build: Callable[[XlsxExportWriter], None]
+    ) -> ExportFile:
+        """
+        Build a workbook from data already in memory, off the event loop.
+
+        Args:
+            filename: Download name
+            build: Adds sheets and rows to the writer (runs in a worker
+                thread, so it must not touch the session)
+
+        Returns:
+            Finished export, positioned at the start
+        """
+
+        def run(file: IO[bytes]) -> int:
+            writer = XlsxExportWriter(file)
+            build(writer)
+            writer.close()
+            return writer.rows
+
+        file = _spooled_file()
+        try:
+            rows = await asyncio.to_thread(run, file)
+        except BaseException:
+            file.close()
+            raise
+
+        file.seek(0)
+        return ExportFile(file, filename, rows)
@@ -8,10 +8,11 @@ Includes DTOs for type-safe data transfer.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import UTC, datetime
 from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import func, select, desc, case
+from sqlalchemy import Row, func, select, desc, case, true
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
@@ -19,6 +20,7 @@ from app.models.deposit import Deposit
 from app.models.transaction import Transaction
 from app.models.enums import TransactionType, TransactionStatus
 from app.models.user import User
+from app.services.export_engine import CSV, ExportEngine, ExportFile
 
 
 @dataclass
@@ -348,17 +350,34 @@ class FinancialReportService:
             wallet_history=wallet_dtos
         )
 
-    async def export_all_users_csv(self) -> str:
+    async def export_all_users(
+        self, fmt: str = CSV, compress: bool = False
+    ) -> ExportFile:
         """
-        Export all users to CSV format.
-        
+        Export all users with their deposit totals.
+
+        Streamed from a server-side cursor into a spooled file, so
+        memory stays flat regardless of the user count.
+
+        Args:
+            fmt: CSV or XLSX
+            compress: Gzip CSV output
+
         Returns:
-            CSV string with all user data
+            Export file (caller closes it)
         """
-        import csv
-        import io
-        
-        # Get all users with their stats
+        # Per-user aggregate via the deposits.user_id index: rows stream
+        # in users.id order instead of waiting for a full GROUP BY
+        deposit_stats = (
+            select(
+                func.coalesce(func.sum(Deposit.amount), 0).label(
+                    "total_deposited"
+                ),
+                func.count(Deposit.id).label("deposits_count"),
+            )
+            .where(Deposit.user_id == User.id)
+            .lateral("deposit_stats")
+        )
         stmt = (
             select(
                 User.id,
@@ -371,44 +390,48 @@ class FinancialReportService:
                 User.is_banned,
                 User.created_at,
                 User.last_active,
-                func.coalesce(func.sum(Deposit.amount), 0).label('total_deposited'),
-                func.count(Deposit.id).label('deposits_count'),
+                deposit_stats.c.total_deposited,
+                deposit_stats.c.deposits_count,
             )
-            .outerjoin(Deposit, User.id == Deposit.user_id)
-            .group_by(User.id)
+            .select_from(User)
+            .join(deposit_stats, true())
             .order_by(User.id.asc())
         )
-        
-        result = await self.session.execute(stmt)
-        rows = result.all()
-        
-        # Create CSV
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Header
-        writer.writerow([
-            'ID', 'Telegram ID', 'Username', 'Wallet', 'Balance',
-            'Total Earned', 'Total Deposited', 'Deposits Count',
-            'Verified', 'Banned', 'Created At', 'Last Active'
-        ])
-        
-        # Data rows
-        for row in rows:
-            writer.writerow([
-                row.id,
-                row.telegram_id,
-                row.username or '',
-                row.wallet_address,
-                float(row.balance),
-                float(row.total_earned),
-                float(row.total_deposited),
-                row.deposits_count,
-                'Yes' if row.is_verified else 'No',
-                'Yes' if row.is_banned else 'No',
-                row.created_at.strftime('%Y-%m-%d %H:%M') if row.created_at else '',
-                row.last_active.strftime('%Y-%m-%d %H:%M') if row.last_active else '',
-            ])
-        
-        return output.getvalue()
 
+        stamp = datetime.now(UTC).strftime('%Y%m%d_%H%M')
+        return await ExportEngine(self.session).export_query(
+            stmt,
+            filename=f"users_export_{stamp}.{fmt}",
+            headers=USER_EXPORT_HEADERS,
+            row_mapper=_user_export_row,
+            fmt=fmt,
+            compress=compress,
+            sheet_title="Users",
+            widths=USER_EXPORT_WIDTHS,
+        )
+
+
+USER_EXPORT_HEADERS = (
+    'ID', 'Telegram ID', 'Username', 'Wallet', 'Balance',
+    'Total Earned', 'Total Deposited', 'Deposits Count',
+    'Verified', 'Banned', 'Created At', 'Last Active',
+)
+USER_EXPORT_WIDTHS = (10, 14, 24, 46, 14, 14, 16, 15, 10, 10, 18, 18)
+
+
+def _user_export_row(row: Row[Any]) -> list[Any]:
+    """Cell values of one exported user."""
+    return [
+        row.id,
+        row.telegram_id,
+        row.username or '',
+        row.wallet_address,
+        float(row.balance),
+        float(row.total_earned),
+        float(row.total_deposited),
+        row.deposits_count,
+        'Yes' if row.is_verified else 'No',
+        'Yes' if row.is_banned else 'No',
+        row.created_at.strftime('%Y-%m-%d %H:%M') if row.created_at else '',
+        row.last_active.strftime('%Y-%m-%d %H:%M') if row.last_active else '',
+    ]
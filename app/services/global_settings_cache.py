@@ -0,0 +1,326 @@
+"""
+Global settings cache.
+
+Process-wide immutable snapshot of GlobalSettings, so hot paths read
+settings from memory instead of the DB.
+
+Every committed ORM change to GlobalSettings bumps its version column,
+invalidates the local snapshot and publishes the new version on a Redis
+channel; other processes (bot, worker, scheduler) subscribed to it drop
+their snapshot on receipt. As a fallback for lost messages (or no
+Redis), a snapshot older than the TTL is revalidated with a single
+`SELECT version` and only reloaded if the version moved.
+"""
+
+import asyncio
+import copy
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config.database import async_session_maker
+from app.config.settings import settings
+from app.models.global_settings import GlobalSettings
+
+SETTINGS_CHANNEL = "global_settings:changed"
+
+# Session.info key for settings versions committed by the transaction
+VERSION_KEY = "global_settings_version"
+
+# Attributes that are runtime state, not configuration
+NON_SETTINGS_FIELDS = frozenset({"last_scanned_block"})
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """Immutable copy of the GlobalSettings row."""
+
+    id: int
+    version: int
+    min_withdrawal_amount: Decimal
+    daily_withdrawal_limit: Decimal | None
+    is_daily_limit_enabled: bool
+    auto_withdrawal_enabled: bool
+    withdrawal_service_fee: Decimal
+    active_rpc_provider: str
+    is_auto_switch_enabled: bool
+    max_open_deposit_level: int
+    roi_settings: Mapping[str, Any]
+    emergency_stop_withdrawals: bool
+    emergency_stop_deposits: bool
+    emergency_stop_roi: bool
+
+    @classmethod
+    def from_model(cls, model: GlobalSettings) -> "SettingsSnapshot":
+        """Build snapshot from a loaded GlobalSettings row."""
+        return cls(
+            id=model.id,
+            version=model.version or 1,
+            min_withdrawal_amount=model.min_withdrawal_amount,
+            daily_withdrawal_limit=model.daily_withdrawal_limit,
+            is_daily_limit_enabled=model.is_daily_limit_enabled,
+            auto_withdrawal_enabled=model.auto_withdrawal_enabled,
+            withdrawal_service_fee=model.withdrawal_service_fee,
+            active_rpc_provider=model.active_rpc_provider,
+            is_auto_switch_enabled=model.is_auto_switch_enabled,
+            max_open_deposit_level=model.max_open_deposit_level,
+            roi_settings=MappingProxyType(
+                copy.deepcopy(dict(model.roi_settings or {}))
+            ),
+            emergency_stop_withdrawals=model.emergency_stop_withdrawals,
+            emergency_stop_deposits=model.emergency_stop_deposits,
+            emergency_stop_roi=model.emergency_stop_roi,
+        )
+
+
+class GlobalSettingsCache:
+    """Versioned in-process GlobalSettings snapshot."""
+
+    def __init__(
+        self,
+        redis_client: Any | None = None,
+        ttl: float | None = None,
+        session_factory: Any | None = None,
+    ) -> None:
+        """
+        Initialize global settings cache.
+
+        Args:
+            redis_client: Async Redis client for pub/sub (optional)
+            ttl: Seconds before the snapshot version is revalidated
+            session_factory: Session factory used when no session given
+        """
+        self.redis_client = redis_client
+        self.ttl = ttl or settings.global_settings_cache_ttl
+        self.session_factory = session_factory or async_session_maker
+        self._snapshot: SettingsSnapshot | None = None
+        self._checked_at = 0.0
+        self._stale = True
+        # Bumped on invalidation; a refresh racing with an invalidation
+        # must not mark its (possibly old) result fresh
+        self._generation = 0
+        self._listener: asyncio.Task | None = None
+
+    @property
+    def snapshot(self) -> SettingsSnapshot | None:
+        """Current snapshot without any freshness check."""
+        return self._snapshot
+
+    async def get(
+        self, session: AsyncSession | None = None
+    ) -> SettingsSnapshot:
+        """
+        Get settings snapshot, touching the DB only when stale.
+
+        Args:
+            session: Session for a refresh (a new one is opened if None)
+
+        Returns:
+            Settings snapshot
+        """
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and not self._stale
+            and time.monotonic() - self._checked_at < self.ttl
+        ):
+            return snapshot
+
+        if session is None:
+            async with self.session_factory() as own_session:
+                return await self._refresh(own_session)
+        return await self._refresh(session)
+
+    def invalidate(self, version: int | None = None) -> None:
+        """
+        Mark the snapshot stale.
+
+        Args:
+            version: Changed version (ignored if not newer than snapshot)
+        """
+        snapshot = self._snapshot
+        if version is None or snapshot is None or version > snapshot.version:
+            self._stale = True
+            self._generation += 1
+
+    async def publish(self, version: int) -> None:
+        """Notify other processes about a new settings version."""
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.publish(SETTINGS_CHANNEL, str(version))
+        except Exception as e:
+            logger.warning(f"Failed to publish settings version: {e}")
+
+    def start_listener(self) -> None:
+        """Subscribe to settings changes on the running event loop."""
+        if not self.redis_client:
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(
+                self._listen()
+            )
+
+    async def stop_listener(self) -> None:
+        """Stop the pub/sub listener."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _refresh(self, session: AsyncSession) -> SettingsSnapshot:
+        """Revalidate snapshot version, reloading the row if it moved."""
+        snapshot = self._snapshot
+        generation = self._generation
+
+        if snapshot is not None and not self._stale:
+            result = await session.execute(
+                select(GlobalSettings.version).where(
+                    GlobalSettings.id == snapshot.id
+                )
+            )
+            if result.scalar_one_or_none() == snapshot.version:
+                self._checked_at = time.monotonic()
+                return snapshot
+
+        # populate_existing: the session may hold an older copy of the row
+        result = await session.execute(
+            select(GlobalSettings)
+            .limit(1)
+            .execution_options(populate_existing=True)
+        )
+        model = result.scalar_one_or_none()
+        if model is None:
+            from app.repositories.global_settings_repository import (
+                GlobalSettingsRepository,
+            )
+
+            model = await GlobalSettingsRepository(session).get_settings()
+
+        snapshot = SettingsSnapshot.from_model(model)
+
+        self._snapshot = snapshot
+        if generation == self._generation:
+            self._stale = False
+        self._checked_at = time.monotonic()
+        return snapshot
+
+    async def _listen(self) -> None:
+        """Invalidate on published versions, resubscribing on errors."""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(SETTINGS_CHANNEL)
+                # Changes may have been missed while unsubscribed
+                self.invalidate()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        self.invalidate(int(message["data"]))
+                    except (TypeError, ValueError):
+                        self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Settings pub/sub listener error: {e}")
+                self.invalidate()
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+def _settings_changed(obj: GlobalSettings) -> bool:
+    """Check if a dirty GlobalSettings row has configuration changes."""
+    state = inspect(obj)
+    return any(
+        attr.history.has_changes()
+        for attr in state.attrs
+        if attr.key not in NON_SETTINGS_FIELDS and attr.key != "version"
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_settings_version(
+    session: Session, flush_context: Any, instances: Any
+) -> None:
+    """Increment version of changed GlobalSettings rows."""
+    for obj in session.dirty:
+        if isinstance(obj, GlobalSettings) and _settings_changed(obj):
+            # Incremented by the UPDATE itself, so concurrent writers
+            # starting from the same loaded version still both bump it
+            obj.version = GlobalSettings.version + 1
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_settings_version(session: Session, flush_context: Any) -> None:
+    """Remember settings versions written in this transaction."""
+    # A version set by SQL is expired by the flush; reading it reloads
+    # the value the UPDATE wrote
+    for obj in [*session.new, *session.dirty]:
+        if isinstance(obj, GlobalSettings):
+            versions = session.info.setdefault(VERSION_KEY, set())
+            versions.add(obj.version or 1)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_settings_version(session: Session) -> None:
+    """Invalidate the local snapshot and notify other processes."""
+    versions = session.info.pop(VERSION_KEY, None)
+    if not versions:
+        return
+
+    version = max(versions)
+    cache = get_global_settings_cache()
+    cache.invalidate(version)
+    try:
+        asyncio.get_running_loop().create_task(cache.publish(version))
+    except RuntimeError:
+        # No running loop (sync scripts) - local invalidation only
+        pass
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_settings_version(session: Session) -> None:
+    """Forget versions of a rolled back transaction."""
+    session.info.pop(VERSION_KEY, None)
+
+
+# Singleton instance
+_global_settings_cache: GlobalSettingsCache | None = None
+
+
+def get_global_settings_cache() -> GlobalSettingsCache:
+    """Get global settings cache (no pub/sub until init with Redis)."""
+    global _global_settings_cache
+    if _global_settings_cache is None:
+        _global_settings_cache = GlobalSettingsCache()
+    return _global_settings_cache
+
+
+def init_global_settings_cache(
+    redis_client: Any | None,
+) -> GlobalSettingsCache:
+    """
+    Initialize global settings cache with Redis and start listening.
+
+    Must be called from a running event loop.
+    """
+    global _global_settings_cache
+    _global_settings_cache = GlobalSettingsCache(redis_client=redis_client)
+    _global_settings_cache.start_listener()
+    return _global_settings_cache
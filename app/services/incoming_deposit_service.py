@@ -2,35 +2,65 @@
 Incoming deposit service.
 
 Handles processing of incoming transfers detected on blockchain.
+
+Transfers are matched per scanned batch: already processed tx hashes,
+senders and deposit levels are each resolved with one query, and the
+matched deposits are inserted with one bulk INSERT that skips tx hashes
+already recorded.
 """
 
+from dataclasses import dataclass
 from decimal import Decimal
+from typing import Any
+
+from aiogram import Bot
 from loguru import logger
-from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.user import User
+from app.config.settings import settings
 from app.models.deposit import Deposit
+from app.models.deposit_level_version import DepositLevelVersion
 from app.models.enums import TransactionStatus
+from app.models.user import User
+from app.repositories.deposit_level_version_repository import (
+    DepositLevelVersionRepository,
+)
+from app.repositories.deposit_repository import DepositRepository
+from app.repositories.user_repository import UserRepository
 from app.services.deposit_service import DepositService
 from app.services.notification_service import NotificationService
-from app.config.settings import settings
 from bot.utils.formatters import escape_md
 
+
+@dataclass
+class MatchedTransfer:
+    """Incoming transfer matched to a user and a deposit level."""
+
+    transfer: dict[str, Any]
+    user: User
+    level_version: DepositLevelVersion
+
+
 class IncomingDepositService:
     """
     Service for processing incoming blockchain transfers.
     """
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, bot: Bot | None = None) -> None:
         """
         Initialize service.
 
         Args:
             session: Database session
+            bot: Bot for admin notifications (not sent without one)
         """
         self.session = session
+        self.bot = bot
         self.deposit_service = DepositService(session)
+        self.deposit_repo = DepositRepository(session)
+        self.user_repo = UserRepository(session)
+        self.version_repo = DepositLevelVersionRepository(session)
         self.notification_service = NotificationService(session)
 
     async def process_incoming_transfer(
@@ -51,109 +81,290 @@ class IncomingDepositService:
             amount: Amount in USDT
             block_number: Block number
         """
-        logger.info(f"📥 Processing incoming transfer: {amount} USDT from {from_address} (TX: {tx_hash})")
+        await self.process_incoming_transfers([{
+            "tx_hash": tx_hash,
+            "from_address": from_address,
+            "to_address": to_address,
+            "amount": amount,
+            "block_number": block_number,
+        }])
+
+    async def process_incoming_transfers(
+        self, transfers: list[dict[str, Any]]
+    ) -> int:
+        """
+        Process a batch of decoded incoming transfer events.
+
+        Args:
+            transfers: Dicts with tx_hash, from_address, to_address,
+                amount and block_number
+
+        Returns:
+            Number of deposits created
+        """
+        pending = await self._new_transfers(transfers)
+        if not pending:
+            return 0
+
+        logger.info(f"📥 Processing {len(pending)} incoming transfers")
 
-        # 1. Idempotency Check
-        existing_deposit = await self.session.execute(
-            select(Deposit).where(Deposit.tx_hash == tx_hash)
+        # 3. User identification: one query for all senders
+        users = await self.user_repo.get_by_wallet_addresses(
+            {transfer["from_address"] for transfer in pending}
         )
-        if existing_deposit.scalars().first():
+        # Amount -> current level version (reverse lookup of the levels)
+        level_versions = {
+            version.amount: version
+            for version in await self.version_repo.get_all_active_levels()
+        }
+
+        matched = []
+        for transfer in pending:
+            user = users.get(transfer["from_address"].lower())
+            if not user:
+                await self._notify_unidentified(transfer)
+                continue
+
+            logger.info(
+                f"✅ Identified user {user.id} for wallet "
+                f"{transfer['from_address']}"
+            )
+            level_version = level_versions.get(transfer["amount"])
+            if not level_version:
+                await self._notify_failed(
+                    user,
+                    transfer,
+                    f"Amount {transfer['amount']} does not match any "
+                    f"active level. Exact amount required.",
+                )
+                continue
+
+            matched.append(MatchedTransfer(transfer, user, level_version))
+
+        created = await self._create_deposits(matched)
+
+        for deposit, match in created:
+            await self._confirm_and_notify(deposit, match)
+
+        return len(created)
+
+    async def _new_transfers(
+        self, transfers: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Drop foreign-recipient, duplicate and already processed ones."""
+        system_wallet = settings.system_wallet_address.lower()
+        by_hash: dict[str, dict[str, Any]] = {}
+
+        for transfer in transfers:
+            # 2. Verify Recipient
+            # Note: This check should ideally happen before calling this
+            # service, but good to have as a safeguard.
+            if transfer["to_address"].lower() != system_wallet:
+                logger.warning(
+                    f"⚠️ Transfer recipient mismatch: "
+                    f"{transfer['to_address']} != "
+                    f"{settings.system_wallet_address}"
+                )
+                continue
+            by_hash.setdefault(transfer["tx_hash"], transfer)
+
+        if not by_hash:
+            return []
+
+        # 1. Idempotency check: one IN (...) query for the batch
+        result = await self.session.execute(
+            select(Deposit.tx_hash).where(Deposit.tx_hash.in_(by_hash))
+        )
+        for tx_hash in result.scalars().all():
             logger.info(f"⏩ Deposit {tx_hash} already processed. Skipping.")
-            return
+            del by_hash[tx_hash]
 
-        # 2. Verify Recipient
-        # Note: This check should ideally happen before calling this service, 
-        # but good to have as a safeguard.
-        if to_address.lower() != settings.system_wallet_address.lower():
-            logger.warning(f"⚠️ Transfer recipient mismatch: {to_address} != {settings.system_wallet_address}")
-            # Allow processing if it's a valid deposit to a known hot wallet?
-            # For now strict check against configured system wallet.
-            return
+        return list(by_hash.values())
+
+    async def _create_deposits(
+        self, matched: list[MatchedTransfer]
+    ) -> list[tuple[Deposit, MatchedTransfer]]:
+        """
+        Insert pending deposits for matched transfers in one statement.
+
+        Applies the checks of DepositService.create_deposit once per
+        batch. A tx_hash that is already recorded (e.g. submitted by the
+        user in the bot) is skipped by the insert, so one known hash
+        does not fail the rest of the batch.
+
+        Returns:
+            Created deposits with their transfers
 
-        # 3. User Identification
-        user_result = await self.session.execute(
-            select(User).where(User.wallet_address.ilike(from_address))
+        Raises:
+            Exception: If the insert fails, so the scan is not advanced
+        """
+        if not matched:
+            return []
+
+        # R17-3: Check emergency stop (DB flag or static config flag)
+        from app.services.global_settings_cache import (
+            get_global_settings_cache,
         )
-        user = user_result.scalars().first()
-
-        if user:
-            logger.info(f"✅ Identified user {user.id} for wallet {from_address}")
-            
-            # Determine Level based on amount
-            # We need to reverse lookup amount -> level from validation logic
-            from app.services.deposit_validation_service import DEPOSIT_LEVELS
-            # Invert mapping: amount -> level
-            amount_to_level = {v: k for k, v in DEPOSIT_LEVELS.items()}
-            
-            level = amount_to_level.get(amount)
-            
-            if not level:
-                logger.warning(f"⚠️ Amount {amount} does not match any level. Defaulting to Level 1 logic or Manual Review.")
-                # Decision: Create deposit with level 1 but maybe mark for review?
-                # For now, try to find closest valid level or just use 1?
-                # Strict mode: Only exact amounts allowed?
-                # Let's assume Level 1 for unknown amounts to capture the funds in system.
-                level = 1
-
-            try:
-                # Create and Confirm Deposit
-                # Use create_deposit from service which handles locks and logic
-                # tx_hash ensures idempotency - duplicate calls will be caught by unique constraint
-                deposit = await self.deposit_service.create_deposit(
-                    user_id=user.id,
-                    level=level,
-                    amount=amount,
-                    tx_hash=tx_hash  # Idempotency key
+
+        global_settings = await get_global_settings_cache().get(self.session)
+        if settings.emergency_stop_deposits or getattr(
+            global_settings, "emergency_stop_deposits", False
+        ):
+            for match in matched:
+                await self._notify_failed(
+                    match.user, match.transfer, "Deposits emergency stop"
                 )
+            return []
+
+        rows = await self._deposit_rows(matched)
+        if not rows:
+            return []
 
-                # Manually update block number and wallet address if not set by create
-                deposit.block_number = block_number
-                deposit.wallet_address = from_address
-                await self.session.commit()
-
-                # Confirm - idempotent operation, safe to call multiple times
-                await self.deposit_service.confirm_deposit(deposit.id, block_number)
-                
-                # Notify User
-                await self.notification_service.notify_user(
-                    user.id,
-                    f"✅ **Депозит успешно зачислен!**\n\n"
-                    f"Сумма: `{amount} USDT`\n"
-                    f"Уровень: {level}\n"
-                    f"Hash: `{tx_hash}`"
+        try:
+            deposits = await self.deposit_repo.bulk_create_new(rows)
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"❌ Failed to create incoming deposits: {e}")
+            await self._notify_admins(
+                f"❌ **Ошибка обработки депозитов**\n"
+                f"Transfers: {len(rows)}\n"
+                f"Error: {e}"
+            )
+            raise
+
+        by_hash = {deposit.tx_hash: deposit for deposit in deposits}
+        for row in rows:
+            if row["tx_hash"] not in by_hash:
+                logger.info(
+                    f"⏩ Deposit {row['tx_hash']} already recorded. Skipping."
                 )
-                
-                # Notify Admin
-                username = escape_md(user.username) if user.username else "без юзернейма"
-                await self.notification_service.notify_admins(
-                    f"💰 **Новый автоматический депозит**\n"
-                    f"User: {user.id} (@{username})\n"
-                    f"Amount: {amount} USDT\n"
-                    f"TX: `{tx_hash}`"
+        return [
+            (by_hash[match.transfer["tx_hash"]], match)
+            for match in matched
+            if match.transfer["tx_hash"] in by_hash
+        ]
+
+    async def _deposit_rows(
+        self, matched: list[MatchedTransfer]
+    ) -> list[dict[str, Any]]:
+        """Build deposit rows, reporting transfers below the minimum."""
+        # R11-2: While the blockchain is down, deposits wait for recovery
+        status = TransactionStatus.PENDING.value
+        if settings.blockchain_maintenance_mode:
+            status = TransactionStatus.PENDING_NETWORK_RECOVERY.value
+
+        # R18-1: Dust attack protection
+        min_deposit = Decimal(str(settings.minimum_deposit_amount))
+        rows = []
+        for match in matched:
+            amount = match.transfer["amount"]
+            if amount < min_deposit:
+                logger.warning(
+                    f"Dust attack attempt blocked: user {match.user.id}, "
+                    f"amount {amount} < minimum {min_deposit}"
                 )
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to process deposit for user {user.id}: {e}")
-                await self.notification_service.notify_admins(
-                    f"❌ **Ошибка обработки депозита**\n"
-                    f"User: {user.id}\n"
-                    f"TX: `{tx_hash}`\n"
-                    f"Error: {str(e)}"
+                await self._notify_failed(
+                    match.user,
+                    match.transfer,
+                    f"Amount {amount} is below the minimum deposit "
+                    f"{min_deposit}",
                 )
-        
-        else:
-            # User NOT found
-            logger.warning(f"⚠️ Unidentified deposit from {from_address}")
-            
-            # Notify Admins about unidentified funds
-            await self.notification_service.notify_admins(
-                f"⚠️ **НЕОПОЗНАННЫЙ ДЕПОЗИТ**\n\n"
+                continue
+
+            # R17-1: ROI cap from the level version
+            roi_cap_percent = Decimal(
+                str(match.level_version.roi_cap_percent)
+            )
+            rows.append({
+                "user_id": match.user.id,
+                "level": match.level_version.level_number,
+                "amount": amount,
+                "tx_hash": match.transfer["tx_hash"],
+                "block_number": match.transfer["block_number"],
+                "wallet_address": match.transfer["from_address"],
+                "deposit_version_id": match.level_version.id,
+                "roi_cap_amount": (
+                    amount * (roi_cap_percent / Decimal("100"))
+                ).quantize(Decimal("0.00000001")),
+                "status": status,
+            })
+
+        return rows
+
+    async def _confirm_and_notify(
+        self, deposit: Deposit, match: MatchedTransfer
+    ) -> None:
+        """Confirm a created deposit and notify the user and admins."""
+        user = match.user
+        tx_hash = deposit.tx_hash
+        amount = deposit.amount
+        level = deposit.level
+
+        try:
+            # Confirm - idempotent operation, safe to call multiple times
+            await self.deposit_service.confirm_deposit(
+                deposit.id, match.transfer["block_number"]
+            )
+
+            # Notify User
+            await self.notification_service.notify_user(
+                user.id,
+                f"✅ **Депозит успешно зачислен!**\n\n"
                 f"Сумма: `{amount} USDT`\n"
-                f"От: `{from_address}`\n"
-                f"TX: `{tx_hash}`\n\n"
-                f"Кошелек не привязан ни к одному пользователю!\n"
-                f"Требуется ручная проверка."
+                f"Уровень: {level}\n"
+                f"Hash: `{tx_hash}`"
             )
-            # Optional: Create a "OrphanedDeposit" record? 
-            # For now logging and alerting is sufficient.
 
+            # Notify Admin
+            username = (
+                escape_md(user.username) if user.username else "без юзернейма"
+            )
+            await self._notify_admins(
+                f"💰 **Новый автоматический депозит**\n"
+                f"User: {user.id} (@{username})\n"
+                f"Amount: {amount} USDT\n"
+                f"TX: `{tx_hash}`"
+            )
+
+        except Exception as e:
+            await self._notify_failed(user, match.transfer, str(e))
+
+    async def _notify_failed(
+        self, user: User, transfer: dict[str, Any], error: str
+    ) -> None:
+        """Alert admins that a transfer from a known user was not booked."""
+        logger.error(
+            f"❌ Failed to process deposit for user {user.id}: {error}"
+        )
+        await self._notify_admins(
+            f"❌ **Ошибка обработки депозита**\n"
+            f"User: {user.id}\n"
+            f"TX: `{transfer['tx_hash']}`\n"
+            f"Error: {error}"
+        )
+
+    async def _notify_unidentified(self, transfer: dict[str, Any]) -> None:
+        """Alert admins about funds from a wallet of no user."""
+        logger.warning(
+            f"⚠️ Unidentified deposit from {transfer['from_address']}"
+        )
+        await self._notify_admins(
+            f"⚠️ **НЕОПОЗНАННЫЙ ДЕПОЗИТ**\n\n"
+            f"Сумма: `{transfer['amount']} USDT`\n"
+            f"От: `{transfer['from_address']}`\n"
+            f"TX: `{transfer['tx_hash']}`\n\n"
+            f"Кошелек не привязан ни к одному пользователю!\n"
+            f"Требуется ручная проверка."
+        )
+
+    async def _notify_admins(self, message: str) -> None:
+        """Send an admin notification if a bot is available."""
+        if self.bot is None:
+            logger.warning("No bot for admin notification, logged only")
+            return
+
+        try:
+            await self.notification_service.notify_admins(self.bot, message)
+        except Exception as e:
+            logger.error(f"Failed to notify admins: {e}")
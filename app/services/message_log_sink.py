@@ -0,0 +1,165 @@
+"""
+Message log sink.
+
+Buffers user message logs in memory and writes them in the background
+with multi-row INSERTs, so logging adds no DB work to update handling.
+Per-user trimming is done by the periodic message log trim task.
+"""
+
+import asyncio
+from collections import deque
+from datetime import UTC, datetime
+from typing import Any
+
+from loguru import logger
+
+from app.config.database import async_session_maker
+from app.config.settings import settings
+from app.repositories.user_message_log_repository import (
+    UserMessageLogRepository,
+)
+
+
+class MessageLogSink:
+    """
+    Background batched writer for UserMessageLog rows.
+
+    Buffered rows are flushed every `flush_interval` seconds or as soon
+    as `batch_size` rows are waiting. The buffer is bounded; when the DB
+    cannot keep up, the oldest rows are dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory: Any | None = None,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        buffer_limit: int | None = None,
+    ) -> None:
+        """
+        Initialize message log sink.
+
+        Args:
+            session_factory: Async session factory for flushes
+            batch_size: Rows per INSERT
+            flush_interval: Max delay before a flush in seconds
+            buffer_limit: Max buffered rows
+        """
+        self.session_factory = session_factory or async_session_maker
+        self.batch_size = batch_size or settings.message_log_batch_size
+        self.flush_interval = (
+            flush_interval or settings.message_log_flush_interval_ms / 1000
+        )
+        self.buffer_limit = buffer_limit or settings.message_log_buffer_limit
+        self._buffer: deque[dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.dropped = 0
+
+    def enqueue(
+        self,
+        telegram_id: int,
+        message_text: str,
+        user_id: int | None = None,
+    ) -> None:
+        """
+        Buffer a message for logging (never blocks).
+
+        Args:
+            telegram_id: Telegram user ID
+            message_text: Message content
+            user_id: Optional DB user ID
+        """
+        if len(self._buffer) >= self.buffer_limit:
+            self._buffer.popleft()
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(
+                    "Message log buffer full, dropping oldest entries",
+                    extra={"dropped": self.dropped},
+                )
+
+        self._buffer.append({
+            "telegram_id": telegram_id,
+            "message_text": message_text,
+            "user_id": user_id,
+            "created_at": datetime.now(UTC),
+        })
+
+        if self._task is None:
+            self.start()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Start the background flush loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out everything buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write buffered rows in batches.
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._buffer:
+                batch = [
+                    self._buffer.popleft()
+                    for _ in range(min(self.batch_size, len(self._buffer)))
+                ]
+                try:
+                    async with self.session_factory() as session:
+                        await UserMessageLogRepository(session).create_many(
+                            batch
+                        )
+                        await session.commit()
+                    written += len(batch)
+                except Exception as e:
+                    # Logs are best effort - never retry into a hot loop
+                    logger.warning(
+                        f"Failed to write {len(batch)} message logs: {e}"
+                    )
+        return written
+
+    async def _run(self) -> None:
+        """Flush on interval or when a full batch is waiting."""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.flush_interval
+                )
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Message log flush loop error: {e}")
+
+
+# Singleton instance
+_message_log_sink: MessageLogSink | None = None
+
+
+def get_message_log_sink() -> MessageLogSink:
+    """Get message log sink singleton."""
+    global _message_log_sink
+    if _message_log_sink is None:
+        _message_log_sink = MessageLogSink()
+    return _message_log_sink
@@ -4,6 +4,7 @@ Metrics Monitor Service (R14-1).
 Monitors financial metrics and detects anomalies using statistical methods.
 """
 
+import statistics
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
 from typing import Any
@@ -47,50 +48,18 @@ class MetricsMonitorService:
         hour_ago = now - timedelta(hours=1)
         day_ago = now - timedelta(days=1)
 
-        # Withdrawal metrics
-        pending_withdrawals = await self.transaction_repo.find_by(
-            type=TransactionType.WITHDRAWAL.value,
-            status=TransactionStatus.PENDING.value,
-        )
-        pending_count = len(pending_withdrawals) if pending_withdrawals else 0
+        # One aggregate query per table instead of loading rows
+        withdrawals = await self._get_withdrawal_rollup(hour_ago)
+        deposits = await self._get_deposit_rollup(day_ago)
 
-        # Withdrawals in last hour
-        withdrawals_last_hour = await self._get_withdrawals_in_period(
-            hour_ago, now
-        )
-        withdrawal_amount_last_hour = float(sum(
-            w.amount for w in withdrawals_last_hour
-        ))
-
-        # Rejected withdrawals (in last hour)
-        rejected_count = len([
-            w for w in withdrawals_last_hour
-            if w.status == TransactionStatus.FAILED.value
-        ])
-        
-        total_withdrawals = (
-            len(withdrawals_last_hour) if withdrawals_last_hour else 0
-        )
         rejection_rate = (
-            (rejected_count / total_withdrawals * 100)
-            if total_withdrawals > 0
+            (withdrawals.rejected_count / withdrawals.last_hour_count * 100)
+            if withdrawals.last_hour_count > 0
             else 0
         )
 
-        # Deposit metrics
-        deposits_last_day = await self._get_deposits_in_period(day_ago, now)
-        deposit_count = len(deposits_last_day) if deposits_last_day else 0
-
-        # Level 5 deposits (max level)
-        level_5_deposits = [
-            d for d in deposits_last_day if d.level == 5
-        ]
-        level_5_count = len(level_5_deposits)
-
         # Balance metrics
         total_balance = await self._get_total_user_balance()
-        total_deposits = await self._get_total_confirmed_deposits()
-        total_withdrawals_all = await self._get_total_confirmed_withdrawals()
 
         # Referral metrics
         referral_earnings = await self._get_referral_earnings_last_day(day_ago)
@@ -98,22 +67,20 @@ class MetricsMonitorService:
         return {
             "timestamp": now.isoformat(),
             "withdrawals": {
-                "pending_count": pending_count,
-                "last_hour_count": len(withdrawals_last_hour)
-                if withdrawals_last_hour
-                else 0,
-                "last_hour_amount": withdrawal_amount_last_hour,
-                "rejected_count": rejected_count,
+                "pending_count": withdrawals.pending_count,
+                "last_hour_count": withdrawals.last_hour_count,
+                "last_hour_amount": float(withdrawals.last_hour_amount),
+                "rejected_count": withdrawals.rejected_count,
                 "rejection_rate": rejection_rate,
             },
             "deposits": {
-                "last_day_count": deposit_count,
-                "level_5_count": level_5_count,
+                "last_day_count": deposits.last_day_count,
+                "level_5_count": deposits.level_5_count,
             },
             "balance": {
                 "total_user_balance": float(total_balance),
-                "total_deposits": float(total_deposits),
-                "total_withdrawals": float(total_withdrawals_all),
+                "total_deposits": float(deposits.confirmed_amount),
+                "total_withdrawals": float(withdrawals.confirmed_amount),
                 "system_liabilities": float(total_balance),
             },
             "referrals": {
@@ -136,7 +103,9 @@ class MetricsMonitorService:
         anomalies = []
 
         # Get historical baseline (last 7 days)
-        baseline = await self._get_historical_baseline(days=7)
+        baseline = await self._get_historical_baseline(
+            days=7, current_metrics=current_metrics
+        )
 
         # Check withdrawal metrics
         if "withdrawals" in current_metrics:
@@ -304,83 +273,54 @@ class MetricsMonitorService:
         return (value - mean) / std_dev
 
     async def _get_historical_baseline(
-        self, days: int = 30
+        self,
+        days: int = 30,
+        current_metrics: dict[str, Any] | None = None,
     ) -> dict[str, float]:
         """
         Calculate historical baseline from actual data.
 
+        Daily series come from one GROUP BY per table over the window.
+
         Args:
             days: Number of days to look back (default 30)
+            current_metrics: Already collected metrics (saves re-reading
+                the snapshot metrics)
 
         Returns:
             Dict with mean and std_dev for each metric
         """
-        import statistics
-        
-        now = datetime.now(UTC)
-        
-        # Collect daily metrics for the past N days
-        daily_deposit_counts: list[int] = []
-        daily_withdrawal_amounts: list[float] = []
-        daily_level_5_counts: list[int] = []
-        
-        for i in range(days):
-            day_start = (now - timedelta(days=i + 1)).replace(
-                hour=0, minute=0, second=0, microsecond=0
-            )
-            day_end = day_start + timedelta(days=1)
-            
-            # Deposits for this day
-            deposits = await self._get_deposits_in_period(day_start, day_end)
-            daily_deposit_counts.append(len(deposits))
-            daily_level_5_counts.append(
-                len([d for d in deposits if d.level == 5])
-            )
-            
-            # Withdrawals for this day
-            withdrawals = await self._get_withdrawals_in_period(day_start, day_end)
-            daily_withdrawal_amounts.append(
-                float(sum(w.amount for w in withdrawals))
-            )
-        
-        # Current pending withdrawals (snapshot metric, not daily)
-        pending = await self.transaction_repo.find_by(
-            type=TransactionType.WITHDRAWAL.value,
-            status=TransactionStatus.PENDING.value,
-        )
-        pending_count = len(pending) if pending else 0
-        
-        # Current system liabilities
-        system_liabilities = float(await self._get_total_user_balance())
-        
-        # Calculate statistics with fallback for insufficient data
-        def safe_mean(data: list, default: float = 0.0) -> float:
-            return statistics.mean(data) if len(data) >= 2 else default
-        
-        def safe_stdev(data: list, default: float = 1.0) -> float:
-            if len(data) < 2:
-                return default
-            try:
-                return max(statistics.stdev(data), 0.1)  # Minimum 0.1 to avoid div by 0
-            except statistics.StatisticsError:
-                return default
-        
+        (
+            daily_deposit_counts,
+            daily_level_5_counts,
+            daily_withdrawal_amounts,
+        ) = await self._get_daily_rollup(days)
+
+        # Snapshot metrics (not daily)
+        if current_metrics is not None:
+            pending_count = current_metrics["withdrawals"]["pending_count"]
+            system_liabilities = current_metrics["balance"][
+                "system_liabilities"
+            ]
+        else:
+            pending_count = (
+                await self._get_withdrawal_rollup(datetime.now(UTC))
+            ).pending_count
+            system_liabilities = float(await self._get_total_user_balance())
+
         # Build baseline from actual data
-        deposit_mean = safe_mean(daily_deposit_counts, 0.0)
-        deposit_std = safe_stdev(daily_deposit_counts, max(deposit_mean * 0.5, 1.0))
-        
-        withdrawal_mean = safe_mean(daily_withdrawal_amounts, 0.0)
-        withdrawal_std = safe_stdev(daily_withdrawal_amounts, max(withdrawal_mean * 0.5, 100.0))
-        
-        level_5_mean = safe_mean(daily_level_5_counts, 0.0)
-        level_5_std = safe_stdev(daily_level_5_counts, max(level_5_mean * 0.5, 1.0))
-        
+        deposit_mean, deposit_std = _series_stats(daily_deposit_counts, 1.0)
+        withdrawal_mean, withdrawal_std = _series_stats(
+            daily_withdrawal_amounts, 100.0
+        )
+        level_5_mean, level_5_std = _series_stats(daily_level_5_counts, 1.0)
+
         logger.debug(
             f"Dynamic baseline calculated from {days} days: "
             f"deposits={deposit_mean:.1f}±{deposit_std:.1f}, "
             f"withdrawals={withdrawal_mean:.1f}±{withdrawal_std:.1f}"
         )
-        
+
         return {
             # Pending withdrawals - use current as baseline if no history
             "pending_withdrawals_mean": float(pending_count) or 1.0,
@@ -402,38 +342,132 @@ class MetricsMonitorService:
             "system_liabilities_std": max(system_liabilities * 0.3, 1000.0),
         }
 
-    async def _get_withdrawals_in_period(
-        self, start: datetime, end: datetime
-    ) -> list[Transaction]:
-        """Get withdrawals in time period."""
-        # Convert to naive datetime for Transaction model (TIMESTAMP WITHOUT TIME ZONE)
-        start_naive = start.replace(tzinfo=None) if start.tzinfo else start
-        end_naive = end.replace(tzinfo=None) if end.tzinfo else end
-        
-        stmt = (
-            select(Transaction)
+    async def _get_daily_rollup(
+        self, days: int
+    ) -> tuple[list[int], list[int], list[float]]:
+        """
+        Get per-day totals for the last N complete UTC days.
+
+        Days without activity are included as zeros.
+
+        Args:
+            days: Number of days
+
+        Returns:
+            Tuple of (deposit counts, level 5 deposit counts,
+            withdrawal amounts), one entry per day
+        """
+        end = datetime.now(UTC).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        start = end - timedelta(days=days)
+
+        deposit_counts = [0] * days
+        level_5_counts = [0] * days
+        withdrawal_amounts = [0.0] * days
+
+        deposit_day = func.date_trunc(
+            "day", func.timezone("UTC", Deposit.created_at)
+        ).label("day")
+        deposit_stmt = (
+            select(
+                deposit_day,
+                func.count().label("deposit_count"),
+                func.count()
+                .filter(Deposit.level == 5)
+                .label("level_5_count"),
+            )
+            .where(Deposit.status == TransactionStatus.CONFIRMED.value)
+            .where(Deposit.created_at >= start)
+            .where(Deposit.created_at < end)
+            .group_by(deposit_day)
+        )
+        for row in (await self.session.execute(deposit_stmt)).all():
+            idx = (row.day.date() - start.date()).days
+            if 0 <= idx < days:
+                deposit_counts[idx] = row.deposit_count
+                level_5_counts[idx] = row.level_5_count
+
+        # Transaction.created_at is naive UTC
+        withdrawal_day = func.date_trunc("day", Transaction.created_at).label(
+            "day"
+        )
+        withdrawal_stmt = (
+            select(
+                withdrawal_day,
+                func.sum(Transaction.amount).label("amount"),
+            )
             .where(Transaction.type == TransactionType.WITHDRAWAL.value)
-            .where(Transaction.created_at >= start_naive)
-            .where(Transaction.created_at < end_naive)
+            .where(Transaction.created_at >= start.replace(tzinfo=None))
+            .where(Transaction.created_at < end.replace(tzinfo=None))
+            .group_by(withdrawal_day)
         )
+        for row in (await self.session.execute(withdrawal_stmt)).all():
+            idx = (row.day.date() - start.date()).days
+            if 0 <= idx < days:
+                withdrawal_amounts[idx] = float(row.amount or 0)
+
+        return deposit_counts, level_5_counts, withdrawal_amounts
+
+    async def _get_withdrawal_rollup(self, since: datetime) -> Any:
+        """
+        Aggregate withdrawal metrics in one query.
+
+        Args:
+            since: Start of the recent window
+
+        Returns:
+            Row with pending_count, last_hour_count, last_hour_amount,
+            rejected_count, confirmed_amount
+        """
+        # Transaction.created_at is naive UTC
+        is_recent = Transaction.created_at >= since.replace(tzinfo=None)
+        stmt = select(
+            func.count()
+            .filter(Transaction.status == TransactionStatus.PENDING.value)
+            .label("pending_count"),
+            func.count().filter(is_recent).label("last_hour_count"),
+            func.coalesce(
+                func.sum(Transaction.amount).filter(is_recent), 0
+            ).label("last_hour_amount"),
+            func.count()
+            .filter(
+                is_recent,
+                Transaction.status == TransactionStatus.FAILED.value,
+            )
+            .label("rejected_count"),
+            func.coalesce(
+                func.sum(Transaction.amount).filter(
+                    Transaction.status == TransactionStatus.CONFIRMED.value
+                ),
+                0,
+            ).label("confirmed_amount"),
+        ).where(Transaction.type == TransactionType.WITHDRAWAL.value)
         result = await self.session.execute(stmt)
-        return list(result.scalars().all())
-
-    async def _get_deposits_in_period(
-        self, start: datetime, end: datetime
-    ) -> list[Deposit]:
-        """Get deposits in time period."""
-        deposits = await self.deposit_repo.find_by(
-            status=TransactionStatus.CONFIRMED.value,
-        )
-        if not deposits:
-            return []
+        return result.one()
+
+    async def _get_deposit_rollup(self, since: datetime) -> Any:
+        """
+        Aggregate confirmed deposit metrics in one query.
 
-        return [
-            d
-            for d in deposits
-            if d.created_at >= start and d.created_at < end
-        ]
+        Args:
+            since: Start of the recent window
+
+        Returns:
+            Row with last_day_count, level_5_count, confirmed_amount
+        """
+        is_recent = Deposit.created_at >= since
+        stmt = select(
+            func.count().filter(is_recent).label("last_day_count"),
+            func.count()
+            .filter(is_recent, Deposit.level == 5)
+            .label("level_5_count"),
+            func.coalesce(func.sum(Deposit.amount), 0).label(
+                "confirmed_amount"
+            ),
+        ).where(Deposit.status == TransactionStatus.CONFIRMED.value)
+        result = await self.session.execute(stmt)
+        return result.one()
 
     async def _get_total_user_balance(self) -> Decimal:
         """Get total user balance."""
@@ -442,27 +476,6 @@ class MetricsMonitorService:
         total = result.scalar() or Decimal("0")
         return total
 
-    async def _get_total_confirmed_deposits(self) -> Decimal:
-        """Get total confirmed deposits."""
-        deposits = await self.deposit_repo.find_by(
-            status=TransactionStatus.CONFIRMED.value,
-        )
-        if not deposits:
-            return Decimal("0")
-
-        return sum(d.amount for d in deposits)
-
-    async def _get_total_confirmed_withdrawals(self) -> Decimal:
-        """Get total confirmed withdrawals."""
-        withdrawals = await self.transaction_repo.find_by(
-            type=TransactionType.WITHDRAWAL.value,
-            status=TransactionStatus.CONFIRMED.value,
-        )
-        if not withdrawals:
-            return Decimal("0")
-
-        return sum(Decimal(str(w.amount)) for w in withdrawals)
-
     async def _get_referral_earnings_last_day(
         self, day_ago: datetime
     ) -> Decimal:
@@ -471,4 +484,17 @@ class MetricsMonitorService:
         return Decimal("0")
 
 
+def _series_stats(
+    values: list[float], min_default_std: float
+) -> tuple[float, float]:
+    """
+    Mean and standard deviation of a daily series.
+
+    Falls back to (0, min_default_std) with fewer than two points and
+    keeps the deviation at least 0.1 so z-scores stay finite.
+    """
+    if len(values) < 2:
+        return 0.0, min_default_std
 
+    mean = statistics.fmean(values)
+    return mean, max(statistics.stdev(values, mean), 0.1)
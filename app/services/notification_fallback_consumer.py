@@ -0,0 +1,264 @@
+"""
+Notification fallback consumer.
+
+R11-3: Delivers notifications queued in notification_queue_fallback.
+
+An insert trigger NOTIFYs the notification_queue_fallback channel; the
+consumer LISTENs on a dedicated connection and drains the queue when
+woken, so an empty queue costs no queries. Without a wake-up the queue
+is swept every `notification_fallback_sweep_seconds` to retry failed
+sends and pick up anything queued while disconnected.
+
+Rows are claimed in batches with FOR UPDATE SKIP LOCKED, so several
+consumers drain the queue in parallel without sending twice. Sends of
+one consumer share a token bucket.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import asyncpg
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+)
+from loguru import logger
+from sqlalchemy import select, update
+
+from app.config.database import async_session_maker, engine
+from app.config.settings import settings
+from app.models.notification_queue_fallback import NotificationQueueFallback
+from app.models.user import User
+from app.services.broadcast_service import TokenBucket
+
+# Channel notified by the notification_queue_fallback insert trigger
+NOTIFY_CHANNEL = "notification_queue_fallback"
+
+# Attempts per notification when Telegram answers with RetryAfter
+SEND_MAX_ATTEMPTS = 3
+
+# Seconds to wait before reconnecting the LISTEN connection
+RECONNECT_DELAY = 5
+
+
+@dataclass
+class DrainResult:
+    """Outcome of one queue drain."""
+
+    sent: int = 0
+    dropped: int = 0
+    failed: int = 0
+
+
+class NotificationFallbackConsumer:
+    """Push-driven consumer of the PostgreSQL notification fallback queue."""
+
+    def __init__(
+        self,
+        bot: Bot,
+        session_factory: Any | None = None,
+        bucket: TokenBucket | None = None,
+        batch_size: int | None = None,
+    ) -> None:
+        """
+        Initialize consumer.
+
+        Args:
+            bot: Bot used to send notifications
+            session_factory: Async session factory (one session per batch)
+            bucket: Rate limiter shared by all sends
+            batch_size: Notifications claimed per batch
+        """
+        self.bot = bot
+        self.session_factory = session_factory or async_session_maker
+        self.bucket = bucket or TokenBucket(
+            settings.notification_fallback_rate_limit
+        )
+        self.batch_size = (
+            batch_size or settings.notification_fallback_batch_size
+        )
+        self._wakeup = asyncio.Event()
+
+    async def run(self) -> None:
+        """LISTEN for queued notifications and drain until cancelled."""
+        while True:
+            try:
+                connection = await asyncpg.connect(_listen_dsn())
+            except Exception as e:
+                logger.warning(
+                    f"R11-3: Fallback consumer cannot connect: {e}"
+                )
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+
+            try:
+                await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                connection.add_termination_listener(self._on_terminate)
+                logger.info("R11-3: Fallback consumer listening")
+                await self._consume(connection)
+            except Exception as e:
+                logger.error(f"R11-3: Fallback consumer failed: {e}")
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+
+    async def drain(self) -> DrainResult:
+        """
+        Send all pending notifications.
+
+        Notifications that failed transiently are skipped for the rest
+        of the drain and retried by the next one.
+
+        Returns:
+            Sent, dropped and failed counts
+        """
+        result = DrainResult()
+        failed_ids: set[int] = set()
+
+        while await self._process_batch(failed_ids, result) == self.batch_size:
+            pass
+
+        if result.sent or result.dropped or result.failed:
+            logger.info(
+                f"R11-3: Fallback queue drained: {result.sent} sent, "
+                f"{result.dropped} dropped, {result.failed} failed"
+            )
+        return result
+
+    async def _consume(self, connection: asyncpg.Connection) -> None:
+        """Drain on every wake-up or sweep until the connection closes."""
+        # Catch up on everything queued while not listening
+        self._wakeup.set()
+
+        while not connection.is_closed():
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=settings.notification_fallback_sweep_seconds,
+                )
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.drain()
+
+    def _on_notify(self, *args: Any) -> None:
+        """asyncpg notification callback."""
+        self._wakeup.set()
+
+    def _on_terminate(self, *args: Any) -> None:
+        """asyncpg termination callback: wake up to notice the close."""
+        self._wakeup.set()
+
+    async def _process_batch(
+        self, failed_ids: set[int], result: DrainResult
+    ) -> int:
+        """
+        Claim, send and mark one batch of notifications.
+
+        Claimed rows stay locked until the batch is committed, so other
+        consumers skip them.
+
+        Returns:
+            Number of claimed notifications
+        """
+        queue = NotificationQueueFallback
+        stmt = (
+            select(queue.id, queue.payload, User.telegram_id)
+            .join(User, User.id == queue.user_id)
+            .where(queue.processed_at.is_(None))
+            .order_by(queue.priority.desc(), queue.created_at.asc())
+            .limit(self.batch_size)
+            .with_for_update(of=queue, skip_locked=True)
+        )
+        if failed_ids:
+            stmt = stmt.where(queue.id.not_in(failed_ids))
+
+        async with self.session_factory() as session:
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                return 0
+
+            outcomes = await asyncio.gather(*(
+                self._deliver(notification_id, telegram_id, payload)
+                for notification_id, payload, telegram_id in rows
+            ))
+
+            processed_ids = []
+            for (notification_id, _, _), outcome in zip(rows, outcomes):
+                if outcome is None:
+                    failed_ids.add(notification_id)
+                    result.failed += 1
+                    continue
+
+                processed_ids.append(notification_id)
+                if outcome:
+                    result.sent += 1
+                else:
+                    result.dropped += 1
+
+            if processed_ids:
+                await session.execute(
+                    update(queue)
+                    .where(queue.id.in_(processed_ids))
+                    .values(processed_at=datetime.now(UTC))
+                )
+            await session.commit()
+
+        return len(rows)
+
+    async def _deliver(
+        self,
+        notification_id: int,
+        telegram_id: int,
+        payload: dict[str, Any],
+    ) -> bool | None:
+        """
+        Send one notification directly (not back through the fallback).
+
+        Returns:
+            True if sent, False if it can never be sent, None to retry
+        """
+        message = payload.get("message", "")
+        if not message:
+            logger.warning(
+                f"R11-3: Notification {notification_id} has empty message"
+            )
+            return False
+
+        for _ in range(SEND_MAX_ATTEMPTS):
+            await self.bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=telegram_id, text=message)
+                return True
+            except TelegramRetryAfter as e:
+                # Flood limit is global for the bot - pause all sends
+                logger.warning(
+                    f"R11-3: Flood control, pausing {e.retry_after}s"
+                )
+                self.bucket.pause(e.retry_after)
+            except (TelegramForbiddenError, TelegramBadRequest) as e:
+                logger.warning(
+                    f"R11-3: Dropping notification {notification_id} "
+                    f"for {telegram_id}: {e}"
+                )
+                return False
+            except Exception as e:
+                logger.warning(
+                    f"R11-3: Failed to send notification {notification_id} "
+                    f"to {telegram_id}: {e}"
+                )
+                return None
+
+        return None
+
+
+def _listen_dsn() -> str:
+    """DSN of the application database for a plain asyncpg connection."""
+    return engine.url.set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
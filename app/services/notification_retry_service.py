@@ -193,26 +193,16 @@ class NotificationRetryService:
             Dict with comprehensive notification stats
         """
         # Get counts
-        all_failed = await self.failed_repo.find_all()
-        total = len(all_failed)
+        total = await self.failed_repo.count()
 
-        unresolved = len(
-            await self.failed_repo.find_by(resolved=False)
-        )
+        unresolved = await self.failed_repo.count(resolved=False)
 
-        critical = len(
-            await self.failed_repo.get_critical_unresolved()
+        critical = await self.failed_repo.count(
+            resolved=False, critical=True
         )
 
         # Get counts by type
-        by_type = {}
-        unresolved_notifications = await self.failed_repo.find_by(
-            resolved=False
-        )
-
-        for notification in unresolved_notifications:
-            ntype = notification.notification_type
-            by_type[ntype] = by_type.get(ntype, 0) + 1
+        by_type = await self.failed_repo.count_unresolved_by_type()
 
         return {
             "total": total,
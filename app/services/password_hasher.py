@@ -0,0 +1,201 @@
+"""
+Password hasher.
+
+Runs bcrypt for financial passwords and admin master keys in a process
+pool, so a ~250 ms KDF call never blocks the event loop. Jobs are
+bounded (callers get PasswordHasherBusyError instead of an unbounded
+backlog) and serialized per user, so one user cannot occupy every
+worker.
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator, Callable, Hashable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import bcrypt
+from loguru import logger
+
+from app.config.settings import settings
+
+# Calls slower than this (queueing included) are logged
+SLOW_CALL_SECONDS = 1.0
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the hashing queue is full."""
+
+
+def _hashpw(password: str, rounds: int) -> str:
+    """Hash a password (runs in a pool process)."""
+    return bcrypt.hashpw(
+        password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)
+    ).decode("utf-8")
+
+
+def _checkpw(password: str, hashed: str) -> bool:
+    """Check a password against a hash (runs in a pool process)."""
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+@dataclass
+class HashingStats:
+    """Latency metrics of the password hasher."""
+
+    calls: int = 0
+    rejected: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def avg_seconds(self) -> float:
+        """Average call latency in seconds."""
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification in a process pool.
+
+    At most `max_pending` jobs are queued or running; beyond that calls
+    are rejected. Calls with the same `key` (e.g. user ID) run one at a
+    time; waiting calls count against the limit.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        rounds: int | None = None,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        Initialize password hasher.
+
+        Args:
+            max_workers: Pool processes
+            max_pending: Max queued + running jobs
+            rounds: bcrypt cost factor for new hashes
+            executor: Optional executor (created lazily if omitted)
+        """
+        self.max_workers = max_workers or settings.password_hash_workers
+        self.max_pending = max_pending or settings.password_hash_max_pending
+        self.rounds = rounds or settings.password_hash_rounds
+        self._executor = executor
+        self._pending = 0
+        self._key_locks: dict[Hashable, asyncio.Lock] = {}
+        self._key_users: dict[Hashable, int] = {}
+        self.stats = HashingStats()
+
+    async def hash(self, password: str, key: Hashable | None = None) -> str:
+        """
+        Hash a password.
+
+        Args:
+            password: Plain password
+            key: Optional per-user concurrency key
+
+        Returns:
+            bcrypt hash
+
+        Raises:
+            PasswordHasherBusyError: If the queue is full
+        """
+        return await self._run(_hashpw, password, self.rounds, key=key)
+
+    async def verify(
+        self, password: str, hashed: str, key: Hashable | None = None
+    ) -> bool:
+        """
+        Verify a password against a bcrypt hash.
+
+        Args:
+            password: Plain password
+            hashed: bcrypt hash
+            key: Optional per-user concurrency key
+
+        Returns:
+            True if match
+
+        Raises:
+            PasswordHasherBusyError: If the queue is full
+        """
+        return await self._run(_checkpw, password, hashed, key=key)
+
+    def shutdown(self) -> None:
+        """Shut down the pool (running jobs are finished)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _run(
+        self, fn: Callable[..., Any], *args: Any, key: Hashable | None
+    ) -> Any:
+        """Run a job in the pool with queue and per-key limits."""
+        if self._pending >= self.max_pending:
+            self.stats.rejected += 1
+            logger.warning(
+                "Password hashing queue full, rejecting call",
+                extra={"pending": self._pending},
+            )
+            raise PasswordHasherBusyError("Password hashing queue is full")
+
+        self._pending += 1
+        started = time.monotonic()
+        try:
+            if key is None:
+                return await self._submit(fn, *args)
+            async with self._acquire_key(key):
+                return await self._submit(fn, *args)
+        finally:
+            self._pending -= 1
+            self._record(time.monotonic() - started)
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a function in the executor."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    @asynccontextmanager
+    async def _acquire_key(
+        self, key: Hashable
+    ) -> AsyncGenerator[None, None]:
+        """Hold the lock of a key (dropped once nobody uses it)."""
+        lock = self._key_locks.setdefault(key, asyncio.Lock())
+        self._key_users[key] = self._key_users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._key_users[key] -= 1
+            if not self._key_users[key]:
+                del self._key_users[key]
+                del self._key_locks[key]
+
+    def _record(self, elapsed: float) -> None:
+        """Record call latency."""
+        self.stats.calls += 1
+        self.stats.total_seconds += elapsed
+        self.stats.max_seconds = max(self.stats.max_seconds, elapsed)
+        if elapsed > SLOW_CALL_SECONDS:
+            logger.warning(
+                f"Slow password hashing call: {elapsed:.2f}s",
+                extra={"pending": self._pending},
+            )
+
+
+# Singleton instance
+_password_hasher: PasswordHasher | None = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get password hasher singleton."""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher()
+    return _password_hasher
@@ -3,6 +3,11 @@ Payment retry service (PART5 critical).
 
 Exponential backoff retry mechanism for failed payments.
 Prevents user fund loss from transient failures.
+
+Due retries are paid out in batches: payments are broadcast
+back-to-back with allocated nonces and their receipts are awaited
+together, so a backlog clears within a few blocks. A payout whose
+broadcast outcome is unknown is never resent automatically.
 """
 
 from datetime import UTC, datetime, timedelta
@@ -12,9 +17,11 @@ from loguru import logger
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config.settings import settings
 from app.models.enums import TransactionStatus, TransactionType
 from app.models.payment_retry import PaymentRetry, PaymentType
 from app.models.transaction import Transaction
+from app.models.user import User
 from app.repositories.deposit_reward_repository import (
     DepositRewardRepository,
 )
@@ -124,9 +131,10 @@ class PaymentRetryService:
         self, blockchain_service
     ) -> dict:
         """
-        Process all pending retries.
+        Process pending retries as one payout batch.
 
-        Called by background job (e.g., every minute).
+        Called by background job (e.g., every minute). Up to
+        settings.payout_batch_size due retries are sent per run.
 
         Args:
             blockchain_service: Blockchain service for sending payments
@@ -134,8 +142,10 @@ class PaymentRetryService:
         Returns:
             Dict with processed, successful, failed, moved_to_dlq counts
         """
-        # Get pending retries
-        pending = await self.retry_repo.get_pending_retries()
+        # Get pending retries (rows claimed by a concurrent run are skipped)
+        pending = await self.retry_repo.get_pending_retries(
+            limit=settings.payout_batch_size, skip_locked=True
+        )
 
         if not pending:
             return {
@@ -149,29 +159,12 @@ class PaymentRetryService:
             f"Processing {len(pending)} pending payment retries..."
         )
 
-        processed = 0
-        successful = 0
-        failed = 0
-        moved_to_dlq = 0
+        outcomes = await self._process_batch(pending, blockchain_service)
 
-        for retry in pending:
-            try:
-                result = await self._process_retry(
-                    retry, blockchain_service
-                )
-                processed += 1
-
-                if result["success"]:
-                    successful += 1
-                elif result["moved_to_dlq"]:
-                    moved_to_dlq += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                logger.error(
-                    f"Error processing retry {retry.id}: {e}"
-                )
-                failed += 1
+        processed = len(outcomes)
+        successful = sum(1 for o in outcomes.values() if o["success"])
+        moved_to_dlq = sum(1 for o in outcomes.values() if o["moved_to_dlq"])
+        failed = processed - successful - moved_to_dlq
 
         logger.info(
             f"Retry processing complete: {successful} successful, "
@@ -186,174 +179,333 @@ class PaymentRetryService:
             "moved_to_dlq": moved_to_dlq,
         }
 
-    async def _process_retry(
-        self, retry: PaymentRetry, blockchain_service
-    ) -> dict:
+    async def _process_batch(
+        self, retries: list[PaymentRetry], blockchain_service
+    ) -> dict[int, dict]:
         """
-        Process single retry attempt.
+        Process one retry attempt for many retries.
+
+        Payments are broadcast back-to-back, receipts are awaited for the
+        whole batch at once and earnings/rewards are marked paid in bulk.
 
         Args:
-            retry: PaymentRetry record
+            retries: PaymentRetry records
             blockchain_service: Blockchain service
 
         Returns:
-            Dict with success and moved_to_dlq flags
+            Dict of {retry_id: {success, moved_to_dlq}}
         """
-        logger.info(
-            f"Processing retry {retry.id} for user {retry.user_id}, "
-            f"attempt {retry.attempt_count + 1}/{retry.max_retries}"
-        )
+        now = datetime.now(UTC)
+
+        # Count the attempt and schedule the next one up front: an
+        # overlapping run will not pick these retries up once the row
+        # locks are released by this commit
+        for retry in retries:
+            retry.attempt_count += 1
+            retry.last_attempt_at = now
+            retry.next_retry_at = self._calculate_next_retry_time(
+                retry.attempt_count
+            )
+        await self.session.commit()
 
-        # Increment attempt count
-        await self.retry_repo.update(
-            retry.id,
-            attempt_count=retry.attempt_count + 1,
-            last_attempt_at=datetime.now(UTC),
-        )
+        wallets = await self._load_wallets(retries)
 
-        try:
-            # Load user
-            user_stmt = select(retry.user)
-            user_result = await self.session.execute(user_stmt)
-            user = user_result.scalar_one()
+        sent, errors, held = await self._send_payouts(
+            retries, wallets, blockchain_service
+        )
 
-            # Validate wallet address
-            if not user.wallet_address:
-                raise ValueError(
-                    f"User {user.telegram_id} has no wallet address"
+        outcomes: dict[int, dict] = {}
+        succeeded = []
+        for retry in retries:
+            if retry.id in sent:
+                # Payment succeeded!
+                retry.resolved = True
+                retry.tx_hash = sent[retry.id]
+                succeeded.append(retry)
+                outcomes[retry.id] = {"success": True, "moved_to_dlq": False}
+                continue
+
+            if retry.id in held:
+                # The transaction may still be mined: resending could pay
+                # twice, so keep its hash for admin review instead
+                retry.tx_hash = held[retry.id]
+                retry.last_error = (
+                    f"Broadcast outcome unknown, transaction "
+                    f"{retry.tx_hash} not mined yet"
                 )
-
-            # Send payment via blockchain
-            logger.info(
-                f"Attempting payment: {retry.amount} USDT "
-                f"to {user.wallet_address}"
-            )
-
-            payment_result = await blockchain_service.send_payment(
-                user.wallet_address, retry.amount
-            )
-
-            if not payment_result["success"]:
-                raise ValueError(
-                    payment_result.get("error", "Unknown payment error")
+                retry.in_dlq = True
+                retry.next_retry_at = None
+                logger.warning(
+                    f"Retry {retry.id} held in DLQ: {retry.last_error}"
                 )
+                outcomes[retry.id] = {"success": False, "moved_to_dlq": True}
+                continue
 
-            # Payment succeeded!
-            tx_hash = payment_result["tx_hash"]
-            logger.info(
-                f"Payment retry {retry.id} succeeded! TxHash: {tx_hash}"
-            )
-
-            # Mark retry as resolved
-            await self.retry_repo.update(
-                retry.id, resolved=True, tx_hash=tx_hash
-            )
-
-            # Mark earnings/rewards as paid
-            if retry.payment_type == PaymentType.REFERRAL_EARNING.value:
-                for earning_id in retry.earning_ids:
-                    await self.earning_repo.update(
-                        earning_id, paid=True, tx_hash=tx_hash
-                    )
-            elif retry.payment_type == PaymentType.DEPOSIT_REWARD.value:
-                for reward_id in retry.earning_ids:
-                    await self.reward_repo.update(
-                        reward_id,
-                        paid=True,
-                        paid_at=datetime.now(UTC),
-                        tx_hash=tx_hash,
-                    )
-
-            # Create transaction record for on-chain payout
-            tx_type = (
-                TransactionType.REFERRAL_REWARD
-                if retry.payment_type == PaymentType.REFERRAL_EARNING.value
-                else TransactionType.SYSTEM_PAYOUT
-            )
-
-            # IDEMPOTENCY CHECK: Verify tx_hash doesn't already exist
-            existing_tx_stmt = select(Transaction).where(
-                Transaction.tx_hash == tx_hash
+            retry.last_error = errors[retry.id]
+            logger.error(
+                f"Retry {retry.id} attempt "
+                f"{retry.attempt_count} failed: {retry.last_error}"
             )
-            existing_tx_result = await self.session.execute(existing_tx_stmt)
-            existing_tx = existing_tx_result.scalar_one_or_none()
 
-            if existing_tx:
+            # Check if max retries exceeded
+            if retry.attempt_count >= retry.max_retries:
+                # Move to DLQ
+                retry.in_dlq = True
+                retry.next_retry_at = None
                 logger.warning(
-                    f"Transaction with tx_hash {tx_hash} already exists (id: {existing_tx.id}). "
-                    f"Skipping duplicate transaction creation (idempotency check)"
+                    f"Retry {retry.id} moved to DLQ "
+                    f"after {retry.attempt_count} attempts"
                 )
+                outcomes[retry.id] = {"success": False, "moved_to_dlq": True}
             else:
-                # Create new transaction
-                await self.transaction_repo.create(
-                    user_id=retry.user_id,
-                    tx_hash=tx_hash,
-                    type=tx_type.value,
-                    amount=retry.amount,
-                    to_address=user.wallet_address,
-                    status=TransactionStatus.CONFIRMED.value,
-                )
-                logger.info(
-                    f"Created transaction record for retry {retry.id} with tx_hash {tx_hash}"
-                )
+                outcomes[retry.id] = {"success": False, "moved_to_dlq": False}
 
-            await self.session.commit()
+        await self._record_payouts(succeeded, wallets, now)
+        await self.session.commit()
 
+        for retry in succeeded:
             logger.info(
                 "Payment retry succeeded",
                 extra={
                     "retry_id": retry.id,
                     "attempt_count": retry.attempt_count,
-                    "tx_hash": tx_hash,
+                    "tx_hash": retry.tx_hash,
                 },
             )
 
-            return {"success": True, "moved_to_dlq": False}
+        return outcomes
 
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(
-                f"Retry {retry.id} attempt "
-                f"{retry.attempt_count} failed: {error_msg}"
+    async def _load_wallets(
+        self, retries: list[PaymentRetry]
+    ) -> dict[int, str]:
+        """Get wallet address by user ID for the retries' users."""
+        result = await self.session.execute(
+            select(User.id, User.wallet_address).where(
+                User.id.in_({retry.user_id for retry in retries})
             )
+        )
+        return {user_id: wallet for user_id, wallet in result.all()}
 
-            # Update retry with error
-            await self.retry_repo.update(
-                retry.id, last_error=error_msg
-            )
+    async def _send_payouts(
+        self,
+        retries: list[PaymentRetry],
+        wallets: dict[int, str],
+        blockchain_service,
+    ) -> tuple[dict[int, str], dict[int, str], dict[int, str]]:
+        """
+        Broadcast payouts and wait for their receipts.
 
-            # Check if max retries exceeded
-            if retry.attempt_count >= retry.max_retries:
-                # Move to DLQ
-                await self.retry_repo.update(
-                    retry.id, in_dlq=True, next_retry_at=None
+        A payout whose broadcast outcome is unknown (status "unknown")
+        counts as sent once mined and as failed if it reverted; while
+        it is not mined it is held, never failed, so it is not resent.
+
+        Args:
+            retries: PaymentRetry records
+            wallets: Wallet address by user ID
+            blockchain_service: Blockchain service
+
+        Returns:
+            Tuple of ({retry_id: tx_hash} for sent payouts,
+            {retry_id: error} for failed ones,
+            {retry_id: tx_hash} for held ones)
+        """
+        errors: dict[int, str] = {}
+        sendable = []
+        for retry in retries:
+            if wallets.get(retry.user_id):
+                sendable.append(retry)
+            else:
+                errors[retry.id] = (
+                    f"User {retry.user_id} has no wallet address"
                 )
 
-                logger.warning(
-                    f"Retry {retry.id} moved to DLQ "
-                    f"after {retry.attempt_count} attempts"
+        # Send payments via blockchain
+        logger.info(
+            f"Attempting {len(sendable)} payments: "
+            f"{sum(r.amount for r in sendable)} USDT"
+        )
+        payment_results = await blockchain_service.send_payments(
+            [(wallets[retry.user_id], retry.amount) for retry in sendable]
+        )
+
+        sent: dict[int, str] = {}
+        ambiguous: set[int] = set()
+        for retry, payment_result in zip(sendable, payment_results):
+            if payment_result["success"]:
+                sent[retry.id] = payment_result["tx_hash"]
+                if payment_result.get("status") == "unknown":
+                    ambiguous.add(retry.id)
+            else:
+                errors[retry.id] = payment_result.get(
+                    "error", "Unknown payment error"
                 )
 
-                await self.session.commit()
+        held = await self._resolve_receipts(
+            sent, ambiguous, errors, blockchain_service
+        )
+        return sent, errors, held
+
+    async def _resolve_receipts(
+        self,
+        sent: dict[int, str],
+        ambiguous: set[int],
+        errors: dict[int, str],
+        blockchain_service,
+    ) -> dict[int, str]:
+        """
+        Wait for payout receipts, moving reverted payouts to errors.
+
+        Args:
+            sent: {retry_id: tx_hash} of broadcast payouts (updated)
+            ambiguous: Retry IDs whose broadcast outcome is unknown
+            errors: {retry_id: error} (updated)
+            blockchain_service: Blockchain service
 
-                return {"success": False, "moved_to_dlq": True}
+        Returns:
+            {retry_id: tx_hash} of ambiguous payouts not mined yet
+        """
+        statuses = {}
+        if sent:
+            statuses = await blockchain_service.wait_for_receipts(
+                list(sent.values()),
+                timeout=settings.payout_receipt_timeout,
+            )
+        held: dict[int, str] = {}
+        unconfirmed = 0
+        for retry_id, tx_hash in list(sent.items()):
+            status = statuses.get(tx_hash, {}).get("status")
+            if status == "failed":
+                errors[retry_id] = f"Transaction {tx_hash} reverted"
+                del sent[retry_id]
+            elif status == "confirmed":
+                continue
+            elif retry_id in ambiguous:
+                held[retry_id] = sent.pop(retry_id)
             else:
-                # Schedule next retry with exponential backoff
-                next_retry = self._calculate_next_retry_time(
-                    retry.attempt_count
+                unconfirmed += 1
+
+        if unconfirmed:
+            logger.warning(
+                f"{unconfirmed} payout(s) not mined within "
+                f"{settings.payout_receipt_timeout}s, recorded as sent"
+            )
+        return held
+
+    async def _settle_held(
+        self, retry: PaymentRetry, blockchain_service
+    ) -> str | None:
+        """
+        Settle a retry held after an ambiguous broadcast.
+
+        Marks it paid if its transaction was mined; clears the hash if
+        the transaction reverted or the node no longer knows it.
+
+        Args:
+            retry: PaymentRetry with tx_hash set
+            blockchain_service: Blockchain service
+
+        Returns:
+            Error if the transaction may still be mined, else None
+        """
+        tx_hash = retry.tx_hash
+        statuses = await blockchain_service.check_transactions_status(
+            [tx_hash]
+        )
+        status = statuses[tx_hash]["status"]
+
+        if status == "confirmed":
+            retry.resolved = True
+            retry.in_dlq = False
+            await self._record_payouts(
+                [retry], await self._load_wallets([retry]), datetime.now(UTC)
+            )
+            await self.session.commit()
+            return None
+
+        if status != "failed":
+            known = await blockchain_service.get_transactions([tx_hash])
+            if status == "unknown" or known.get(tx_hash):
+                return f"Transaction {tx_hash} may still be mined"
+
+        # Reverted or dropped: safe to send again
+        retry.tx_hash = None
+        return None
+
+    async def _record_payouts(
+        self,
+        retries: list[PaymentRetry],
+        wallets: dict[int, str],
+        paid_at: datetime,
+    ) -> None:
+        """
+        Mark earnings/rewards paid and create on-chain payout records.
+
+        Does not commit.
+
+        Args:
+            retries: Resolved retries (tx_hash set)
+            wallets: Wallet address by user ID
+            paid_at: Payment timestamp
+        """
+        earnings = []
+        rewards = []
+        for retry in retries:
+            if retry.payment_type == PaymentType.REFERRAL_EARNING.value:
+                earnings.extend(
+                    {"id": earning_id, "paid": True, "tx_hash": retry.tx_hash}
+                    for earning_id in retry.earning_ids
                 )
-                await self.retry_repo.update(
-                    retry.id, next_retry_at=next_retry
+            elif retry.payment_type == PaymentType.DEPOSIT_REWARD.value:
+                rewards.extend(
+                    {
+                        "id": reward_id,
+                        "paid": True,
+                        "paid_at": paid_at,
+                        "tx_hash": retry.tx_hash,
+                    }
+                    for reward_id in retry.earning_ids
                 )
 
-                logger.info(
-                    f"Retry {retry.id} scheduled for next attempt "
-                    f"at: {next_retry.isoformat()}"
-                )
+        await self.earning_repo.bulk_update(earnings)
+        await self.reward_repo.bulk_update(rewards)
+
+        if not retries:
+            return
 
-                await self.session.commit()
+        # IDEMPOTENCY CHECK: Skip tx_hashes that already have a record
+        result = await self.session.execute(
+            select(Transaction.tx_hash).where(
+                Transaction.tx_hash.in_([r.tx_hash for r in retries])
+            )
+        )
+        existing = set(result.scalars().all())
+        if existing:
+            logger.warning(
+                f"Transactions with tx_hash {sorted(existing)} already "
+                f"exist. Skipping duplicate transaction creation "
+                f"(idempotency check)"
+            )
 
-                return {"success": False, "moved_to_dlq": False}
+        await self.transaction_repo.bulk_create(
+            [
+                {
+                    "user_id": retry.user_id,
+                    "tx_hash": retry.tx_hash,
+                    "type": (
+                        TransactionType.REFERRAL_REWARD
+                        if retry.payment_type
+                        == PaymentType.REFERRAL_EARNING.value
+                        else TransactionType.SYSTEM_PAYOUT
+                    ).value,
+                    "amount": retry.amount,
+                    "to_address": wallets[retry.user_id],
+                    "status": TransactionStatus.CONFIRMED.value,
+                }
+                for retry in retries
+                if retry.tx_hash not in existing
+            ],
+            returning=False,
+        )
 
     def _calculate_next_retry_time(
         self, attempt_count: int
@@ -403,6 +555,14 @@ class PaymentRetryService:
         if retry.resolved:
             return False, None, "Payment already resolved"
 
+        if retry.tx_hash:
+            # Held after an ambiguous broadcast
+            error = await self._settle_held(retry, blockchain_service)
+            if error:
+                return False, None, error
+            if retry.resolved:
+                return True, retry.tx_hash, None
+
         logger.info(
             f"Manual retry of DLQ item {retry_id} by admin"
         )
@@ -418,9 +578,9 @@ class PaymentRetryService:
         await self.session.flush()
 
         # Process the retry
-        result = await self._process_retry(retry, blockchain_service)
+        outcomes = await self._process_batch([retry], blockchain_service)
 
-        if result["success"]:
+        if outcomes[retry.id]["success"]:
             return True, retry.tx_hash, None
         else:
             return False, None, retry.last_error or "Retry failed"
@@ -433,13 +593,11 @@ class PaymentRetryService:
             Dict with comprehensive retry stats
         """
         # Get counts
-        pending = len(
-            await self.retry_repo.find_by(
-                resolved=False, in_dlq=False
-            )
+        pending = await self.retry_repo.count(
+            resolved=False, in_dlq=False
         )
-        dlq = len(await self.retry_repo.get_dlq_entries())
-        resolved = len(await self.retry_repo.find_by(resolved=True))
+        dlq = await self.retry_repo.count(in_dlq=True, resolved=False)
+        resolved = await self.retry_repo.count(resolved=True)
 
         # Get amounts
         all_unresolved = await self.retry_repo.find_by(resolved=False)
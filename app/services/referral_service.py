@@ -15,7 +15,13 @@ from app.models.user import User
 from app.repositories.referral_earning_repository import (
     ReferralEarningRepository,
 )
-from app.repositories.referral_repository import ReferralRepository
+from app.repositories.referral_leaderboard_repository import (
+    ReferralLeaderboardRepository,
+)
+from app.repositories.referral_repository import (
+    ReferralCredit,
+    ReferralRepository,
+)
 from app.repositories.user_repository import UserRepository
 
 # Referral system configuration (from PART2 docs)
@@ -35,6 +41,7 @@ class ReferralService:
         self.session = session
         self.referral_repo = ReferralRepository(session)
         self.earning_repo = ReferralEarningRepository(session)
+        self.leaderboard_repo = ReferralLeaderboardRepository(session)
         self.user_repo = UserRepository(session)
 
     async def get_referral_chain(
@@ -156,16 +163,28 @@ class ReferralService:
         if not direct_referrer:
             return False, "Реферер не найден"
 
-        # Get referral chain from direct referrer
-        referrers = await self.get_referral_chain(
-            direct_referrer_id, REFERRAL_DEPTH
+        # Direct referrer's own chain from the closure table (one query);
+        # the new user's level N+1 referrer is its level N referrer
+        ancestors = await self.referral_repo.get_ancestors(
+            [direct_referrer_id]
         )
+        referrers_by_level = {1: direct_referrer_id}
+        referrers_by_level.update(
+            (a.level + 1, a.referrer_id) for a in ancestors
+        )
+
+        if not ancestors and direct_referrer.referrer_id:
+            # Chain predates the closure rows - walk users instead
+            chain = await self.get_referral_chain(
+                direct_referrer_id, REFERRAL_DEPTH
+            )
+            referrers_by_level.update(
+                (level, u.id) for level, u in enumerate(chain, start=2)
+            )
 
-        # Add direct referrer as level 1
-        referrers.insert(0, direct_referrer)
+        referrer_ids = list(referrers_by_level.values())
 
         # Check for referral loops
-        referrer_ids = [r.id for r in referrers]
         if new_user_id in referrer_ids:
             logger.warning(
                 "Referral loop detected",
@@ -177,31 +196,30 @@ class ReferralService:
             )
             return False, "Нельзя создать циклическую реферальную цепочку"
 
-        # Create referral records for each level
-        for i, referrer in enumerate(referrers[: REFERRAL_DEPTH]):
-            level = i + 1
-
-            # Check if relationship already exists
-            existing = await self.referral_repo.find_by(
-                referrer_id=referrer.id, referral_id=new_user_id
+        # Create referral records for each level (skip existing ones)
+        existing_referrer_ids = {
+            r.referrer_id
+            for r in await self.referral_repo.get_by_referral_user(
+                new_user_id
             )
-
-            if not existing:
-                await self.referral_repo.create(
-                    referrer_id=referrer.id,
-                    referral_id=new_user_id,
-                    level=level,
-                    total_earned=Decimal("0"),
-                )
-
-                logger.debug(
-                    "Referral relationship created",
-                    extra={
-                        "referrer_id": referrer.id,
-                        "referral_id": new_user_id,
-                        "level": level,
-                    },
-                )
+        }
+        new_relationships = [
+            {
+                "referrer_id": referrer_id,
+                "referral_id": new_user_id,
+                "level": level,
+                "total_earned": Decimal("0"),
+            }
+            for level, referrer_id in sorted(referrers_by_level.items())
+            if level <= REFERRAL_DEPTH
+            and referrer_id not in existing_referrer_ids
+        ]
+        await self.referral_repo.bulk_create(
+            new_relationships, returning=False
+        )
+        await self.leaderboard_repo.add_referrals(
+            r["referrer_id"] for r in new_relationships
+        )
 
         await self.session.commit()
 
@@ -210,7 +228,7 @@ class ReferralService:
             extra={
                 "new_user_id": new_user_id,
                 "direct_referrer_id": direct_referrer_id,
-                "levels_created": min(len(referrers), REFERRAL_DEPTH),
+                "levels_created": len(new_relationships),
             },
         )
 
@@ -231,96 +249,9 @@ class ReferralService:
         Returns:
             Tuple of (success, total_rewards, error_message)
         """
-        # Get all referral relationships for this user
-        relationships = await self.referral_repo.get_referrals_for_user(
-            user_id
+        total_rewards = await self._credit_referral_chain(
+            user_id, deposit_amount, "internal_balance", "deposit"
         )
-
-        if not relationships:
-            logger.debug(
-                "No referrers found for user", extra={"user_id": user_id}
-            )
-            return True, Decimal("0"), None
-
-        total_rewards = Decimal("0")
-
-        # Create earning records for each referrer
-        for relationship in relationships:
-            level = relationship.level
-            rate = REFERRAL_RATES.get(level, Decimal("0"))
-
-            if rate == Decimal("0"):
-                continue
-
-            reward_amount = (deposit_amount * rate).quantize(Decimal("0.00000001"))
-
-            # Fetch referrer with pessimistic lock to prevent balance race conditions
-            stmt = select(User).where(User.id == relationship.referrer_id).with_for_update()
-            result = await self.session.execute(stmt)
-            referrer = result.scalar_one_or_none()
-
-            if not referrer:
-                logger.warning(
-                    f"Referrer {relationship.referrer_id} not found for reward",
-                    extra={"referral_id": relationship.id}
-                )
-                continue
-
-            # Security checks: skip inactive, blocked, or banned referrers
-            if not referrer.is_active:
-                logger.warning(
-                    "Skipping inactive referrer for reward",
-                    extra={"referrer_id": referrer.id, "referral_id": relationship.id}
-                )
-                continue
-
-            if referrer.earnings_blocked:
-                logger.warning(
-                    "Skipping earnings-blocked referrer for reward",
-                    extra={"referrer_id": referrer.id, "referral_id": relationship.id}
-                )
-                continue
-
-            if referrer.is_banned:
-                logger.warning(
-                    "Skipping banned referrer for reward",
-                    extra={"referrer_id": referrer.id, "referral_id": relationship.id}
-                )
-                continue
-
-            # Update referrer balance atomically
-            referrer.balance = ((referrer.balance or Decimal("0")) + reward_amount).quantize(Decimal("0.00000001"))
-            referrer.total_earned = ((referrer.total_earned or Decimal("0")) + reward_amount).quantize(Decimal("0.00000001"))
-            self.session.add(referrer)
-
-            # Create earning record
-            await self.earning_repo.create(
-                referral_id=relationship.id,
-                amount=reward_amount,
-                paid=True,  # Paid to internal balance
-                tx_hash='internal_balance',
-            )
-
-            # Update total earned in relationship
-            relationship.total_earned = (relationship.total_earned + reward_amount).quantize(Decimal("0.00000001"))
-            self.session.add(relationship)
-
-            total_rewards += reward_amount
-
-            logger.info(
-                "Referral reward created",
-                extra={
-                    "referrer_id": relationship.referrer_id,
-                    "referral_user_id": user_id,
-                    "level": level,
-                    "rate": str(rate),
-                    "amount": str(reward_amount),
-                    "source": "deposit",
-                },
-            )
-
-        # Flush all changes at once to avoid race conditions
-        await self.session.flush()
         await self.session.commit()
 
         return True, total_rewards, None
@@ -338,94 +269,95 @@ class ReferralService:
         Returns:
             Tuple of (success, total_rewards, error_message)
         """
-        # Get all referral relationships for this user
-        relationships = await self.referral_repo.get_referrals_for_user(
-            user_id
+        total_rewards = await self._credit_referral_chain(
+            user_id, roi_amount, "internal_balance_roi", "roi"
         )
+        await self.session.commit()
+
+        return True, total_rewards, None
+
+    async def _credit_referral_chain(
+        self,
+        user_id: int,
+        base_amount: Decimal,
+        tx_hash: str,
+        source: str,
+    ) -> Decimal:
+        """
+        Credit every eligible referrer of a user to internal balance.
+
+        One read (chain with eligibility flags) and one bulk write
+        (earnings, relationship totals, referrer balances).
+
+        Args:
+            user_id: User whose referrers are rewarded
+            base_amount: Amount the referral rates apply to
+            tx_hash: Marker stored on earning records
+            source: Reward source for logging ("deposit" or "roi")
 
-        if not relationships:
-            return True, Decimal("0"), None
+        Returns:
+            Total credited amount
+        """
+        ancestors = await self.referral_repo.get_ancestors([user_id])
 
-        total_rewards = Decimal("0")
+        if not ancestors:
+            logger.debug(
+                "No referrers found for user", extra={"user_id": user_id}
+            )
+            return Decimal("0")
 
-        # Create earning records for each referrer
-        for relationship in relationships:
+        credits: list[ReferralCredit] = []
+        for relationship in ancestors:
             level = relationship.level
             rate = REFERRAL_RATES.get(level, Decimal("0"))
 
             if rate == Decimal("0"):
                 continue
 
-            # Reward is % of ROI amount
-            reward_amount = (roi_amount * rate).quantize(Decimal("0.00000001"))
+            reward_amount = (base_amount * rate).quantize(Decimal("0.00000001"))
 
             if reward_amount <= 0:
                 continue
 
-            # Fetch referrer with pessimistic lock to prevent balance race conditions
-            stmt = select(User).where(User.id == relationship.referrer_id).with_for_update()
-            result = await self.session.execute(stmt)
-            referrer = result.scalar_one_or_none()
-
-            if not referrer:
-                continue
-
             # Security checks: skip inactive, blocked, or banned referrers
-            if not referrer.is_active:
+            if not relationship.is_eligible:
                 logger.warning(
-                    "Skipping inactive referrer for ROI reward",
-                    extra={"referrer_id": referrer.id, "referral_id": relationship.id}
-                )
-                continue
-
-            if referrer.earnings_blocked:
-                logger.warning(
-                    "Skipping earnings-blocked referrer for ROI reward",
-                    extra={"referrer_id": referrer.id, "referral_id": relationship.id}
+                    "Skipping ineligible referrer for reward",
+                    extra={
+                        "referrer_id": relationship.referrer_id,
+                        "referral_id": relationship.id,
+                        "is_active": relationship.is_active,
+                        "earnings_blocked": relationship.earnings_blocked,
+                        "is_banned": relationship.is_banned,
+                        "source": source,
+                    },
                 )
                 continue
 
-            if referrer.is_banned:
-                logger.warning(
-                    "Skipping banned referrer for ROI reward",
-                    extra={"referrer_id": referrer.id, "referral_id": relationship.id}
+            credits.append(
+                ReferralCredit(
+                    referral_id=relationship.id,
+                    referrer_id=relationship.referrer_id,
+                    level=level,
+                    amount=reward_amount,
                 )
-                continue
-
-            # Update referrer balance atomically
-            referrer.balance = ((referrer.balance or Decimal("0")) + reward_amount).quantize(Decimal("0.00000001"))
-            referrer.total_earned = ((referrer.total_earned or Decimal("0")) + reward_amount).quantize(Decimal("0.00000001"))
-            self.session.add(referrer)
-
-            # Create earning record
-            await self.earning_repo.create(
-                referral_id=relationship.id,
-                amount=reward_amount,
-                paid=True,  # Paid to internal balance
-                tx_hash='internal_balance_roi',
             )
 
-            # Update total earned in relationship
-            relationship.total_earned = (relationship.total_earned + reward_amount).quantize(Decimal("0.00000001"))
-            self.session.add(relationship)
-
-            total_rewards += reward_amount
-
             logger.info(
-                "Referral ROI reward created",
+                "Referral reward created",
                 extra={
                     "referrer_id": relationship.referrer_id,
                     "referral_user_id": user_id,
                     "level": level,
                     "rate": str(rate),
                     "amount": str(reward_amount),
-                    "source": "roi",
+                    "source": source,
                 },
             )
 
-        await self.session.commit()
+        await self.referral_repo.apply_credits(credits, tx_hash=tx_hash)
 
-        return True, total_rewards, None
+        return sum((c.amount for c in credits), Decimal("0"))
 
     async def get_referrals_by_level(
         self, user_id: int, level: int, page: int = 1, limit: int = 10
@@ -559,7 +491,7 @@ class ReferralService:
         if earning.paid:
             return False, "Already paid"
 
-        await self.earning_repo.update(
+        await self.earning_repo.update_by_id(
             earning_id, paid=True, tx_hash=tx_hash
         )
 
@@ -626,70 +558,38 @@ class ReferralService:
         """
         Get referral leaderboard.
 
+        Reads the top rows of the materialized leaderboard.
+
         Args:
             limit: Number of top users to return
 
         Returns:
             Dict with by_referrals and by_earnings lists
         """
-        # Get all users with referrals
-        stmt = text("""
-            WITH referral_stats AS (
-                SELECT
-                    r.referrer_id,
-                    COUNT(DISTINCT r.referral_id) as referral_count,
-                    COALESCE(SUM(re.amount), 0) as total_earnings
-                FROM referrals r
-                LEFT JOIN referral_earnings re ON re.referral_id = r.id
-                GROUP BY r.referrer_id
-            )
-            SELECT
-                u.id as user_id,
-                u.telegram_id,
-                u.username,
-                rs.referral_count,
-                rs.total_earnings
-            FROM referral_stats rs
-            JOIN users u ON u.id = rs.referrer_id
-            ORDER BY rs.referral_count DESC, rs.total_earnings DESC
-        """)
+        by_referrals = await self.leaderboard_repo.get_top(limit)
+        by_earnings = await self.leaderboard_repo.get_top(
+            limit, by_earnings=True
+        )
 
-        result = await self.session.execute(stmt)
-        rows = result.fetchall()
+        return {
+            "by_referrals": self._leaderboard_rows(by_referrals),
+            "by_earnings": self._leaderboard_rows(by_earnings),
+        }
 
-        # Build by_referrals leaderboard
-        by_referrals = []
-        for idx, row in enumerate(rows[:limit], 1):
-            by_referrals.append({
+    @staticmethod
+    def _leaderboard_rows(rows: list) -> list[dict]:
+        """Format leaderboard rows with their rank."""
+        return [
+            {
                 "rank": idx,
                 "user_id": row.user_id,
                 "telegram_id": row.telegram_id,
                 "username": row.username,
                 "referral_count": row.referral_count,
                 "total_earnings": Decimal(str(row.total_earnings)),
-            })
-
-        # Build by_earnings leaderboard (sorted differently)
-        sorted_by_earnings = sorted(
-            rows,
-            key=lambda r: (r.total_earnings, r.referral_count),
-            reverse=True
-        )
-        by_earnings = []
-        for idx, row in enumerate(sorted_by_earnings[:limit], 1):
-            by_earnings.append({
-                "rank": idx,
-                "user_id": row.user_id,
-                "telegram_id": row.telegram_id,
-                "username": row.username,
-                "referral_count": row.referral_count,
-                "total_earnings": Decimal(str(row.total_earnings)),
-            })
-
-        return {
-            "by_referrals": by_referrals,
-            "by_earnings": by_earnings,
-        }
+            }
+            for idx, row in enumerate(rows, 1)
+        ]
 
     async def get_user_leaderboard_position(self, user_id: int) -> dict:
         """
@@ -701,45 +601,12 @@ class ReferralService:
         Returns:
             Dict with referral_rank, earnings_rank, total_users
         """
-        # Get all users with referrals
-        stmt = text("""
-            WITH referral_stats AS (
-                SELECT
-                    r.referrer_id,
-                    COUNT(DISTINCT r.referral_id) as referral_count,
-                    COALESCE(SUM(re.amount), 0) as total_earnings
-                FROM referrals r
-                LEFT JOIN referral_earnings re ON re.referral_id = r.id
-                GROUP BY r.referrer_id
-            )
-            SELECT
-                referrer_id,
-                referral_count,
-                total_earnings,
-                RANK() OVER (ORDER BY referral_count DESC,
-                             total_earnings DESC) as referral_rank,
-                RANK() OVER (ORDER BY total_earnings DESC,
-                             referral_count DESC) as earnings_rank
-            FROM referral_stats
-        """)
-
-        result = await self.session.execute(stmt)
-        rows = result.fetchall()
-
-        # Find user's position
-        referral_rank = None
-        earnings_rank = None
-
-        for row in rows:
-            if row.referrer_id == user_id:
-                referral_rank = row.referral_rank
-                earnings_rank = row.earnings_rank
-                break
+        position = await self.leaderboard_repo.get_position(user_id)
 
         return {
-            "referral_rank": referral_rank,
-            "earnings_rank": earnings_rank,
-            "total_users": len(rows),
+            "referral_rank": position.referral_rank,
+            "earnings_rank": position.earnings_rank,
+            "total_users": position.total_users,
         }
 
     async def get_platform_referral_stats(self) -> dict:
@@ -1,17 +1,12 @@
 """
 Report service.
 
-Generates Excel reports for users.
+Generates Excel reports for users (write-only, via the export engine).
 """
 
-import io
-from datetime import datetime
-from decimal import Decimal
+from typing import Any
 
-import openpyxl
-from loguru import logger
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from openpyxl.styles import Font
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -22,6 +17,20 @@ from app.models.referral import Referral
 from app.models.transaction import Transaction
 from app.models.user import User
 from app.repositories.referral_earning_repository import ReferralEarningRepository
+from app.services.export_engine import (
+    ExportEngine,
+    ExportFile,
+    XlsxExportWriter,
+    column_widths,
+)
+
+TITLE_FONT = Font(bold=True, size=14, color="366092")
+LABEL_FONT = Font(bold=True)
+
+TRANSACTION_HEADERS = ["ID", "Дата", "Тип", "Сумма (USDT)", "Статус", "Описание", "TX Hash", "Баланс до", "Баланс после"]
+DEPOSIT_HEADERS = ["ID", "Дата", "Уровень", "Сумма (USDT)", "Статус", "ROI Cap", "Выплачено", "Завершено", "Процент дохода", "TX Hash"]
+REFERRAL_HEADERS = ["ID", "Дата регистрации", "Уровень", "Пользователь (Username)", "Пользователь (ID)", "Заработано с него (USDT)"]
+WALLET_HISTORY_HEADERS = ["Дата изменения", "Старый кошелек", "Новый кошелек"]
 
 
 class ReportService:
@@ -32,15 +41,18 @@ class ReportService:
         self.session = session
         self.earning_repo = ReferralEarningRepository(session)
 
-    async def generate_user_report(self, user_id: int) -> bytes:
+    async def generate_user_report(self, user_id: int) -> ExportFile:
         """
         Generate comprehensive Excel report for user.
 
+        Data is fetched here; the workbook is written in write-only mode
+        off the event loop.
+
         Args:
             user_id: User ID
 
         Returns:
-            Bytes of the Excel file
+            Excel export file (caller closes it)
         """
         # Fetch data
         user = await self._get_user(user_id)
@@ -50,30 +62,35 @@ class ReportService:
         earnings = await self.earning_repo.get_all_for_referrer(user_id)
         wallet_history = await self._get_wallet_history(user_id)
 
-        # Create workbook
-        wb = openpyxl.Workbook()
-        
-        # Sheet 1: General Info
-        self._create_general_sheet(wb, user, deposits, earnings)
-        
-        # Sheet 2: Transactions
-        self._create_transactions_sheet(wb, transactions)
-        
-        # Sheet 3: Deposits
-        self._create_deposits_sheet(wb, deposits)
-        
-        # Sheet 4: Referrals
-        self._create_referrals_sheet(wb, referrals)
+        # Plain rows, so the worker thread never touches ORM objects
+        general = self._general_rows(user, deposits, earnings)
+        sheets = [
+            (
+                "История транзакций",
+                TRANSACTION_HEADERS,
+                self._transaction_rows(transactions),
+            ),
+            ("Депозиты", DEPOSIT_HEADERS, self._deposit_rows(deposits)),
+            ("Рефералы", REFERRAL_HEADERS, self._referral_rows(referrals)),
+            (
+                "История смены кошелька",
+                WALLET_HISTORY_HEADERS,
+                self._wallet_history_rows(wallet_history),
+            ),
+        ]
 
-        # Sheet 5: Wallet History
-        self._create_wallet_history_sheet(wb, wallet_history)
+        def build(writer: XlsxExportWriter) -> None:
+            self._write_general_sheet(writer, general)
+            for title, headers, rows in sheets:
+                writer.add_sheet(
+                    title,
+                    headers=headers,
+                    widths=column_widths(headers, rows),
+                    striped=True,
+                )
+                writer.write_rows(rows)
 
-        # Save to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        return output.getvalue()
+        return await ExportEngine.write_xlsx(f"report_{user_id}.xlsx", build)
 
     async def _get_user(self, user_id: int) -> User:
         stmt = select(User).where(User.id == user_id)
@@ -111,57 +128,24 @@ class ReportService:
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
-    def _apply_header_style(self, ws):
-        """Apply professional style to the header row."""
-        header_font = Font(bold=True, color="FFFFFF", name="Calibri", size=11)
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        alignment = Alignment(horizontal="center", vertical="center")
-        
-        for cell in ws[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = alignment
-
-    def _adjust_column_widths(self, ws):
-        """Auto-adjust column widths."""
-        for col in ws.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2) * 1.2
-            # Cap width at 50 chars to avoid super wide columns
-            ws.column_dimensions[column].width = min(adjusted_width, 50)
-
-    def _apply_zebra_striping(self, ws):
-        """Apply alternating row colors for readability."""
-        fill_even = PatternFill(start_color="E9EFF7", end_color="E9EFF7", fill_type="solid")
-        thin_border = Side(border_style="thin", color="D4D4D4")
-        border = Border(left=thin_border, right=thin_border, top=thin_border, bottom=thin_border)
-        
-        for row in ws.iter_rows(min_row=2):
-            for cell in row:
-                cell.border = border
-                if row[0].row % 2 == 0:
-                    cell.fill = fill_even
+    @staticmethod
+    def _write_general_sheet(
+        writer: XlsxExportWriter, rows: list[tuple[str, Any]]
+    ) -> None:
+        writer.add_sheet("Общая информация", widths=(30, 40))
+        writer.write_rows([
+            [writer.cell("ОТЧЕТ ПОЛЬЗОВАТЕЛЯ SIGMATRADE", font=TITLE_FONT)]
+        ])
+        writer.write_rows(
+            [writer.cell(label, font=LABEL_FONT), value]
+            for label, value in rows
+        )
 
-    def _create_general_sheet(self, wb, user: User, deposits: list[Deposit], earnings: list):
-        ws = wb.active
-        ws.title = "Общая информация"
-        
-        # Styles
-        title_font = Font(bold=True, size=14, color="366092")
-        label_font = Font(bold=True)
-        
-        ws.append(["ОТЧЕТ ПОЛЬЗОВАТЕЛЯ SIGMATRADE"])
-        ws["A1"].font = title_font
-        ws.merge_cells("A1:B1")
-        
-        data = [
+    @staticmethod
+    def _general_rows(
+        user: User, deposits: list[Deposit], earnings: list
+    ) -> list[tuple[str, Any]]:
+        return [
             ("ID пользователя", user.id),
             ("Telegram ID", user.telegram_id),
             ("Username", f"@{user.username}" if user.username else "Не указан"),
@@ -182,26 +166,10 @@ class ReportService:
             ("Общая сумма начислений", float(sum(e.amount for e in earnings))),
         ]
 
-        for row in data:
-            ws.append(row)
-
-        # Style labels (first column)
-        for row in ws.iter_rows(min_row=2, max_col=1):
-            for cell in row:
-                cell.font = label_font
-
-        # Formatting
-        ws.column_dimensions['A'].width = 30
-        ws.column_dimensions['B'].width = 40
-
-    def _create_transactions_sheet(self, wb, transactions: list[Transaction]):
-        ws = wb.create_sheet("История транзакций")
-        
-        headers = ["ID", "Дата", "Тип", "Сумма (USDT)", "Статус", "Описание", "TX Hash", "Баланс до", "Баланс после"]
-        ws.append(headers)
-        
-        for tx in transactions:
-            ws.append([
+    @staticmethod
+    def _transaction_rows(transactions: list[Transaction]) -> list[list]:
+        return [
+            [
                 tx.id,
                 tx.created_at.strftime("%Y-%m-%d %H:%M:%S"),
                 tx.type,
@@ -211,24 +179,19 @@ class ReportService:
                 tx.tx_hash or "-",
                 float(tx.balance_before),
                 float(tx.balance_after)
-            ])
-            
-        self._apply_header_style(ws)
-        self._apply_zebra_striping(ws)
-        self._adjust_column_widths(ws)
+            ]
+            for tx in transactions
+        ]
 
-    def _create_deposits_sheet(self, wb, deposits: list[Deposit]):
-        ws = wb.create_sheet("Депозиты")
-        
-        headers = ["ID", "Дата", "Уровень", "Сумма (USDT)", "Статус", "ROI Cap", "Выплачено", "Завершено", "Процент дохода", "TX Hash"]
-        ws.append(headers)
-        
+    @staticmethod
+    def _deposit_rows(deposits: list[Deposit]) -> list[list]:
+        rows = []
         for dep in deposits:
             roi_percent = "N/A"
             if dep.deposit_version and dep.deposit_version.roi_percent:
                 roi_percent = f"{float(dep.deposit_version.roi_percent)}%"
-            
-            ws.append([
+
+            rows.append([
                 dep.id,
                 dep.created_at.strftime("%Y-%m-%d %H:%M:%S"),
                 dep.level,
@@ -240,26 +203,20 @@ class ReportService:
                 roi_percent,
                 dep.tx_hash or "-"
             ])
-            
-        self._apply_header_style(ws)
-        self._apply_zebra_striping(ws)
-        self._adjust_column_widths(ws)
+        return rows
 
-    def _create_referrals_sheet(self, wb, referrals: list[Referral]):
-        ws = wb.create_sheet("Рефералы")
-        
-        headers = ["ID", "Дата регистрации", "Уровень", "Пользователь (Username)", "Пользователь (ID)", "Заработано с него (USDT)"]
-        ws.append(headers)
-        
+    @staticmethod
+    def _referral_rows(referrals: list[Referral]) -> list[list]:
+        rows = []
         for ref in referrals:
             username = "Не указан"
             telegram_id = "Неизвестно"
-            
+
             if ref.referral:
                 username = f"@{ref.referral.username}" if ref.referral.username else "Не указан"
                 telegram_id = str(ref.referral.telegram_id)
-            
-            ws.append([
+
+            rows.append([
                 ref.id,
                 ref.created_at.strftime("%Y-%m-%d %H:%M:%S"),
                 ref.level,
@@ -267,24 +224,15 @@ class ReportService:
                 telegram_id,
                 float(ref.total_earned)
             ])
-            
-        self._apply_header_style(ws)
-        self._apply_zebra_striping(ws)
-        self._adjust_column_widths(ws)
+        return rows
 
-    def _create_wallet_history_sheet(self, wb, history: list):
-        ws = wb.create_sheet("История смены кошелька")
-        
-        headers = ["Дата изменения", "Старый кошелек", "Новый кошелек"]
-        ws.append(headers)
-        
-        for h in history:
-            ws.append([
+    @staticmethod
+    def _wallet_history_rows(history: list) -> list[list]:
+        return [
+            [
                 h.changed_at.strftime("%Y-%m-%d %H:%M:%S"),
                 h.old_wallet_address,
                 h.new_wallet_address
-            ])
-            
-        self._apply_header_style(ws)
-        self._apply_zebra_striping(ws)
-        self._adjust_column_widths(ws)
+            ]
+            for h in history
+        ]
@@ -0,0 +1,275 @@
+"""
+Retention service.
+
+Deletes expired rows table by table in bounded batches:
+
+    DELETE FROM t WHERE id IN (
+        SELECT id FROM t WHERE <expired> ORDER BY id LIMIT n
+        FOR UPDATE SKIP LOCKED
+    )
+
+Every batch is its own short transaction followed by a pause, so no
+long lock is held and autovacuum keeps up with the deleted tuples.
+Rows of archived policies are written to gzip-compressed JSON lines
+files before their batch is committed.
+"""
+
+import asyncio
+import gzip
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import ColumnElement, and_, delete, select
+
+from app.config.database import async_session_maker
+from app.config.settings import settings
+from app.models.admin_action import AdminAction
+from app.models.admin_session import AdminSession
+from app.models.base import Base
+from app.models.notification_queue_fallback import NotificationQueueFallback
+from app.models.user_fsm_state import UserFsmState
+from app.models.user_message_log import UserMessageLog
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Which rows of a table expire.
+
+    Attributes:
+        name: Policy name (used in logs and archive file names)
+        model: Model with an integer "id" primary key
+        condition: Builds the expiry condition for the current time
+        archive: Write deleted rows to an archive file
+    """
+
+    name: str
+    model: type[Base]
+    condition: Callable[[datetime], ColumnElement[bool]]
+    archive: bool = False
+
+
+@dataclass
+class RetentionResult:
+    """Progress of one policy run."""
+
+    name: str
+    deleted: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    archive_path: Path | None = None
+    error: str | None = None
+
+
+def default_policies() -> list[RetentionPolicy]:
+    """
+    Get retention policies configured by settings.
+
+    Returns:
+        Policies for admin actions, message logs, FSM states,
+        notification fallbacks and admin sessions
+    """
+    admin_actions = timedelta(days=settings.retention_admin_actions_days)
+    message_logs = timedelta(days=settings.retention_message_logs_days)
+    fsm_states = timedelta(days=settings.retention_fsm_states_days)
+    notifications = timedelta(
+        days=settings.retention_notification_fallback_days
+    )
+    admin_sessions = timedelta(days=settings.retention_admin_sessions_days)
+
+    return [
+        RetentionPolicy(
+            name="admin_actions",
+            model=AdminAction,
+            # R18-4: Immutable audit entries are never deleted
+            condition=lambda now: and_(
+                AdminAction.created_at < now - admin_actions,
+                AdminAction.is_immutable.is_(False),
+            ),
+            archive=True,
+        ),
+        RetentionPolicy(
+            name="user_message_logs",
+            model=UserMessageLog,
+            condition=lambda now: (
+                UserMessageLog.created_at < now - message_logs
+            ),
+        ),
+        RetentionPolicy(
+            name="user_fsm_states",
+            model=UserFsmState,
+            condition=lambda now: UserFsmState.updated_at < now - fsm_states,
+        ),
+        RetentionPolicy(
+            name="notification_queue_fallback",
+            model=NotificationQueueFallback,
+            # Pending notifications (processed_at NULL) never match
+            condition=lambda now: (
+                NotificationQueueFallback.processed_at < now - notifications
+            ),
+        ),
+        RetentionPolicy(
+            name="admin_sessions",
+            model=AdminSession,
+            condition=lambda now: and_(
+                AdminSession.is_active.is_(False),
+                AdminSession.last_activity < now - admin_sessions,
+            ),
+        ),
+    ]
+
+
+class RetentionService:
+    """Applies retention policies with batched, throttled deletes."""
+
+    def __init__(
+        self,
+        session_factory: Any | None = None,
+        batch_size: int | None = None,
+        pause: float | None = None,
+        archive_dir: Path | None = None,
+    ) -> None:
+        """
+        Initialize retention service.
+
+        Args:
+            session_factory: Async session factory (one session per batch)
+            batch_size: Rows deleted per batch
+            pause: Seconds to sleep between batches
+            archive_dir: Directory for archive files
+        """
+        self.session_factory = session_factory or async_session_maker
+        self.batch_size = batch_size or settings.retention_batch_size
+        self.pause = (
+            pause
+            if pause is not None
+            else settings.retention_batch_pause_ms / 1000
+        )
+        self.archive_dir = archive_dir or Path(settings.retention_archive_dir)
+
+    async def run(
+        self, policies: list[RetentionPolicy] | None = None
+    ) -> list[RetentionResult]:
+        """
+        Apply policies one after another.
+
+        A failing policy does not stop the others.
+
+        Args:
+            policies: Policies to apply (default_policies() if None)
+
+        Returns:
+            Result per policy
+        """
+        if policies is None:
+            policies = default_policies()
+        return [await self.apply(policy) for policy in policies]
+
+    async def apply(self, policy: RetentionPolicy) -> RetentionResult:
+        """
+        Delete all expired rows of one policy.
+
+        Args:
+            policy: Retention policy
+
+        Returns:
+            Deleted row and batch counts
+        """
+        result = RetentionResult(name=policy.name)
+        # Fixed cutoff, so rows expiring during the run wait for the next
+        condition = policy.condition(datetime.now(UTC))
+        started = time.monotonic()
+
+        if policy.archive:
+            timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+            result.archive_path = (
+                self.archive_dir / f"{policy.name}_{timestamp}.jsonl.gz"
+            )
+
+        try:
+            while True:
+                async with self.session_factory() as session:
+                    deleted = await self._delete_batch(
+                        session, policy, condition, result.archive_path
+                    )
+                    await session.commit()
+
+                result.deleted += deleted
+                result.batches += 1
+                logger.debug(
+                    f"Retention {policy.name}: batch {result.batches}, "
+                    f"{result.deleted} rows deleted"
+                )
+
+                if deleted < self.batch_size:
+                    break
+                await asyncio.sleep(self.pause)
+
+        except Exception as e:
+            result.error = str(e)
+            logger.error(
+                f"Retention {policy.name} failed after "
+                f"{result.deleted} rows: {e}"
+            )
+
+        result.elapsed = time.monotonic() - started
+        if result.deleted:
+            logger.info(
+                f"Retention {policy.name}: deleted {result.deleted} rows "
+                f"in {result.batches} batches ({result.elapsed:.1f}s)",
+                extra={
+                    "policy": policy.name,
+                    "deleted": result.deleted,
+                    "batches": result.batches,
+                    "archive": (
+                        str(result.archive_path)
+                        if result.archive_path
+                        else None
+                    ),
+                },
+            )
+        return result
+
+    async def _delete_batch(
+        self,
+        session: Any,
+        policy: RetentionPolicy,
+        condition: ColumnElement[bool],
+        archive_path: Path | None,
+    ) -> int:
+        """Delete (and archive) one batch of expired rows, uncommitted."""
+        table = policy.model.__table__
+        expired_ids = (
+            select(table.c.id)
+            .where(condition)
+            .order_by(table.c.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = delete(table).where(table.c.id.in_(expired_ids))
+
+        if archive_path is None:
+            result = await session.execute(stmt)
+            return result.rowcount or 0
+
+        result = await session.execute(stmt.returning(*table.c))
+        rows = [dict(row) for row in result.mappings().all()]
+        if rows:
+            # Written before commit: a failed write keeps the rows
+            await asyncio.to_thread(_append_archive, archive_path, rows)
+        return len(rows)
+
+
+def _append_archive(path: Path, rows: list[dict[str, Any]]) -> None:
+    """Append rows as a gzip member of JSON lines."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "at", encoding="utf-8") as archive:
+        for row in rows:
+            archive.write(json.dumps(row, default=str, ensure_ascii=False))
+            archive.write("\n")
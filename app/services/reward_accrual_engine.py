@@ -0,0 +1,487 @@
+"""
+Reward accrual engine.
+
+Set-based individual ROI accrual. Due deposits are processed in
+keyset-ordered chunks: rewards are computed in memory and written with
+bulk INSERT / UPDATE ... FROM (VALUES ...) statements, one commit per
+chunk, so row locks are held only for the duration of a single chunk.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import (
+    Boolean,
+    Integer,
+    case,
+    column,
+    insert,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.models.deposit import Deposit
+from app.models.deposit_reward import DepositReward
+from app.models.enums import TransactionStatus, TransactionType
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.repositories.referral_repository import (
+    AMOUNT_TYPE,
+    ReferralCredit,
+    ReferralRelation,
+    ReferralRepository,
+    delta_values,
+    sum_deltas,
+)
+from app.services.referral_service import REFERRAL_RATES
+from app.services.roi_corridor_service import RoiCorridorService
+
+AMOUNT_QUANT = Decimal("0.00000001")
+
+
+@dataclass
+class DueDeposit:
+    """Deposit row loaded for accrual (columns only, no ORM identity)."""
+
+    id: int
+    user_id: int
+    telegram_id: int | None
+    level: int
+    amount: Decimal
+    roi_cap_amount: Decimal
+    roi_paid_amount: Decimal
+
+
+@dataclass
+class AccrualItem:
+    """Computed accrual for a single deposit."""
+
+    deposit: DueDeposit
+    rate: Decimal
+    reward_amount: Decimal
+    new_roi_paid: Decimal
+    completed: bool
+
+
+@dataclass
+class AccrualResult:
+    """Summary of an accrual run."""
+
+    chunks: int = 0
+    rewards_created: int = 0
+    total_amount: Decimal = Decimal("0")
+    failed_chunks: int = 0
+    completed: list[AccrualItem] = field(default_factory=list)
+
+
+def plan_accruals(
+    deposits: list[DueDeposit],
+    configs: dict[int, dict[str, Any]],
+    rate_generator: Callable[[Decimal, Decimal], Decimal],
+) -> list[AccrualItem]:
+    """
+    Compute rewards for a chunk of deposits in memory.
+
+    Args:
+        deposits: Due deposits
+        configs: Corridor configuration per level
+        rate_generator: Callable producing a rate from (roi_min, roi_max)
+
+    Returns:
+        Accrual items for deposits with a positive reward
+    """
+    items = []
+    for deposit in deposits:
+        config = configs[deposit.level]
+        if config["mode"] == "custom":
+            rate = rate_generator(config["roi_min"], config["roi_max"])
+        else:  # equal
+            rate = config["roi_fixed"]
+
+        reward_amount = (
+            (deposit.amount * rate) / Decimal("100")
+        ).quantize(AMOUNT_QUANT)
+
+        roi_paid = deposit.roi_paid_amount or Decimal("0")
+        roi_remaining = deposit.roi_cap_amount - roi_paid
+        if reward_amount > roi_remaining:
+            logger.warning(
+                "Reward capped to remaining ROI",
+                extra={
+                    "deposit_id": deposit.id,
+                    "original_reward": str(reward_amount),
+                    "capped_reward": str(roi_remaining),
+                },
+            )
+            reward_amount = roi_remaining
+
+        if reward_amount <= 0:
+            logger.debug(
+                "Skipping deposit with zero reward",
+                extra={"deposit_id": deposit.id},
+            )
+            continue
+
+        new_roi_paid = (roi_paid + reward_amount).quantize(AMOUNT_QUANT)
+        items.append(
+            AccrualItem(
+                deposit=deposit,
+                rate=rate,
+                reward_amount=reward_amount,
+                new_roi_paid=new_roi_paid,
+                completed=new_roi_paid >= deposit.roi_cap_amount,
+            )
+        )
+
+    return items
+
+
+def plan_referral_credits(
+    items: list[AccrualItem],
+    relations: list[ReferralRelation],
+) -> list[ReferralCredit]:
+    """
+    Compute referral rewards from ROI for a chunk.
+
+    Mirrors ReferralService.process_roi_referral_rewards: each referrer
+    in the chain gets REFERRAL_RATES[level] of the ROI amount, ineligible
+    (inactive, earnings-blocked, banned) referrers are skipped.
+
+    Args:
+        items: Accrual items of the chunk
+        relations: Referral relationships of the chunk's users
+
+    Returns:
+        One credit per (accrual, relationship) pair with positive amount
+    """
+    by_user: dict[int, list[ReferralRelation]] = defaultdict(list)
+    for relation in relations:
+        by_user[relation.referral_id].append(relation)
+
+    credits = []
+    for item in items:
+        for relation in by_user.get(item.deposit.user_id, []):
+            rate = REFERRAL_RATES.get(relation.level, Decimal("0"))
+            if rate == Decimal("0"):
+                continue
+
+            amount = (item.reward_amount * rate).quantize(AMOUNT_QUANT)
+            if amount <= 0 or not relation.is_eligible:
+                continue
+
+            credits.append(
+                ReferralCredit(
+                    referral_id=relation.id,
+                    referrer_id=relation.referrer_id,
+                    level=relation.level,
+                    amount=amount,
+                )
+            )
+
+    return credits
+
+
+class RewardAccrualEngine:
+    """Batched engine for individual (corridor-based) ROI accrual."""
+
+    def __init__(
+        self, session: AsyncSession, chunk_size: int | None = None
+    ) -> None:
+        """
+        Initialize accrual engine.
+
+        Args:
+            session: Async database session (committed per chunk)
+            chunk_size: Deposits per chunk (defaults to settings)
+        """
+        self.session = session
+        self.chunk_size = chunk_size or settings.reward_accrual_chunk_size
+        self.corridor_service = RoiCorridorService(session)
+
+    async def run(self) -> AccrualResult:
+        """
+        Accrue rewards for all deposits due at the start of the run.
+
+        Corridor configuration and accrual period are read once. Each
+        chunk is committed on its own; a failing chunk is rolled back and
+        left for the next run without affecting the others.
+
+        Returns:
+            AccrualResult with totals and deposits that completed ROI
+        """
+        configs = await self.corridor_service.get_all_corridor_configs()
+        period_hours = await self.corridor_service.get_accrual_period_hours()
+        # Release the settings read before locking deposits
+        await self.session.commit()
+
+        now = datetime.now(UTC)
+        next_accrual = now + timedelta(hours=period_hours)
+
+        result = AccrualResult()
+        last_id = 0
+
+        while True:
+            deposits = await self._fetch_chunk(now, last_id)
+            if not deposits:
+                await self.session.rollback()
+                break
+
+            last_id = deposits[-1].id
+            result.chunks += 1
+
+            try:
+                items = plan_accruals(
+                    deposits,
+                    configs,
+                    self.corridor_service.generate_rate_from_corridor,
+                )
+                if items:
+                    await self._apply_chunk(items, now, next_accrual)
+                await self.session.commit()
+            except Exception as e:
+                await self.session.rollback()
+                result.failed_chunks += 1
+                logger.error(
+                    f"Error processing accrual chunk: {e}",
+                    extra={
+                        "first_deposit_id": deposits[0].id,
+                        "last_deposit_id": last_id,
+                        "error": str(e),
+                    },
+                )
+                continue
+
+            result.rewards_created += len(items)
+            result.total_amount += sum(
+                (item.reward_amount for item in items), Decimal("0")
+            )
+            result.completed.extend(item for item in items if item.completed)
+
+            logger.debug(
+                "Accrual chunk committed",
+                extra={
+                    "chunk": result.chunks,
+                    "deposits": len(deposits),
+                    "rewards": len(items),
+                    "last_deposit_id": last_id,
+                },
+            )
+
+        return result
+
+    async def _fetch_chunk(
+        self, now: datetime, last_id: int
+    ) -> list[DueDeposit]:
+        """
+        Lock and load the next chunk of due deposits.
+
+        SKIP LOCKED lets a concurrent run (or a deposit held by another
+        transaction) be skipped instead of blocking the whole chunk.
+        """
+        stmt = (
+            select(
+                Deposit.id,
+                Deposit.user_id,
+                User.telegram_id,
+                Deposit.level,
+                Deposit.amount,
+                Deposit.roi_cap_amount,
+                Deposit.roi_paid_amount,
+            )
+            .join(User, User.id == Deposit.user_id)
+            .where(
+                Deposit.status == TransactionStatus.CONFIRMED.value,
+                Deposit.is_roi_completed == False,  # noqa: E712
+                Deposit.next_accrual_at <= now,
+                Deposit.id > last_id,
+            )
+            .order_by(Deposit.id)
+            .limit(self.chunk_size)
+            .with_for_update(of=Deposit, skip_locked=True)
+        )
+        result = await self.session.execute(stmt)
+        return [DueDeposit(*row) for row in result.all()]
+
+    async def _apply_chunk(
+        self,
+        items: list[AccrualItem],
+        now: datetime,
+        next_accrual: datetime,
+    ) -> None:
+        """Write rewards, deposit progress, balances and referral fan-out."""
+        relations = await self._load_referral_relations(
+            {item.deposit.user_id for item in items}
+        )
+        referral_credits = plan_referral_credits(items, relations)
+
+        # Lock all affected users in id order to avoid deadlocks with
+        # concurrent withdrawals/credits touching the same rows
+        user_ids = {item.deposit.user_id for item in items}
+        user_ids.update(credit.referrer_id for credit in referral_credits)
+        await self.session.execute(
+            select(User.id)
+            .where(User.id.in_(sorted(user_ids)))
+            .order_by(User.id)
+            .with_for_update()
+        )
+
+        await self.session.execute(
+            insert(DepositReward),
+            [
+                {
+                    "user_id": item.deposit.user_id,
+                    "deposit_id": item.deposit.id,
+                    "reward_session_id": None,  # Individual accrual
+                    "deposit_level": item.deposit.level,
+                    "deposit_amount": item.deposit.amount,
+                    "reward_rate": item.rate,
+                    "reward_amount": item.reward_amount,
+                    "paid": False,
+                    "calculated_at": now,
+                }
+                for item in items
+            ],
+        )
+
+        await self._update_deposits(items, now, next_accrual)
+        await self._credit_roi(items)
+
+        if referral_credits:
+            await self._apply_referral_credits(referral_credits, now)
+
+    async def _update_deposits(
+        self,
+        items: list[AccrualItem],
+        now: datetime,
+        next_accrual: datetime,
+    ) -> None:
+        """Update ROI progress of all chunk deposits in one statement."""
+        progress = values(
+            column("id", Integer),
+            column("roi_paid_amount", AMOUNT_TYPE),
+            column("completed", Boolean),
+            name="progress",
+        ).data(
+            [
+                (item.deposit.id, item.new_roi_paid, item.completed)
+                for item in items
+            ]
+        )
+
+        stmt = (
+            update(Deposit)
+            .where(Deposit.id == progress.c.id)
+            .values(
+                roi_paid_amount=progress.c.roi_paid_amount,
+                next_accrual_at=next_accrual,
+                is_roi_completed=progress.c.completed,
+                completed_at=case(
+                    (progress.c.completed, now),
+                    else_=Deposit.completed_at,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+
+    async def _credit_roi(self, items: list[AccrualItem]) -> None:
+        """
+        Credit ROI to user balances and record accounting transactions.
+
+        Balances are incremented in a single UPDATE ... RETURNING; the
+        per-deposit balance_before/balance_after chain is then rebuilt
+        from the returned final balance.
+        """
+        deltas = sum_deltas(
+            [(item.deposit.user_id, item.reward_amount) for item in items]
+        )
+        credit = delta_values(deltas, "roi_credit")
+
+        stmt = (
+            update(User)
+            .where(User.id == credit.c.id)
+            .values(
+                balance=User.balance + credit.c.delta,
+                total_earned=User.total_earned + credit.c.delta,
+            )
+            .returning(User.id, User.balance)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        final_balances = {row.id: row.balance for row in result.all()}
+
+        running = {
+            row["id"]: final_balances[row["id"]] - row["delta"]
+            for row in deltas
+            if row["id"] in final_balances
+        }
+
+        transactions = []
+        for item in items:
+            user_id = item.deposit.user_id
+            if user_id not in running:
+                logger.error(
+                    "Failed to credit ROI to balance: user not found",
+                    extra={
+                        "user_id": user_id,
+                        "reward_amount": str(item.reward_amount),
+                    },
+                )
+                continue
+
+            balance_before = running[user_id]
+            balance_after = (
+                balance_before + item.reward_amount
+            ).quantize(AMOUNT_QUANT)
+            running[user_id] = balance_after
+
+            transactions.append(
+                {
+                    "user_id": user_id,
+                    "type": TransactionType.DEPOSIT_REWARD.value,
+                    "amount": item.reward_amount,
+                    "balance_before": balance_before,
+                    "balance_after": balance_after,
+                    "status": TransactionStatus.CONFIRMED.value,
+                    "description": "ROI reward credited to internal balance",
+                    "reference_type": "deposit",
+                    "reference_id": item.deposit.id,
+                    "tx_hash": "internal_balance",
+                }
+            )
+
+        if transactions:
+            await self.session.execute(insert(Transaction), transactions)
+
+    async def _load_referral_relations(
+        self, user_ids: set[int]
+    ) -> list[ReferralRelation]:
+        """Load referral chains of all chunk users in one query."""
+        return await ReferralRepository(self.session).get_ancestors(user_ids)
+
+    async def _apply_referral_credits(
+        self, credits: list[ReferralCredit], now: datetime
+    ) -> None:
+        """Write referral earnings and apply aggregated balance deltas."""
+        await ReferralRepository(self.session).apply_credits(
+            credits, tx_hash="internal_balance_roi", created_at=now
+        )
+
+        logger.info(
+            "Referral ROI rewards credited",
+            extra={
+                "earnings": len(credits),
+                "total": str(sum((c.amount for c in credits), Decimal("0"))),
+                "source": "roi",
+            },
+        )
@@ -25,6 +25,7 @@ from app.repositories.reward_session_repository import (
 )
 from app.repositories.transaction_repository import TransactionRepository
 from app.repositories.user_repository import UserRepository
+from app.services.reward_accrual_engine import RewardAccrualEngine
 
 
 class RewardService:
@@ -171,10 +172,8 @@ class RewardService:
             Tuple of (success, error_message)
         """
         # Check if rewards have been calculated
-        rewards_count = len(
-            await self.reward_repo.find_by(
-                reward_session_id=session_id
-            )
+        rewards_count = await self.reward_repo.count(
+            reward_session_id=session_id
         )
 
         if rewards_count > 0:
@@ -269,6 +268,8 @@ class RewardService:
 
         rewards_calculated = 0
         total_reward_amount = Decimal("0")
+        # Reward rows are inserted in one bulk INSERT after the loop
+        reward_rows: list[dict] = []
 
         for deposit in deposits:
             # Load user to check earnings_blocked
@@ -371,16 +372,16 @@ class RewardService:
                     continue
 
             # Create reward record
-            await self.reward_repo.create(
-                user_id=deposit.user_id,
-                deposit_id=deposit.id,
-                reward_session_id=session_id,
-                deposit_level=deposit.level,
-                deposit_amount=deposit.amount,
-                reward_rate=reward_rate,
-                reward_amount=reward_amount,
-                paid=False,
-            )
+            reward_rows.append({
+                "user_id": deposit.user_id,
+                "deposit_id": deposit.id,
+                "reward_session_id": session_id,
+                "deposit_level": deposit.level,
+                "deposit_amount": deposit.amount,
+                "reward_rate": reward_rate,
+                "reward_amount": reward_amount,
+                "paid": False,
+            })
 
             # R12-1: Update deposit roi_paid_amount and check for completion
             from app.repositories.deposit_repository import DepositRepository
@@ -390,7 +391,7 @@ class RewardService:
             new_roi_paid = ((deposit.roi_paid_amount or Decimal("0")) + reward_amount).quantize(Decimal("0.00000001"))
 
             # Update roi_paid_amount
-            await deposit_repo.update(
+            await deposit_repo.update_by_id(
                 deposit.id,
                 roi_paid_amount=new_roi_paid,
             )
@@ -417,7 +418,7 @@ class RewardService:
             if deposit.roi_cap_amount and new_roi_paid >= deposit.roi_cap_amount:
                 # Mark deposit as ROI completed with timestamp
                 from datetime import UTC, datetime
-                await deposit_repo.update(
+                await deposit_repo.update_by_id(
                     deposit.id,
                     is_roi_completed=True,
                     completed_at=datetime.now(UTC),
@@ -443,6 +444,7 @@ class RewardService:
             rewards_calculated += 1
             total_reward_amount += reward_amount
 
+        await self.reward_repo.bulk_create(reward_rows, returning=False)
         await self.session.commit()
 
         logger.info(
@@ -509,14 +511,9 @@ class RewardService:
         Returns:
             Tuple of (success, updated_count, error_message)
         """
-        updated = 0
-
-        for reward_id in reward_ids:
-            result = await self.reward_repo.update(
-                reward_id, paid=True, tx_hash=tx_hash
-            )
-            if result:
-                updated += 1
+        updated = await self.reward_repo.update_by_ids(
+            reward_ids, paid=True, tx_hash=tx_hash
+        )
 
         await self.session.commit()
 
@@ -537,156 +534,36 @@ class RewardService:
 
         This method processes individual deposits based on their
         next_accrual_at timestamp and corridor settings.
-        Uses pessimistic locking to prevent race conditions.
+        Delegates to RewardAccrualEngine, which locks, computes and
+        commits deposits in chunks using set-based statements.
         """
-        from datetime import UTC
-        from datetime import timedelta
-
-        from app.services.roi_corridor_service import RoiCorridorService
-        from app.services.referral_service import ReferralService
+        engine = RewardAccrualEngine(self.session)
+        result = await engine.run()
 
-        corridor_service = RoiCorridorService(self.session)
-        referral_service = ReferralService(self.session)
-
-        # Get deposits due for accrual with pessimistic lock
-        now = datetime.now(UTC)
-        stmt = (
-            select(Deposit)
-            .where(
-                Deposit.status == "confirmed",
-                Deposit.is_roi_completed == False,  # noqa: E712
-                Deposit.next_accrual_at <= now,
+        for item in result.completed:
+            logger.info(
+                "Deposit ROI completed",
+                extra={
+                    "deposit_id": item.deposit.id,
+                    "user_id": item.deposit.user_id,
+                    "total_paid": str(item.new_roi_paid),
+                },
+            )
+            await self._send_roi_completed_notification(
+                deposit_id=item.deposit.id,
+                user_id=item.deposit.user_id,
+                telegram_id=item.deposit.telegram_id,
+                roi_paid_amount=item.new_roi_paid,
             )
-            .with_for_update()  # Prevent concurrent reward calculations
-        )
-        result = await self.session.execute(stmt)
-        deposits = list(result.scalars().all())
-
-        logger.info(
-            "Processing individual rewards",
-            extra={"deposits_count": len(deposits)},
-        )
-
-        for deposit in deposits:
-            try:
-                # Get corridor config
-                config = await corridor_service.get_corridor_config(
-                    deposit.level
-                )
-
-                # Determine rate
-                if config["mode"] == "custom":
-                    rate = corridor_service.generate_rate_from_corridor(
-                        config["roi_min"], config["roi_max"]
-                    )
-                else:  # equal
-                    rate = config["roi_fixed"]
-
-                # Calculate reward
-                reward_amount = ((deposit.amount * rate) / Decimal("100")).quantize(Decimal("0.00000001"))
-
-                # Check ROI cap
-                roi_remaining = deposit.roi_cap_amount - (
-                    deposit.roi_paid_amount or Decimal("0")
-                )
-                if reward_amount > roi_remaining:
-                    logger.warning(
-                        "Reward capped to remaining ROI",
-                        extra={
-                            "deposit_id": deposit.id,
-                            "original_reward": str(reward_amount),
-                            "capped_reward": str(roi_remaining),
-                        },
-                    )
-                    reward_amount = roi_remaining
-
-                if reward_amount <= 0:
-                    logger.debug(
-                        "Skipping deposit with zero reward",
-                        extra={"deposit_id": deposit.id},
-                    )
-                    continue
-
-                # Create reward
-                await self.reward_repo.create(
-                    user_id=deposit.user_id,
-                    deposit_id=deposit.id,
-                    reward_session_id=None,  # Individual accrual
-                    deposit_level=deposit.level,
-                    deposit_amount=deposit.amount,
-                    reward_rate=rate,
-                    reward_amount=reward_amount,
-                    paid=False,
-                    calculated_at=datetime.now(UTC),
-                )
-
-                # Update deposit
-                new_roi_paid = (
-                    (deposit.roi_paid_amount or Decimal("0")) + reward_amount
-                ).quantize(Decimal("0.00000001"))
-                period_hours = await corridor_service.get_accrual_period_hours()
-                next_accrual = now + timedelta(hours=period_hours)
-
-                await self.deposit_repo.update(
-                    deposit.id,
-                    roi_paid_amount=new_roi_paid,
-                    next_accrual_at=next_accrual,
-                )
-
-                # R19: Process referral rewards from ROI
-                await referral_service.process_roi_referral_rewards(
-                    deposit.user_id, reward_amount
-                )
-
-                # Check if ROI completed
-                if new_roi_paid >= deposit.roi_cap_amount:
-                    await self.deposit_repo.update(
-                        deposit.id,
-                        is_roi_completed=True,
-                        completed_at=now,
-                    )
-
-                    # Send notification
-                    await self._send_roi_completed_notification(deposit)
-
-                    logger.info(
-                        "Deposit ROI completed",
-                        extra={
-                            "deposit_id": deposit.id,
-                            "user_id": deposit.user_id,
-                            "total_paid": str(new_roi_paid),
-                        },
-                    )
-                else:
-                    logger.debug(
-                        "Reward calculated",
-                        extra={
-                            "deposit_id": deposit.id,
-                            "rate": str(rate),
-                            "amount": str(reward_amount),
-                            "next_accrual": next_accrual.isoformat(),
-                        },
-                    )
-
-                # Credit ROI to user's internal balance and create accounting transaction
-                await self._credit_roi_to_balance(
-                    user_id=deposit.user_id,
-                    reward_amount=reward_amount,
-                    deposit_id=deposit.id,
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"Error processing deposit {deposit.id}: {e}",
-                    extra={"deposit_id": deposit.id, "error": str(e)},
-                )
-                continue
-
-        await self.session.commit()
 
         logger.info(
             "Individual rewards processing completed",
-            extra={"processed": len(deposits)},
+            extra={
+                "chunks": result.chunks,
+                "processed": result.rewards_created,
+                "total_amount": str(result.total_amount),
+                "failed_chunks": result.failed_chunks,
+            },
         )
 
     async def _credit_roi_to_balance(
@@ -743,38 +620,45 @@ class RewardService:
         )
 
     async def _send_roi_completed_notification(
-        self, deposit: Deposit
+        self,
+        deposit_id: int,
+        user_id: int,
+        telegram_id: int | None,
+        roi_paid_amount: Decimal,
     ) -> None:
         """
         Send notification when ROI reaches 500%.
 
         Args:
-            deposit: Completed deposit
+            deposit_id: Completed deposit ID
+            user_id: Deposit owner ID
+            telegram_id: Deposit owner Telegram ID
+            roi_paid_amount: Total ROI paid on the deposit
         """
         try:
             from bot.utils.notification import send_telegram_message
 
             text = (
                 "🎉 Обязательства системы выполнены в объеме 500%!\n\n"
-                f"💰 Вы заработали: {deposit.roi_paid_amount:.2f} USDT\n"
+                f"💰 Вы заработали: {roi_paid_amount:.2f} USDT\n"
                 "📈 Ваш ROI равен 500%\n\n"
                 "⚠️ Ваш текущий депозит деактивирован системой.\n\n"
                 "✅ Вы можете открыть новый депозит и продолжить "
                 "зарабатывать с системой!"
             )
 
-            await send_telegram_message(deposit.user.telegram_id, text)
+            await send_telegram_message(telegram_id, text)
 
             logger.info(
                 "ROI completion notification sent",
                 extra={
-                    "deposit_id": deposit.id,
-                    "user_id": deposit.user_id,
-                    "telegram_id": deposit.user.telegram_id,
+                    "deposit_id": deposit_id,
+                    "user_id": user_id,
+                    "telegram_id": telegram_id,
                 },
             )
         except Exception as e:
             logger.error(
                 f"Failed to send ROI notification: {e}",
-                extra={"deposit_id": deposit.id, "error": str(e)},
+                extra={"deposit_id": deposit_id, "error": str(e)},
             )
@@ -18,6 +18,7 @@ from app.repositories.deposit_corridor_history_repository import (
     DepositCorridorHistoryRepository,
 )
 from app.repositories.global_settings_repository import GlobalSettingsRepository
+from app.services.global_settings_cache import get_global_settings_cache
 
 
 class RoiCorridorService:
@@ -34,10 +35,15 @@ class RoiCorridorService:
         self.settings_repo = GlobalSettingsRepository(session)
         self.history_repo = DepositCorridorHistoryRepository(session)
 
+    async def _get_roi_settings(self) -> Any:
+        """Helper to get ROI settings JSON from the settings snapshot."""
+        snapshot = await get_global_settings_cache().get(self.session)
+        return snapshot.roi_settings
+
     async def _get_roi_setting(self, key: str, default: str) -> str:
         """Helper to get ROI setting from GlobalSettings JSON."""
-        settings = await self.settings_repo.get_settings()
-        return str(settings.roi_settings.get(key, default))
+        roi = await self._get_roi_settings()
+        return str(roi.get(key, default))
 
     async def _set_roi_setting(self, key: str, value: str) -> None:
         """Helper to set ROI setting in GlobalSettings JSON."""
@@ -65,16 +71,36 @@ class RoiCorridorService:
         Returns:
             Dictionary with corridor configuration
         """
-        mode = await self._get_roi_setting(f"LEVEL_{level}_ROI_MODE", "custom")
-        roi_min = Decimal(await self._get_roi_setting(f"LEVEL_{level}_ROI_MIN", "0.8"))
-        roi_max = Decimal(await self._get_roi_setting(f"LEVEL_{level}_ROI_MAX", "10.0"))
-        roi_fixed = Decimal(await self._get_roi_setting(f"LEVEL_{level}_ROI_FIXED", "5.0"))
+        roi = await self._get_roi_settings()
+        return self._corridor_config(roi, level)
+
+    @staticmethod
+    def _corridor_config(roi: Any, level: int) -> dict[str, Any]:
+        """Build corridor configuration for a level from ROI settings."""
+        return {
+            "mode": str(roi.get(f"LEVEL_{level}_ROI_MODE", "custom")),
+            "roi_min": Decimal(str(roi.get(f"LEVEL_{level}_ROI_MIN", "0.8"))),
+            "roi_max": Decimal(
+                str(roi.get(f"LEVEL_{level}_ROI_MAX", "10.0"))
+            ),
+            "roi_fixed": Decimal(
+                str(roi.get(f"LEVEL_{level}_ROI_FIXED", "5.0"))
+            ),
+        }
+
+    async def get_all_corridor_configs(self) -> dict[int, dict[str, Any]]:
+        """
+        Get corridor configuration for all levels with a single read.
+
+        Used by batch accrual so GlobalSettings is read once per run
+        instead of four times per deposit.
 
+        Returns:
+            Dictionary of {level: corridor configuration}
+        """
+        roi = await self._get_roi_settings()
         return {
-            "mode": mode,
-            "roi_min": roi_min,
-            "roi_max": roi_max,
-            "roi_fixed": roi_fixed,
+            level: self._corridor_config(roi, level) for level in range(1, 6)
         }
 
     async def set_corridor(
@@ -0,0 +1,320 @@
+"""
+User context cache.
+
+Per-telegram_id snapshot of what the update middlewares need (user id,
+ban flag, language, blacklist entry, admin id), served from an
+in-process LRU with Redis behind it. A miss is loaded with one query.
+
+Entries are invalidated automatically after any committed ORM write to
+a User (ban/language), Blacklist or Admin row, so middlewares never act
+on a stale ban decision from this process; other processes see the
+change once the Redis key is dropped and their short local TTL expires.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import event, inspect, literal, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config.settings import settings
+from app.models.admin import Admin
+from app.models.blacklist import Blacklist
+from app.models.user import User
+
+REDIS_KEY_PREFIX = "user_ctx:"
+
+# User attributes that affect the cached context
+USER_CONTEXT_FIELDS = ("telegram_id", "is_banned", "language")
+
+# Session.info key for telegram IDs touched by the current transaction
+DIRTY_KEY = "user_context_dirty"
+
+
+@dataclass(frozen=True)
+class UserContext:
+    """Cached per-user state used by update middlewares."""
+
+    telegram_id: int
+    user_id: int | None = None
+    is_banned: bool = False
+    language: str | None = None
+    blacklist_id: int | None = None
+    blacklist_action_type: str | None = None
+    blacklist_is_active: bool = False
+    admin_id: int | None = None
+
+    def to_json(self) -> str:
+        """Serialize for Redis."""
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "UserContext":
+        """Deserialize from Redis."""
+        return cls(**json.loads(raw))
+
+
+class UserContextCache:
+    """
+    Two-level (LRU + Redis) cache of UserContext by telegram_id.
+
+    The local LRU keeps a tombstone for invalidated IDs, so the next
+    lookup in this process goes straight to the DB even if the Redis
+    delete has not landed yet.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any | None = None,
+        max_size: int | None = None,
+        local_ttl: float | None = None,
+        redis_ttl: int | None = None,
+    ) -> None:
+        """
+        Initialize user context cache.
+
+        Args:
+            redis_client: Async Redis client (optional, LRU only if None)
+            max_size: Max entries in the local LRU
+            local_ttl: Local entry lifetime in seconds
+            redis_ttl: Redis entry lifetime in seconds
+        """
+        self.redis_client = redis_client
+        self.max_size = max_size or settings.user_context_cache_size
+        self.local_ttl = local_ttl or settings.user_context_local_ttl
+        self.redis_ttl = redis_ttl or settings.user_context_redis_ttl
+        # telegram_id -> (expires_at, context or None for tombstone)
+        self._local: OrderedDict[
+            int, tuple[float, UserContext | None]
+        ] = OrderedDict()
+
+    async def get_or_load(
+        self, session: AsyncSession, telegram_id: int
+    ) -> UserContext:
+        """
+        Get user context, loading it from the DB on miss.
+
+        Args:
+            session: Database session used on miss
+            telegram_id: Telegram user ID
+
+        Returns:
+            User context (user_id is None for unregistered users)
+        """
+        now = time.monotonic()
+        cached = self._local.get(telegram_id)
+        tombstone = False
+
+        if cached:
+            expires_at, context = cached
+            if expires_at > now:
+                if context is not None:
+                    self._local.move_to_end(telegram_id)
+                    return context
+                tombstone = True
+            else:
+                del self._local[telegram_id]
+
+        if self.redis_client and not tombstone:
+            try:
+                raw = await self.redis_client.get(
+                    f"{REDIS_KEY_PREFIX}{telegram_id}"
+                )
+                if raw:
+                    context = UserContext.from_json(raw)
+                    self._put_local(telegram_id, context)
+                    return context
+            except Exception as e:
+                logger.warning(f"User context Redis read failed: {e}")
+
+        context = await self._load(session, telegram_id)
+        self._put_local(telegram_id, context)
+
+        if self.redis_client:
+            try:
+                await self.redis_client.set(
+                    f"{REDIS_KEY_PREFIX}{telegram_id}",
+                    context.to_json(),
+                    ex=self.redis_ttl,
+                )
+            except Exception as e:
+                logger.warning(f"User context Redis write failed: {e}")
+
+        return context
+
+    def invalidate_local(self, telegram_ids: Iterable[int]) -> None:
+        """Replace local entries with tombstones (bypass Redis on next get)."""
+        expires_at = time.monotonic() + self.local_ttl
+        for telegram_id in telegram_ids:
+            self._local[telegram_id] = (expires_at, None)
+            self._local.move_to_end(telegram_id)
+        self._evict()
+
+    async def invalidate(self, telegram_ids: Iterable[int]) -> None:
+        """
+        Invalidate cached contexts locally and in Redis.
+
+        Args:
+            telegram_ids: Telegram user IDs
+        """
+        telegram_ids = list(telegram_ids)
+        self.invalidate_local(telegram_ids)
+
+        if self.redis_client and telegram_ids:
+            try:
+                await self.redis_client.delete(
+                    *(f"{REDIS_KEY_PREFIX}{tid}" for tid in telegram_ids)
+                )
+            except Exception as e:
+                logger.warning(f"User context Redis invalidation failed: {e}")
+
+    def _put_local(self, telegram_id: int, context: UserContext) -> None:
+        """Store context in the local LRU."""
+        self._local[telegram_id] = (
+            time.monotonic() + self.local_ttl,
+            context,
+        )
+        self._local.move_to_end(telegram_id)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries above max_size."""
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    @staticmethod
+    async def _load(session: AsyncSession, telegram_id: int) -> UserContext:
+        """Load user, blacklist entry and admin id in one query."""
+        user = (
+            select(User.id, User.is_banned, User.language)
+            .where(User.telegram_id == telegram_id)
+            .subquery()
+        )
+        # Blacklist may hold several rows per user - prefer the active one
+        blacklist = (
+            select(Blacklist.id, Blacklist.action_type, Blacklist.is_active)
+            .where(Blacklist.telegram_id == telegram_id)
+            .order_by(Blacklist.is_active.desc(), Blacklist.id.desc())
+            .limit(1)
+            .subquery()
+        )
+        admin = (
+            select(Admin.id)
+            .where(Admin.telegram_id == telegram_id)
+            .subquery()
+        )
+        anchor = select(literal(1).label("one")).subquery()
+
+        stmt = (
+            select(
+                user.c.id.label("user_id"),
+                user.c.is_banned,
+                user.c.language,
+                blacklist.c.id.label("blacklist_id"),
+                blacklist.c.action_type,
+                blacklist.c.is_active,
+                admin.c.id.label("admin_id"),
+            )
+            .select_from(anchor)
+            .outerjoin(user, true())
+            .outerjoin(blacklist, true())
+            .outerjoin(admin, true())
+        )
+        row = (await session.execute(stmt)).one()
+
+        return UserContext(
+            telegram_id=telegram_id,
+            user_id=row.user_id,
+            is_banned=bool(row.is_banned),
+            language=row.language,
+            blacklist_id=row.blacklist_id,
+            blacklist_action_type=row.action_type,
+            blacklist_is_active=bool(row.is_active),
+            admin_id=row.admin_id,
+        )
+
+
+def _changed_telegram_ids(
+    new: Iterable[Any], dirty: Iterable[Any], deleted: Iterable[Any]
+) -> set[int]:
+    """Telegram IDs whose cached context is affected by a flush."""
+    telegram_ids: set[int] = set()
+
+    for obj in [*new, *deleted]:
+        if isinstance(obj, User | Blacklist | Admin) and obj.telegram_id:
+            telegram_ids.add(obj.telegram_id)
+
+    for obj in dirty:
+        if isinstance(obj, Blacklist | Admin):
+            changed = True
+        elif isinstance(obj, User):
+            attrs = inspect(obj).attrs
+            changed = any(
+                attrs[name].history.has_changes()
+                for name in USER_CONTEXT_FIELDS
+            )
+        else:
+            continue
+
+        if changed and obj.telegram_id:
+            telegram_ids.add(obj.telegram_id)
+
+    return telegram_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_contexts(session: Session, flush_context: Any) -> None:
+    """Remember telegram IDs written in this transaction."""
+    telegram_ids = _changed_telegram_ids(
+        session.new, session.dirty, session.deleted
+    )
+    if telegram_ids:
+        session.info.setdefault(DIRTY_KEY, set()).update(telegram_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_contexts(session: Session) -> None:
+    """Invalidate contexts once the write is committed."""
+    telegram_ids = session.info.pop(DIRTY_KEY, None)
+    if not telegram_ids:
+        return
+
+    cache = get_user_context_cache()
+    cache.invalidate_local(telegram_ids)
+    try:
+        asyncio.get_running_loop().create_task(cache.invalidate(telegram_ids))
+    except RuntimeError:
+        # No running loop (sync scripts) - local invalidation only
+        pass
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_dirty_contexts(session: Session) -> None:
+    """Forget telegram IDs of a rolled back transaction."""
+    session.info.pop(DIRTY_KEY, None)
+
+
+# Singleton instance
+_user_context_cache: UserContextCache | None = None
+
+
+def get_user_context_cache() -> UserContextCache:
+    """Get user context cache (LRU only until init with Redis)."""
+    global _user_context_cache
+    if _user_context_cache is None:
+        _user_context_cache = UserContextCache()
+    return _user_context_cache
+
+
+def init_user_context_cache(redis_client: Any | None) -> UserContextCache:
+    """Initialize user context cache with a Redis client."""
+    global _user_context_cache
+    _user_context_cache = UserContextCache(redis_client=redis_client)
+    return _user_context_cache
@@ -35,7 +35,10 @@ class UserMessageLogService:
         user_id: int | None = None,
     ) -> UserMessageLog:
         """
-        Log user message and cleanup old messages.
+        Log user message.
+
+        Bot updates go through MessageLogSink instead; old messages are
+        trimmed by the periodic message log trim task.
 
         Args:
             telegram_id: Telegram user ID
@@ -45,32 +48,12 @@ class UserMessageLogService:
         Returns:
             Created UserMessageLog
         """
-        # Create log entry
-        log = await self.repo.create(
+        return await self.repo.create(
             telegram_id=telegram_id,
             message_text=message_text,
             user_id=user_id,
         )
 
-        # Cleanup old messages (keep last 500)
-        try:
-            deleted_count = await self.repo.cleanup_old_messages(
-                telegram_id=telegram_id,
-                keep_last=self.MAX_MESSAGES_PER_USER,
-            )
-            if deleted_count > 0:
-                logger.debug(
-                    f"Cleaned up {deleted_count} old messages "
-                    f"for user {telegram_id}"
-                )
-        except Exception as e:
-            logger.warning(
-                f"Failed to cleanup old messages for user {telegram_id}: {e}"
-            )
-            # Don't fail if cleanup fails
-
-        return log
-
     async def get_user_messages(
         self,
         telegram_id: int,
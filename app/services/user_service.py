@@ -297,9 +297,13 @@ class UserService:
         Returns:
             Tuple (success, error_message). Error is None if success.
         """
-        import bcrypt
         from datetime import UTC, datetime, timedelta
 
+        from app.services.password_hasher import (
+            PasswordHasherBusyError,
+            get_password_hasher,
+        )
+
         user = await self.user_repo.get_by_id(user_id)
         if not user:
             return False, "Пользователь не найден"
@@ -321,11 +325,13 @@ class UserService:
                 user.finpass_locked_until = None
                 await self.session.commit()
 
-        # Verify password
-        is_valid = bcrypt.checkpw(
-            password.encode(),
-            user.financial_password.encode(),
-        )
+        # Verify password (off the event loop)
+        try:
+            is_valid = await get_password_hasher().verify(
+                password, user.financial_password, key=user_id
+            )
+        except PasswordHasherBusyError:
+            return False, "⏳ Сервис перегружен, попробуйте через минуту"
 
         if is_valid:
             # Reset attempts on success
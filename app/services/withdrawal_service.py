@@ -19,13 +19,15 @@ from app.models.admin_action_escrow import AdminActionEscrow
 from app.models.enums import TransactionStatus, TransactionType
 from app.models.transaction import Transaction
 from app.models.user import User
-from app.models.global_settings import GlobalSettings
 from app.repositories.admin_action_escrow_repository import (
     AdminActionEscrowRepository,
 )
 from app.repositories.deposit_repository import DepositRepository
-from app.repositories.global_settings_repository import GlobalSettingsRepository
 from app.repositories.transaction_repository import TransactionRepository
+from app.services.global_settings_cache import (
+    SettingsSnapshot,
+    get_global_settings_cache,
+)
 
 # R9-2: Maximum retries for race condition conflicts (DO NOT REVERT TO 3)
 MAX_RETRIES = 5
@@ -39,20 +41,19 @@ class WithdrawalService:
         """Initialize withdrawal service."""
         self.session = session
         self.transaction_repo = TransactionRepository(session)
-        self.settings_repo = GlobalSettingsRepository(session)
 
     async def get_min_withdrawal_amount(self) -> Decimal:
         """
         Get minimum withdrawal amount from global settings.
         """
-        settings = await self.settings_repo.get_settings()
-        return settings.min_withdrawal_amount
+        snapshot = await get_global_settings_cache().get(self.session)
+        return snapshot.min_withdrawal_amount
 
     async def _check_auto_withdrawal_eligibility(
         self,
         user_id: int,
         amount: Decimal,
-        settings: GlobalSettings
+        settings: SettingsSnapshot
     ) -> bool:
         """
         Check if withdrawal is eligible for auto-approval.
@@ -116,7 +117,7 @@ class WithdrawalService:
             Tuple of (transaction, error_message, is_auto_approved)
         """
         # Load global settings
-        global_settings = await self.settings_repo.get_settings()
+        global_settings = await get_global_settings_cache().get(self.session)
 
         # R17-3: Check emergency stop (DB flag or static config flag)
         if (
@@ -0,0 +1,46 @@
+"""
+Message Log Trim Task.
+
+Keeps only the newest messages per user in user_message_logs.
+"""
+
+from loguru import logger
+
+from app.config.database import async_session_maker
+from app.config.settings import settings
+from app.repositories.user_message_log_repository import (
+    UserMessageLogRepository,
+)
+
+# Rows deleted per transaction
+TRIM_BATCH_SIZE = 5000
+
+
+async def run_message_log_trim_task() -> None:
+    """
+    Delete messages beyond the per-user limit in bounded batches.
+    """
+    keep_last = settings.message_log_keep_per_user
+    total_deleted = 0
+
+    try:
+        while True:
+            async with async_session_maker() as session:
+                repo = UserMessageLogRepository(session)
+                deleted = await repo.trim_all_users(
+                    keep_last=keep_last, batch_size=TRIM_BATCH_SIZE
+                )
+                await session.commit()
+
+            total_deleted += deleted
+            if deleted < TRIM_BATCH_SIZE:
+                break
+
+        if total_deleted:
+            logger.info(
+                f"Message log trim completed. Deleted {total_deleted} "
+                f"messages beyond {keep_last} per user."
+            )
+
+    except Exception as e:
+        logger.error(f"Message log trim task failed: {e}")
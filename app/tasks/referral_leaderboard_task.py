@@ -0,0 +1,28 @@
+"""
+Referral Leaderboard Task.
+
+Recomputes the materialized referral leaderboard to correct drift from
+changes the incremental upserts do not see (e.g. deleted users).
+"""
+
+from loguru import logger
+
+from app.config.database import async_session_maker
+from app.repositories.referral_leaderboard_repository import (
+    ReferralLeaderboardRepository,
+)
+
+
+async def run_referral_leaderboard_rebuild_task() -> None:
+    """
+    Rebuild the referral leaderboard in one transaction.
+    """
+    try:
+        async with async_session_maker() as session:
+            rows = await ReferralLeaderboardRepository(session).rebuild()
+            await session.commit()
+
+        logger.info(f"Referral leaderboard rebuilt: {rows} referrers")
+
+    except Exception as e:
+        logger.error(f"Referral leaderboard rebuild failed: {e}")
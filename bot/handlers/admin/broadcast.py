@@ -301,7 +301,9 @@ async def execute_broadcast(
     from app.services.broadcast_service import BroadcastService
     
     # Start broadcast in background
-    service = BroadcastService(session, message.bot)
+    service = BroadcastService(
+        session, message.bot, session_factory=data.get("session_factory")
+    )
     broadcast_id = await service.start_broadcast(
         admin_id=admin_id,
         broadcast_data=broadcast_data,
@@ -227,12 +227,10 @@ async def approve_request_action(
         if not user:
             raise ValueError("User not found")
 
-        import bcrypt
-        hashed = bcrypt.hashpw(
-            new_password.encode(),
-            bcrypt.gensalt(rounds=12),
+        from app.services.password_hasher import get_password_hasher
+        user.financial_password = await get_password_hasher().hash(
+            new_password, key=user.id
         )
-        user.financial_password = hashed.decode()
         user.earnings_blocked = True
 
         # Notify user
@@ -345,7 +345,9 @@ async def regenerate_master_key(
     
     # Generate new master key
     plain_master_key = admin_service.generate_master_key()
-    hashed_master_key = admin_service.hash_master_key(plain_master_key)
+    hashed_master_key = await admin_service.hash_master_key(
+        plain_master_key
+    )
     
     # Update admin with new master key
     admin.master_key = hashed_master_key
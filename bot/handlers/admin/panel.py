@@ -3,7 +3,6 @@ Admin Panel Handler
 Handles admin panel main menu and platform statistics
 """
 
-from datetime import UTC
 from typing import Any
 
 from aiogram import F, Router
@@ -877,8 +876,8 @@ async def cmd_export_users(
     **data: Any,
 ) -> None:
     """
-    Export all users to CSV file for admins.
-    Usage: /export
+    Export all users to a CSV (or XLSX) file for admins.
+    Usage: /export [csv|gz|xlsx]
     """
     is_admin = data.get("is_admin", False)
     if not is_admin:
@@ -886,8 +885,15 @@ async def cmd_export_users(
         return
 
     from aiogram.enums import ChatAction
-    from aiogram.types import BufferedInputFile
+    from app.services.export_engine import CSV, XLSX
     from app.services.financial_report_service import FinancialReportService
+    from bot.utils.export_input_file import ExportInputFile
+
+    parts = (message.text or "").split()
+    mode = parts[1].lower() if len(parts) > 1 else CSV
+    if mode not in (CSV, "gz", XLSX):
+        await message.answer("Использование: /export [csv|gz|xlsx]")
+        return
 
     # Send typing indicator
     await message.bot.send_chat_action(
@@ -897,21 +903,21 @@ async def cmd_export_users(
 
     try:
         report_service = FinancialReportService(session)
-        csv_data = await report_service.export_all_users_csv()
-        
-        # Create file
-        file_bytes = csv_data.encode('utf-8-sig')  # BOM for Excel compatibility
-        file = BufferedInputFile(
-            file_bytes,
-            filename=f"users_export_{datetime.now(UTC).strftime('%Y%m%d_%H%M')}.csv"
-        )
-        
-        await message.answer_document(
-            file,
-            caption="📊 *Экспорт пользователей*\n\nФайл содержит данные всех пользователей.",
-            parse_mode="Markdown"
+        export = await report_service.export_all_users(
+            fmt=XLSX if mode == XLSX else CSV,
+            compress=mode == "gz",
         )
-        
+
+        with export:
+            await message.answer_document(
+                ExportInputFile(export),
+                caption=(
+                    "📊 *Экспорт пользователей*\n\n"
+                    f"Файл содержит данные всех пользователей ({export.rows})."
+                ),
+                parse_mode="Markdown"
+            )
+
     except Exception as e:
         logger.error(f"Error exporting users: {e}")
         await message.answer("❌ Ошибка при экспорте пользователей.")
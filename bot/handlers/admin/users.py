@@ -16,8 +16,8 @@ from sqlalchemy import select, desc
 from loguru import logger
 
 from app.models.admin import Admin
-from app.models.user import User
 from app.models.transaction import Transaction
+from app.repositories.user_repository import UserRepository
 from app.services.admin_log_service import AdminLogService
 from app.services.blacklist_service import BlacklistService, BlacklistActionType
 from app.services.user_service import UserService
@@ -206,17 +206,27 @@ async def handle_list_users(
 
     user_service = UserService(session)
     limit = 10
-    offset = (page - 1) * limit
-    
-    # Fetch users sorted by created_at desc
-    stmt = select(User).order_by(desc(User.created_at)).limit(limit).offset(offset)
-    result = await session.execute(stmt)
-    users = result.scalars().all()
-    
+
+    # Keyset pagination (newest first): cursors[i] is the last user ID
+    # shown before page i + 1, so page cost does not grow with depth
+    state_data = await state.get_data()
+    cursors: list[int | None] = state_data.get("user_list_cursors") or [None]
+    if page > len(cursors):
+        page = len(cursors)
+    cursors = cursors[:page]
+
+    users = await UserRepository(session).get_page(
+        after_id=cursors[page - 1], limit=limit, descending=True
+    )
+    if users and len(users) == limit:
+        cursors.append(users[-1].id)
+
     total_users = await user_service.get_total_users()
     total_pages = (total_users + limit - 1) // limit if total_users > 0 else 1
 
-    await state.update_data(current_user_list_page=page)
+    await state.update_data(
+        current_user_list_page=page, user_list_cursors=cursors
+    )
     
     if not users:
         await message.answer(
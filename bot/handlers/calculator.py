@@ -39,14 +39,11 @@ class CalculatorStates(StatesGroup):
 
 async def get_roi_corridor(session: AsyncSession) -> dict:
     """Get ROI corridor settings from global_settings."""
-    from sqlalchemy import select
-    from app.models.global_settings import GlobalSettings
+    from app.services.global_settings_cache import get_global_settings_cache
 
-    stmt = select(GlobalSettings).where(GlobalSettings.id == 1)
-    result = await session.execute(stmt)
-    settings = result.scalar_one_or_none()
+    settings = await get_global_settings_cache().get(session)
 
-    if settings and settings.roi_settings:
+    if settings.roi_settings:
         roi = settings.roi_settings
         return {
             "min": Decimal(roi.get("LEVEL_1_ROI_MIN", "1.0")),
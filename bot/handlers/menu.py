@@ -9,7 +9,7 @@ from typing import Any
 from aiogram import F, Router
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
-from aiogram.types import BufferedInputFile, Message
+from aiogram.types import Message
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -29,6 +29,7 @@ from bot.keyboards.reply import (
 )
 from bot.states.profile_update import ProfileUpdateStates
 from bot.states.registration import RegistrationStates
+from bot.utils.export_input_file import ExportInputFile
 from bot.utils.text_utils import escape_markdown
 from bot.utils.safe_message import safe_answer, safe_send_message, safe_edit_text
 
@@ -642,14 +643,13 @@ async def download_report(
 
     try:
         report_service = ReportService(session)
-        report_bytes = await report_service.generate_user_report(user.id)
+        report = await report_service.generate_user_report(user.id)
 
-        file = BufferedInputFile(report_bytes, filename=f"report_{user.id}.xlsx")
-
-        await message.answer_document(
-            document=file,
-            caption="📊 Ваш полный отчет (профиль, транзакции, депозиты, рефералы)"
-        )
+        with report:
+            await message.answer_document(
+                document=ExportInputFile(report),
+                caption="📊 Ваш полный отчет (профиль, транзакции, депозиты, рефералы)"
+            )
         await status_msg.delete()
     except Exception as e:
         await status_msg.edit_text("❌ Ошибка генерации отчета")
@@ -729,11 +729,20 @@ async def process_password_confirmation(
     wallet_address = state_data.get("wallet_address")
     referrer_telegram_id = state_data.get("referrer_telegram_id")
 
-    # Hash financial password with bcrypt
-    import bcrypt
-    hashed_password = bcrypt.hashpw(
-        password.encode("utf-8"), bcrypt.gensalt(rounds=12)
-    ).decode("utf-8")
+    # Hash financial password with bcrypt (off the event loop)
+    from app.services.password_hasher import (
+        PasswordHasherBusyError,
+        get_password_hasher,
+    )
+    try:
+        hashed_password = await get_password_hasher().hash(
+            password, key=message.from_user.id
+        )
+    except PasswordHasherBusyError:
+        await message.answer(
+            "⏳ Сервис перегружен. Подтвердите пароль ещё раз через минуту."
+        )
+        return
 
     # Normalize wallet address to checksum format
     from app.utils.validation import normalize_bsc_address
@@ -20,10 +20,10 @@ from bot.keyboards.reply import (
     transaction_history_keyboard,
     transaction_history_type_keyboard,
 )
+from bot.utils.export_input_file import ExportInputFile
 from bot.utils.formatters import format_transaction_hash, format_usdt, escape_md
 from bot.utils.safe_message import safe_answer
 from app.services.report_service import ReportService
-from aiogram.types import BufferedInputFile
 from datetime import datetime
 from loguru import logger
 
@@ -392,16 +392,15 @@ async def handle_export_report(
     try:
         report_service = ReportService(session)
         # Generate report
-        report_bytes = await report_service.generate_user_report(user.id)
+        report = await report_service.generate_user_report(user.id)
         
         # Send file
         filename = f"SigmaTrade_Report_{user.telegram_id}_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-        input_file = BufferedInputFile(report_bytes, filename=filename)
-        
-        await message.answer_document(
-            document=input_file,
-            caption="📊 Ваш полный отчет (транзакции, депозиты, рефералы)",
-        )
+        with report:
+            await message.answer_document(
+                document=ExportInputFile(report, filename=filename),
+                caption="📊 Ваш полный отчет (транзакции, депозиты, рефералы)",
+            )
         await wait_msg.delete()
         
     except Exception as e:
@@ -121,13 +121,13 @@ async def start_verification(
     # Hash and save password
     user_service = UserService(session)
 
-    # Import bcrypt hashing
-    import bcrypt
+    # bcrypt hashing runs in the password hasher pool
+    from app.services.password_hasher import get_password_hasher
 
     try:
-        password_hash = bcrypt.hashpw(
-            financial_password.encode("utf-8"), bcrypt.gensalt(rounds=12)
-        ).decode("utf-8")
+        password_hash = await get_password_hasher().hash(
+            financial_password, key=user.id
+        )
 
         # R2-10: Update user with error handling
         try:
@@ -2,6 +2,10 @@
 Bot main entry point.
 
 Initializes and runs the Telegram bot with aiogram 3.x.
+
+BOT_MODE selects how updates arrive: "polling" (default, one process),
+"webhook" (HTTP ingress queueing updates per chat shard in Redis) or
+"worker" (handles one shard; run one process per WEBHOOK_WORKER_SHARD).
 """
 
 import asyncio
@@ -189,6 +193,18 @@ async def main() -> None:  # noqa: C901
         logger.warning(f"Rate limiting disabled: {e}")
     
     dp.update.middleware(DatabaseMiddleware(session_pool=async_session_maker))
+    # Shared user context cache (LRU + Redis) for Auth/Ban middlewares
+    from app.services.user_context_cache import init_user_context_cache
+
+    init_user_context_cache(redis_client)
+    # Versioned GlobalSettings snapshot, invalidated over Redis pub/sub
+    from app.services.global_settings_cache import init_global_settings_cache
+
+    init_global_settings_cache(redis_client)
+    # Admin sessions validated from Redis (DB fallback without Redis)
+    from app.services.admin_session_store import init_admin_session_store
+
+    init_admin_session_store(redis_client)
     # Add Redis client to data for handlers that need it
     if redis_client:
         dp.update.middleware(RedisMiddleware(redis_client=redis_client))
@@ -377,6 +393,11 @@ async def main() -> None:  # noqa: C901
     # Debug handler (MUST BE LAST to catch unhandled messages)
     from bot.handlers import debug_unhandled
     dp.include_router(debug_unhandled.router)
+
+    # Button texts resolve to their handlers via an index built from the
+    # routers above (must be registered after all routers are included)
+    from bot.middlewares.text_dispatch import TextDispatchMiddleware
+    dp.message.outer_middleware(TextDispatchMiddleware(dp))
     
     # Test bot connection
     try:
@@ -394,36 +415,78 @@ async def main() -> None:  # noqa: C901
         logger.error(f"Failed to connect to Telegram API: {e}")
         raise
 
-    # Initialize default super admin (after bot connection is established)
-    logger.info("Initializing default super admin...")
-    try:
-        async with async_session_maker() as session:
-            await ensure_default_super_admin(session, bot=bot)
-        logger.info("Default super admin initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize default super admin: {e}")
-        logger.warning(
-            "Bot will continue, but admin may need to be created manually"
-        )
+    # Webhook ingress and shard workers exchange updates over Redis
+    update_queue = None
+    if settings.bot_mode != "polling":
+        if not redis_client:
+            raise RuntimeError(
+                f"BOT_MODE={settings.bot_mode} requires Redis"
+            )
+        from bot.webhook import UpdateQueue
+
+        update_queue = UpdateQueue(redis_client)
+
+    # One-time startup work runs in the polling/ingress process only
+    if settings.bot_mode != "worker":
+        # Initialize default super admin (after bot connection is established)
+        logger.info("Initializing default super admin...")
+        try:
+            async with async_session_maker() as session:
+                await ensure_default_super_admin(session, bot=bot)
+            logger.info("Default super admin initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize default super admin: {e}")
+            logger.warning(
+                "Bot will continue, but admin may need to be created manually"
+            )
+
+        # Resume broadcasts interrupted by a restart
+        try:
+            from app.services.broadcast_service import BroadcastService
+
+            resumed = await BroadcastService(
+                None, bot, session_factory=async_session_maker
+            ).resume_unfinished()
+            if resumed:
+                logger.info(f"Resumed {resumed} unfinished broadcast(s)")
+        except Exception as e:
+            logger.warning(f"Failed to resume broadcasts: {e}")
 
     # Start polling
     logger.info("Bot started successfully")
 
-    # Start health check server in background
-    try:
-        from app.http_health_server import run_health_server
+    # Start health check server (and webhook endpoint) in background;
+    # shard workers share hosts, so they do not bind the port
+    if settings.bot_mode != "worker":
+        try:
+            from app.http_health_server import (
+                create_health_app,
+                run_health_server,
+            )
 
-        asyncio.create_task(
-            run_health_server(
-                host="0.0.0.0",
-                port=settings.health_check_port or 8080,
+            http_app = create_health_app()
+            if update_queue is not None:
+                from bot.webhook import create_webhook_handler
+
+                http_app.router.add_post(
+                    settings.webhook_path,
+                    create_webhook_handler(
+                        update_queue, settings.webhook_secret
+                    ),
+                )
+
+            asyncio.create_task(
+                run_health_server(
+                    host="0.0.0.0",
+                    port=settings.health_check_port or 8080,
+                    app=http_app,
+                )
             )
-        )
-        logger.info(
-            f"Health check server started on port {settings.health_check_port or 8080}"
-        )
-    except Exception as e:
-        logger.warning(f"Failed to start health check server: {e}")
+            logger.info(
+                f"Health check server started on port {settings.health_check_port or 8080}"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to start health check server: {e}")
 
     # Graceful shutdown handler
     shutdown_event = asyncio.Event()
@@ -442,6 +505,39 @@ async def main() -> None:  # noqa: C901
         except Exception as e:
             logger.warning(f"Error stopping scheduler: {e}")
         
+        # Write out buffered message logs before the engine goes away
+        try:
+            from app.services.message_log_sink import get_message_log_sink
+
+            await get_message_log_sink().stop()
+        except Exception as e:
+            logger.warning(f"Error flushing message logs: {e}")
+
+        try:
+            from app.services.admin_session_store import (
+                get_admin_session_store,
+            )
+
+            await get_admin_session_store().stop()
+        except Exception as e:
+            logger.warning(f"Error flushing admin session activity: {e}")
+
+        try:
+            from app.services.password_hasher import get_password_hasher
+
+            get_password_hasher().shutdown()
+        except Exception as e:
+            logger.warning(f"Error stopping password hasher pool: {e}")
+
+        try:
+            from app.services.global_settings_cache import (
+                get_global_settings_cache,
+            )
+
+            await get_global_settings_cache().stop_listener()
+        except Exception as e:
+            logger.warning(f"Error stopping settings listener: {e}")
+
         # Close database connections
         try:
             from app.config.database import engine
@@ -453,12 +549,36 @@ async def main() -> None:  # noqa: C901
         logger.info("Graceful shutdown complete")
 
     try:
-        logger.info("Starting polling...")
-        await dp.start_polling(
-            bot, allowed_updates=dp.resolve_used_update_types()
-        )
+        if settings.bot_mode == "webhook":
+            webhook_url = settings.webhook_url.rstrip("/") + (
+                settings.webhook_path
+            )
+            logger.info(f"Setting webhook to {webhook_url}")
+            await bot.set_webhook(
+                url=webhook_url,
+                secret_token=settings.webhook_secret,
+                allowed_updates=dp.resolve_used_update_types(),
+            )
+            # Updates are queued by the HTTP handler until shutdown
+            await asyncio.Event().wait()
+        elif settings.bot_mode == "worker":
+            from bot.webhook import ShardWorker
+
+            await dp.emit_startup(bot=bot)
+            try:
+                await ShardWorker(dp, bot, update_queue).run()
+            finally:
+                # Closes the FSM storage like start_polling does
+                await dp.emit_shutdown(bot=bot)
+        else:
+            logger.info("Starting polling...")
+            # getUpdates is rejected while a webhook is set
+            await bot.delete_webhook()
+            await dp.start_polling(
+                bot, allowed_updates=dp.resolve_used_update_types()
+            )
     except Exception as e:
-        logger.exception(f"Polling error: {e}")
+        logger.exception(f"Update loop error ({settings.bot_mode}): {e}")
         raise
     finally:
         await shutdown_handler()
@@ -73,11 +73,13 @@ class AdminAuthMiddleware(BaseMiddleware):
             # Not an admin, skip middleware
             return await handler(event, data)
 
-        # Get admin from database
+        # Admin resolved by AuthMiddleware (identity cache), DB otherwise
         admin_service = AdminService(session)
-        admin = await admin_service.get_admin_by_telegram_id(
-            telegram_user.id
-        )
+        admin = data.get("admin")
+        if admin is None:
+            admin = await admin_service.get_admin_by_telegram_id(
+                telegram_user.id
+            )
 
         if not admin:
             # Security: If marked as admin but not in DB - block access
@@ -12,8 +12,13 @@ from aiogram.types import CallbackQuery, Message, TelegramObject
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.admin import Admin
 from app.models.user import User
-from app.repositories.user_repository import UserRepository
+from app.services.admin_identity_cache import get_admin_identity_cache
+from app.services.user_context_cache import (
+    UserContext,
+    get_user_context_cache,
+)
 
 
 class AuthMiddleware(BaseMiddleware):
@@ -90,10 +95,10 @@ class AuthMiddleware(BaseMiddleware):
             f"AuthMiddleware: Processing event for user {telegram_user.id}"
         )
 
-        # Load user from database
-        user_repo = UserRepository(session)
-        users = await user_repo.find_by(telegram_id=telegram_user.id)
-        user: User | None = users[0] if users else None
+        context, user, admin = await self._load_identity(
+            session, telegram_user.id
+        )
+        data["user_context"] = context
 
         # Do NOT auto-create user - registration must be explicit
         # If user not found, set user=None to allow registration flow
@@ -117,10 +122,6 @@ class AuthMiddleware(BaseMiddleware):
         # Admin check: check Admin table first (authoritative source)
         # This works even if user=None (admin can exist before user registration)
         is_admin = False
-        from app.repositories.admin_repository import AdminRepository
-
-        admin_repo = AdminRepository(session)
-        admin = await admin_repo.get_by_telegram_id(telegram_user.id)
         if admin is not None:
             # R10-3: Check if admin is blocked
             if admin.is_blocked:
@@ -153,3 +154,36 @@ class AuthMiddleware(BaseMiddleware):
 
         # Call next handler
         return await handler(event, data)
+
+    @staticmethod
+    async def _load_identity(
+        session: AsyncSession, telegram_id: int
+    ) -> tuple[UserContext, User | None, Admin | None]:
+        """
+        Load the user and admin of a Telegram user.
+
+        IDs are resolved from the shared context cache (one query on
+        miss); the user is loaded by primary key and the admin from the
+        admin identity cache.
+
+        Args:
+            session: Database session
+            telegram_id: Telegram user ID
+
+        Returns:
+            Tuple of (context, user or None, admin or None)
+        """
+        context = await get_user_context_cache().get_or_load(
+            session, telegram_id
+        )
+
+        user: User | None = None
+        if context.user_id:
+            user = await session.get(User, context.user_id)
+
+        admin: Admin | None = None
+        if context.admin_id:
+            admin = await get_admin_identity_cache().get(
+                session, context.admin_id
+            )
+        return context, user, admin
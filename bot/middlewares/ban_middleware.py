@@ -48,26 +48,22 @@ class BanMiddleware(BaseMiddleware):
         # Check if user is banned or blacklisted
         # (import here to avoid circular dependency)
         from app.models.blacklist import Blacklist, BlacklistActionType
-        from app.models.user import User as DbUser
-        from sqlalchemy import select
-
-        # Single query with LEFT JOIN to get both user and blacklist
-        stmt = (
-            select(DbUser, Blacklist)
-            .outerjoin(Blacklist, DbUser.telegram_id == Blacklist.telegram_id)
-            .where(DbUser.telegram_id == user.id)
-        )
-        result = await session.execute(stmt)
-        row = result.one_or_none()
-
-        if row:
-            db_user, blacklist_entry = row
-        else:
-            # User not registered, check blacklist separately
-            stmt_blacklist = select(Blacklist).where(Blacklist.telegram_id == user.id)
-            result_blacklist = await session.execute(stmt_blacklist)
-            blacklist_entry = result_blacklist.scalar_one_or_none()
-            db_user = None
+        from app.services.user_context_cache import get_user_context_cache
+
+        # Ban state comes from the shared user context (set by
+        # AuthMiddleware or loaded here); no DB query on cache hit
+        context = data.get("user_context")
+        if context is None or context.telegram_id != user.id:
+            context = await get_user_context_cache().get_or_load(
+                session, user.id
+            )
+
+        # Only users with a blacklist record need the ORM entry
+        blacklist_entry = None
+        if context.blacklist_id:
+            blacklist_entry = await session.get(
+                Blacklist, context.blacklist_id
+            )
 
         # Pass blacklist_entry to handlers to avoid repeated queries
         data["blacklist_entry"] = blacklist_entry
@@ -128,7 +124,7 @@ class BanMiddleware(BaseMiddleware):
                 return None
 
         # Check if user is banned (legacy is_banned flag)
-        if db_user and db_user.is_banned:
+        if context.user_id and context.is_banned:
             logger.info(f"Banned user attempted to use bot: {user.id}")
             # Check if user is blocked (can appeal) or terminated (cannot)
             if (
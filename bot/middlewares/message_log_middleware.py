@@ -2,6 +2,8 @@
 Message Log Middleware.
 
 Logs all text messages from users to database for admin monitoring.
+Messages are handed to the background MessageLogSink, so logging does
+not add DB work to the update's transaction.
 """
 
 from collections.abc import Awaitable, Callable
@@ -10,9 +12,8 @@ from typing import Any
 from aiogram import BaseMiddleware
 from aiogram.types import Message, TelegramObject
 from loguru import logger
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.user_message_log_service import UserMessageLogService
+from app.services.message_log_sink import get_message_log_sink
 
 
 class MessageLogMiddleware(BaseMiddleware):
@@ -20,7 +21,7 @@ class MessageLogMiddleware(BaseMiddleware):
     Message log middleware.
 
     Logs all text messages (not buttons/callbacks) to database.
-    Keeps last 500 messages per user.
+    Keeps last 500 messages per user (trimmed by a periodic task).
     """
 
     async def __call__(
@@ -39,30 +40,23 @@ class MessageLogMiddleware(BaseMiddleware):
                     event.from_user.id if event.from_user else None
                 )
                 if telegram_id:
-                    session: AsyncSession | None = data.get("session")
-                    if session:
-                        try:
-                            # Get user_id from data if available
-                            user = data.get("user")
-                            user_id = user.id if user else None
-
-                            # Log message
-                            service = UserMessageLogService(session)
-                            await service.log_message(
-                                telegram_id=telegram_id,
-                                message_text=event.text,
-                                user_id=user_id,
-                            )
-                            logger.debug(
-                                f"Logged message from user {telegram_id}"
-                            )
-                        except Exception as e:
-                            # Don't fail if logging fails
-                            logger.warning(
-                                f"Failed to log message from user "
-                                f"{telegram_id}: {e}"
-                            )
+                    try:
+                        # Get user_id from data if available
+                        user = data.get("user")
+                        user_id = user.id if user else None
+
+                        # Buffer message (written in background batches)
+                        get_message_log_sink().enqueue(
+                            telegram_id=telegram_id,
+                            message_text=event.text,
+                            user_id=user_id,
+                        )
+                    except Exception as e:
+                        # Don't fail if logging fails
+                        logger.warning(
+                            f"Failed to log message from user "
+                            f"{telegram_id}: {e}"
+                        )
 
         # Continue processing
         return await handler(event, data)
-
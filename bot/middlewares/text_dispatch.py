@@ -0,0 +1,261 @@
+"""
+Exact-text dispatch middleware.
+
+Reply keyboard buttons are matched by `F.text == "..."` /
+`F.text.in_(...)` filters spread over many routers, so every text
+message is checked against the handlers of each router in turn. At
+startup this middleware indexes, per exact button text, the handlers
+that can match it, in router resolution order. A button press (text in
+the index) is then dispatched to those few handlers directly; free text
+goes through the normal router chain.
+
+Handlers whose filters the index cannot read (regexp, custom filters,
+no text filter) stay candidates for every text, and state filters are
+resolved per FSM state, so the first handler that matches is the same
+one the router chain would pick.
+"""
+
+import operator
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from inspect import isclass
+from typing import Any
+
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import FilterObject, HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters import StateFilter
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import Message, TelegramObject
+from loguru import logger
+from magic_filter.operations import (
+    ComparatorOperation,
+    FunctionOperation,
+    GetAttributeOperation,
+)
+from magic_filter.util import in_op
+
+# Sentinel: filter does not constrain texts/states
+ANY = None
+
+
+@dataclass(frozen=True)
+class IndexedHandler:
+    """Message handler with the texts and states it can match."""
+
+    router: Router
+    observer: TelegramEventObserver
+    handler: HandlerObject
+    texts: frozenset[str] | None
+    states: frozenset[str | None] | None
+
+
+def _filter_texts(filter_: FilterObject) -> frozenset[str] | None:
+    """Texts an exact F.text filter accepts (None if not such a filter)."""
+    magic = filter_.magic
+    if magic is None or len(magic._operations) != 2:
+        return ANY
+
+    attribute, check = magic._operations
+    if not (
+        isinstance(attribute, GetAttributeOperation)
+        and attribute.name == "text"
+    ):
+        return ANY
+
+    if (
+        isinstance(check, ComparatorOperation)
+        and check.comparator is operator.eq
+        and isinstance(check.right, str)
+    ):
+        return frozenset({check.right})
+    if (
+        isinstance(check, FunctionOperation)
+        and check.function is in_op
+        and len(check.args) == 1
+        and all(isinstance(text, str) for text in check.args[0])
+    ):
+        return frozenset(check.args[0])
+    return ANY
+
+
+def _filter_states(filter_: FilterObject) -> frozenset[str | None] | None:
+    """FSM states a state filter accepts (None if any/not a state filter)."""
+    callback = filter_.callback
+    if isinstance(callback, StateFilter):
+        allowed = callback.states
+    elif isinstance(callback, State | StatesGroup) or (
+        isclass(callback) and issubclass(callback, StatesGroup)
+    ):
+        allowed = (callback,)
+    else:
+        return ANY
+
+    states: set[str | None] = set()
+    for state in allowed:
+        if isinstance(state, StatesGroup):
+            state = type(state)
+        if isclass(state) and issubclass(state, StatesGroup):
+            states.update(state.__all_states_names__)
+            continue
+        if isinstance(state, State):
+            state = state.state
+        if state == "*":
+            return ANY
+        states.add(state)
+    return frozenset(states)
+
+
+def _intersect(
+    current: frozenset | None, constraint: frozenset | None
+) -> frozenset | None:
+    """Combine two constraints of one handler (all filters must pass)."""
+    if constraint is ANY:
+        return current
+    if current is ANY:
+        return constraint
+    return current & constraint
+
+
+class TextDispatchMiddleware(BaseMiddleware):
+    """
+    Outer message middleware dispatching button texts via an index.
+
+    Register on the dispatcher's message observer after all routers are
+    included. Routers with their own message filters or outer
+    middlewares would be bypassed, so the index is disabled if any are
+    found.
+    """
+
+    def __init__(self, root: Router) -> None:
+        """
+        Build the index from the routers included in root.
+
+        Args:
+            root: Dispatcher (or root router)
+        """
+        self._handlers = self._collect(root)
+        self._by_text: dict[str, tuple[IndexedHandler, ...]] = {}
+        # (text, raw_state) -> candidates
+        self._resolved: dict[
+            tuple[str, str | None], tuple[IndexedHandler, ...]
+        ] = {}
+
+        if self._handlers is None:
+            logger.warning(
+                "Text dispatch index disabled: routers with message "
+                "filters or outer middlewares"
+            )
+            return
+
+        texts = set().union(
+            *(h.texts for h in self._handlers if h.texts is not ANY)
+        )
+        for text in texts:
+            self._by_text[text] = tuple(
+                h
+                for h in self._handlers
+                if h.texts is ANY or text in h.texts
+            )
+        logger.info(
+            f"Text dispatch index: {len(self._by_text)} texts, "
+            f"{len(self._handlers)} message handlers"
+        )
+
+    @staticmethod
+    def _collect(root: Router) -> list[IndexedHandler] | None:
+        """Message handlers of all routers in resolution order."""
+        handlers: list[IndexedHandler] = []
+        stack = [root]
+        while stack:
+            router = stack.pop()
+            observer = router.message
+            if observer._handler.filters or (
+                router is not root and observer.outer_middleware
+            ):
+                return None
+
+            for handler in observer.handlers:
+                texts = states = ANY
+                for filter_ in handler.filters or ():
+                    texts = _intersect(texts, _filter_texts(filter_))
+                    states = _intersect(states, _filter_states(filter_))
+                handlers.append(
+                    IndexedHandler(router, observer, handler, texts, states)
+                )
+            # Depth-first, own handlers before sub routers
+            stack.extend(reversed(router.sub_routers))
+        return handlers
+
+    def candidates(
+        self, text: str, raw_state: str | None
+    ) -> tuple[IndexedHandler, ...] | None:
+        """
+        Handlers that can match a text in a state.
+
+        Args:
+            text: Message text
+            raw_state: Current FSM state
+
+        Returns:
+            Candidates in resolution order, or None for unindexed text
+        """
+        key = (text, raw_state)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            by_text = self._by_text.get(text)
+            if by_text is None:
+                return None
+            resolved = tuple(
+                h
+                for h in by_text
+                if h.states is ANY or raw_state in h.states
+            )
+            self._resolved[key] = resolved
+        return resolved
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """
+        Dispatch indexed texts directly, everything else via routers.
+
+        Args:
+            handler: Router chain
+            event: Message
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        candidates = None
+        if isinstance(event, Message) and event.text:
+            candidates = self.candidates(event.text, data.get("raw_state"))
+        if candidates is None:
+            return await handler(event, data)
+
+        # Same steps as Router.propagate_event + observer.trigger
+        for indexed in candidates:
+            kwargs = {
+                **data,
+                "event_router": indexed.router,
+                "handler": indexed.handler,
+            }
+            result, extra = await indexed.handler.check(event, **kwargs)
+            if not result:
+                continue
+            kwargs.update(extra)
+            observer = indexed.observer
+            wrapped = observer.outer_middleware.wrap_middlewares(
+                observer._resolve_middlewares(), indexed.handler.call
+            )
+            try:
+                return await wrapped(event, kwargs)
+            except SkipHandler:
+                continue
+
+        return UNHANDLED
@@ -3,19 +3,41 @@ PostgreSQL FSM storage for aiogram.
 
 R11-3: Custom FSM storage using PostgreSQL when Redis is unavailable.
 Stores FSM states in user_fsm_states table.
+
+Records are keyed by (chat_id, user_id) of the storage key, so no users
+lookup is needed. Reads are served from a per-process LRU after the
+first load. Writes update the LRU and are written behind: all state and
+data changes of a key within `fsm_write_delay_ms` (e.g. set_state +
+update_data of one handler) become a single INSERT ... ON CONFLICT DO
+UPDATE.
 """
 
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
 from typing import Any
 
 from aiogram.fsm.state import State
 from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
 from loguru import logger
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
 
 from app.config.database import async_session_maker
+from app.config.settings import settings
 from app.models.user_fsm_state import UserFsmState
-from app.repositories.user_repository import UserRepository
+
+# (chat_id, telegram user_id)
+RecordKey = tuple[int, int]
+
+
+@dataclass
+class FsmRecord:
+    """State and data of one FSM key."""
+
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
 
 
 class PostgreSQLFSMStorage(BaseStorage):
@@ -26,13 +48,38 @@ class PostgreSQLFSMStorage(BaseStorage):
     Uses user_fsm_states table to persist states across restarts.
     """
 
-    def __init__(self) -> None:
-        """Initialize PostgreSQL FSM storage."""
-        self._session_factory = async_session_maker
+    def __init__(
+        self,
+        session_factory: Any | None = None,
+        cache_size: int | None = None,
+        write_delay: float | None = None,
+    ) -> None:
+        """
+        Initialize PostgreSQL FSM storage.
+
+        Args:
+            session_factory: Async session factory
+            cache_size: Max records in the process LRU
+            write_delay: Seconds writes of a key are coalesced
+        """
+        self._session_factory = session_factory or async_session_maker
+        self.cache_size = cache_size or settings.fsm_cache_size
+        self.write_delay = (
+            write_delay
+            if write_delay is not None
+            else settings.fsm_write_delay_ms / 1000
+        )
+        self._cache: OrderedDict[RecordKey, FsmRecord] = OrderedDict()
+        # Records changed but not yet written (never evicted)
+        self._pending: dict[RecordKey, FsmRecord] = {}
+        self._flushes: dict[RecordKey, asyncio.Task] = {}
+        # Set on close: scheduled writes stop waiting
+        self._closing = asyncio.Event()
 
     async def close(self) -> None:
-        """Close storage (no-op for PostgreSQL)."""
-        pass
+        """Write all pending records."""
+        self._closing.set()
+        await asyncio.gather(*self._flushes.values(), return_exceptions=True)
 
     async def set_state(
         self,
@@ -46,55 +93,9 @@ class PostgreSQLFSMStorage(BaseStorage):
             key: Storage key (contains chat_id, user_id, etc.)
             state: State to set (None to clear)
         """
-        try:
-            async with self._session_factory() as session:
-                user_repo = UserRepository(session)
-                user = await user_repo.get_by_telegram_id(key.user_id)
-
-                if not user:
-                    logger.warning(
-                        f"R11-3: Cannot set FSM state for unknown user {key.user_id}"
-                    )
-                    return
-
-                # Get or create FSM state record
-                stmt = select(UserFsmState).where(
-                    UserFsmState.user_id == user.id
-                )
-                result = await session.execute(stmt)
-                fsm_state = result.scalar_one_or_none()
-
-                state_str = (
-                    state.state
-                    if isinstance(state, State)
-                    else str(state)
-                    if state
-                    else None
-                )
-
-                if fsm_state:
-                    # Update existing
-                    fsm_state.state = state_str
-                    await session.flush()
-                else:
-                    # Create new
-                    fsm_state = UserFsmState(
-                        user_id=user.id,
-                        state=state_str,
-                    )
-                    session.add(fsm_state)
-                    await session.flush()
-
-                await session.commit()
-                logger.debug(
-                    f"R11-3: Set FSM state for user {key.user_id}: {state_str}"
-                )
-
-        except Exception as e:
-            logger.error(
-                f"R11-3: Failed to set FSM state for user {key.user_id}: {e}",
-                exc_info=True,
-            )
+        record = await self._get_record(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._schedule_write(key, record)
 
     async def get_state(
         self,
@@ -109,31 +110,7 @@ class PostgreSQLFSMStorage(BaseStorage):
         Returns:
             State string or None
         """
-        try:
-            async with self._session_factory() as session:
-                user_repo = UserRepository(session)
-                user = await user_repo.get_by_telegram_id(key.user_id)
-
-                if not user:
-                    return None
-
-                stmt = select(UserFsmState).where(
-                    UserFsmState.user_id == user.id
-                )
-                result = await session.execute(stmt)
-                fsm_state = result.scalar_one_or_none()
-
-                if fsm_state and fsm_state.state:
-                    return fsm_state.state
-
-                return None
-
-        except Exception as e:
-            logger.error(
-                f"R11-3: Failed to get FSM state for user {key.user_id}: {e}",
-                exc_info=True,
-            )
-            return None
+        return (await self._get_record(key)).state
 
     async def set_data(
         self,
@@ -141,56 +118,15 @@ class PostgreSQLFSMStorage(BaseStorage):
         data: dict[str, Any],
     ) -> None:
         """
-        Set FSM data for user.
+        Set FSM data for user (replace).
 
         Args:
             key: Storage key
             data: Data dictionary
         """
-        try:
-            async with self._session_factory() as session:
-                user_repo = UserRepository(session)
-                user = await user_repo.get_by_telegram_id(key.user_id)
-
-                if not user:
-                    logger.warning(
-                        f"R11-3: Cannot set FSM data for unknown user {key.user_id}"
-                    )
-                    return
-
-                # Get or create FSM state record
-                stmt = select(UserFsmState).where(
-                    UserFsmState.user_id == user.id
-                )
-                result = await session.execute(stmt)
-                fsm_state = result.scalar_one_or_none()
-
-                if fsm_state:
-                    # Update existing
-                    if fsm_state.data:
-                        fsm_state.data.update(data)
-                    else:
-                        fsm_state.data = data
-                    await session.flush()
-                else:
-                    # Create new
-                    fsm_state = UserFsmState(
-                        user_id=user.id,
-                        data=data,
-                    )
-                    session.add(fsm_state)
-                    await session.flush()
-
-                await session.commit()
-                logger.debug(
-                    f"R11-3: Set FSM data for user {key.user_id}: {len(data)} keys"
-                )
-
-        except Exception as e:
-            logger.error(
-                f"R11-3: Failed to set FSM data for user {key.user_id}: {e}",
-                exc_info=True,
-            )
+        record = await self._get_record(key)
+        record.data = data.copy()
+        self._schedule_write(key, record)
 
     async def get_data(
         self,
@@ -203,88 +139,115 @@ class PostgreSQLFSMStorage(BaseStorage):
             key: Storage key
 
         Returns:
-            Data dictionary
+            Data dictionary (a copy)
         """
+        return (await self._get_record(key)).data.copy()
+
+    async def _get_record(self, key: StorageKey) -> FsmRecord:
+        """Get the record of a key from pending writes, LRU or DB."""
+        record_key = (key.chat_id, key.user_id)
+
+        record = self._pending.get(record_key)
+        if record is None:
+            record = self._cache.get(record_key)
+        if record is None:
+            record = await self._load(record_key)
+
+        self._cache[record_key] = record
+        self._cache.move_to_end(record_key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return record
+
+    async def _load(self, record_key: RecordKey) -> FsmRecord:
+        """Load a record (empty if missing or on DB error)."""
+        chat_id, telegram_id = record_key
         try:
             async with self._session_factory() as session:
-                user_repo = UserRepository(session)
-                user = await user_repo.get_by_telegram_id(key.user_id)
-
-                if not user:
-                    return {}
-
-                stmt = select(UserFsmState).where(
-                    UserFsmState.user_id == user.id
+                result = await session.execute(
+                    select(UserFsmState.state, UserFsmState.data).where(
+                        UserFsmState.chat_id == chat_id,
+                        UserFsmState.telegram_id == telegram_id,
+                    )
                 )
-                result = await session.execute(stmt)
-                fsm_state = result.scalar_one_or_none()
-
-                if fsm_state and fsm_state.data:
-                    return fsm_state.data
-
-                return {}
-
+                row = result.first()
         except Exception as e:
             logger.error(
-                f"R11-3: Failed to get FSM data for user {key.user_id}: {e}",
+                f"R11-3: Failed to load FSM state for user {telegram_id}: {e}",
                 exc_info=True,
             )
-            return {}
+            return FsmRecord()
 
-    async def update_data(
-        self,
-        key: StorageKey,
-        data: dict[str, Any],
-    ) -> None:
-        """
-        Update FSM data for user (merge with existing).
+        if row is None:
+            return FsmRecord()
+        return FsmRecord(state=row.state, data=dict(row.data or {}))
 
-        Args:
-            key: Storage key
-            data: Data dictionary to merge
-        """
-        try:
-            async with self._session_factory() as session:
-                user_repo = UserRepository(session)
-                user = await user_repo.get_by_telegram_id(key.user_id)
+    def _schedule_write(self, key: StorageKey, record: FsmRecord) -> None:
+        """Mark a record changed and make sure a write is scheduled."""
+        record_key = (key.chat_id, key.user_id)
+        self._pending[record_key] = record
 
-                if not user:
-                    logger.warning(
-                        f"R11-3: Cannot update FSM data for unknown user {key.user_id}"
-                    )
-                    return
+        if record_key not in self._flushes:
+            self._flushes[record_key] = asyncio.create_task(
+                self._flush_later(record_key)
+            )
 
-                # Get or create FSM state record
-                stmt = select(UserFsmState).where(
-                    UserFsmState.user_id == user.id
+    async def _flush_later(self, record_key: RecordKey) -> None:
+        """Write a record after the coalescing delay."""
+        try:
+            try:
+                await asyncio.wait_for(
+                    self._closing.wait(), timeout=self.write_delay
                 )
-                result = await session.execute(stmt)
-                fsm_state = result.scalar_one_or_none()
-
-                if fsm_state:
-                    # Update existing
-                    if fsm_state.data:
-                        fsm_state.data.update(data)
-                    else:
-                        fsm_state.data = data
-                    await session.flush()
-                else:
-                    # Create new
-                    fsm_state = UserFsmState(
-                        user_id=user.id,
-                        data=data,
-                    )
-                    session.add(fsm_state)
-                    await session.flush()
+            except TimeoutError:
+                pass
+            # Changes made while writing are written by the next pass
+            while record_key in self._pending:
+                await self._write(record_key)
+        finally:
+            del self._flushes[record_key]
+
+    async def _write(self, record_key: RecordKey) -> None:
+        """Upsert (or delete an empty) record in one statement."""
+        record = self._pending.pop(record_key, None)
+        if record is None:
+            return
+
+        chat_id, telegram_id = record_key
+        if record.state is None and not record.data:
+            stmt = delete(UserFsmState).where(
+                UserFsmState.chat_id == chat_id,
+                UserFsmState.telegram_id == telegram_id,
+            )
+        else:
+            now = datetime.now(UTC)
+            stmt = insert(UserFsmState).values(
+                chat_id=chat_id,
+                telegram_id=telegram_id,
+                state=record.state,
+                data=record.data.copy(),
+                created_at=now,
+                updated_at=now,
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_user_fsm_states_chat_user",
+                set_={
+                    "state": stmt.excluded.state,
+                    "data": stmt.excluded.data,
+                    "updated_at": stmt.excluded.updated_at,
+                },
+            )
 
+        try:
+            async with self._session_factory() as session:
+                await session.execute(stmt)
                 await session.commit()
-                logger.debug(
-                    f"R11-3: Updated FSM data for user {key.user_id}: {len(data)} keys"
-                )
-
+            logger.debug(
+                f"R11-3: Saved FSM state for user {telegram_id}: "
+                f"{record.state}"
+            )
         except Exception as e:
             logger.error(
-                f"R11-3: Failed to update FSM data for user {key.user_id}: {e}",
+                f"R11-3: Failed to save FSM state for user {telegram_id}: {e}",
                 exc_info=True,
             )
-
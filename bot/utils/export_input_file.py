@@ -0,0 +1,52 @@
+"""
+Export Input File
+Uploads an ExportFile to Telegram in chunks, without loading it into memory.
+"""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING
+
+from aiogram.types import InputFile
+from aiogram.types.input_file import DEFAULT_CHUNK_SIZE
+
+from app.services.export_engine import ExportFile
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+class ExportInputFile(InputFile):
+    """
+    Input file backed by a spooled export.
+
+    Chunks are read in a worker thread, since a large export lives on
+    disk. The export is not closed here; the caller owns it.
+    """
+
+    def __init__(
+        self,
+        export: ExportFile,
+        filename: str | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """
+        Initialize input file.
+
+        Args:
+            export: Finished export to upload
+            filename: Upload name (defaults to the export's name)
+            chunk_size: Bytes read per chunk
+        """
+        super().__init__(
+            filename=filename or export.filename, chunk_size=chunk_size
+        )
+        self.export = export
+
+    async def read(self, bot: "Bot") -> AsyncGenerator[bytes, None]:
+        # Rewind so a retried request sends the whole file again
+        self.export.seek(0)
+        while chunk := await asyncio.to_thread(
+            self.export.read, self.chunk_size
+        ):
+            yield chunk
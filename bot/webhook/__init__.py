@@ -0,0 +1,23 @@
+"""
+Webhook ingestion.
+
+BOT_MODE=webhook runs the ingress that queues updates per shard;
+BOT_MODE=worker runs one ShardWorker per process (WEBHOOK_WORKER_SHARD),
+so update handling scales across cores and hosts sharing Redis.
+"""
+
+from bot.webhook.ingress import create_webhook_handler
+from bot.webhook.shard_worker import ShardWorker
+from bot.webhook.update_queue import (
+    UpdateQueue,
+    shard_for_chat,
+    update_chat_id,
+)
+
+__all__ = [
+    "ShardWorker",
+    "UpdateQueue",
+    "create_webhook_handler",
+    "shard_for_chat",
+    "update_chat_id",
+]
@@ -0,0 +1,55 @@
+"""
+Webhook ingress.
+
+aiohttp endpoint Telegram posts updates to. It only checks the secret
+token and queues the raw update (see update_queue), so it answers within
+a few milliseconds no matter how busy the shard workers are.
+"""
+
+import hmac
+from collections.abc import Awaitable, Callable
+
+from aiohttp import web
+from loguru import logger
+
+from bot.webhook.update_queue import UpdateQueue
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def create_webhook_handler(
+    queue: UpdateQueue, secret: str
+) -> Callable[[web.Request], Awaitable[web.Response]]:
+    """
+    Create the aiohttp handler queueing webhook updates.
+
+    Args:
+        queue: Update queue
+        secret: Expected secret token
+
+    Returns:
+        Request handler
+    """
+
+    async def webhook_handler(request: web.Request) -> web.Response:
+        """Queue one update (non-2xx makes Telegram retry it)."""
+        if not hmac.compare_digest(
+            request.headers.get(SECRET_HEADER, "").encode(), secret.encode()
+        ):
+            return web.Response(status=401)
+
+        try:
+            update = await request.json()
+            update["update_id"]
+        except Exception:
+            return web.Response(status=400)
+
+        try:
+            await queue.publish(update)
+        except Exception as e:
+            logger.error(f"Failed to queue update {update['update_id']}: {e}")
+            return web.Response(status=503)
+
+        return web.Response()
+
+    return webhook_handler
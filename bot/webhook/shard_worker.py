@@ -0,0 +1,182 @@
+"""
+Shard worker.
+
+Handles the updates of one shard stream with the full dispatcher. Updates
+of different chats run concurrently (up to `webhook_worker_concurrency`);
+updates of one chat run one after another in stream order. An entry
+left pending by a crash is replayed on restart until it has been
+delivered `webhook_max_deliveries` times; then it is dead-lettered.
+"""
+
+import asyncio
+import json
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from loguru import logger
+
+from app.config.settings import settings
+from bot.webhook.update_queue import UpdateQueue, update_chat_id
+
+# Entries fetched per XREADGROUP and max wait for new ones
+READ_COUNT = 100
+READ_BLOCK_MS = 5000
+
+
+class ShardWorker:
+    """Consumes one shard of the update queue."""
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        queue: UpdateQueue,
+        shard: int | None = None,
+        concurrency: int | None = None,
+        max_deliveries: int | None = None,
+    ) -> None:
+        """
+        Initialize shard worker.
+
+        Args:
+            dp: Dispatcher with handlers and middlewares
+            bot: Bot instance
+            queue: Update queue
+            shard: Shard handled by this worker
+            concurrency: Max updates handled at once
+            max_deliveries: Deliveries before an entry is dead-lettered
+        """
+        self.dp = dp
+        self.bot = bot
+        self.queue = queue
+        self.shard = (
+            shard if shard is not None else settings.webhook_worker_shard
+        )
+        self.consumer = f"shard-{self.shard}"
+        self.max_deliveries = (
+            max_deliveries or settings.webhook_max_deliveries
+        )
+        self._slots = asyncio.Semaphore(
+            concurrency or settings.webhook_worker_concurrency
+        )
+        # chat_id -> last scheduled task of the chat
+        self._tails: dict[int, asyncio.Task] = {}
+
+    async def run(self) -> None:
+        """Handle updates until cancelled."""
+        await self.queue.ensure_group(self.shard)
+        logger.info(f"Shard worker started for shard {self.shard}")
+
+        # Entries delivered before a crash/restart come first
+        pending = True
+        try:
+            while True:
+                try:
+                    entries = await self.queue.read(
+                        self.shard,
+                        self.consumer,
+                        count=READ_COUNT,
+                        block_ms=READ_BLOCK_MS,
+                        pending=pending,
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Shard {self.shard} read failed: {e}")
+                    await asyncio.sleep(1)
+                    continue
+
+                if pending and not entries:
+                    pending = False
+                    continue
+
+                if pending:
+                    entries = await self._drop_poisoned(entries)
+
+                for entry_id, update in entries:
+                    await self._slots.acquire()
+                    self._schedule(entry_id, update)
+
+                if pending:
+                    # Wait before re-reading the pending list
+                    await self.drain()
+        finally:
+            await self.drain()
+
+    async def _drop_poisoned(
+        self, entries: list[tuple[str, dict[str, Any]]]
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Dead-letter replayed entries delivered too often."""
+        entry_ids = [entry_id for entry_id, _ in entries]
+        try:
+            counts = await self.queue.delivery_counts(
+                self.shard, self.consumer, entry_ids
+            )
+        except Exception as e:
+            logger.warning(f"Shard {self.shard} XPENDING failed: {e}")
+            return entries
+
+        replayable = []
+        for entry_id, update in entries:
+            deliveries = counts.get(entry_id, 0)
+            if deliveries <= self.max_deliveries:
+                replayable.append((entry_id, update))
+                continue
+
+            logger.error(
+                f"Update {update.get('update_id')} on shard {self.shard} "
+                f"delivered {deliveries} times, dead-lettering"
+            )
+            try:
+                await self.queue.dead_letter(
+                    self.shard, entry_id, {"update": json.dumps(update)}
+                )
+            except Exception as e:
+                logger.warning(f"Failed to dead-letter {entry_id}: {e}")
+        return replayable
+
+    async def drain(self) -> None:
+        """Wait for scheduled updates."""
+        tails = list(self._tails.values())
+        if tails:
+            await asyncio.gather(*tails, return_exceptions=True)
+
+    def _schedule(self, entry_id: str, update: dict[str, Any]) -> None:
+        """Run an update after the previous update of its chat."""
+        chat_id = update_chat_id(update)
+        previous = self._tails.get(chat_id)
+        task = asyncio.create_task(
+            self._handle(entry_id, update, previous)
+        )
+        self._tails[chat_id] = task
+
+        def release(done: asyncio.Task) -> None:
+            self._slots.release()
+            if self._tails.get(chat_id) is done:
+                del self._tails[chat_id]
+
+        task.add_done_callback(release)
+
+    async def _handle(
+        self,
+        entry_id: str,
+        update: dict[str, Any],
+        previous: asyncio.Task | None,
+    ) -> None:
+        """Feed an update to the dispatcher and acknowledge it."""
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        try:
+            await self.dp.feed_raw_update(self.bot, update)
+        except Exception as e:
+            # The dispatcher error handler has already run
+            logger.error(
+                f"Update {update.get('update_id')} failed on shard "
+                f"{self.shard}: {e}"
+            )
+
+        try:
+            await self.queue.ack(self.shard, [entry_id])
+        except Exception as e:
+            logger.warning(f"Failed to ack update entry {entry_id}: {e}")
@@ -0,0 +1,255 @@
+"""
+Sharded update queue.
+
+Webhook updates are deduplicated by update_id and appended to one Redis
+stream per shard. The shard of an update is a consistent hash of its
+chat ID, so all updates of a chat (and its FSM keys) land in the same
+stream and are handled, in order, by the one worker owning that shard.
+Entries that keep failing are moved to a per-shard dead-letter stream.
+"""
+
+import json
+from typing import Any
+
+from loguru import logger
+
+from app.config.settings import settings
+
+STREAM_KEY_PREFIX = "bot:updates:"
+DEDUP_KEY_PREFIX = "bot:update_seen:"
+DEAD_LETTER_KEY_PREFIX = "bot:updates:dead:"
+CONSUMER_GROUP = "bot-workers"
+
+# Jump consistent hash multiplier (Lamping & Veach)
+_JUMP_MULTIPLIER = 2862933555777941757
+_UINT64_MASK = (1 << 64) - 1
+
+
+def shard_for_chat(chat_id: int, shards: int) -> int:
+    """
+    Map a chat to a shard with jump consistent hashing.
+
+    Growing the shard count from n to n + 1 moves only ~1/(n + 1) of
+    the chats.
+
+    Args:
+        chat_id: Telegram chat ID (may be negative)
+        shards: Number of shards
+
+    Returns:
+        Shard index in [0, shards)
+    """
+    key = chat_id & _UINT64_MASK
+    bucket, candidate = -1, 0
+    while candidate < shards:
+        bucket = candidate
+        key = (key * _JUMP_MULTIPLIER + 1) & _UINT64_MASK
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def update_chat_id(update: dict[str, Any]) -> int:
+    """
+    Get the chat an update belongs to (user ID for chatless updates).
+
+    Args:
+        update: Raw Telegram update
+
+    Returns:
+        Chat ID, or 0 if the update carries none
+    """
+    for name, event in update.items():
+        if name == "update_id" or not isinstance(event, dict):
+            continue
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+        user = event.get("from") or event.get("user")
+        if user:
+            return user["id"]
+    return 0
+
+
+class UpdateQueue:
+    """Redis streams of raw updates, one per shard."""
+
+    def __init__(
+        self,
+        redis_client: Any,
+        shards: int | None = None,
+        dedup_ttl: int | None = None,
+        stream_maxlen: int | None = None,
+    ) -> None:
+        """
+        Initialize update queue.
+
+        Args:
+            redis_client: Async Redis client
+            shards: Number of shards
+            dedup_ttl: Seconds an update_id is remembered
+            stream_maxlen: Approximate max entries per stream
+        """
+        self.redis_client = redis_client
+        self.shards = shards or settings.webhook_shards
+        self.dedup_ttl = dedup_ttl or settings.webhook_dedup_ttl
+        self.stream_maxlen = stream_maxlen or settings.webhook_stream_maxlen
+
+    @staticmethod
+    def stream_key(shard: int) -> str:
+        """Redis key of a shard stream."""
+        return f"{STREAM_KEY_PREFIX}{shard}"
+
+    @staticmethod
+    def dead_letter_key(shard: int) -> str:
+        """Redis key of a shard's dead-letter stream."""
+        return f"{DEAD_LETTER_KEY_PREFIX}{shard}"
+
+    async def publish(self, update: dict[str, Any]) -> bool:
+        """
+        Queue an update unless its update_id was already seen.
+
+        Args:
+            update: Raw Telegram update
+
+        Returns:
+            True if queued, False if duplicate
+        """
+        update_id = update["update_id"]
+        dedup_key = f"{DEDUP_KEY_PREFIX}{update_id}"
+        if not await self.redis_client.set(
+            dedup_key, 1, nx=True, ex=self.dedup_ttl
+        ):
+            logger.debug(f"Duplicate update {update_id} skipped")
+            return False
+
+        shard = shard_for_chat(update_chat_id(update), self.shards)
+        try:
+            await self.redis_client.xadd(
+                self.stream_key(shard),
+                {"update": json.dumps(update)},
+                maxlen=self.stream_maxlen,
+                approximate=True,
+            )
+        except Exception:
+            # Let Telegram's retry queue the update again
+            await self.redis_client.delete(dedup_key)
+            raise
+        return True
+
+    async def ensure_group(self, shard: int) -> None:
+        """
+        Create the consumer group of a shard stream if missing.
+
+        Args:
+            shard: Shard index
+        """
+        try:
+            await self.redis_client.xgroup_create(
+                self.stream_key(shard), CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(
+        self,
+        shard: int,
+        consumer: str,
+        count: int,
+        block_ms: int,
+        pending: bool = False,
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Read updates of a shard in stream order.
+
+        Args:
+            shard: Shard index
+            consumer: Consumer name
+            count: Max entries
+            block_ms: Max wait for new entries
+            pending: Re-read entries delivered but not acknowledged
+
+        Entries that cannot be decoded are dead-lettered, not returned.
+
+        Returns:
+            List of (entry ID, update)
+        """
+        response = await self.redis_client.xreadgroup(
+            CONSUMER_GROUP,
+            consumer,
+            {self.stream_key(shard): "0" if pending else ">"},
+            count=count,
+            block=None if pending else block_ms,
+        )
+        entries = []
+        for _stream, messages in response or []:
+            for entry_id, fields in messages:
+                try:
+                    entries.append((entry_id, json.loads(fields["update"])))
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.error(f"Undecodable update entry {entry_id}: {e}")
+                    await self.dead_letter(shard, entry_id, fields)
+        return entries
+
+    async def delivery_counts(
+        self, shard: int, consumer: str, entry_ids: list[str]
+    ) -> dict[str, int]:
+        """
+        Get how often pending entries were delivered (XPENDING).
+
+        Args:
+            shard: Shard index
+            consumer: Consumer name
+            entry_ids: Pending entry IDs in stream order
+
+        Returns:
+            Delivery count by entry ID
+        """
+        if not entry_ids:
+            return {}
+        pending = await self.redis_client.xpending_range(
+            self.stream_key(shard),
+            CONSUMER_GROUP,
+            min=entry_ids[0],
+            max=entry_ids[-1],
+            count=len(entry_ids),
+            consumername=consumer,
+        )
+        return {
+            item["message_id"]: item["times_delivered"] for item in pending
+        }
+
+    async def dead_letter(
+        self, shard: int, entry_id: str, fields: dict[str, Any]
+    ) -> None:
+        """
+        Move an entry to the shard's dead-letter stream and ack it.
+
+        Args:
+            shard: Shard index
+            entry_id: Stream entry ID
+            fields: Entry fields (the raw update)
+        """
+        await self.redis_client.xadd(
+            self.dead_letter_key(shard),
+            {**fields, "entry_id": entry_id},
+            maxlen=self.stream_maxlen,
+            approximate=True,
+        )
+        await self.ack(shard, [entry_id])
+
+    async def ack(self, shard: int, entry_ids: list[str]) -> None:
+        """
+        Acknowledge handled entries and drop them from the stream.
+
+        Args:
+            shard: Shard index
+            entry_ids: Stream entry IDs
+        """
+        if not entry_ids:
+            return
+        key = self.stream_key(shard)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.xack(key, CONSUMER_GROUP, *entry_ids)
+            pipe.xdel(key, *entry_ids)
+            await pipe.execute()
@@ -6,9 +6,11 @@ Redis-based message broker for task queue.
 
 import dramatiq
 from dramatiq.brokers.redis import RedisBroker
+from dramatiq.middleware import AsyncIO
 from loguru import logger
 
 from app.config.settings import settings
+from jobs.runtime import WorkerRuntime
 
 # Initialize Redis broker
 redis_broker = RedisBroker(
@@ -18,6 +20,11 @@ redis_broker = RedisBroker(
     db=settings.redis_db,
 )
 
+# Async actors run on one long-lived event loop per worker process,
+# sharing the DB pool, Redis client and Bot (see jobs.runtime)
+redis_broker.add_middleware(AsyncIO())
+redis_broker.add_middleware(WorkerRuntime())
+
 # Set as default broker
 dramatiq.set_broker(redis_broker)
 
@@ -0,0 +1,138 @@
+"""
+Worker runtime.
+
+Async actors run on one long-lived event loop per worker process
+(dramatiq AsyncIO middleware), so loop-bound resources are shared by
+every message instead of being built and torn down per task:
+
+- the pooled engine behind app.config.database.async_session_maker
+- one Redis client
+- one aiogram Bot (one HTTP session)
+- the GlobalSettings cache listener (Redis pub/sub invalidation)
+
+The Redis client and Bot are created lazily on the running loop. The
+WorkerRuntime middleware starts the settings listener when the worker
+boots and closes everything when the worker shuts down.
+"""
+
+import asyncio
+from typing import Any
+
+from aiogram import Bot
+from dramatiq import Middleware
+from dramatiq.asyncio import get_event_loop_thread
+from loguru import logger
+
+try:
+    from redis.asyncio import Redis as AsyncRedis
+except ImportError:
+    AsyncRedis = None  # type: ignore
+
+from app.config.database import close_db
+from app.config.settings import settings
+from app.services.global_settings_cache import (
+    get_global_settings_cache,
+    init_global_settings_cache,
+)
+
+# Shared resources with the event loop they are bound to
+_bot: tuple[asyncio.AbstractEventLoop, Bot] | None = None
+_redis: tuple[asyncio.AbstractEventLoop, Any] | None = None
+
+
+def get_bot() -> Bot:
+    """
+    Get the Bot shared by tasks on the running event loop.
+
+    Tasks must not close its session.
+
+    Returns:
+        Bot instance
+    """
+    global _bot
+    loop = asyncio.get_running_loop()
+    if _bot is None or _bot[0] is not loop:
+        _bot = (loop, Bot(token=settings.telegram_bot_token))
+    return _bot[1]
+
+
+def get_redis() -> Any | None:
+    """
+    Get the Redis client shared by tasks on the running event loop.
+
+    Tasks must not close it.
+
+    Returns:
+        Redis client (decode_responses=True) or None if redis is not
+        installed
+    """
+    global _redis
+    if AsyncRedis is None:
+        return None
+
+    loop = asyncio.get_running_loop()
+    if _redis is None or _redis[0] is not loop:
+        _redis = (
+            loop,
+            AsyncRedis(
+                host=settings.redis_host,
+                port=settings.redis_port,
+                password=settings.redis_password,
+                db=settings.redis_db,
+                decode_responses=True,
+            ),
+        )
+    return _redis[1]
+
+
+async def start_runtime() -> None:
+    """Start loop-bound listeners (must run on the worker event loop)."""
+    init_global_settings_cache(get_redis())
+
+
+async def close_runtime() -> None:
+    """Close shared resources (must run on the worker event loop)."""
+    global _bot, _redis
+
+    await get_global_settings_cache().stop_listener()
+    if _bot is not None:
+        await _bot[1].session.close()
+        _bot = None
+    if _redis is not None:
+        await _redis[1].aclose()
+        _redis = None
+    await close_db()
+
+
+class WorkerRuntime(Middleware):
+    """
+    Starts and closes shared task resources with the worker.
+
+    Must be added after AsyncIO: the event loop thread is started in its
+    before_worker_boot, and "after" hooks run in reverse order, so the
+    shutdown hook runs once worker threads have finished and before the
+    event loop thread is stopped.
+    """
+
+    def after_worker_boot(self, broker: Any, worker: Any) -> None:
+        """Start the settings listener on the event loop thread."""
+        event_loop_thread = get_event_loop_thread()
+        if event_loop_thread is None:
+            return
+
+        try:
+            event_loop_thread.run_coroutine(start_runtime())
+        except Exception as e:
+            logger.warning(f"Failed to start worker runtime: {e}")
+
+    def after_worker_shutdown(self, broker: Any, worker: Any) -> None:
+        """Close resources on the still running event loop thread."""
+        event_loop_thread = get_event_loop_thread()
+        if event_loop_thread is None:
+            return
+
+        try:
+            event_loop_thread.run_coroutine(close_runtime())
+            logger.info("Worker runtime closed")
+        except Exception as e:
+            logger.warning(f"Failed to close worker runtime: {e}")
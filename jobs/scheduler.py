@@ -36,6 +36,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from app.config.database import async_session_maker
 from app.config.settings import settings
 from app.services.blockchain_service import init_blockchain_service
+from app.tasks.message_log_trim_task import run_message_log_trim_task
+from app.tasks.referral_leaderboard_task import (
+    run_referral_leaderboard_rebuild_task,
+)
 
 try:
     init_blockchain_service(
@@ -63,9 +67,6 @@ from jobs.tasks.notification_retry import process_notification_retries
 from jobs.tasks.payment_retry import process_payment_retries
 from jobs.tasks.stuck_transaction_monitor import monitor_stuck_transactions
 from jobs.tasks.mark_immutable_audit_logs import mark_immutable_audit_logs
-from jobs.tasks.notification_fallback_processor import (
-    process_notification_fallback,
-)
 from jobs.tasks.warmup_redis_cache import warmup_redis_cache
 from jobs.tasks.incoming_transfer_monitor import monitor_incoming_transfers
 from app.tasks.reward_accrual_task import run_individual_reward_accrual
@@ -100,15 +101,6 @@ def create_scheduler() -> AsyncIOScheduler:
         replace_existing=True,
     )
 
-    # R11-3: Notification fallback processor - every 5 seconds
-    scheduler.add_job(
-        process_notification_fallback.send,
-        trigger=IntervalTrigger(seconds=5),
-        id="notification_fallback",
-        name="Notification Fallback Processing",
-        replace_existing=True,
-    )
-
     # Deposit monitoring - every 1 minute
     scheduler.add_job(
         monitor_deposits.send,
@@ -217,16 +209,34 @@ def create_scheduler() -> AsyncIOScheduler:
         replace_existing=True,
     )
 
-    # Cleanup task - every week (Sunday at 04:00 UTC)
+    # Data retention - every day at 04:00 UTC (small daily batches)
     scheduler.add_job(
         run_cleanup_task,
-        trigger=CronTrigger(day_of_week="sun", hour=4, minute=0),
+        trigger=CronTrigger(hour=4, minute=0),
         id="cleanup_task",
         name="Data Cleanup Task",
         replace_existing=True,
     )
 
-    logger.info("Task scheduler configured with 16 jobs")
+    # Trim user message logs to the per-user limit - every 10 minutes
+    scheduler.add_job(
+        run_message_log_trim_task,
+        trigger=IntervalTrigger(minutes=10),
+        id="message_log_trim",
+        name="Message Log Trim",
+        replace_existing=True,
+    )
+
+    # Recompute the referral leaderboard - daily at 03:30
+    scheduler.add_job(
+        run_referral_leaderboard_rebuild_task,
+        trigger=CronTrigger(hour=3, minute=30),
+        id="referral_leaderboard_rebuild",
+        name="Referral Leaderboard Rebuild",
+        replace_existing=True,
+    )
+
+    logger.info("Task scheduler configured with 17 jobs")
 
     return scheduler
 
@@ -241,12 +251,33 @@ async def start_scheduler() -> None:
 if __name__ == "__main__":
     import asyncio
 
+    from aiogram import Bot
+
+    from app.services.global_settings_cache import (
+        get_global_settings_cache,
+        init_global_settings_cache,
+    )
+    from app.services.notification_fallback_consumer import (
+        NotificationFallbackConsumer,
+    )
+    from jobs.runtime import get_redis
+
     async def main():
+        # Settings changed by the bot invalidate this process's snapshot
+        init_global_settings_cache(get_redis())
         await start_scheduler()
+
+        # R11-3: Push-based fallback notification delivery (LISTEN/NOTIFY)
+        bot = Bot(token=settings.telegram_bot_token)
+        consumer = NotificationFallbackConsumer(bot)
+
         # Keep running
         try:
-            await asyncio.Event().wait()
+            await consumer.run()
         except KeyboardInterrupt:
             logger.info("Scheduler stopped")
+        finally:
+            await get_global_settings_cache().stop_listener()
+            await bot.session.close()
 
     asyncio.run(main())
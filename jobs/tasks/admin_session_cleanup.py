@@ -5,8 +5,6 @@ Cleans up expired and inactive admin sessions.
 Runs every 5 minutes to deactivate expired sessions.
 """
 
-import asyncio
-
 import dramatiq
 from loguru import logger
 
@@ -15,7 +13,7 @@ from app.repositories.admin_session_repository import AdminSessionRepository
 
 
 @dramatiq.actor(max_retries=3, time_limit=60_000)  # 1 min timeout
-def cleanup_expired_admin_sessions() -> dict:
+async def cleanup_expired_admin_sessions() -> dict:
     """
     Cleanup expired and inactive admin sessions.
 
@@ -30,7 +28,7 @@ def cleanup_expired_admin_sessions() -> dict:
 
     try:
         # Run async code
-        result = asyncio.run(_cleanup_sessions_async())
+        result = await _cleanup_sessions_async()
 
         logger.info(
             f"Admin session cleanup complete: "
@@ -3,8 +3,22 @@
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from app.database import async_session_maker
 from loguru import logger
+from sqlalchemy import and_
+
+from app.models.deposit import Deposit
+from app.models.enums import TransactionStatus
+from app.services.retention_service import RetentionPolicy, RetentionService
+
+PENDING_DEPOSITS_POLICY = RetentionPolicy(
+    name="pending_deposits",
+    model=Deposit,
+    condition=lambda now: and_(
+        Deposit.status == TransactionStatus.PENDING.value,
+        Deposit.created_at < now - timedelta(hours=24),
+    ),
+    archive=True,
+)
 
 
 async def cleanup_logs_and_data() -> None:
@@ -53,30 +67,13 @@ async def _cleanup_log_files() -> None:
 async def _cleanup_database() -> None:
     """Cleanup orphaned database records."""
     try:
-        async with async_session_maker() as session:
-            # Cleanup orphaned pending deposits (>24 hours old)
-            from app.repositories.deposit_repository import DepositRepository
-
-            deposit_repo = DepositRepository(session)
-
-            cutoff_time = datetime.utcnow() - timedelta(hours=24)
-
-            # Find old pending deposits
-            deposits = await deposit_repo.get_pending_deposits()
-
-            deleted_count = 0
-
-            for deposit in deposits:
-                if deposit.created_at < cutoff_time:
-                    await deposit_repo.delete(deposit.id)
-                    deleted_count += 1
-
-            if deleted_count > 0:
-                logger.info(
-                    f"Deleted {deleted_count} orphaned pending deposits"
-                )
+        # Orphaned pending deposits (>24 hours old), deleted in batches
+        result = await RetentionService().apply(PENDING_DEPOSITS_POLICY)
 
-            await session.commit()
+        if result.deleted > 0:
+            logger.info(
+                f"Deleted {result.deleted} orphaned pending deposits"
+            )
 
     except Exception as e:
         logger.error(f"Database cleanup error: {e}")
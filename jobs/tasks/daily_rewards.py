@@ -5,8 +5,6 @@ Processes daily reward sessions for all confirmed deposits.
 Runs once per day to calculate and distribute rewards.
 """
 
-import asyncio
-
 import dramatiq
 from loguru import logger
 
@@ -15,7 +13,7 @@ from app.services.reward_service import RewardService
 
 
 @dramatiq.actor(max_retries=3, time_limit=60_000)  # 1 min timeout
-def process_daily_rewards(session_id: int | None = None) -> None:
+async def process_daily_rewards(session_id: int | None = None) -> None:
     """
     Process daily rewards for active session.
 
@@ -33,7 +31,7 @@ def process_daily_rewards(session_id: int | None = None) -> None:
 
     try:
         # Run async code
-        result = asyncio.run(_process_daily_rewards_async(session_id))
+        result = await _process_daily_rewards_async(session_id)
 
         if result["success"]:
             logger.info(
@@ -5,21 +5,18 @@ Performs daily financial reconciliation to verify system balance integrity.
 Runs daily at 01:00 UTC.
 """
 
-import asyncio
 from datetime import UTC, datetime
 
 import dramatiq
-from aiogram import Bot
 from loguru import logger
 
 from app.config.database import async_session_maker
-from app.config.settings import settings
 from app.services.notification_service import NotificationService
 from app.services.reconciliation_service import ReconciliationService
 
 
 @dramatiq.actor(max_retries=3, time_limit=600_000)  # 10 min timeout
-def perform_financial_reconciliation() -> None:
+async def perform_financial_reconciliation() -> None:
     """
     Perform daily financial reconciliation.
 
@@ -35,7 +32,7 @@ def perform_financial_reconciliation() -> None:
 
     try:
         # Run async code
-        result = asyncio.run(_perform_reconciliation_async())
+        result = await _perform_reconciliation_async()
 
         if result.get("success"):
             if result.get("critical"):
@@ -65,8 +62,6 @@ async def _perform_reconciliation_async() -> dict:
         # If critical discrepancy, notify admins
         if result.get("critical"):
             try:
-                # Initialize bot for notifications
-                bot = Bot(token=settings.telegram_bot_token)
                 notification_service = NotificationService(session)
 
                 # Get admin telegram IDs (would need admin service)
@@ -87,8 +82,6 @@ async def _perform_reconciliation_async() -> dict:
                 # TODO: Send notification to all super_admins
                 # This would require AdminService integration
 
-                await bot.session.close()
-
             except Exception as e:
                 logger.error(f"Error sending admin notification: {e}")
 
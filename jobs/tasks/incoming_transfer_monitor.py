@@ -3,163 +3,257 @@ Incoming transfer monitor task.
 
 Scans blockchain for all incoming transfers to system wallet.
 Runs frequently (e.g. every minute) to catch deposits without explicit user action.
+
+Scanning is driven by a durable cursor (GlobalSettings.last_scanned_block):
+each run walks the range from the cursor up to the confirmed head
+(current block minus confirmation depth) in adaptive chunks, so every
+block is fetched and processed exactly once, and missed ranges after an
+outage are caught up instead of silently skipped.
 """
 
 import asyncio
 from decimal import Decimal
+from typing import Any
 
 import dramatiq
+from eth_utils import to_checksum_address
 from loguru import logger
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config.database import async_session_maker
 from app.config.settings import settings
-from app.services.blockchain_service import get_blockchain_service
+from app.repositories.global_settings_repository import (
+    GlobalSettingsRepository,
+)
+from app.services.blockchain_service import (
+    USDT_DECIMALS,
+    get_blockchain_service,
+)
 from app.services.incoming_deposit_service import IncomingDepositService
+from jobs.runtime import get_bot
+
+# Blocks to look back when no cursor has been stored yet
+INITIAL_LOOKBACK_BLOCKS = 50
+
+# Upper bound of blocks walked per run (keeps a catch-up run within the
+# actor time limit; the next run continues from the cursor)
+MAX_BLOCKS_PER_RUN = 50_000
+
+# Provider error fragments meaning "range too large / too many results"
+RANGE_LIMIT_ERRORS = (
+    "block range",
+    "limited to a",
+    "query returned more than",
+    "too many results",
+    "response size",
+)
+
+# Provider error fragments meaning "slow down" (the range is fine)
+RATE_LIMIT_ERRORS = (
+    "429",
+    "too many requests",
+    "rate limit",
+    "rate-limit",
+)
+
+# Retries of a rate-limited request, with delays of 2, 4, 8, 16 seconds
+RATE_LIMIT_RETRIES = 4
+RATE_LIMIT_DELAY_BASE = 2
+
 
 @dramatiq.actor(max_retries=3, time_limit=300_000)
-def monitor_incoming_transfers() -> None:
+async def monitor_incoming_transfers() -> None:
     """
     Monitor blockchain for ANY incoming transfer to system wallet.
     """
     logger.info("Starting incoming transfer monitoring...")
     try:
-        asyncio.run(_monitor_incoming_async())
+        await _monitor_incoming_async()
         logger.info("Incoming transfer monitoring complete")
     except Exception as e:
         logger.exception(f"Incoming transfer monitoring failed: {e}")
 
+
+def _is_range_limit_error(error: Exception) -> bool:
+    """Check if an eth_getLogs error means the range must be narrowed."""
+    message = str(error).lower()
+    return any(fragment in message for fragment in RANGE_LIMIT_ERRORS)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Check if an RPC error means the provider throttles requests."""
+    message = str(error).lower()
+    return any(fragment in message for fragment in RATE_LIMIT_ERRORS)
+
+
+async def _fetch_logs(blockchain: Any, start: int, end: int) -> list[Any]:
+    """
+    Fetch Transfer logs, backing off while the provider rate limits.
+
+    A rate limit says nothing about the range size, so the same range is
+    retried after an exponential delay instead of being narrowed.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await blockchain.get_usdt_transfer_logs(
+                start, end, settings.system_wallet_address
+            )
+        except Exception as e:
+            if attempt >= RATE_LIMIT_RETRIES or not _is_rate_limit_error(e):
+                raise
+            attempt += 1
+            delay = RATE_LIMIT_DELAY_BASE ** attempt
+            logger.warning(
+                f"eth_getLogs rate limited for blocks {start}-{end}, "
+                f"retrying in {delay}s: {e}"
+            )
+            await asyncio.sleep(delay)
+
+
+def _decode_transfer_log(log: Any) -> dict[str, Any]:
+    """
+    Decode a USDT Transfer log.
+
+    topics[0] is the event signature, topics[1] is `from` (indexed),
+    topics[2] is `to` (indexed); data holds `value`.
+    """
+    from_hex = log["topics"][1].hex()
+    to_hex = log["topics"][2].hex()
+    value_wei = int(log["data"].hex(), 16)
+
+    return {
+        "tx_hash": log["transactionHash"].hex(),
+        "from_address": to_checksum_address("0x" + from_hex[-40:]),
+        "to_address": to_checksum_address("0x" + to_hex[-40:]),
+        "amount": Decimal(value_wei) / Decimal(10 ** USDT_DECIMALS),
+        "block_number": log["blockNumber"],
+    }
+
+
+def plan_scan_range(
+    cursor: int | None, current_block: int
+) -> tuple[int, int] | None:
+    """
+    Compute the block range to scan in this run.
+
+    Args:
+        cursor: Last fully processed block (None if never scanned)
+        current_block: Current chain head
+
+    Returns:
+        Inclusive (from_block, to_block) or None if nothing is final yet
+    """
+    safe_head = current_block - settings.incoming_scan_confirmations
+    if cursor is None:
+        cursor = safe_head - INITIAL_LOOKBACK_BLOCKS
+
+    from_block = cursor + 1
+    to_block = min(safe_head, cursor + MAX_BLOCKS_PER_RUN)
+
+    if from_block > to_block:
+        return None
+    return from_block, to_block
+
+
 async def _monitor_incoming_async() -> None:
     """Async implementation."""
-    
+
     # Check if maintenance mode is active
     if settings.blockchain_maintenance_mode:
         logger.warning("Blockchain maintenance mode active. Skipping incoming monitor.")
         return
 
-    local_engine = create_async_engine(
-        settings.database_url,
-        echo=False,
-        poolclass=NullPool,
-    )
-    
-    local_session_maker = async_sessionmaker(
-        local_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autocommit=False,
-        autoflush=False,
-    )
+    async with async_session_maker() as session:
+        blockchain = get_blockchain_service()
+        service = IncomingDepositService(session, get_bot())
+        settings_repo = GlobalSettingsRepository(session)
 
-    try:
-        async with local_session_maker() as session:
-            blockchain = get_blockchain_service()
-            service = IncomingDepositService(session)
-            
-            # Determine scan range
-            # We should persist last scanned block to DB to avoid re-scanning.
-            # For now, let's scan last N blocks or use a simple state file/redis.
-            # A robust solution would be `SystemSetting` table.
-            
-            from app.repositories.global_settings_repository import GlobalSettingsRepository
-            settings_repo = GlobalSettingsRepository(session)
-            global_settings = await settings_repo.get_settings()
-            
-            # Use stored last_scanned_block or fetch current - 100
-            current_block = await blockchain.get_block_number()
-            
-            # If last_scanned_block is 0 or too old (e.g. > 1000 blocks behind), catch up carefully
-            # Or just look at recent history for now.
-            # Let's add `last_scanned_block` to GlobalSettings in next iteration if needed.
-            # For now, let's scan last 100 blocks to be safe, assuming job runs every minute.
-            # 1 minute = ~20 blocks on BSC. 100 blocks = ~5 mins overlap.
-            
-            # NOTE: This overlap means we rely on `process_incoming_transfer` idempotency (tx_hash check).
-            
-            to_block = current_block
-            from_block = current_block - 50 # Scan last 50 blocks
-            
-            logger.info(f"Scanning blocks {from_block} to {to_block} for incoming USDT...")
-            
-            # Get transfer events
-            # We need a new method in blockchain service or use raw web3 here?
-            # Let's add a helper method to BlockchainService if possible, or do it here.
-            # Since BlockchainService encapsulates provider failover, we should use it.
-            
-            # We can use `get_incoming_transfers` if we implement it, 
-            # or reuse `search_blockchain_for_deposit` logic but broader.
-            
-            # Let's implement a broad search in this script using public `web3` property 
-            # or add `get_transfers` to service. 
-            # Ideally, service should expose `get_usdt_transfers(from_block, to_block)`.
-            
-            # For now, accessing web3 directly via getter
-            w3 = blockchain.get_active_web3()
-            contract = blockchain.usdt_contract
-            
-            # Filter for Transfer events to system wallet
-            # topic0 = Transfer
-            # topic2 = to address (indexed)
-            
-            # Transfer(address from, address to, uint256 value)
-            # topics = [keccak('Transfer(...)'), pad(from), pad(to)]
-            
-            transfer_event_signature = w3.keccak(text="Transfer(address,address,uint256)").hex()
-            padded_system_wallet = "0x" + settings.system_wallet_address[2:].lower().zfill(64)
-            
-            logs = await blockchain._run_async_failover(
-                lambda w: w.eth.get_logs({
-                    "fromBlock": from_block,
-                    "toBlock": to_block,
-                    "address": blockchain.usdt_contract_address,
-                    "topics": [
-                        transfer_event_signature,
-                        None, # from (any)
-                        padded_system_wallet # to (system wallet)
-                    ]
-                })
+        global_settings = await settings_repo.get_settings()
+        cursor = global_settings.last_scanned_block
+        current_block = await blockchain.get_block_number()
+
+        scan_range = plan_scan_range(cursor, current_block)
+        if not scan_range:
+            logger.debug(
+                f"No confirmed blocks to scan "
+                f"(cursor={cursor}, head={current_block})"
+            )
+            return
+
+        from_block, to_block = scan_range
+        if to_block - from_block + 1 > settings.incoming_scan_max_block_range:
+            logger.info(
+                f"Catch-up mode: {to_block - from_block + 1} blocks behind "
+                f"(cursor={cursor}, head={current_block})"
+            )
+
+        await _scan_range(
+            blockchain, service, settings_repo, session,
+            cursor, from_block, to_block,
+        )
+
+
+async def _scan_range(
+    blockchain: Any,
+    service: IncomingDepositService,
+    settings_repo: GlobalSettingsRepository,
+    session: AsyncSession,
+    cursor: int | None,
+    from_block: int,
+    to_block: int,
+) -> None:
+    """
+    Walk [from_block, to_block] in adaptive chunks, advancing the cursor.
+
+    The chunk size starts at the provider limit, is halved when the
+    provider rejects a range and grows back after successful requests.
+    The cursor is committed after each chunk, so a crash re-scans at most
+    one chunk (absorbed by tx_hash idempotency).
+    """
+    max_chunk = settings.incoming_scan_max_block_range
+    chunk = max_chunk
+    start = from_block
+
+    while start <= to_block:
+        end = min(start + chunk - 1, to_block)
+
+        try:
+            logs = await _fetch_logs(blockchain, start, end)
+        except Exception as e:
+            if chunk > 1 and _is_range_limit_error(e):
+                chunk = max(1, chunk // 2)
+                logger.warning(
+                    f"eth_getLogs rejected blocks {start}-{end}, "
+                    f"shrinking chunk to {chunk}: {e}"
+                )
+                continue
+            raise
+
+        logger.info(
+            f"Scanned blocks {start} to {end}: {len(logs)} transfer events"
+        )
+
+        transfers = []
+        for log in logs:
+            try:
+                transfers.append(_decode_transfer_log(log))
+            except Exception as e:
+                logger.error(f"Error decoding log {log}: {e}")
+
+        # Match the whole chunk at once (batched lookups, bulk insert)
+        if transfers:
+            await service.process_incoming_transfers(transfers)
+
+        if not await settings_repo.advance_last_scanned_block(cursor, end):
+            await session.rollback()
+            logger.warning(
+                f"Scan cursor moved by another scanner "
+                f"(expected {cursor}), stopping"
             )
-            
-            logger.info(f"Found {len(logs)} transfer events")
-            
-            for log in logs:
-                try:
-                    tx_hash = log["transactionHash"].hex()
-                    block_number = log["blockNumber"]
-                    
-                    # Parse event
-                    # Topic 1 is 'from', data is 'value'
-                    # topics[0] is signature
-                    # topics[1] is from (indexed)
-                    # topics[2] is to (indexed)
-                    
-                    # Extract from address
-                    # 0x000...address
-                    from_hex = log["topics"][1].hex()
-                    from_address = "0x" + from_hex[26:] # Last 40 chars (20 bytes)
-                    from_address = w3.to_checksum_address(from_address)
-                    
-                    # Extract value
-                    value_hex = log["data"].hex()
-                    value_wei = int(value_hex, 16)
-                    amount = Decimal(value_wei) / Decimal(10 ** 18) # USDT 18 decimals
-                    
-                    # Verify 'to' address just in case
-                    to_hex = log["topics"][2].hex()
-                    to_addr_extracted = "0x" + to_hex[26:]
-                    to_addr_checksum = w3.to_checksum_address(to_addr_extracted)
-                    
-                    await service.process_incoming_transfer(
-                        tx_hash=tx_hash,
-                        from_address=from_address,
-                        to_address=to_addr_checksum,
-                        amount=amount,
-                        block_number=block_number
-                    )
-                    
-                except Exception as e:
-                    logger.error(f"Error processing log {log}: {e}")
-
-    finally:
-        await local_engine.dispose()
+            return
+        await session.commit()
 
+        cursor = end
+        start = end + 1
+        chunk = min(max_chunk, chunk * 2)
@@ -5,7 +5,6 @@ Runs periodically to mark admin actions older than N days as immutable,
 preventing future modifications.
 """
 
-import asyncio
 from datetime import UTC, datetime, timedelta
 
 import dramatiq
@@ -18,7 +17,7 @@ from app.models.admin_action import AdminAction
 
 
 @dramatiq.actor(max_retries=3, time_limit=60_000)  # 1 min timeout
-def mark_immutable_audit_logs() -> dict:
+async def mark_immutable_audit_logs() -> dict:
     """
     Mark old admin actions as immutable.
 
@@ -31,7 +30,7 @@ def mark_immutable_audit_logs() -> dict:
 
     try:
         # Run async code
-        result = asyncio.run(_mark_immutable_async())
+        result = await _mark_immutable_async()
 
         logger.info(
             f"R18-4: Immutable audit log marking complete: "
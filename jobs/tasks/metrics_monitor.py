@@ -5,10 +5,7 @@ Monitors financial metrics and detects anomalies.
 Runs every 5 minutes.
 """
 
-import asyncio
-
 import dramatiq
-from aiogram import Bot
 from loguru import logger
 
 from app.config.database import async_session_maker
@@ -17,17 +14,18 @@ from typing import Any
 
 from app.services.metrics_monitor_service import MetricsMonitorService
 from app.services.notification_service import NotificationService
+from jobs.runtime import get_bot
 
 
 @dramatiq.actor(max_retries=3, time_limit=120_000)  # 2 min timeout
-def monitor_metrics() -> None:
+async def monitor_metrics() -> None:
     """
     Monitor financial metrics and detect anomalies (R14-1).
     """
     logger.debug("Starting metrics monitoring...")
 
     try:
-        asyncio.run(_monitor_metrics_async())
+        await _monitor_metrics_async()
 
     except Exception as e:
         logger.exception(f"Metrics monitoring failed: {e}")
@@ -76,7 +74,7 @@ async def _send_anomaly_alerts(
     """Send anomaly alerts to admins (R14-1)."""
     try:
         async with async_session_maker() as session:
-            bot = Bot(token=settings.telegram_bot_token)
+            bot = get_bot()
             notification_service = NotificationService(session)
 
             admin_ids = settings.get_admin_ids()
@@ -123,8 +121,6 @@ async def _send_anomaly_alerts(
                         bot, admin_id, message, critical=(severity == "critical")
                     )
 
-            await bot.session.close()
-
     except Exception as e:
         logger.error(f"Error sending anomaly alerts: {e}")
 
@@ -5,20 +5,18 @@ Monitors blockchain node health and activates maintenance mode if needed.
 Runs every 30 seconds.
 """
 
-import asyncio
-
 import dramatiq
-from aiogram import Bot
 from loguru import logger
 
 from app.config.database import async_session_maker
 from app.config.settings import settings
 from app.services.blockchain_service import get_blockchain_service
 from app.services.notification_service import NotificationService
+from jobs.runtime import get_bot
 
 
 @dramatiq.actor(max_retries=3, time_limit=60_000)  # 1 min timeout
-def monitor_node_health() -> None:
+async def monitor_node_health() -> None:
     """
     Monitor blockchain node health (R7-5).
 
@@ -28,7 +26,7 @@ def monitor_node_health() -> None:
     logger.debug("Starting node health check...")
 
     try:
-        asyncio.run(_monitor_node_health_async())
+        await _monitor_node_health_async()
     except Exception as e:
         logger.exception(f"Node health monitoring failed: {e}")
 
@@ -80,7 +78,7 @@ async def _notify_admins_maintenance_mode() -> None:
     """Notify admins about maintenance mode activation."""
     try:
         async with async_session_maker() as session:
-            bot = Bot(token=settings.telegram_bot_token)
+            bot = get_bot()
             notification_service = NotificationService(session)
 
             admin_ids = settings.get_admin_ids()
@@ -97,8 +95,6 @@ async def _notify_admins_maintenance_mode() -> None:
                     bot, admin_id, message, critical=True
                 )
 
-            await bot.session.close()
-
     except Exception as e:
         logger.error(f"Error notifying admins: {e}")
 
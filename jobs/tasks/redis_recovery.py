@@ -5,32 +5,23 @@ R11-3: Handles recovery of notification queue and FSM states when Redis recovers
 Migrates data from PostgreSQL fallback back to Redis.
 """
 
-import asyncio
 import json
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import dramatiq
-from loguru import logger
-
-try:
-    from redis.asyncio import Redis as AsyncRedis
-except ImportError:
-    import redis.asyncio as aioredis
-
-    AsyncRedis = aioredis.Redis
-
 from aiogram.fsm.storage.redis import RedisStorage
+from loguru import logger
 
 from app.config.database import async_session_maker
 from app.config.settings import settings
 from app.models.notification_queue_fallback import NotificationQueueFallback
 from app.models.user_fsm_state import UserFsmState
-from app.repositories.user_repository import UserRepository
+from jobs.runtime import get_redis
 
 
 @dramatiq.actor(max_retries=3, time_limit=600_000)  # 10 min timeout
-def recover_redis_data() -> dict:
+async def recover_redis_data() -> dict:
     """
     Recover notification queue and FSM states when Redis recovers.
 
@@ -42,7 +33,7 @@ def recover_redis_data() -> dict:
     logger.info("R11-3: Starting Redis recovery process...")
 
     try:
-        result = asyncio.run(_recover_redis_data_async())
+        result = await _recover_redis_data_async()
         logger.info(
             f"R11-3: Redis recovery complete: "
             f"{result['notifications_migrated']} notifications, "
@@ -60,15 +51,11 @@ def recover_redis_data() -> dict:
 
 async def _recover_redis_data_async() -> dict:
     """Async implementation of Redis recovery."""
-    # Check if Redis is available
+    # Check if the shared worker Redis client is available
     try:
-        redis_client = AsyncRedis(
-            host=settings.redis_host,
-            port=settings.redis_port,
-            password=settings.redis_password,
-            db=settings.redis_db,
-            decode_responses=True,
-        )
+        redis_client = get_redis()
+        if redis_client is None:
+            raise RuntimeError("redis is not installed")
         await redis_client.ping()
         logger.info("R11-3: Redis is available, starting recovery")
     except Exception as e:
@@ -141,8 +128,6 @@ async def _recover_redis_data_async() -> dict:
                 )
 
             # 2. Migrate FSM states from PostgreSQL to Redis
-            user_repo = UserRepository(session)
-
             # Get active FSM states (updated in last 24 hours)
             cutoff_time = datetime.now(UTC) - timedelta(hours=24)
             stmt = (
@@ -164,16 +149,12 @@ async def _recover_redis_data_async() -> dict:
 
                 for fsm_state in active_fsm_states:
                     try:
-                        user = await user_repo.get_by_id(fsm_state.user_id)
-                        if not user:
-                            continue
-
                         # Create storage key
                         from aiogram.fsm.storage.base import StorageKey
 
                         storage_key = StorageKey(
-                            chat_id=user.telegram_id,
-                            user_id=user.telegram_id,
+                            chat_id=fsm_state.chat_id,
+                            user_id=fsm_state.telegram_id,
                             bot_id=int(settings.telegram_bot_token.split(":")[0]),
                         )
 
@@ -194,7 +175,7 @@ async def _recover_redis_data_async() -> dict:
                     except Exception as e:
                         logger.error(
                             f"R11-3: Failed to migrate FSM state "
-                            f"for user {fsm_state.user_id}: {e}"
+                            f"for user {fsm_state.telegram_id}: {e}"
                         )
 
                 logger.info(
@@ -203,8 +184,6 @@ async def _recover_redis_data_async() -> dict:
 
     except Exception as e:
         logger.error(f"R11-3: Error during Redis recovery: {e}", exc_info=True)
-    finally:
-        await redis_client.close()
 
     return {
         "notifications_migrated": notifications_migrated,
@@ -5,22 +5,20 @@ Monitors withdrawal transactions stuck in PROCESSING status.
 Runs every 5 minutes to check for stuck transactions.
 """
 
-import asyncio
 from datetime import UTC, datetime, timedelta
 
 import dramatiq
-from aiogram import Bot
 from loguru import logger
 
 from app.config.database import async_session_maker
-from app.config.settings import settings
 from app.services.blockchain_service import get_blockchain_service
 from app.services.notification_service import NotificationService
 from app.services.stuck_transaction_service import StuckTransactionService
+from jobs.runtime import get_bot
 
 
 @dramatiq.actor(max_retries=3, time_limit=300_000)  # 5 min timeout
-def monitor_stuck_transactions() -> dict:
+async def monitor_stuck_transactions() -> dict:
     """
     Monitor stuck withdrawal transactions.
 
@@ -37,7 +35,7 @@ def monitor_stuck_transactions() -> dict:
 
     try:
         # Run async code
-        result = asyncio.run(_monitor_stuck_transactions_async())
+        result = await _monitor_stuck_transactions_async()
 
         logger.info(
             f"Stuck transaction monitoring complete: "
@@ -84,8 +82,8 @@ async def _monitor_stuck_transactions_async() -> dict:
             f"Found {len(stuck_withdrawals)} stuck withdrawal(s) to process"
         )
 
-        # Initialize bot for notifications
-        bot = Bot(token=settings.telegram_bot_token)
+        # Shared worker bot for notifications
+        bot = get_bot()
         notification_service = NotificationService(session)
 
         processed = 0
@@ -96,11 +94,14 @@ async def _monitor_stuck_transactions_async() -> dict:
         # Get web3 instance from blockchain service
         web3 = blockchain_service.get_active_web3()
 
+        # Check all stuck transactions with batched receipt lookups
+        statuses = await blockchain_service.check_transactions_status(
+            [w.tx_hash for w in stuck_withdrawals]
+        )
+
         for withdrawal in stuck_withdrawals:
             try:
-                # Check transaction status in blockchain
-                # Use blockchain_service to handle async web3 calls correctly
-                bs_status = await blockchain_service.check_transaction_status(withdrawal.tx_hash)
+                bs_status = statuses[withdrawal.tx_hash]
                 
                 # Map status to format expected by handle_stuck_transaction
                 status_map = {
@@ -223,8 +224,6 @@ async def _monitor_stuck_transactions_async() -> dict:
             # Notify admins (this would require admin service integration)
             # For now, just log it
 
-        await bot.session.close()
-
         return {
             "processed": processed,
             "confirmed": confirmed,
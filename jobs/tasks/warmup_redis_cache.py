@@ -5,31 +5,22 @@ R11-3: Warms up Redis cache after recovery by loading frequently used data.
 Loads users, deposit levels, and system settings in batches.
 """
 
-import asyncio
 from typing import Any
 
 import dramatiq
 from loguru import logger
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
 
-try:
-    from redis.asyncio import Redis as AsyncRedis
-except ImportError:
-    import redis.asyncio as aioredis
-
-    AsyncRedis = aioredis.Redis
-
-from app.config.settings import settings
+from app.config.database import async_session_maker
 from app.repositories.deposit_level_version_repository import (
     DepositLevelVersionRepository,
 )
 from app.repositories.global_settings_repository import GlobalSettingsRepository
 from app.repositories.user_repository import UserRepository
+from jobs.runtime import get_redis
 
 
 @dramatiq.actor(max_retries=3, time_limit=300_000)  # 5 min timeout
-def warmup_redis_cache() -> None:
+async def warmup_redis_cache() -> None:
     """
     Warm up Redis cache after recovery.
 
@@ -38,7 +29,7 @@ def warmup_redis_cache() -> None:
     logger.info("R11-3: Starting Redis cache warmup...")
 
     try:
-        asyncio.run(_warmup_redis_cache_async())
+        await _warmup_redis_cache_async()
         logger.info("R11-3: Redis cache warmup complete")
     except Exception as e:
         logger.exception(f"R11-3: Redis cache warmup failed: {e}")
@@ -46,15 +37,11 @@ def warmup_redis_cache() -> None:
 
 async def _warmup_redis_cache_async() -> None:
     """Async implementation of Redis cache warmup."""
-    # Initialize Redis client
+    # Shared worker Redis client (not closed here)
     try:
-        redis_client = AsyncRedis(
-            host=settings.redis_host,
-            port=settings.redis_port,
-            password=settings.redis_password,
-            db=settings.redis_db,
-            decode_responses=True,
-        )
+        redis_client = get_redis()
+        if redis_client is None:
+            raise RuntimeError("redis is not installed")
         await redis_client.ping()
     except Exception as e:
         logger.error(f"R11-3: Redis not available for warmup: {e}")
@@ -64,23 +51,8 @@ async def _warmup_redis_cache_async() -> None:
     deposit_levels_loaded = 0
     settings_loaded = 0
 
-    # Create local engine to avoid event loop issues in threaded worker
-    local_engine = create_async_engine(
-        settings.database_url,
-        echo=False,
-        poolclass=NullPool,
-    )
-
-    local_session_maker = async_sessionmaker(
-        local_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-        autocommit=False,
-        autoflush=False,
-    )
-
     try:
-        async with local_session_maker() as session:
+        async with async_session_maker() as session:
             # 1. Load active users (batch of 1000)
             user_repo = UserRepository(session)
             users = await user_repo.find_all(limit=1000)
@@ -168,8 +140,3 @@ async def _warmup_redis_cache_async() -> None:
 
     except Exception as e:
         logger.error(f"R11-3: Error during cache warmup: {e}", exc_info=True)
-    finally:
-        await redis_client.close()
-        await local_engine.dispose()
-
-
@@ -38,7 +38,9 @@ async def main():
             if not admin.master_key:
                 print("Generating master key...")
                 plain_key = admin_service.generate_master_key()
-                admin.master_key = admin_service.hash_master_key(plain_key)
+                admin.master_key = await admin_service.hash_master_key(
+                    plain_key
+                )
                 await session.commit()
                 print(f"New Master Key: {plain_key}")
                 
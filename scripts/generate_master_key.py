@@ -46,7 +46,9 @@ async def generate_master_key_for_admin(telegram_id: int) -> None:
 
         # Generate new master key
         plain_master_key = admin_service.generate_master_key()
-        hashed_master_key = admin_service.hash_master_key(plain_master_key)
+        hashed_master_key = await admin_service.hash_master_key(
+            plain_master_key
+        )
 
         # Update admin
         admin.master_key = hashed_master_key
@@ -34,7 +34,7 @@ async def test_health_endpoint_includes_rpc_stats() -> None:
         "app.utils.health_check.get_blockchain_service"
     ) as mock_get_service:
         mock_service = MagicMock()
-        mock_service.web3.eth.chain_id = 56
+        mock_service.get_chain_id = AsyncMock(return_value=56)
         mock_service.get_rpc_stats.return_value = mock_rpc_stats
         mock_get_service.return_value = mock_service
 
@@ -171,7 +171,7 @@ async def test_health_endpoint_rpc_stats_structure() -> None:
         "app.utils.health_check.get_blockchain_service"
     ) as mock_get_service:
         mock_service = MagicMock()
-        mock_service.web3.eth.chain_id = 56
+        mock_service.get_chain_id = AsyncMock(return_value=56)
         mock_service.get_rpc_stats.return_value = mock_rpc_stats
         mock_get_service.return_value = mock_service
 
@@ -9,7 +9,7 @@ from decimal import Decimal
 
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
-from app.utils.encryption import hash_password
+from tests.conftest import hash_password
 
 
 class TestUserRepositoryCRUD:
@@ -214,3 +214,127 @@ class TestUserRepositoryQueries:
         assert isinstance(count, int)
         assert count >= 1
 
+    @pytest.mark.asyncio
+    async def test_exists(
+        self,
+        db_session,  # pylint: disable=redefined-outer-name
+        test_user,  # pylint: disable=redefined-outer-name
+    ):
+        """Test existence check without loading rows."""
+        repo = UserRepository(db_session)
+
+        assert await repo.exists(telegram_id=test_user.telegram_id)
+        assert not await repo.exists(telegram_id=999999998)
+
+
+class TestUserRepositoryKeyset:
+    """Tests for keyset pagination and streaming."""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_all_users_in_order(
+        self,
+        db_session,  # pylint: disable=redefined-outer-name
+    ):
+        """Test iter_pages yields every user exactly once by ID."""
+        repo = UserRepository(db_session)
+        for i in range(5):
+            await repo.create(
+                telegram_id=800000100 + i,
+                wallet_address="0x" + str(i) * 40,
+                financial_password=hash_password("test123"),
+            )
+
+        pages = [page async for page in repo.iter_pages(page_size=2)]
+        ids = [user.id for page in pages for user in page]
+
+        assert all(len(page) <= 2 for page in pages)
+        assert ids == sorted(ids)
+        assert len(ids) == len(set(ids)) == await repo.count()
+
+    @pytest.mark.asyncio
+    async def test_descending_page_after_cursor(
+        self,
+        db_session,  # pylint: disable=redefined-outer-name
+        test_user,  # pylint: disable=redefined-outer-name
+    ):
+        """Test descending pages only contain older IDs."""
+        repo = UserRepository(db_session)
+
+        page = await repo.get_page(
+            after_id=test_user.id + 1, limit=10, descending=True
+        )
+
+        assert page[0].id == test_user.id
+
+    @pytest.mark.asyncio
+    async def test_stream_matches_find_by(
+        self,
+        db_session,  # pylint: disable=redefined-outer-name
+        test_user,  # pylint: disable=redefined-outer-name
+    ):
+        """Test streaming yields the same users as find_by."""
+        repo = UserRepository(db_session)
+
+        streamed = [u.id async for u in repo.stream(batch_size=1)]
+        found = sorted(u.id for u in await repo.find_by())
+
+        assert streamed == found
+
+
+class TestUserRepositoryBulk:
+    """Tests for bulk insert and single-statement updates."""
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_returning(
+        self,
+        db_session,  # pylint: disable=redefined-outer-name
+    ):
+        """Test bulk_create returns entities with generated IDs."""
+        repo = UserRepository(db_session)
+
+        users = await repo.bulk_create([
+            {
+                "telegram_id": 800000200 + i,
+                "wallet_address": "0x" + str(i) * 40,
+                "financial_password": hash_password("test123"),
+            }
+            for i in range(3)
+        ])
+
+        assert [u.telegram_id for u in users] == [
+            800000200, 800000201, 800000202
+        ]
+        assert all(u.id is not None for u in users)
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_without_returning(
+        self,
+        db_session,  # pylint: disable=redefined-outer-name
+    ):
+        """Test bulk_create can skip fetching rows back."""
+        repo = UserRepository(db_session)
+
+        result = await repo.bulk_create(
+            [{
+                "telegram_id": 800000210,
+                "wallet_address": "0x" + "b" * 40,
+                "financial_password": hash_password("test123"),
+            }],
+            returning=False,
+        )
+
+        assert result == []
+        assert await repo.exists(telegram_id=800000210)
+
+    @pytest.mark.asyncio
+    async def test_update_by_id_syncs_loaded_entity(
+        self,
+        db_session,  # pylint: disable=redefined-outer-name
+        test_user,  # pylint: disable=redefined-outer-name
+    ):
+        """Test single-statement update keeps loaded instances in sync."""
+        repo = UserRepository(db_session)
+
+        assert await repo.update_by_id(test_user.id, is_verified=True)
+        assert test_user.is_verified is True
+        assert not await repo.update_by_id(999999999, is_verified=True)
@@ -0,0 +1,213 @@
+"""
+Unit tests for AdminSessionStore and Redis-backed session validation.
+
+Tests store round trips, debounced activity writes and that a stored
+session is validated without DB queries.
+"""
+
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from app.models.admin import Admin
+from app.models.admin_session import AdminSession
+from app.services import admin_service as admin_service_module
+from app.services.admin_service import AdminService
+from app.services.admin_session_store import (
+    REDIS_KEY_PREFIX,
+    AdminSessionStore,
+    _revoked_tokens,
+)
+
+TOKEN = "token-1"
+
+
+class FakePipeline:
+    """Pipeline stub applying queued commands on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        for name, args, kwargs in self.commands:
+            await getattr(self.redis, name)(*args, **kwargs)
+
+
+class FakeRedis:
+    """Minimal async Redis hash stub."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        entry = self.data.setdefault(key, {})
+        if mapping:
+            entry.update({k: str(v) for k, v in mapping.items()})
+        if field is not None:
+            entry[field] = str(value)
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def expire(self, key, seconds):
+        self.ttl[key] = seconds
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class Result:
+    """UPDATE result stub."""
+
+    def __init__(self, rowcount):
+        self.rowcount = rowcount
+
+
+class FakeSessionFactory:
+    """Session factory recording activity UPDATEs."""
+
+    def __init__(self, rowcount):
+        self.rowcount = rowcount
+        self.statements = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return Result(self.rowcount)
+
+    async def commit(self):
+        pass
+
+
+def make_session():
+    """Active DB session row."""
+    return AdminSession(
+        id=5,
+        admin_id=7,
+        session_token=TOKEN,
+        is_active=True,
+        expires_at=datetime.now(UTC) + timedelta(hours=1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_activity_is_persisted_once_per_interval():
+    """Test touches extend the TTL; the DB is written when due."""
+    redis = FakeRedis()
+    factory = FakeSessionFactory(rowcount=1)
+    store = AdminSessionStore(redis, factory, persist_interval=60)
+
+    await store.save(make_session())
+    stored = await store.get(TOKEN)
+    assert (stored.session_id, stored.admin_id) == (5, 7)
+    assert not stored.is_expired
+
+    await store.touch(TOKEN, stored)
+    await store.stop()
+    assert factory.statements == []
+
+    stale = await store.get(TOKEN)
+    object.__setattr__(stale, "persisted_at", time.time() - 61)
+    await store.touch(TOKEN, stale)
+    await store.stop()
+
+    assert len(factory.statements) == 1
+    assert await store.get(TOKEN) is not None
+
+
+@pytest.mark.asyncio
+async def test_token_is_revoked_when_db_row_is_inactive():
+    """Test an activity write finding no active row revokes the token."""
+    redis = FakeRedis()
+    store = AdminSessionStore(
+        redis, FakeSessionFactory(rowcount=0), persist_interval=1
+    )
+    await store.save(make_session())
+
+    stored = await store.get(TOKEN)
+    object.__setattr__(stored, "persisted_at", 0.0)
+    await store.touch(TOKEN, stored)
+    await asyncio.sleep(0)
+    await store.stop()
+
+    assert f"{REDIS_KEY_PREFIX}{TOKEN}" not in redis.data
+
+
+class NoSqlSession:
+    """AsyncSession stub failing on any query."""
+
+    async def execute(self, *args, **kwargs):
+        raise AssertionError("unexpected query")
+
+    async def get(self, *args, **kwargs):
+        raise AssertionError("unexpected query")
+
+    async def commit(self):
+        pass
+
+
+class CachedAdmins:
+    """Admin identity cache stub."""
+
+    async def get(self, session, admin_id):
+        return Admin(id=admin_id, telegram_id=1, role="admin",
+                     is_blocked=False)
+
+
+@pytest.mark.asyncio
+async def test_stored_session_is_validated_without_queries(monkeypatch):
+    """Test validate_session serves a stored session with zero SQL."""
+    store = AdminSessionStore(
+        FakeRedis(), FakeSessionFactory(rowcount=1), persist_interval=60
+    )
+    await store.save(make_session())
+    monkeypatch.setattr(
+        admin_service_module, "get_admin_identity_cache", CachedAdmins
+    )
+
+    service = AdminService(NoSqlSession(), session_store=store)
+    admin, session, error = await service.validate_session(TOKEN)
+
+    assert error is None
+    assert admin.id == 7
+    assert (session.id, session.session_token) == (5, TOKEN)
+
+
+def test_deactivated_and_deleted_sessions_are_revoked():
+    """Test flush detection of deactivated and deleted sessions."""
+    deactivated = make_session()
+    deactivated.is_active = False
+    deleted = AdminSession(id=6, admin_id=7, session_token="token-2")
+    untouched = AdminSession(id=8, admin_id=7, session_token="token-3")
+
+    assert _revoked_tokens(
+        [deactivated, untouched], [deleted]
+    ) == {TOKEN, "token-2"}
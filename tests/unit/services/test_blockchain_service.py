@@ -0,0 +1,400 @@
+"""
+Unit tests for BlockchainService async transport.
+
+Tests pooled session reuse across loops, provider failover and JSON-RPC
+batching without network access.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.config.settings import settings
+from app.services.blockchain_service import BlockchainService
+
+
+@pytest.fixture
+async def service():
+    """BlockchainService with no DB session factory."""
+    svc = BlockchainService(settings)
+    yield svc
+    await svc.close()
+
+
+@pytest.mark.asyncio
+async def test_session_is_shared_within_loop(service):
+    """Test one pooled session is registered per provider per loop."""
+    await service._get_web3("quicknode")
+    _, first = service._sessions["quicknode"]
+
+    await service._get_web3("quicknode")
+    _, second = service._sessions["quicknode"]
+
+    assert first is second
+    assert not first.closed
+
+
+def test_tuned_session_is_attached_on_every_loop():
+    """Test a new loop gets a pooled session, not web3's default one."""
+    from app.services.blockchain_service import RPC_POOL_SIZE
+
+    svc = BlockchainService(settings)
+    sessions = []
+
+    async def attach():
+        w3 = await svc._get_web3("quicknode")
+        session = w3.provider.session
+        sessions.append((session, session.connector.limit))
+        await svc.close()
+
+    for _ in range(2):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(attach())
+        finally:
+            loop.close()
+    (first, _), (second, limit) = sessions
+
+    assert first is not second
+    assert limit == RPC_POOL_SIZE
+
+
+def test_previous_loop_session_is_closed_on_new_loop():
+    """Test attaching a session on a new loop closes the old one."""
+    svc = BlockchainService(settings)
+    sessions = []
+
+    async def attach():
+        w3 = await svc._get_web3("quicknode")
+        sessions.append(w3.provider.session)
+
+    first_loop = asyncio.new_event_loop()
+    first_loop.run_until_complete(attach())
+    first_loop.close()
+
+    second_loop = asyncio.new_event_loop()
+    try:
+        second_loop.run_until_complete(attach())
+        first, second = sessions
+
+        assert first.closed
+        assert not second.closed
+    finally:
+        second_loop.run_until_complete(svc.close())
+        second_loop.close()
+
+
+@pytest.mark.asyncio
+async def test_provider_posts_through_attached_session(service):
+    """Test JSON-RPC requests go through the session set by the service."""
+    w3 = await service._get_web3("quicknode")
+    session = FakeBatchSession({})
+    session.post = lambda url, data=None, **kwargs: FakeRawResponse(
+        b'{"jsonrpc": "2.0", "id": 0, "result": "0x38"}'
+    )
+    w3.provider.session = session
+    session.closed = False
+
+    response = await w3.provider.make_request("eth_chainId", [])
+
+    assert response["result"] == "0x38"
+
+
+@pytest.mark.asyncio
+async def test_failover_to_backup_provider(service):
+    """Test a failing primary provider switches to the backup."""
+    service.providers["nodereal"] = service.providers["quicknode"]
+    service.active_provider_name = "quicknode"
+    calls = []
+
+    async def rpc(w3):
+        calls.append(service.active_provider_name)
+        if len(calls) == 1:
+            raise ConnectionError("primary down")
+        return 56
+
+    assert await service._run_async_failover(rpc) == 56
+    assert service.active_provider_name == "nodereal"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_no_failover_when_auto_switch_disabled(service):
+    """Test errors propagate when auto switch is disabled."""
+    service.providers["nodereal"] = service.providers["quicknode"]
+    service.is_auto_switch_enabled = False
+
+    async def rpc(w3):
+        raise ConnectionError("primary down")
+
+    with pytest.raises(ConnectionError):
+        await service._run_async_failover(rpc)
+    assert service.active_provider_name == "quicknode"
+
+
+class FakeResponse:
+    """aiohttp response stub returning a prepared JSON body."""
+
+    def __init__(self, body):
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def json(self, content_type=None):
+        return self.body
+
+
+class FakeRawResponse(FakeResponse):
+    """aiohttp response stub returning raw bytes."""
+
+    async def read(self):
+        return self.body
+
+
+class FakeBatchSession:
+    """Session stub answering JSON-RPC batches with canned receipts."""
+
+    def __init__(self, receipts):
+        self.receipts = receipts
+        self.requests = []
+
+    def post(self, url, json=None, headers=None):
+        self.requests.append(json)
+        body = []
+        for call in reversed(json):  # Providers may reorder responses
+            receipt = self.receipts.get(call["params"][0])
+            if receipt == "error":
+                body.append({"id": call["id"], "error": {"code": -32000}})
+            else:
+                body.append({"id": call["id"], "result": receipt})
+        return FakeResponse(body)
+
+
+def make_receipt(block_number: int, status: int = 1) -> dict:
+    """Raw (hex-encoded) receipt as returned by the node."""
+    return {
+        "blockNumber": hex(block_number),
+        "status": hex(status),
+        "transactionHash": "0x" + "00" * 32,
+    }
+
+
+@pytest.mark.asyncio
+async def test_receipts_fetched_in_batches(service, monkeypatch):
+    """Test receipts are chunked by rpc_batch_size and formatted."""
+    monkeypatch.setattr(settings, "rpc_batch_size", 2)
+    session = FakeBatchSession({
+        "0x01": make_receipt(100),
+        "0x02": None,
+        "0x03": "error",
+        "0x04": make_receipt(101, status=0),
+        "0x05": make_receipt(102),
+    })
+    monkeypatch.setattr(service, "_session_for", lambda w3: session)
+
+    receipts = await service.get_transaction_receipts(
+        ["0x01", "0x02", "0x03", "0x04", "0x05", "0x01"]
+    )
+
+    assert len(session.requests) == 3
+    assert json.dumps(session.requests[0])  # Serializable payload
+    assert receipts["0x01"].blockNumber == 100
+    assert receipts["0x02"] is None
+    assert receipts["0x03"] is None
+    assert receipts["0x04"].status == 0
+
+
+@pytest.mark.asyncio
+async def test_check_transactions_status(service, monkeypatch):
+    """Test batch status matches single-call status semantics."""
+    session = FakeBatchSession({
+        "0xaa": make_receipt(100),
+        "0xbb": make_receipt(110, status=0),
+        "0xcc": None,
+    })
+    monkeypatch.setattr(service, "_session_for", lambda w3: session)
+
+    async def block_number():
+        return 111
+
+    monkeypatch.setattr(service, "get_block_number", block_number)
+
+    statuses = await service.check_transactions_status(
+        ["0xaa", "0xbb", "0xcc"]
+    )
+
+    assert len(session.requests) == 1
+    assert statuses["0xaa"] == {
+        "status": "confirmed",
+        "confirmations": 12,
+        "block_number": 100,
+    }
+    assert statuses["0xbb"]["status"] == "failed"
+    assert statuses["0xcc"] == {"status": "pending", "confirmations": 0}
+
+
+@pytest.mark.asyncio
+async def test_wait_for_receipts_polls_only_pending(service, monkeypatch):
+    """Test every poll is one batch over the still-pending hashes."""
+    polls = []
+    mined = {"0xaa": "confirmed", "0xbb": "pending"}
+
+    async def check(tx_hashes):
+        polls.append(list(tx_hashes))
+        statuses = {
+            h: {"status": mined[h], "confirmations": 1} for h in tx_hashes
+        }
+        mined["0xbb"] = "failed"
+        return statuses
+
+    monkeypatch.setattr(service, "check_transactions_status", check)
+
+    statuses = await service.wait_for_receipts(
+        ["0xaa", "0xbb"], timeout=5, poll_interval=0.001
+    )
+
+    assert polls == [["0xaa", "0xbb"], ["0xbb"]]
+    assert statuses["0xaa"]["status"] == "confirmed"
+    assert statuses["0xbb"]["status"] == "failed"
+
+
+@pytest.mark.asyncio
+async def test_send_payments_broadcasts_in_nonce_order(service, monkeypatch):
+    """Test a batch reads gas price once and keeps per-payment results."""
+    from decimal import Decimal
+
+    class Eth:
+        gas_price_reads = 0
+
+        @property
+        async def gas_price(self):
+            Eth.gas_price_reads += 1
+            return 50_000_000
+
+        @property
+        async def chain_id(self):
+            return 56
+
+    w3 = type("W3", (), {"eth": Eth()})()
+    nonces = iter(range(40, 50))
+    sent = []
+
+    class Manager:
+        async def reserve(self, w3):
+            return next(nonces)
+
+    async def estimate(calldata):
+        return [50_000, None, 60_000][:len(calldata)]
+
+    async def failover(func):
+        return await func(w3)
+
+    async def sign_and_send(w3, txn):
+        if txn["gas"] == 120_000:
+            raise ValueError("insufficient funds")
+        sent.append(txn)
+        return f"0x{txn['nonce']}"
+
+    service.wallet_account = object()
+    service.nonce_manager = Manager()
+    monkeypatch.setattr(service, "_estimate_transfers_gas", estimate)
+    monkeypatch.setattr(service, "_run_async_failover", failover)
+    monkeypatch.setattr(service, "_sign_and_send", sign_and_send)
+
+    results = await service.send_payments([
+        ("0x" + "11" * 20, Decimal("1")),
+        ("not-an-address", Decimal("2")),
+        ("0x" + "22" * 20, Decimal("3")),
+        ("0x" + "33" * 20, Decimal("4")),
+    ])
+
+    assert [r["success"] for r in results] == [True, False, False, True]
+    assert "Invalid address" in results[1]["error"]
+    assert results[2]["error"] == "insufficient funds"
+    assert [txn["nonce"] for txn in sent] == [40, 42]
+    assert [txn["gas"] for txn in sent] == [60_000, 72_000]
+    assert Eth.gas_price_reads == 1
+
+
+@pytest.mark.asyncio
+async def test_send_payment_broadcasts_once_outside_failover(
+    service, monkeypatch
+):
+    """Test an ambiguous broadcast is reported, not resent on failover."""
+    from app.services.blockchain_service import AmbiguousBroadcastError
+
+    service.providers["nodereal"] = service.providers["quicknode"]
+    nonces = iter(range(7, 10))
+    prepared = []
+    broadcasts = []
+
+    class Manager:
+        async def reserve(self, w3):
+            return next(nonces)
+
+    async def get_web3(name):
+        return name
+
+    async def prepare(w3):
+        prepared.append(w3)
+        if w3 == "quicknode":
+            raise ConnectionError("primary down")
+        return w3, await service._reserve_txn(w3, build)
+
+    async def build(nonce):
+        return {"nonce": nonce}
+
+    async def sign_and_send(w3, txn):
+        broadcasts.append((w3, txn["nonce"]))
+        raise AmbiguousBroadcastError("0xabc", TimeoutError())
+
+    service.nonce_manager = Manager()
+    monkeypatch.setattr(service, "_get_web3", get_web3)
+    monkeypatch.setattr(service, "_sign_and_send", sign_and_send)
+
+    w3, txn = await service._run_async_failover(prepare)
+    result = await service._send_reserved(w3, txn)
+
+    assert prepared == ["quicknode", "nodereal"]
+    assert broadcasts == [("nodereal", 7)]
+    assert result == {
+        "success": True,
+        "tx_hash": "0xabc",
+        "error": None,
+        "status": "unknown",
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_stops_after_ambiguous_broadcast(service, monkeypatch):
+    """Test payments after an unknown broadcast outcome are not sent."""
+    from app.services.blockchain_service import AmbiguousBroadcastError
+
+    nonces = iter(range(5, 10))
+    sent = []
+
+    class Manager:
+        async def reserve(self, w3):
+            return next(nonces)
+
+    async def sign_and_send(w3, txn):
+        sent.append(txn["nonce"])
+        if txn["nonce"] == 6:
+            raise AmbiguousBroadcastError("0x6", TimeoutError())
+        return f"0x{txn['nonce']}"
+
+    service.nonce_manager = Manager()
+    monkeypatch.setattr(service, "_sign_and_send", sign_and_send)
+
+    results = await service._broadcast_in_order(object(), [{}, {}, {}])
+
+    assert sent == [5, 6]
+    assert [r["success"] for r in results] == [True, True, False]
+    assert results[1]["status"] == "unknown"
+    assert results[1]["tx_hash"] == "0x6"
+    assert "outcome unknown" in results[2]["error"]
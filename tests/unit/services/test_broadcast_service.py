@@ -0,0 +1,204 @@
+"""
+Unit tests for BroadcastService delivery.
+
+Tests the shared token bucket, per-recipient retry behaviour and the
+job lease without Telegram or DB access.
+"""
+
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendPhoto
+
+from app.services.broadcast_service import BroadcastService, TokenBucket
+
+
+class FakeBot:
+    """Bot stub failing the first `flood_errors` sends with RetryAfter."""
+
+    def __init__(self, flood_errors: int = 0):
+        self.flood_errors = flood_errors
+        self.sent = []
+
+    async def send_photo(self, chat_id, photo, **kwargs):
+        if self.flood_errors:
+            self.flood_errors -= 1
+            raise TelegramRetryAfter(
+                method=SendPhoto(chat_id=chat_id, photo=photo),
+                message="Too Many Requests",
+                retry_after=0,
+            )
+        self.sent.append((chat_id, photo, kwargs.get("caption")))
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text, None))
+
+
+PHOTO = {"type": "photo", "file_id": "file-1", "caption": "hi"}
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    """Test tokens beyond the burst are issued at the configured rate."""
+    bucket = TokenBucket(rate=50, capacity=5)
+
+    start = time.monotonic()
+    for _ in range(10):
+        await bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    # 5 burst tokens + 5 refilled at 50/s = ~0.1s
+    assert elapsed >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_pause_blocks_all_acquirers():
+    """Test pause() delays the next token for every sender."""
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.pause(0.1)
+
+    start = time.monotonic()
+    await bucket.acquire()
+
+    assert time.monotonic() - start >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_media_retried_after_flood_control():
+    """Test media messages are retried after RetryAfter."""
+    bot = FakeBot(flood_errors=1)
+    service = BroadcastService(None, bot, session_factory=object())
+    bucket = TokenBucket(rate=1000)
+
+    delivered = await service._deliver(
+        bucket, asyncio.Semaphore(1), 42, PHOTO, None
+    )
+
+    assert delivered is True
+    assert bot.sent == [(42, "file-1", "hi")]
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    """Test persistent flood control counts the recipient as failed."""
+    bot = FakeBot(flood_errors=10)
+    service = BroadcastService(None, bot, session_factory=object())
+
+    delivered = await service._deliver(
+        TokenBucket(rate=1000), asyncio.Semaphore(1), 42, PHOTO, None
+    )
+
+    assert delivered is False
+    assert bot.sent == []
+
+
+@pytest.mark.asyncio
+async def test_unknown_type_is_failed():
+    """Test unsupported payload types are not delivered."""
+    service = BroadcastService(None, FakeBot(), session_factory=object())
+
+    delivered = await service._deliver(
+        TokenBucket(rate=1000),
+        asyncio.Semaphore(1),
+        42,
+        {"type": "sticker", "file_id": "x"},
+        None,
+    )
+
+    assert delivered is False
+
+
+class FakeSession:
+    """Session stub usable as the task's session factory."""
+
+    def __init__(self):
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_broadcast_stops_when_lease_is_lost(monkeypatch):
+    """Test a sender whose lease was taken over stops at the checkpoint."""
+    from types import SimpleNamespace
+
+    from app.services import broadcast_service
+
+    job = SimpleNamespace(
+        broadcast_id="b1",
+        admin_telegram_id=1,
+        status="running",
+        lease_token="mine",
+        payload={"type": "text", "text": "hi"},
+        button=None,
+        last_user_id=0,
+        sent_count=0,
+        failed_count=0,
+    )
+    renewals = iter([True, False])
+
+    class JobRepo:
+        def __init__(self, session):
+            pass
+
+        async def get_by_id(self, job_id):
+            return job
+
+        async def renew_lease(self, job_id, lease_token, lease_seconds):
+            return next(renewals)
+
+    class UserRepo:
+        def __init__(self, session):
+            pass
+
+        async def get_telegram_id_page(self, after_id, limit):
+            return [(after_id + 1, 100 + after_id)]
+
+    monkeypatch.setattr(broadcast_service, "BroadcastJobRepository", JobRepo)
+    monkeypatch.setattr(broadcast_service, "UserRepository", UserRepo)
+    session = FakeSession()
+    bot = FakeBot()
+    service = BroadcastService(None, bot, session_factory=lambda: session)
+
+    await service._broadcast_task(1, "mine")
+
+    assert [chat_id for chat_id, _, _ in bot.sent] == [100, 101]
+    assert session.commits == 1  # Second page was not checkpointed
+    assert job.status == "running"
+
+
+@pytest.mark.asyncio
+async def test_leased_job_is_not_started_by_another_token(monkeypatch):
+    """Test a task without the job's lease token does nothing."""
+    from types import SimpleNamespace
+
+    from app.services import broadcast_service
+
+    class JobRepo:
+        def __init__(self, session):
+            pass
+
+        async def get_by_id(self, job_id):
+            return SimpleNamespace(status="running", lease_token="other")
+
+    monkeypatch.setattr(broadcast_service, "BroadcastJobRepository", JobRepo)
+    bot = FakeBot()
+    service = BroadcastService(
+        None, bot, session_factory=lambda: FakeSession()
+    )
+
+    await service._broadcast_task(1, "mine")
+
+    assert bot.sent == []
@@ -0,0 +1,160 @@
+"""
+Unit tests for ExportEngine.
+
+Tests batched CSV/gzip and write-only XLSX exports into spooled files
+without DB access.
+"""
+
+import gzip
+from collections import namedtuple
+
+import openpyxl
+import pytest
+from sqlalchemy import column, select, table
+
+from app.services.export_engine import (
+    XLSX,
+    ExportEngine,
+    column_widths,
+)
+
+UserRow = namedtuple("UserRow", "id name")
+
+STMT = select(table("users", column("id"), column("name")))
+
+
+class StreamResult:
+    """Streamed result stub yielding fixed partitions."""
+
+    def __init__(self, rows, size):
+        self.rows = rows
+        self.size = size
+
+    async def partitions(self):
+        for start in range(0, len(self.rows), self.size):
+            yield self.rows[start:start + self.size]
+
+
+class FakeSession:
+    """Session whose stream() serves queued rows."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def stream(self, stmt):
+        self.statements.append(stmt)
+        size = stmt.get_execution_options()["yield_per"]
+        return StreamResult(self.rows, size)
+
+
+def _rows(count):
+    return [UserRow(i, f"user{i}") for i in range(1, count + 1)]
+
+
+async def _export(rows, **kwargs):
+    engine = ExportEngine(FakeSession(rows), batch_size=2)
+    return await engine.export_query(
+        STMT,
+        filename="users.csv",
+        headers=["ID", "Имя"],
+        row_mapper=lambda row: [row.id, row.name],
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_csv_export_streams_batches_with_bom():
+    """Test rows arrive in cursor batches and encode as UTF-8 CSV."""
+    session = FakeSession(_rows(5))
+    engine = ExportEngine(session, batch_size=2)
+
+    with await engine.export_query(
+        STMT,
+        filename="users.csv",
+        headers=["ID", "Имя"],
+        row_mapper=lambda row: [row.id, row.name],
+    ) as export:
+        data = export.getvalue()
+
+        assert export.rows == 5
+        assert export.filename == "users.csv"
+        assert export.size == len(data)
+
+    assert session.statements[0].get_execution_options()["yield_per"] == 2
+    assert data.startswith(b"\xef\xbb\xbf")
+    lines = data.decode("utf-8-sig").splitlines()
+    assert lines[0] == "ID,Имя"
+    assert lines[1:] == [f"{i},user{i}" for i in range(1, 6)]
+
+
+@pytest.mark.asyncio
+async def test_compressed_csv_export():
+    """Test gzip output decompresses to the plain CSV."""
+    with await _export(_rows(3), compress=True) as export:
+        assert export.filename == "users.csv.gz"
+        text = gzip.decompress(export.getvalue()).decode("utf-8-sig")
+
+    assert text.splitlines() == ["ID,Имя", "1,user1", "2,user2", "3,user3"]
+
+
+@pytest.mark.asyncio
+async def test_xlsx_export_is_striped_write_only_workbook():
+    """Test XLSX export has a styled header, rows and zebra striping."""
+    with await _export(_rows(3), fmt=XLSX, widths=[8, 20]) as export:
+        workbook = openpyxl.load_workbook(export.file)
+
+    sheet = workbook["Export"]
+    assert [[c.value for c in row] for row in sheet.iter_rows()] == [
+        ["ID", "Имя"],
+        [1, "user1"],
+        [2, "user2"],
+        [3, "user3"],
+    ]
+    assert sheet["A1"].font.bold
+    assert sheet["A2"].fill.fill_type == "solid"
+    assert sheet["A3"].fill.fill_type is None
+    assert sheet["B3"].border.left.style == "thin"
+    assert sheet.column_dimensions["B"].width == 20
+
+
+@pytest.mark.asyncio
+async def test_write_xlsx_builds_sheets_off_loop():
+    """Test write_xlsx runs the builder and counts data rows."""
+
+    def build(writer):
+        writer.add_sheet("One", headers=["A"])
+        writer.write_rows([[1], [2]])
+        writer.add_sheet("Two")
+        writer.write_rows([[writer.cell("x")]])
+
+    with await ExportEngine.write_xlsx("report.xlsx", build) as export:
+        assert export.rows == 3
+        workbook = openpyxl.load_workbook(export.file)
+
+    assert workbook.sheetnames == ["One", "Two"]
+    assert workbook["Two"]["A1"].value == "x"
+
+
+@pytest.mark.asyncio
+async def test_unknown_format_is_rejected():
+    """Test an unsupported format fails before touching the session."""
+    session = FakeSession(_rows(1))
+
+    with pytest.raises(ValueError):
+        await ExportEngine(session).export_query(
+            STMT,
+            filename="users.pdf",
+            headers=["ID"],
+            row_mapper=lambda row: [row.id],
+            fmt="pdf",
+        )
+
+    assert session.statements == []
+
+
+def test_column_widths_fit_longest_value_and_cap():
+    """Test auto widths follow the longest cell and are capped."""
+    widths = column_widths(["ID", "Name"], [[1, "x" * 100], [12345, "ab"]])
+
+    assert widths == [(5 + 2) * 1.2, 50]
@@ -0,0 +1,187 @@
+"""
+Unit tests for GlobalSettingsCache.
+
+Tests snapshot reuse, version revalidation and pub/sub invalidation
+without DB access.
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from app.models.global_settings import GlobalSettings
+from app.services.global_settings_cache import (
+    SETTINGS_CHANNEL,
+    GlobalSettingsCache,
+    SettingsSnapshot,
+    _settings_changed,
+)
+
+
+def make_settings(version: int = 1, **overrides) -> GlobalSettings:
+    """Build a detached GlobalSettings row."""
+    values = {
+        "id": 1,
+        "version": version,
+        "min_withdrawal_amount": Decimal("5"),
+        "daily_withdrawal_limit": None,
+        "is_daily_limit_enabled": False,
+        "auto_withdrawal_enabled": True,
+        "withdrawal_service_fee": Decimal("0"),
+        "active_rpc_provider": "quicknode",
+        "is_auto_switch_enabled": True,
+        "max_open_deposit_level": 5,
+        "roi_settings": {"LEVEL_1_ROI_MIN": "1.0"},
+        "emergency_stop_withdrawals": False,
+        "emergency_stop_deposits": False,
+        "emergency_stop_roi": False,
+    }
+    values.update(overrides)
+    return GlobalSettings(**values)
+
+
+class Result:
+    """Query result stub."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Session stub serving one GlobalSettings row."""
+
+    def __init__(self, row):
+        self.row = row
+        self.version_probes = 0
+        self.loads = 0
+
+    async def execute(self, stmt):
+        if stmt.column_descriptions[0]["name"] == "version":
+            self.version_probes += 1
+            return Result(self.row.version)
+        self.loads += 1
+        return Result(self.row)
+
+
+@pytest.mark.asyncio
+async def test_fresh_snapshot_skips_db():
+    """Test a second read within the TTL does not query."""
+    session = FakeSession(make_settings())
+    cache = GlobalSettingsCache(ttl=60)
+
+    first = await cache.get(session)
+    second = await cache.get(session)
+
+    assert first is second
+    assert session.loads == 1
+    assert session.version_probes == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_snapshot_is_revalidated_by_version():
+    """Test an unchanged version keeps the snapshot after the TTL."""
+    session = FakeSession(make_settings())
+    cache = GlobalSettingsCache(ttl=60)
+    first = await cache.get(session)
+
+    cache._checked_at -= 120
+    second = await cache.get(session)
+
+    assert first is second
+    assert session.version_probes == 1
+    assert session.loads == 1
+
+
+@pytest.mark.asyncio
+async def test_older_version_does_not_invalidate():
+    """Test stale pub/sub messages are ignored."""
+    session = FakeSession(make_settings(version=3))
+    cache = GlobalSettingsCache(ttl=60)
+    await cache.get(session)
+
+    cache.invalidate(2)
+    await cache.get(session)
+    cache.invalidate(4)
+    session.row = make_settings(version=4, active_rpc_provider="nodereal")
+    snapshot = await cache.get(session)
+
+    assert session.loads == 2
+    assert snapshot.active_rpc_provider == "nodereal"
+
+
+def test_snapshot_is_immutable():
+    """Test snapshots cannot leak writes into the shared copy."""
+    row = make_settings()
+    snapshot = SettingsSnapshot.from_model(row)
+    row.roi_settings["LEVEL_1_ROI_MIN"] = "9.0"
+
+    with pytest.raises(AttributeError):
+        snapshot.version = 2
+    with pytest.raises(TypeError):
+        snapshot.roi_settings["LEVEL_1_ROI_MIN"] = "2.0"
+    assert snapshot.roi_settings["LEVEL_1_ROI_MIN"] == "1.0"
+
+
+@pytest.mark.asyncio
+async def test_listener_invalidates_on_published_version():
+    """Test a pub/sub message marks the snapshot stale."""
+    messages: asyncio.Queue = asyncio.Queue()
+
+    class FakePubSub:
+        async def subscribe(self, channel):
+            assert channel == SETTINGS_CHANNEL
+
+        async def listen(self):
+            while True:
+                yield await messages.get()
+
+        async def aclose(self):
+            pass
+
+    class FakeRedis:
+        def pubsub(self):
+            return FakePubSub()
+
+    session = FakeSession(make_settings())
+    cache = GlobalSettingsCache(redis_client=FakeRedis(), ttl=60)
+    cache.start_listener()
+    await asyncio.sleep(0)
+    await cache.get(session)
+
+    await messages.put({"type": "message", "data": b"2"})
+    await asyncio.sleep(0.01)
+    await cache.stop_listener()
+
+    assert cache._stale is True
+
+
+def test_scan_cursor_does_not_bump_version():
+    """Test only configuration changes count as settings changes."""
+    cursor = make_settings()
+    fee = make_settings()
+    for row in (cursor, fee):
+        row._sa_instance_state.committed_state.clear()
+    cursor.last_scanned_block = 100
+    fee.withdrawal_service_fee = Decimal("1")
+
+    assert _settings_changed(cursor) is False
+    assert _settings_changed(fee) is True
+
+
+def test_version_is_incremented_in_sql():
+    """Test the version bump is an UPDATE expression, not a Python value."""
+    from types import SimpleNamespace
+
+    from app.services.global_settings_cache import _bump_settings_version
+
+    row = make_settings(version=3)
+    row._sa_instance_state.committed_state.clear()
+    row.withdrawal_service_fee = Decimal("1")
+
+    _bump_settings_version(SimpleNamespace(dirty=[row]), None, None)
+
+    assert str(row.version) == "global_settings.version + :version_1"
@@ -0,0 +1,200 @@
+"""
+Unit tests for IncomingDepositService.
+
+Tests that a batch of transfers is matched with batched lookups and one
+conflict-tolerant bulk insert, without DB or Telegram access.
+"""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.config.settings import settings
+from app.models.deposit import Deposit
+from app.models.deposit_level_version import DepositLevelVersion
+from app.models.user import User
+from app.services.incoming_deposit_service import IncomingDepositService
+
+SENDER = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+STRANGER = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+
+
+class Result:
+    """Select result stub."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session stub answering the processed tx_hash query."""
+
+    def __init__(self, processed_hashes):
+        self.processed_hashes = processed_hashes
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        queried = stmt.whereclause.right.value  # tx_hash IN (...)
+        return Result([h for h in self.processed_hashes if h in queried])
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+def transfer(tx_hash, from_address, amount="10"):
+    """Decoded Transfer log to the system wallet."""
+    return {
+        "tx_hash": tx_hash,
+        "from_address": from_address,
+        "to_address": settings.system_wallet_address,
+        "amount": Decimal(amount),
+        "block_number": 100,
+    }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Service with stubbed repositories, settings cache and notifier."""
+    monkeypatch.setattr(
+        "app.services.global_settings_cache.get_global_settings_cache",
+        lambda: SimpleNamespace(get=_no_emergency_stop),
+    )
+    session = FakeSession(processed_hashes=["0xprocessed"])
+    service = IncomingDepositService(session)
+
+    user = User(id=7, wallet_address=SENDER.lower(), username="alice")
+    version = DepositLevelVersion(
+        id=3, level_number=1, amount=Decimal("10"), roi_cap_percent=500
+    )
+    service.calls = {"bulk_create": [], "confirmed": [], "admins": []}
+    service.recorded_hashes = set()  # Inserted concurrently, e.g. by bot
+
+    async def get_by_wallet_addresses(addresses):
+        service.calls["addresses"] = addresses
+        return {SENDER.lower(): user}
+
+    async def get_all_active_levels():
+        return [version]
+
+    async def bulk_create_new(rows):
+        service.calls["bulk_create"].append(rows)
+        return [
+            Deposit(id=i, **row)
+            for i, row in enumerate(rows, start=1)
+            if row["tx_hash"] not in service.recorded_hashes
+        ]
+
+    async def confirm_deposit(deposit_id, block_number):
+        service.calls["confirmed"].append(deposit_id)
+
+    async def notify_admins(message):
+        service.calls["admins"].append(message)
+
+    async def notify_user(user_id, message):
+        return True
+
+    service.user_repo.get_by_wallet_addresses = get_by_wallet_addresses
+    service.version_repo.get_all_active_levels = get_all_active_levels
+    service.deposit_repo.bulk_create_new = bulk_create_new
+    service.deposit_service.confirm_deposit = confirm_deposit
+    service.notification_service.notify_user = notify_user
+    service._notify_admins = notify_admins
+    return service
+
+
+async def _no_emergency_stop(session):
+    return SimpleNamespace(emergency_stop_deposits=False)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_matched_with_one_insert(service):
+    """Test dedupe, case-insensitive sender match and one bulk insert."""
+    created = await service.process_incoming_transfers([
+        transfer("0xnew", SENDER),
+        transfer("0xnew", SENDER),  # Second log of the same transaction
+        transfer("0xprocessed", SENDER),
+        transfer("0xunknown", STRANGER),
+    ])
+
+    assert created == 1
+    assert len(service.session.statements) == 1
+    assert service.calls["addresses"] == {SENDER, STRANGER}
+
+    [rows] = service.calls["bulk_create"]
+    assert [row["tx_hash"] for row in rows] == ["0xnew"]
+    assert rows[0]["user_id"] == 7
+    assert rows[0]["level"] == 1
+    assert rows[0]["deposit_version_id"] == 3
+    assert rows[0]["roi_cap_amount"] == Decimal("50")
+    assert service.calls["confirmed"] == [1]
+
+    unidentified, deposited = service.calls["admins"]
+    assert "НЕОПОЗНАННЫЙ" in unidentified and STRANGER in unidentified
+    assert "0xnew" in deposited
+
+
+@pytest.mark.asyncio
+async def test_unknown_amount_is_not_booked(service):
+    """Test a transfer matching no level is reported, not inserted."""
+    created = await service.process_incoming_transfers([
+        transfer("0xodd", SENDER, amount="12.5"),
+    ])
+
+    assert created == 0
+    assert service.calls["bulk_create"] == []
+    [message] = service.calls["admins"]
+    assert "0xodd" in message and "12.5" in message
+
+
+@pytest.mark.asyncio
+async def test_hash_recorded_meanwhile_does_not_fail_batch(service):
+    """Test a tx_hash conflict skips that row and books the others."""
+    service.recorded_hashes = {"0xbot"}
+
+    created = await service.process_incoming_transfers([
+        transfer("0xbot", SENDER),
+        transfer("0xnew", SENDER),
+    ])
+
+    assert created == 1
+    assert service.calls["confirmed"] == [2]
+
+
+@pytest.mark.asyncio
+async def test_dust_is_reported_not_booked(service, monkeypatch):
+    """Test a transfer below the minimum deposit alerts admins."""
+    monkeypatch.setattr(settings, "minimum_deposit_amount", 20)
+
+    created = await service.process_incoming_transfers([
+        transfer("0xdust", SENDER),
+    ])
+
+    assert created == 0
+    assert service.calls["bulk_create"] == []
+    [message] = service.calls["admins"]
+    assert "0xdust" in message and "below the minimum" in message
+
+
+@pytest.mark.asyncio
+async def test_deposit_waits_for_network_in_maintenance(
+    service, monkeypatch
+):
+    """Test R11-2 status is used while the blockchain is down."""
+    monkeypatch.setattr(settings, "blockchain_maintenance_mode", True)
+
+    await service.process_incoming_transfers([transfer("0xnew", SENDER)])
+
+    [rows] = service.calls["bulk_create"]
+    assert rows[0]["status"] == "pending_network_recovery"
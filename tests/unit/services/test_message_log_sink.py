@@ -0,0 +1,110 @@
+"""
+Unit tests for MessageLogSink.
+
+Tests batching, background flushing and the set-based trim query
+without DB access.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.user_message_log_repository import (
+    UserMessageLogRepository,
+)
+from app.services.message_log_sink import MessageLogSink
+
+
+class FakeSession:
+    """Async session stub recording executed statements."""
+
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, stmt):
+        self.log.append(stmt)
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def inserts():
+    """Executed INSERT statements."""
+    return []
+
+
+@pytest.fixture
+def sink(inserts):
+    """Sink writing to a fake session factory."""
+    return MessageLogSink(
+        session_factory=lambda: FakeSession(inserts),
+        batch_size=3,
+        flush_interval=60,
+        buffer_limit=5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_flush_uses_multi_row_inserts(sink, inserts):
+    """Test buffered rows are written in batch_size chunks."""
+    sink._task = object()  # Keep the background loop out of this test
+    for i in range(4):
+        sink.enqueue(telegram_id=i, message_text=f"msg {i}")
+
+    assert await sink.flush() == 4
+    assert [len(stmt._multi_values[0]) for stmt in inserts] == [3, 1]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_wakes_background_flush(sink, inserts):
+    """Test a full batch is flushed before the interval elapses."""
+    for i in range(3):
+        sink.enqueue(telegram_id=i, message_text="hi")
+
+    await asyncio.sleep(0.05)
+
+    assert len(inserts) == 1
+    await sink.stop()
+
+
+@pytest.mark.asyncio
+async def test_buffer_drops_oldest_when_full(sink, inserts):
+    """Test the bounded buffer keeps the newest rows."""
+    sink._task = object()
+    for i in range(7):
+        sink.enqueue(telegram_id=i, message_text="hi")
+
+    assert sink.dropped == 2
+    assert [row["telegram_id"] for row in sink._buffer] == [2, 3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_trim_is_a_single_set_based_delete():
+    """Test trimming ranks rows per user in one DELETE statement."""
+    statements = []
+
+    class Result:
+        rowcount = 7
+
+    class Session:
+        async def execute(self, stmt):
+            statements.append(stmt)
+            return Result()
+
+    deleted = await UserMessageLogRepository(Session()).trim_all_users(
+        keep_last=500, batch_size=100
+    )
+
+    sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert deleted == 7
+    assert len(statements) == 1
+    assert sql.startswith("DELETE FROM user_message_logs")
+    assert "row_number() OVER (PARTITION BY" in sql
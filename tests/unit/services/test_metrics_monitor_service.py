@@ -0,0 +1,107 @@
+"""
+Unit tests for MetricsMonitorService.
+
+Tests that metrics and the historical baseline come from a fixed number
+of aggregate queries, without DB access.
+"""
+
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.metrics_monitor_service import (
+    MetricsMonitorService,
+    _series_stats,
+)
+
+
+class Result:
+    """Query result stub."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def one(self):
+        return self.rows[0]
+
+    def scalar(self):
+        return self.rows[0]
+
+
+class FakeSession:
+    """Session stub returning queued results in order."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return Result(self.results.pop(0))
+
+
+@pytest.mark.asyncio
+async def test_current_metrics_use_three_aggregate_queries():
+    """Test withdrawals, deposits and balance are one query each."""
+    session = FakeSession(
+        [SimpleNamespace(
+            pending_count=4,
+            last_hour_count=10,
+            last_hour_amount=Decimal("250"),
+            rejected_count=2,
+            confirmed_amount=Decimal("1000"),
+        )],
+        [SimpleNamespace(
+            last_day_count=7,
+            level_5_count=1,
+            confirmed_amount=Decimal("5000"),
+        )],
+        [Decimal("300")],
+    )
+
+    metrics = await MetricsMonitorService(session).collect_current_metrics()
+
+    assert len(session.statements) == 3
+    assert metrics["withdrawals"]["pending_count"] == 4
+    assert metrics["withdrawals"]["rejection_rate"] == 20
+    assert metrics["deposits"]["level_5_count"] == 1
+    assert metrics["balance"]["total_deposits"] == 5000.0
+
+
+@pytest.mark.asyncio
+async def test_baseline_zero_fills_days_without_activity():
+    """Test the daily series come from two GROUP BY queries."""
+    today = datetime.now(UTC).replace(
+        hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+    )
+    yesterday = today - timedelta(days=1)
+    session = FakeSession(
+        [SimpleNamespace(day=yesterday, deposit_count=4, level_5_count=2)],
+        [SimpleNamespace(day=yesterday, amount=Decimal("400"))],
+    )
+    current = {
+        "withdrawals": {"pending_count": 3},
+        "balance": {"system_liabilities": 5000.0},
+    }
+
+    baseline = await MetricsMonitorService(session)._get_historical_baseline(
+        days=4, current_metrics=current
+    )
+
+    assert len(session.statements) == 2
+    assert baseline["deposit_count_mean"] == 1.0
+    assert baseline["level_5_count_mean"] == 0.5
+    assert baseline["withdrawal_amount_mean"] == 100.0
+    assert baseline["deposit_count_std"] == 2.0
+    assert baseline["pending_withdrawals_mean"] == 3.0
+
+
+def test_series_stats_fallback_for_short_series():
+    """Test a series with fewer than two points uses the default."""
+    assert _series_stats([5.0], 100.0) == (0.0, 100.0)
+    assert _series_stats([1.0, 1.0], 1.0) == (1.0, 0.1)
@@ -0,0 +1,179 @@
+"""
+Unit tests for NonceManager.
+
+Tests the in-process allocator (reservation, release, gap reset) and
+nonce handling around BlockchainService sends without network access.
+"""
+
+import asyncio
+
+import pytest
+from hexbytes import HexBytes
+
+from app.config.settings import settings
+from app.services.blockchain.nonce_manager import NonceManager
+from app.services.blockchain_service import (
+    AmbiguousBroadcastError,
+    BlockchainService,
+)
+
+ADDRESS = "0x" + "ab" * 20
+
+
+class FakeAccount:
+    """Wallet stub signing to a fixed transaction hash."""
+
+    def sign_transaction(self, txn):
+        return type("Signed", (), {
+            "rawTransaction": b"",
+            "hash": HexBytes("0x" + "cd" * 32),
+        })()
+
+
+class FakeEth:
+    """Chain stub with fixed transaction counts."""
+
+    def __init__(self, pending, latest=None):
+        self.counts = {"pending": pending, "latest": latest or pending}
+        self.calls = 0
+
+    async def get_transaction_count(self, address, block):
+        self.calls += 1
+        return self.counts[block]
+
+
+class FakeWeb3:
+    """Web3 stand-in (the allocator only needs transaction counts)."""
+
+    def __init__(self, pending, latest=None):
+        self.eth = FakeEth(pending, latest)
+
+
+@pytest.fixture
+def web3(monkeypatch):
+    """Fake web3 treated as AsyncWeb3 by the allocator."""
+    from app.services.blockchain import nonce_manager
+
+    monkeypatch.setattr(nonce_manager, "AsyncWeb3", FakeWeb3)
+    return FakeWeb3(pending=7)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reservations_are_distinct(web3):
+    """Test parallel sends get consecutive nonces from one chain read."""
+    manager = NonceManager(address=ADDRESS)
+
+    nonces = await asyncio.gather(*(manager.reserve(web3) for _ in range(5)))
+
+    assert sorted(nonces) == [7, 8, 9, 10, 11]
+    assert web3.eth.calls == 2  # One resync (pending + latest)
+
+
+@pytest.mark.asyncio
+async def test_released_nonce_is_reused_first(web3):
+    """Test a nonce that was never broadcast fills the hole."""
+    manager = NonceManager(address=ADDRESS)
+    first = await manager.reserve(web3)
+    await manager.reserve(web3)
+
+    await manager.release(first)
+
+    assert await manager.reserve(web3) == first
+    assert await manager.reserve(web3) == 9
+
+
+@pytest.mark.asyncio
+async def test_idle_gap_resets_to_chain(web3):
+    """Test lost reservations are reclaimed once the wallet is idle."""
+    manager = NonceManager(address=ADDRESS, stale_after=0)
+    for _ in range(3):
+        await manager.reserve(web3)
+
+    # Nothing reached the chain, nothing pending
+    assert await manager.sync(web3) == 7
+
+
+@pytest.mark.asyncio
+async def test_resync_moves_past_external_sends(web3):
+    """Test transactions sent elsewhere advance the sequence."""
+    manager = NonceManager(address=ADDRESS)
+    await manager.reserve(web3)
+
+    web3.eth.counts = {"pending": 20, "latest": 18}
+
+    assert await manager.sync(web3) == 20
+    assert await manager.reserve(web3) == 20
+
+
+@pytest.mark.asyncio
+async def test_send_releases_nonce_when_node_rejects():
+    """Test a rejected transaction hands its nonce back."""
+    service = BlockchainService(settings)
+    released = []
+
+    class Manager:
+        async def reserve(self, w3):
+            return 3
+
+        async def release(self, nonce):
+            released.append(nonce)
+
+    class Eth:
+        async def send_raw_transaction(self, raw):
+            raise ValueError({"code": -32000, "message": "underpriced"})
+
+    async def build(nonce):
+        return {"nonce": nonce}
+
+    service.nonce_manager = Manager()
+    service.wallet_account = FakeAccount()
+    w3 = type("W3", (), {"eth": Eth()})()
+
+    txn = await service._reserve_txn(w3, build)
+    with pytest.raises(ValueError):
+        await service._sign_and_send(w3, txn)
+
+    assert released == [3]
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_send_keeps_nonce_and_resyncs():
+    """Test a transport error keeps the nonce and reports the hash."""
+    service = BlockchainService(settings)
+    calls = []
+
+    class Manager:
+        async def release(self, nonce):
+            calls.append(("release", nonce))
+
+        async def sync(self, w3):
+            calls.append(("sync", None))
+            return 4
+
+    class Eth:
+        async def send_raw_transaction(self, raw):
+            raise TimeoutError()
+
+    service.nonce_manager = Manager()
+    service.wallet_account = FakeAccount()
+    w3 = type("W3", (), {"eth": Eth()})()
+
+    with pytest.raises(AmbiguousBroadcastError) as error:
+        await service._sign_and_send(w3, {"nonce": 3})
+
+    assert error.value.tx_hash == "0x" + "cd" * 32
+    assert calls == [("sync", None)]
+    await service.close()
+
+
+def test_payment_sender_shares_redis_sequence_by_default():
+    """Test the default PaymentSender allocator is Redis-backed."""
+    from web3 import AsyncWeb3
+
+    from app.services.blockchain.nonce_manager import create_redis_client
+    from app.services.blockchain.payment_sender import PaymentSender
+
+    sender = PaymentSender(AsyncWeb3(), ADDRESS)
+
+    assert sender.nonce_manager.redis_factory is create_redis_client
@@ -0,0 +1,129 @@
+"""
+Unit tests for NotificationFallbackConsumer.
+
+Tests batched claiming and per-notification outcomes without DB or
+Telegram access.
+"""
+
+import pytest
+from aiogram.exceptions import TelegramForbiddenError
+from sqlalchemy.dialects import postgresql
+
+from app.services.broadcast_service import TokenBucket
+from app.services.notification_fallback_consumer import (
+    NotificationFallbackConsumer,
+)
+
+
+class Result:
+    """Select result stub."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSessionFactory:
+    """Session factory answering claim queries with queued batches."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.claims = []
+        self.updates = []
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, stmt):
+        if stmt.is_select:
+            self.claims.append(stmt)
+            return Result(self.batches.pop(0) if self.batches else [])
+        self.updates.append(stmt)
+        return None
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeBot:
+    """Bot stub failing for configured chats."""
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        if chat_id in self.errors:
+            raise self.errors[chat_id]
+        self.sent.append((chat_id, text))
+
+
+def compile_sql(stmt):
+    """Render a statement as PostgreSQL SQL with inlined ids."""
+    return str(
+        stmt.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+def make_consumer(bot, factory, batch_size=10):
+    """Consumer with an effectively unlimited rate."""
+    return NotificationFallbackConsumer(
+        bot, factory, bucket=TokenBucket(10_000), batch_size=batch_size
+    )
+
+
+@pytest.mark.asyncio
+async def test_drain_marks_sent_and_dropped_notifications():
+    """Test transient failures stay pending, the rest is processed."""
+    factory = FakeSessionFactory([
+        (1, {"message": "hello"}, 100),
+        (2, {"message": "blocked"}, 200),
+        (3, {"message": ""}, 300),
+        (4, {"message": "flaky"}, 400),
+    ])
+    bot = FakeBot({
+        200: TelegramForbiddenError(method=None, message="blocked"),
+        400: ConnectionError("timeout"),
+    })
+
+    result = await make_consumer(bot, factory).drain()
+
+    assert (result.sent, result.dropped, result.failed) == (1, 2, 1)
+    assert bot.sent == [(100, "hello")]
+    assert factory.commits == 1
+
+    claim = compile_sql(factory.claims[0])
+    assert "FOR UPDATE OF notification_queue_fallback SKIP LOCKED" in claim
+    assert "processed_at IS NULL" in claim
+
+    update = compile_sql(factory.updates[0])
+    assert "IN (1, 2, 3)" in update
+
+
+@pytest.mark.asyncio
+async def test_failed_notifications_are_not_reclaimed_in_one_drain():
+    """Test a full batch of failures does not block the next batch."""
+    factory = FakeSessionFactory(
+        [(1, {"message": "a"}, 100), (2, {"message": "b"}, 100)],
+        [(3, {"message": "c"}, 300)],
+    )
+    bot = FakeBot({100: ConnectionError("timeout")})
+
+    result = await make_consumer(bot, factory, batch_size=2).drain()
+
+    assert (result.sent, result.failed) == (1, 2)
+    assert bot.sent == [(300, "c")]
+    assert len(factory.claims) == 2
+    assert "NOT IN (1, 2)" in compile_sql(factory.claims[1])
@@ -0,0 +1,68 @@
+"""
+Unit tests for PasswordHasher.
+
+Tests pool hashing/verification, the bounded queue and per-user
+serialization.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.password_hasher import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+)
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_in_process_pool():
+    """Test a hash made in the pool verifies and records latency."""
+    hasher = PasswordHasher(max_workers=1, max_pending=4, rounds=4)
+    try:
+        hashed = await hasher.hash("secret123", key=1)
+
+        assert hashed.startswith("$2b$04$")
+        assert await hasher.verify("secret123", hashed, key=1)
+        assert not await hasher.verify("wrong", hashed, key=1)
+    finally:
+        hasher.shutdown()
+
+    assert hasher.stats.calls == 3
+    assert hasher.stats.max_seconds > 0
+    assert hasher._key_locks == {}
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_and_same_user_is_serialized(monkeypatch):
+    """Test calls beyond max_pending fail and one user runs one job."""
+    release = threading.Event()
+    running = []
+
+    def blocking_check(password, hashed):
+        running.append(password)
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(
+        "app.services.password_hasher._checkpw", blocking_check
+    )
+    executor = ThreadPoolExecutor(max_workers=4)
+    hasher = PasswordHasher(max_pending=2, executor=executor)
+
+    first = asyncio.create_task(hasher.verify("a", "h", key=7))
+    second = asyncio.create_task(hasher.verify("b", "h", key=7))
+    await asyncio.sleep(0.05)
+
+    # Same key waits for the first job; both count against the limit
+    assert running == ["a"]
+    with pytest.raises(PasswordHasherBusyError):
+        await hasher.verify("c", "h", key=8)
+
+    release.set()
+    assert await asyncio.gather(first, second) == [True, True]
+    assert running == ["a", "b"]
+    assert hasher.stats.rejected == 1
+    hasher.shutdown()
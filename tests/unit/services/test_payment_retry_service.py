@@ -0,0 +1,224 @@
+"""
+Unit tests for PaymentRetryService.
+
+Tests that due retries are paid out as one batch (one send, one receipt
+wait, bulk updates) without DB or network access.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from app.models.payment_retry import PaymentRetry, PaymentType
+from app.services.payment_retry_service import PaymentRetryService
+
+
+def make_retry(retry_id: int, user_id: int, **overrides) -> PaymentRetry:
+    """Build a detached PaymentRetry row."""
+    values = {
+        "id": retry_id,
+        "user_id": user_id,
+        "amount": Decimal("10"),
+        "payment_type": PaymentType.REFERRAL_EARNING.value,
+        "earning_ids": [retry_id * 10],
+        "attempt_count": 0,
+        "max_retries": 5,
+        "in_dlq": False,
+        "resolved": False,
+    }
+    values.update(overrides)
+    return PaymentRetry(**values)
+
+
+class Result:
+    """Query result stub."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+
+class FakeSession:
+    """Session stub: answers selects in order, records bulk statements."""
+
+    def __init__(self, *select_results):
+        self.select_results = list(select_results)
+        self.bulk = []
+        self.commits = 0
+
+    async def execute(self, stmt, params=None):
+        if params is not None:
+            self.bulk.append((stmt.table.name, params))
+            return None
+        return Result(self.select_results.pop(0))
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeBlockchain:
+    """Blockchain service stub that pays every payment."""
+
+    def __init__(self, receipt_status="confirmed", send_status="pending"):
+        self.receipt_status = receipt_status
+        self.send_status = send_status
+        self.batches = []
+
+    async def send_payments(self, payments):
+        self.batches.append(payments)
+        return [
+            {
+                "success": True,
+                "tx_hash": f"0x{i}",
+                "error": None,
+                "status": self.send_status,
+            }
+            for i, _ in enumerate(payments)
+        ]
+
+    async def wait_for_receipts(self, tx_hashes, timeout):
+        return {
+            tx_hash: {"status": self.receipt_status, "confirmations": 1}
+            for tx_hash in tx_hashes
+        }
+
+
+def make_service(session, retries):
+    """PaymentRetryService whose repository returns the given retries."""
+    service = PaymentRetryService(session)
+
+    async def get_pending_retries(limit=None, skip_locked=False):
+        return retries
+
+    service.retry_repo.get_pending_retries = get_pending_retries
+    return service
+
+
+@pytest.mark.asyncio
+async def test_due_retries_are_paid_as_one_batch():
+    """Test one send for the batch and bulk marking of earnings."""
+    retries = [
+        make_retry(1, user_id=10, earning_ids=[11, 12]),
+        make_retry(
+            2,
+            user_id=20,
+            payment_type=PaymentType.DEPOSIT_REWARD.value,
+            earning_ids=[21],
+        ),
+        make_retry(3, user_id=30, attempt_count=4),
+    ]
+    session = FakeSession(
+        [(10, "0x" + "11" * 20), (20, "0x" + "22" * 20), (30, None)],
+        [],  # No existing transactions with these hashes
+    )
+    blockchain = FakeBlockchain()
+
+    stats = await make_service(session, retries).process_pending_retries(
+        blockchain
+    )
+
+    assert stats == {
+        "processed": 3,
+        "successful": 2,
+        "failed": 0,
+        "moved_to_dlq": 1,
+    }
+    assert len(blockchain.batches) == 1
+    assert len(blockchain.batches[0]) == 2
+
+    tables = dict(session.bulk)
+    assert tables["referral_earnings"] == [
+        {"id": 11, "paid": True, "tx_hash": "0x0"},
+        {"id": 12, "paid": True, "tx_hash": "0x0"},
+    ]
+    assert [row["id"] for row in tables["deposit_rewards"]] == [21]
+    assert len(tables["transactions"]) == 2
+
+    assert retries[0].resolved and retries[0].tx_hash == "0x0"
+    assert retries[2].in_dlq and "no wallet" in retries[2].last_error
+    assert session.commits == 2
+
+
+@pytest.mark.asyncio
+async def test_reverted_payout_is_rescheduled():
+    """Test a failed receipt counts as a failed attempt."""
+    retries = [make_retry(1, user_id=10)]
+    session = FakeSession([(10, "0x" + "11" * 20)])
+
+    stats = await make_service(session, retries).process_pending_retries(
+        FakeBlockchain(receipt_status="failed")
+    )
+
+    assert stats["failed"] == 1
+    assert not retries[0].resolved
+    assert retries[0].attempt_count == 1
+    assert retries[0].next_retry_at is not None
+    assert "reverted" in retries[0].last_error
+    assert session.bulk == []
+
+
+@pytest.mark.asyncio
+async def test_unmined_ambiguous_payout_is_held_not_rescheduled():
+    """Test an unknown broadcast outcome keeps its hash and is not resent."""
+    retries = [make_retry(1, user_id=10)]
+    session = FakeSession([(10, "0x" + "11" * 20)])
+
+    stats = await make_service(session, retries).process_pending_retries(
+        FakeBlockchain(receipt_status="pending", send_status="unknown")
+    )
+
+    assert stats["moved_to_dlq"] == 1
+    assert not retries[0].resolved
+    assert retries[0].in_dlq
+    assert retries[0].next_retry_at is None
+    assert retries[0].tx_hash == "0x0"
+    assert session.bulk == []
+
+
+@pytest.mark.asyncio
+async def test_mined_ambiguous_payout_counts_as_paid():
+    """Test an unknown broadcast outcome resolved by its receipt."""
+    retries = [make_retry(1, user_id=10)]
+    session = FakeSession([(10, "0x" + "11" * 20)], [])
+
+    stats = await make_service(session, retries).process_pending_retries(
+        FakeBlockchain(send_status="unknown")
+    )
+
+    assert stats["successful"] == 1
+    assert retries[0].resolved and retries[0].tx_hash == "0x0"
+
+
+@pytest.mark.asyncio
+async def test_dlq_retry_of_held_payout_waits_for_pending_transaction():
+    """Test a held payout still known to the node is not resent."""
+    retry = make_retry(1, user_id=10, in_dlq=True, tx_hash="0xabc")
+    service = PaymentRetryService(FakeSession())
+    blockchain = FakeBlockchain()
+
+    async def get_by_id(retry_id):
+        return retry
+
+    async def check_transactions_status(tx_hashes):
+        return {
+            h: {"status": "pending", "confirmations": 0} for h in tx_hashes
+        }
+
+    async def get_transactions(tx_hashes):
+        return {h: {"hash": h} for h in tx_hashes}
+
+    service.retry_repo.get_by_id = get_by_id
+    blockchain.check_transactions_status = check_transactions_status
+    blockchain.get_transactions = get_transactions
+
+    success, _, error = await service.retry_dlq_item(1, blockchain)
+
+    assert not success
+    assert "may still be mined" in error
+    assert blockchain.batches == []
+    assert retry.tx_hash == "0xabc"
@@ -0,0 +1,122 @@
+"""
+Unit tests for RetentionService.
+
+Tests batched deletes, throttling and archival without DB access.
+"""
+
+import gzip
+import json
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.retention_service import (
+    RetentionService,
+    default_policies,
+)
+
+
+class Result:
+    """DELETE result stub."""
+
+    def __init__(self, count, rows=None):
+        self.rowcount = count
+        self.rows = rows or []
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSessionFactory:
+    """Session factory whose sessions delete queued batch sizes."""
+
+    def __init__(self, *batches, rows=False):
+        self.batches = list(batches)
+        self.rows = rows
+        self.statements = []
+        self.commits = 0
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        count = self.batches.pop(0)
+        if not self.rows:
+            return Result(count)
+        return Result(count, [
+            {"id": i, "action_type": "test"} for i in range(count)
+        ])
+
+    async def commit(self):
+        self.commits += 1
+
+
+def policy(name):
+    """Get a default policy by name."""
+    return next(p for p in default_policies() if p.name == name)
+
+
+@pytest.mark.asyncio
+async def test_deletes_in_batches_until_short_batch(monkeypatch):
+    """Test one transaction per batch and a pause between batches."""
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr("asyncio.sleep", sleep)
+    factory = FakeSessionFactory(100, 100, 40)
+    service = RetentionService(factory, batch_size=100, pause=0.5)
+
+    result = await service.apply(policy("user_message_logs"))
+
+    assert result.deleted == 240
+    assert result.batches == 3
+    assert result.error is None
+    assert factory.commits == 3
+    assert sleeps == [0.5, 0.5]
+
+    sql = str(factory.statements[0].compile(dialect=postgresql.dialect()))
+    assert "DELETE FROM user_message_logs" in sql
+    assert "LIMIT" in sql
+    assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+@pytest.mark.asyncio
+async def test_archived_rows_are_written_before_commit(tmp_path):
+    """Test deleted admin actions land in a gzip JSON lines file."""
+    factory = FakeSessionFactory(2, rows=True)
+    service = RetentionService(factory, batch_size=10, archive_dir=tmp_path)
+
+    result = await service.apply(policy("admin_actions"))
+
+    with gzip.open(result.archive_path, "rt") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row["id"] for row in rows] == [0, 1]
+
+    sql = str(factory.statements[0].compile(dialect=postgresql.dialect()))
+    assert "is_immutable IS false" in sql
+    assert "RETURNING" in sql
+
+
+@pytest.mark.asyncio
+async def test_failing_policy_does_not_stop_others():
+    """Test an error is recorded and the next policy still runs."""
+    factory = FakeSessionFactory(0)  # Second execute fails (empty queue)
+    service = RetentionService(factory, batch_size=10)
+    policies = [policy("user_fsm_states"), policy("admin_sessions")]
+
+    results = await service.run(policies)
+
+    assert results[0].error is None
+    assert results[1].error is not None
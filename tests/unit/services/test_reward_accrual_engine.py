@@ -0,0 +1,126 @@
+"""
+Unit tests for RewardAccrualEngine planning.
+
+Tests in-memory reward and referral fan-out computation used by the
+batched accrual engine.
+"""
+
+from decimal import Decimal
+
+from app.repositories.referral_repository import sum_deltas
+from app.services.reward_accrual_engine import (
+    DueDeposit,
+    ReferralRelation,
+    plan_accruals,
+    plan_referral_credits,
+)
+
+EQUAL_CONFIGS = {
+    level: {
+        "mode": "equal",
+        "roi_min": Decimal("0.8"),
+        "roi_max": Decimal("10.0"),
+        "roi_fixed": Decimal("2"),
+    }
+    for level in range(1, 6)
+}
+
+
+def make_deposit(
+    deposit_id: int,
+    user_id: int = 1,
+    amount: str = "100",
+    cap: str = "500",
+    paid: str = "0",
+) -> DueDeposit:
+    """Build a due deposit row."""
+    return DueDeposit(
+        id=deposit_id,
+        user_id=user_id,
+        telegram_id=1000 + user_id,
+        level=1,
+        amount=Decimal(amount),
+        roi_cap_amount=Decimal(cap),
+        roi_paid_amount=Decimal(paid),
+    )
+
+
+class TestPlanAccruals:
+    """Tests for reward computation."""
+
+    def test_equal_mode_uses_fixed_rate(self):
+        """Test equal mode applies roi_fixed to the deposit amount."""
+        items = plan_accruals(
+            [make_deposit(1)], EQUAL_CONFIGS, lambda lo, hi: lo
+        )
+
+        assert len(items) == 1
+        assert items[0].rate == Decimal("2")
+        assert items[0].reward_amount == Decimal("2.00000000")
+        assert items[0].new_roi_paid == Decimal("2.00000000")
+        assert items[0].completed is False
+
+    def test_custom_mode_uses_rate_generator(self):
+        """Test custom mode asks the generator for a rate."""
+        configs = {
+            1: {
+                "mode": "custom",
+                "roi_min": Decimal("1"),
+                "roi_max": Decimal("3"),
+                "roi_fixed": Decimal("5"),
+            }
+        }
+        items = plan_accruals(
+            [make_deposit(1)], configs, lambda lo, hi: hi
+        )
+
+        assert items[0].rate == Decimal("3")
+        assert items[0].reward_amount == Decimal("3.00000000")
+
+    def test_reward_capped_and_completed(self):
+        """Test reward is capped to remaining ROI and marks completion."""
+        deposit = make_deposit(1, paid="499")
+        items = plan_accruals([deposit], EQUAL_CONFIGS, lambda lo, hi: lo)
+
+        assert items[0].reward_amount == Decimal("1")
+        assert items[0].new_roi_paid == Decimal("500")
+        assert items[0].completed is True
+
+    def test_zero_reward_skipped(self):
+        """Test deposits with no ROI space left are skipped."""
+        deposit = make_deposit(1, paid="500")
+        items = plan_accruals([deposit], EQUAL_CONFIGS, lambda lo, hi: lo)
+
+        assert items == []
+
+
+class TestPlanReferralCredits:
+    """Tests for referral fan-out computation."""
+
+    def test_credits_per_level_and_skips_ineligible(self):
+        """Test rates per level and ineligible referrers skipped."""
+        items = plan_accruals(
+            [make_deposit(1, user_id=10)], EQUAL_CONFIGS, lambda lo, hi: lo
+        )
+        relations = [
+            ReferralRelation(1, 10, 20, 1, True, False, False),
+            ReferralRelation(2, 10, 21, 2, True, False, True),  # banned
+            ReferralRelation(3, 10, 22, 3, True, False, False),
+        ]
+
+        credits = plan_referral_credits(items, relations)
+
+        assert [c.referrer_id for c in credits] == [20, 22]
+        assert credits[0].amount == Decimal("0.06000000")  # 3% of 2
+        assert credits[1].amount == Decimal("0.10000000")  # 5% of 2
+
+    def test_sum_deltas_aggregates_sorted(self):
+        """Test deltas are aggregated per id and sorted by id."""
+        rows = sum_deltas(
+            [(5, Decimal("1")), (2, Decimal("2")), (5, Decimal("3"))]
+        )
+
+        assert rows == [
+            {"id": 2, "delta": Decimal("2")},
+            {"id": 5, "delta": Decimal("4")},
+        ]
@@ -0,0 +1,144 @@
+"""
+Unit tests for UserContextCache.
+
+Tests LRU hits, tombstones and write detection without DB access.
+"""
+
+import pytest
+
+from app.models.admin import Admin
+from app.models.blacklist import Blacklist
+from app.models.user import User
+from app.services.user_context_cache import (
+    UserContext,
+    UserContextCache,
+    _changed_telegram_ids,
+)
+
+
+class FakeRedis:
+    """Minimal async Redis stub backed by a dict."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Record DB loads instead of querying."""
+    calls = []
+
+    async def fake_load(session, telegram_id):
+        calls.append(telegram_id)
+        return UserContext(telegram_id=telegram_id, user_id=telegram_id * 10)
+
+    monkeypatch.setattr(UserContextCache, "_load", staticmethod(fake_load))
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_local_hit_skips_db_and_redis(loads):
+    """Test a second lookup is served from the LRU."""
+    redis = FakeRedis()
+    cache = UserContextCache(redis, max_size=10, local_ttl=60, redis_ttl=60)
+
+    first = await cache.get_or_load(None, 1)
+    redis.data.clear()
+    second = await cache.get_or_load(None, 1)
+
+    assert first is second
+    assert loads == [1]
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_skips_db(loads):
+    """Test a context cached by another process is read from Redis."""
+    redis = FakeRedis()
+    await UserContextCache(redis, 10, 60, 60).get_or_load(None, 1)
+
+    context = await UserContextCache(redis, 10, 60, 60).get_or_load(None, 1)
+
+    assert context.user_id == 10
+    assert loads == [1]
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest(loads):
+    """Test the LRU is bounded by max_size."""
+    cache = UserContextCache(None, max_size=2, local_ttl=60, redis_ttl=60)
+
+    for telegram_id in (1, 2, 3):
+        await cache.get_or_load(None, telegram_id)
+    await cache.get_or_load(None, 1)
+
+    assert loads == [1, 2, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_invalidated_entry_bypasses_stale_redis(loads):
+    """Test a local tombstone reloads from DB even if Redis is stale."""
+    redis = FakeRedis()
+    cache = UserContextCache(redis, max_size=10, local_ttl=60, redis_ttl=60)
+    await cache.get_or_load(None, 1)
+
+    # Redis delete has not landed yet
+    cache.invalidate_local([1])
+    await cache.get_or_load(None, 1)
+
+    assert loads == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_redis_key(loads):
+    """Test invalidate() removes the shared Redis entry."""
+    redis = FakeRedis()
+    cache = UserContextCache(redis, max_size=10, local_ttl=60, redis_ttl=60)
+    await cache.get_or_load(None, 1)
+
+    await cache.invalidate([1])
+
+    assert redis.data == {}
+
+
+def test_context_json_roundtrip():
+    """Test contexts survive Redis serialization."""
+    context = UserContext(
+        telegram_id=1,
+        user_id=2,
+        is_banned=True,
+        language="en",
+        blacklist_id=3,
+        blacklist_action_type="pre_block",
+        blacklist_is_active=True,
+        admin_id=4,
+    )
+
+    assert UserContext.from_json(context.to_json()) == context
+
+
+def test_only_context_fields_mark_user_dirty():
+    """Test unrelated User updates do not invalidate the context."""
+    banned = User(telegram_id=1, wallet_address="0x1", is_banned=False)
+    renamed = User(telegram_id=2, wallet_address="0x2", username="old")
+    for user in (banned, renamed):
+        user._sa_instance_state.committed_state.clear()
+    banned.is_banned = True
+    renamed.username = "new"
+
+    changed = _changed_telegram_ids(
+        new=[Blacklist(telegram_id=3)],
+        dirty=[banned, renamed, Admin(telegram_id=4)],
+        deleted=[],
+    )
+
+    assert changed == {1, 3, 4}
@@ -0,0 +1,98 @@
+"""
+Unit tests for incoming transfer monitor scan planning.
+
+Tests cursor-based range planning and Transfer log decoding.
+"""
+
+from decimal import Decimal
+
+from hexbytes import HexBytes
+
+from app.config.settings import settings
+from jobs.tasks.incoming_transfer_monitor import (
+    INITIAL_LOOKBACK_BLOCKS,
+    MAX_BLOCKS_PER_RUN,
+    _decode_transfer_log,
+    _is_range_limit_error,
+    _is_rate_limit_error,
+    plan_scan_range,
+)
+
+SENDER = "0x742d35cc6634c0532925a3b844bc454e4438f44e"
+RECIPIENT = "0x5aaeb6053f3e94c9b9a09f33669435e7ef1beaed"
+
+
+def test_first_run_starts_from_lookback():
+    """Test scan starts INITIAL_LOOKBACK_BLOCKS behind confirmed head."""
+    head = 1_000_000
+    safe_head = head - settings.incoming_scan_confirmations
+
+    assert plan_scan_range(None, head) == (
+        safe_head - INITIAL_LOOKBACK_BLOCKS + 1,
+        safe_head,
+    )
+
+
+def test_resumes_after_cursor_up_to_confirmed_head():
+    """Test scan resumes right after cursor and stops at confirmed head."""
+    head = 1_000_000
+    safe_head = head - settings.incoming_scan_confirmations
+
+    assert plan_scan_range(safe_head - 10, head) == (
+        safe_head - 9,
+        safe_head,
+    )
+
+
+def test_nothing_to_scan_when_caught_up():
+    """Test no range when cursor already reached confirmed head."""
+    head = 1_000_000
+    safe_head = head - settings.incoming_scan_confirmations
+
+    assert plan_scan_range(safe_head, head) is None
+
+
+def test_catch_up_bounded_per_run():
+    """Test a long outage is caught up in bounded runs."""
+    assert plan_scan_range(0, 10_000_000) == (1, MAX_BLOCKS_PER_RUN)
+
+
+def test_range_limit_error_detection():
+    """Test provider range errors are recognised."""
+    assert _is_range_limit_error(
+        ValueError("eth_getLogs is limited to a 10,000 range")
+    )
+    assert _is_range_limit_error(
+        ValueError("query returned more than 10000 results, too many")
+    )
+    assert not _is_range_limit_error(ConnectionError("connection reset"))
+
+
+def test_rate_limit_is_not_a_range_error():
+    """Test a 429 backs off instead of narrowing the range."""
+    error = ValueError("429 Too Many Requests: request limit reached")
+
+    assert _is_rate_limit_error(error)
+    assert not _is_range_limit_error(error)
+
+
+def test_decode_transfer_log():
+    """Test Transfer log topics and data are decoded."""
+    log = {
+        "transactionHash": HexBytes("0x" + "ab" * 32),
+        "blockNumber": 123,
+        "topics": [
+            HexBytes("0x" + "00" * 32),
+            HexBytes("0x" + SENDER[2:].zfill(64)),
+            HexBytes("0x" + RECIPIENT[2:].zfill(64)),
+        ],
+        "data": HexBytes(hex(10 * 10**18)),
+    }
+
+    transfer = _decode_transfer_log(log)
+
+    assert transfer["tx_hash"] == "0x" + "ab" * 32
+    assert transfer["from_address"].lower() == SENDER
+    assert transfer["to_address"].lower() == RECIPIENT
+    assert transfer["amount"] == Decimal("10")
+    assert transfer["block_number"] == 123
@@ -0,0 +1,112 @@
+"""
+Unit tests for PostgreSQLFSMStorage.
+
+Tests LRU reads and coalesced write-behind upserts without DB access.
+"""
+
+import asyncio
+
+import pytest
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy.dialects import postgresql
+
+from bot.storage.postgresql_fsm_storage import PostgreSQLFSMStorage
+
+KEY = StorageKey(bot_id=1, chat_id=100, user_id=100)
+
+
+class Row:
+    """Loaded FSM row stub."""
+
+    state = "Deposit:amount"
+    data = {"level": 2}
+
+
+class Result:
+    """Select result stub."""
+
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class FakeSessionFactory:
+    """Session factory recording statements."""
+
+    def __init__(self, row=None):
+        self.row = row
+        self.selects = []
+        self.writes = []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute(self, stmt):
+        if stmt.is_select:
+            self.selects.append(stmt)
+            return Result(self.row)
+        self.writes.append(
+            str(stmt.compile(dialect=postgresql.dialect()))
+        )
+        return None
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_lru():
+    """Test a key is loaded once, then read from the process cache."""
+    factory = FakeSessionFactory(Row())
+    storage = PostgreSQLFSMStorage(factory, write_delay=0)
+
+    assert await storage.get_state(KEY) == "Deposit:amount"
+    assert await storage.get_data(KEY) == {"level": 2}
+    assert await storage.get_state(KEY) == "Deposit:amount"
+
+    assert len(factory.selects) == 1
+    assert "chat_id" in str(factory.selects[0])
+
+
+@pytest.mark.asyncio
+async def test_state_and_data_writes_are_coalesced():
+    """Test set_state + update_data of one handler is one upsert."""
+    factory = FakeSessionFactory()
+    storage = PostgreSQLFSMStorage(factory, write_delay=0.01)
+
+    await storage.set_state(KEY, State("amount", group_name="Deposit"))
+    data = await storage.update_data(KEY, {"level": 3})
+    data["level"] = 4  # Returned data is a copy
+
+    assert factory.writes == []
+    await asyncio.sleep(0.05)
+
+    assert len(factory.writes) == 1
+    assert "ON CONFLICT ON CONSTRAINT uq_user_fsm_states_chat_user" in (
+        factory.writes[0]
+    )
+    assert await storage.get_state(KEY) == "Deposit:amount"
+    assert await storage.get_data(KEY) == {"level": 3}
+
+
+@pytest.mark.asyncio
+async def test_cleared_key_is_deleted_on_close():
+    """Test an empty record is deleted and close() writes pending keys."""
+    factory = FakeSessionFactory(Row())
+    storage = PostgreSQLFSMStorage(factory, write_delay=60)
+
+    await storage.set_state(KEY, None)
+    await storage.set_data(KEY, {})
+    await storage.close()
+
+    assert len(factory.writes) == 1
+    assert factory.writes[0].startswith("DELETE FROM user_fsm_states")
@@ -4,11 +4,16 @@ Unit tests for ReferralService.
 Tests referral chain creation, reward processing, and statistics.
 """
 
-import pytest
 from decimal import Decimal
+
+import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.referral_service import ReferralService, REFERRAL_RATES
+from app.repositories.referral_leaderboard_repository import (
+    ReferralLeaderboardRepository,
+)
+from app.repositories.referral_repository import ReferralRelation
+from app.services.referral_service import REFERRAL_RATES, ReferralService
 
 
 @pytest.mark.asyncio
@@ -73,3 +78,125 @@ async def test_get_referral_stats(
     assert "pending_earnings" in stats
     assert "paid_earnings" in stats
 
+
+class FakeReferralRepository:
+    """Referral repository stub with a fixed chain."""
+
+    def __init__(self, ancestors):
+        self.ancestors = ancestors
+        self.applied = []
+
+    async def get_ancestors(self, user_ids):
+        return self.ancestors
+
+    async def apply_credits(self, credits, tx_hash, created_at=None):
+        self.applied.append((credits, tx_hash))
+
+
+@pytest.mark.asyncio
+async def test_roi_rewards_credit_chain_in_one_write():
+    """Test the whole chain is credited with a single bulk write."""
+
+    class Session:
+        async def commit(self):
+            pass
+
+    service = ReferralService(Session())
+    service.referral_repo = FakeReferralRepository([
+        ReferralRelation(1, 10, 20, 1, True, False, False),
+        ReferralRelation(2, 10, 21, 2, True, True, False),  # blocked
+        ReferralRelation(3, 10, 22, 3, True, False, False),
+    ])
+
+    success, total, error = await service.process_roi_referral_rewards(
+        user_id=10, roi_amount=Decimal("100")
+    )
+
+    credits, tx_hash = service.referral_repo.applied[0]
+    assert success is True and error is None
+    assert len(service.referral_repo.applied) == 1
+    assert tx_hash == "internal_balance_roi"
+    assert [(c.referrer_id, c.amount) for c in credits] == [
+        (20, Decimal("3.00000000")),
+        (22, Decimal("5.00000000")),
+    ]
+    assert total == Decimal("8")
+
+
+class RecordingSession:
+    """Session stub recording statements and returning fixed rows."""
+
+    def __init__(self, *results):
+        self.statements = []
+        self.results = list(results)
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        return self.results.pop(0) if self.results else None
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_earnings_are_incremental_upserts():
+    """Test earnings add to existing totals in one statement."""
+    from sqlalchemy.dialects import postgresql
+
+    session = RecordingSession()
+    repo = ReferralLeaderboardRepository(session)
+
+    await repo.add_earnings({22: Decimal("5"), 20: Decimal("3")})
+
+    lock, upsert = session.statements
+    assert "pg_advisory_xact_lock_shared" in str(lock)
+    compiled = upsert.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "ON CONFLICT (user_id) DO UPDATE" in sql
+    assert (
+        "total_earnings = (referral_leaderboard.total_earnings"
+        " + excluded.total_earnings)"
+    ) in sql
+    assert compiled.params["user_id_m0"] == 20  # Stable lock order
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_rebuild_upserts_under_exclusive_lock():
+    """Test a rebuild locks out increments and never empties the table."""
+    from types import SimpleNamespace
+
+    session = RecordingSession(None, SimpleNamespace(rowcount=3), None)
+    repo = ReferralLeaderboardRepository(session)
+
+    assert await repo.rebuild() == 3
+
+    lock, rebuild, prune = (str(stmt) for stmt in session.statements)
+    assert "pg_advisory_xact_lock(" in lock
+    assert "ON CONFLICT (user_id) DO UPDATE" in rebuild
+    assert "WHERE NOT EXISTS" in prune
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_position_counts_users_ahead():
+    """Test ranks come from index range counts, not a full ranking."""
+
+    class Result:
+        def __init__(self, row):
+            self.row = row
+
+        def one_or_none(self):
+            return self.row
+
+        def one(self):
+            return self.row
+
+    session = RecordingSession(
+        Result((4, Decimal("12.5"))), Result((2, 0, 9))
+    )
+    service = ReferralService(session)
+
+    position = await service.get_user_leaderboard_position(user_id=20)
+
+    assert position == {
+        "referral_rank": 3,
+        "earnings_rank": 1,
+        "total_users": 9,
+    }
+    assert len(session.statements) == 2
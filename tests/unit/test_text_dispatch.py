@@ -0,0 +1,139 @@
+"""
+Unit tests for TextDispatchMiddleware.
+
+Feeds the same updates to dispatchers with and without the exact-text
+index and checks the same handler runs.
+"""
+
+import datetime
+
+import pytest
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.filters import StateFilter
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.types import Chat, Message, Update, User
+
+from bot.middlewares.text_dispatch import TextDispatchMiddleware
+
+BOT = Bot(token="42:TEST")
+USER_ID = 7
+
+
+class Form(StatesGroup):
+    """Test states."""
+
+    name = State()
+    confirm = State()
+
+
+def build_dispatcher(  # noqa: C901
+    calls: list[str], indexed: bool
+) -> Dispatcher:
+    """Dispatcher with button, state and free-text handlers."""
+    menu = Router()
+    form = Router()
+    admin = Router()
+    fallback = Router()
+
+    @menu.message(StateFilter("*"), F.text == "📊 Баланс")
+    async def balance(message: Message) -> None:
+        calls.append("balance")
+
+    @menu.message(F.text.in_({"💰 Депозит", "💸 Вывод"}))
+    async def money(message: Message) -> None:
+        calls.append("money")
+
+    @form.message(Form.confirm, F.text == "✅ Да")
+    async def confirm(message: Message) -> None:
+        calls.append("confirm")
+
+    @form.message(Form.name)
+    async def name(message: Message) -> None:
+        calls.append("name")
+
+    async def deny(*args, **kwargs) -> bool:
+        return False
+
+    @admin.message(F.text == "✅ Да", deny)
+    async def never(message: Message) -> None:
+        calls.append("never")
+
+    @admin.message(F.text == "👑 Админ")
+    async def admin_panel(message: Message) -> None:
+        calls.append("admin")
+
+    async def inner(handler, event, data):
+        calls.append("inner")
+        return await handler(event, data)
+
+    admin.message.middleware(inner)
+
+    @fallback.message(F.text)
+    async def any_text(message: Message) -> None:
+        calls.append("fallback")
+
+    dp = Dispatcher()
+    dp.include_routers(menu, form, admin, fallback)
+    if indexed:
+        dp.message.outer_middleware(TextDispatchMiddleware(dp))
+    return dp
+
+
+def text_update(update_id: int, text: str) -> Update:
+    """Private chat text message update."""
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.datetime.now(),
+            chat=Chat(id=USER_ID, type="private"),
+            from_user=User(id=USER_ID, is_bot=False, first_name="U"),
+            text=text,
+        ),
+    )
+
+
+CASES = [
+    (None, "📊 Баланс"),
+    (Form.name, "📊 Баланс"),
+    (None, "💸 Вывод"),
+    (Form.name, "💸 Вывод"),
+    (Form.confirm, "✅ Да"),
+    (None, "✅ Да"),
+    (Form.name, "✅ Да"),
+    (None, "👑 Админ"),
+    (None, "hello"),
+    (Form.name, "hello"),
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("state,text", CASES)
+async def test_same_handler_as_router_chain(state, text):
+    """Test indexed dispatch picks what the router chain picks."""
+    results = []
+    for indexed in (False, True):
+        calls: list[str] = []
+        dp = build_dispatcher(calls, indexed)
+        key = StorageKey(bot_id=BOT.id, chat_id=USER_ID, user_id=USER_ID)
+        await dp.storage.set_state(key, state)
+
+        await dp.feed_update(BOT, text_update(1, text))
+        results.append(calls)
+
+    assert results[0] == results[1]
+    assert results[0]
+
+
+def test_index_lists_only_possible_handlers():
+    """Test a button resolves to its handler plus free-text handlers."""
+    dp = build_dispatcher([], indexed=False)
+    index = TextDispatchMiddleware(dp)
+
+    names = [
+        h.handler.callback.__name__
+        for h in index.candidates("📊 Баланс", None)
+    ]
+    assert names == ["balance", "any_text"]
+    assert index.candidates("hello", None) is None
@@ -0,0 +1,269 @@
+"""
+Unit tests for webhook ingestion.
+
+Tests consistent sharding, update_id deduplication, the ingress secret
+check, per-chat ordering and dead-lettering in the shard worker without
+Redis or Telegram.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from bot.webhook.shard_worker import ShardWorker
+from bot.webhook.update_queue import (
+    UpdateQueue,
+    shard_for_chat,
+    update_chat_id,
+)
+
+
+def message_update(update_id, chat_id, text="hi"):
+    """Raw message update."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "U"},
+            "text": text,
+        },
+    }
+
+
+def test_sharding_is_stable_and_consistent():
+    """Test a chat keeps its shard and growing shards moves few chats."""
+    chats = range(-5000, 5000)
+    before = {chat: shard_for_chat(chat, 8) for chat in chats}
+    after = {chat: shard_for_chat(chat, 9) for chat in chats}
+
+    assert all(0 <= shard < 8 for shard in before.values())
+    assert before == {chat: shard_for_chat(chat, 8) for chat in chats}
+    moved = sum(before[chat] != after[chat] for chat in chats)
+    # ~1/9 of the chats move, all of them to the new shard
+    assert moved < len(chats) * 0.2
+    assert {after[c] for c in chats if before[c] != after[c]} == {8}
+
+
+def test_chat_id_of_callback_and_chatless_updates():
+    """Test callback queries use the message chat, others the user."""
+    callback = {
+        "update_id": 1,
+        "callback_query": {
+            "id": "1",
+            "from": {"id": 42},
+            "message": {"chat": {"id": -100}},
+        },
+    }
+    inline = {"update_id": 2, "inline_query": {"from": {"id": 42}}}
+
+    assert update_chat_id(callback) == -100
+    assert update_chat_id(inline) == 42
+    assert update_chat_id({"update_id": 3}) == 0
+
+
+class FakeRedis:
+    """Redis stub for SET NX and XADD."""
+
+    def __init__(self):
+        self.keys = {}
+        self.streams = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.keys:
+            return None
+        self.keys[key] = value
+        return True
+
+    async def delete(self, key):
+        self.keys.pop(key, None)
+
+    async def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.streams.setdefault(key, []).append(fields)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_updates_are_queued_once():
+    """Test Telegram retries of an update_id are dropped."""
+    redis = FakeRedis()
+    queue = UpdateQueue(redis, shards=4, dedup_ttl=60, stream_maxlen=1000)
+
+    assert await queue.publish(message_update(1, 100))
+    assert not await queue.publish(message_update(1, 100))
+    assert await queue.publish(message_update(2, 100))
+
+    stream = redis.streams[queue.stream_key(shard_for_chat(100, 4))]
+    assert [json.loads(f["update"])["update_id"] for f in stream] == [1, 2]
+
+
+class FakeQueue:
+    """Update queue stub recording acks."""
+
+    def __init__(self):
+        self.acked = []
+
+    async def ack(self, shard, entry_ids):
+        self.acked.extend(entry_ids)
+
+
+class SlowDispatcher:
+    """Dispatcher stub; first update of chat 1 is slow."""
+
+    def __init__(self):
+        self.handled = []
+
+    async def feed_raw_update(self, bot, update):
+        if update["update_id"] == 1:
+            await asyncio.sleep(0.05)
+        self.handled.append(update["update_id"])
+
+
+@pytest.mark.asyncio
+async def test_updates_of_a_chat_keep_order():
+    """Test a chat's updates run in order while other chats proceed."""
+    dp = SlowDispatcher()
+    queue = FakeQueue()
+    worker = ShardWorker(dp, None, queue, shard=0, concurrency=10)
+
+    for entry_id, update in [
+        ("1-0", message_update(1, 1)),
+        ("2-0", message_update(2, 2)),
+        ("3-0", message_update(3, 1)),
+    ]:
+        await worker._slots.acquire()
+        worker._schedule(entry_id, update)
+    await worker.drain()
+
+    assert dp.handled == [2, 1, 3]
+    assert sorted(queue.acked) == ["1-0", "2-0", "3-0"]
+    assert worker._tails == {}
+
+
+class PublishingQueue:
+    """Update queue stub recording published updates."""
+
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, update):
+        self.published.append(update)
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_wrong_secret():
+    """Test only requests carrying the secret token are queued."""
+    from aiohttp.test_utils import make_mocked_request
+
+    from bot.webhook.ingress import SECRET_HEADER, create_webhook_handler
+
+    queue = PublishingQueue()
+    handler = create_webhook_handler(queue, "s3cret")
+
+    async def post(headers):
+        request = make_mocked_request("POST", "/", headers=headers)
+        request.json = lambda: asyncio.sleep(0, {"update_id": 1})
+        return await handler(request)
+
+    assert (await post({})).status == 401
+    assert (await post({SECRET_HEADER: "wrong"})).status == 401
+    assert (await post({SECRET_HEADER: "s3cret"})).status == 200
+    assert queue.published == [{"update_id": 1}]
+
+
+class ReplayQueue(FakeQueue):
+    """Update queue stub replaying pending entries once."""
+
+    def __init__(self, entries, counts):
+        super().__init__()
+        self.reads = [entries, []]
+        self.counts = counts
+        self.dead = []
+
+    async def ensure_group(self, shard):
+        pass
+
+    async def read(self, shard, consumer, count, block_ms, pending=False):
+        if not self.reads:
+            raise asyncio.CancelledError
+        return self.reads.pop(0)
+
+    async def delivery_counts(self, shard, consumer, entry_ids):
+        return {entry_id: self.counts[entry_id] for entry_id in entry_ids}
+
+    async def dead_letter(self, shard, entry_id, fields):
+        self.dead.append((entry_id, json.loads(fields["update"])))
+
+
+@pytest.mark.asyncio
+async def test_poison_entry_is_dead_lettered_on_replay():
+    """Test an entry delivered too often is dead-lettered, not replayed."""
+    dp = SlowDispatcher()
+    queue = ReplayQueue(
+        [("1-0", message_update(1, 1)), ("2-0", message_update(2, 2))],
+        counts={"1-0": 4, "2-0": 2},
+    )
+    worker = ShardWorker(
+        dp, None, queue, shard=0, concurrency=10, max_deliveries=3
+    )
+
+    with pytest.raises(asyncio.CancelledError):
+        await worker.run()
+
+    assert queue.dead == [("1-0", message_update(1, 1))]
+    assert dp.handled == [2]
+    assert queue.acked == ["2-0"]
+
+
+class StreamRedis:
+    """Redis stub serving one XREADGROUP response."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.added = []
+
+    async def xreadgroup(self, group, consumer, streams, count, block):
+        [key] = streams
+        return [(key, self.messages)]
+
+    async def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.added.append((key, fields))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline()
+
+
+class FakePipeline:
+    """Pipeline stub accepting XACK/XDEL."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    def xack(self, *args):
+        pass
+
+    def xdel(self, *args):
+        pass
+
+    async def execute(self):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_undecodable_entry_is_dead_lettered():
+    """Test a malformed entry does not break reading the shard."""
+    redis = StreamRedis([
+        ("1-0", {"update": "{not json"}),
+        ("2-0", {"update": json.dumps(message_update(2, 2))}),
+    ])
+    queue = UpdateQueue(redis, shards=1, dedup_ttl=60, stream_maxlen=1000)
+
+    entries = await queue.read(0, "shard-0", count=10, block_ms=1)
+
+    assert [entry_id for entry_id, _ in entries] == ["2-0"]
+    assert redis.added == [
+        (queue.dead_letter_key(0), {"update": "{not json", "entry_id": "1-0"})
+    ]
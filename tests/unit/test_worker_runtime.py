@@ -0,0 +1,79 @@
+"""
+Unit tests for the dramatiq worker runtime.
+
+Tests that loop-bound resources are shared per event loop, that the
+settings listener is started on boot and that everything is closed on
+shutdown.
+"""
+
+import asyncio
+
+import pytest
+
+from jobs import runtime
+
+
+@pytest.fixture(autouse=True)
+def reset_runtime(monkeypatch):
+    """Start every test without cached resources."""
+    monkeypatch.setattr(runtime, "_bot", None)
+    monkeypatch.setattr(runtime, "_redis", None)
+
+
+@pytest.mark.asyncio
+async def test_resources_are_shared_on_one_loop():
+    """Test repeated calls on the running loop return the same objects."""
+    assert runtime.get_bot() is runtime.get_bot()
+    assert runtime.get_redis() is runtime.get_redis()
+
+
+def test_resources_are_recreated_for_a_new_loop():
+    """Test a client bound to another loop is never reused."""
+
+    async def get_bot():
+        return runtime.get_bot()
+
+    bots = []
+    for _ in range(2):
+        loop = asyncio.new_event_loop()
+        try:
+            bots.append(loop.run_until_complete(get_bot()))
+        finally:
+            loop.close()
+    first, second = bots
+
+    assert first is not second
+
+
+@pytest.mark.asyncio
+async def test_close_runtime_closes_shared_resources(monkeypatch):
+    """Test the bot session, Redis client and DB engine are closed."""
+    closed = []
+
+    async def close_db():
+        closed.append("db")
+
+    monkeypatch.setattr(runtime, "close_db", close_db)
+    bot = runtime.get_bot()
+    redis_client = runtime.get_redis()
+
+    await runtime.close_runtime()
+
+    assert closed == ["db"]
+    assert bot.session._session is None or bot.session._session.closed
+    assert redis_client.connection is None
+    assert runtime._bot is None
+    assert runtime._redis is None
+
+
+@pytest.mark.asyncio
+async def test_start_runtime_listens_for_settings_changes(monkeypatch):
+    """Test the settings cache is initialized with the shared Redis."""
+    clients = []
+    monkeypatch.setattr(
+        runtime, "init_global_settings_cache", clients.append
+    )
+
+    await runtime.start_runtime()
+
+    assert clients == [runtime.get_redis()]